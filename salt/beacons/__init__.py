@@ -4,26 +4,195 @@ This package contains the loader modules for the salt streams system
 
 import copy
 import logging
+import os
 import re
 import sys
+import time
 
+import salt.ext.tornado.ioloop
 import salt.loader
 import salt.utils.event
 import salt.utils.minion
 
+try:
+    import pyinotify
+
+    HAS_PYINOTIFY = True
+    WATCH_MASK = (
+        pyinotify.IN_MODIFY
+        | pyinotify.IN_ATTRIB
+        | pyinotify.IN_CREATE
+        | pyinotify.IN_DELETE
+        | pyinotify.IN_MOVED_FROM
+        | pyinotify.IN_MOVED_TO
+        | pyinotify.IN_DELETE_SELF
+        | pyinotify.IN_MOVE_SELF
+    )
+except ImportError:
+    HAS_PYINOTIFY = False
+
 log = logging.getLogger(__name__)
 
 
+def _path_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class BeaconWatcher:
+    """
+    Handle passed to the ``watch`` function of event-driven beacons, used to
+    register their event sources on the minion's IOLoop and to emit events
+    as they happen
+
+    .. versionadded:: 3007.0
+    """
+
+    def __init__(self, name, io_loop, emit, stats):
+        self.name = name
+        self.io_loop = io_loop
+        self._emit = emit
+        self._stats = stats
+        self._fds = []
+        self._callbacks = []
+        self._closers = []
+        self.closed = False
+
+    def _run(self, callback, *args):
+        if self.closed:
+            return
+        start = time.process_time()
+        try:
+            callback(*args)
+        except Exception:  # pylint: disable=broad-except
+            log.error("Beacon %s failed to handle an event", self.name, exc_info=True)
+        finally:
+            self._stats["cpu"] += time.process_time() - start
+            self._stats["calls"] += 1
+
+    def emit(self, events):
+        """
+        Fire a list of events, in the format returned by the ``beacon``
+        function of polling beacons
+        """
+        if events and not self.closed:
+            self._emit(events)
+
+    def add_fd(self, fd, callback):
+        """
+        Call ``callback`` whenever ``fd`` is readable
+        """
+        self.io_loop.add_handler(
+            fd, lambda fd_, events: self._run(callback), self.io_loop.READ
+        )
+        self._fds.append(fd)
+
+    def call_every(self, interval, callback):
+        """
+        Call ``callback`` every ``interval`` seconds
+        """
+        periodic = salt.ext.tornado.ioloop.PeriodicCallback(
+            lambda: self._run(callback), max(interval, 0.1) * 1000, io_loop=self.io_loop
+        )
+        periodic.start()
+        self._callbacks.append(periodic)
+
+    def add_closer(self, callback):
+        """
+        Call ``callback`` when the beacon stops watching
+        """
+        self._closers.append(callback)
+
+    def watch_path(self, path, callback, interval=1):
+        """
+        Call ``callback`` whenever the file or directory at ``path`` changes.
+        Changes are detected with inotify when it is available, the path is
+        only polled while it does not exist. Without inotify the path is
+        polled every ``interval`` seconds, which only costs a ``stat`` call.
+        """
+        state = {"key": _path_key(path)}
+
+        def _check():
+            key = _path_key(path)
+            if key != state["key"]:
+                state["key"] = key
+                callback()
+
+        if not HAS_PYINOTIFY:
+            self.call_every(interval, _check)
+            return
+
+        wm = pyinotify.WatchManager()
+        notifier = pyinotify.Notifier(wm, lambda event: None)
+
+        def _ensure_watch():
+            if not wm.watches and os.path.exists(path):
+                wm.add_watch(path, WATCH_MASK)
+                state["ino"] = (_path_key(path) or (None,))[0]
+                return True
+            return False
+
+        def _readable():
+            notifier.read_events()
+            notifier.process_events()
+            # pyinotify drops the watch of a removed path, but a watch follows
+            # a path renamed away, as when a log file is rotated
+            key = _path_key(path)
+            if wm.watches and (key or (None,))[0] != state.get("ino"):
+                wm.rm_watch(list(wm.watches))
+            _check()
+            _ensure_watch()
+
+        def _poll():
+            if _ensure_watch():
+                _check()
+
+        _ensure_watch()
+        self.add_fd(wm.get_fd(), _readable)
+        self.call_every(interval, _poll)
+        self.add_closer(notifier.stop)
+
+    def close(self):
+        """
+        Remove all the event sources of the beacon
+        """
+        self.closed = True
+        for fd in self._fds:
+            try:
+                self.io_loop.remove_handler(fd)
+            except Exception:  # pylint: disable=broad-except
+                pass
+        for periodic in self._callbacks:
+            periodic.stop()
+        for closer in self._closers:
+            try:
+                closer()
+            except Exception:  # pylint: disable=broad-except
+                log.debug("Failed to close beacon %s", self.name, exc_info=True)
+        self._fds = []
+        self._callbacks = []
+        self._closers = []
+
+
 class Beacon:
     """
     This class is used to evaluate and execute on the beacon system
     """
 
-    def __init__(self, opts, functions):
+    def __init__(self, opts, functions, io_loop=None, fire=None):
         self.opts = opts
         self.functions = functions
         self.beacons = salt.loader.beacons(opts, functions)
         self.interval_map = dict()
+        # Event-driven beacons are only used when the caller runs an IOLoop
+        # and a callback to fire the events they emit
+        self.io_loop = io_loop
+        self.fire = fire
+        self.watchers = {}
+        self.stats = {}
 
     def process(self, config, grains):
         """
@@ -39,13 +208,19 @@ class Beacon:
                     - /var/cache/foo: {}
         """
         ret = []
-        b_config = copy.deepcopy(config)
-        if "enabled" in b_config and not b_config["enabled"]:
+        if "enabled" in config and not config["enabled"]:
+            self.close_watchers()
             return
+        watching = set()
         for mod in config:
             if mod == "enabled":
                 continue
 
+            watcher = self.watchers.get(mod)
+            b_config = {}
+            if watcher is None:
+                b_config[mod] = copy.deepcopy(config[mod])
+
             # Convert beacons that are lists to a dict to make processing easier
             current_beacon_config = None
             if isinstance(config[mod], list):
@@ -65,6 +240,13 @@ class Beacon:
                     else:
                         self._remove_list_item(config[mod], "enabled")
 
+            if watcher is not None:
+                if watcher.config == config[mod]:
+                    # The beacon is watching for events with this configuration
+                    watching.add(mod)
+                    continue
+                b_config[mod] = copy.deepcopy(config[mod])
+
             log.trace("Beacon processing: %s", mod)
             beacon_name = None
             if self._determine_beacon_config(current_beacon_config, "beacon_module"):
@@ -94,6 +276,13 @@ class Beacon:
                     log.error("Configuration for beacon must be a list.")
                     continue
 
+            if self._can_watch(beacon_name):
+                self._start_watcher(
+                    mod, beacon_name, config[mod], b_config, current_beacon_config
+                )
+                watching.add(mod)
+                continue
+
             fun_str = "{}.beacon".format(beacon_name)
             if fun_str in self.beacons:
                 runonce = self._determine_beacon_config(
@@ -117,12 +306,7 @@ class Beacon:
                     b_config = self._trim_config(
                         b_config, mod, "disable_during_state_run"
                     )
-                    is_running = False
-                    running_jobs = salt.utils.minion.running(self.opts)
-                    for job in running_jobs:
-                        if re.match("state.*", job["fun"]):
-                            is_running = True
-                    if is_running:
+                    if self._state_running():
                         close_str = "{}.close".format(beacon_name)
                         if close_str in self.beacons:
                             log.info("Closing beacon %s. State run in progress.", mod)
@@ -135,6 +319,8 @@ class Beacon:
 
                 # Fire the beacon!
                 error = None
+                stats = self._beacon_stats(mod)
+                start = time.process_time()
                 try:
                     raw = self.beacons[fun_str](b_config[mod])
                 except:  # pylint: disable=bare-except
@@ -150,22 +336,109 @@ class Beacon:
                             "beacon_name": beacon_name,
                         }
                     )
+                finally:
+                    stats["cpu"] += time.process_time() - start
+                    stats["calls"] += 1
                 if not error:
-                    for data in raw:
-                        tag = "salt/beacon/{}/{}/".format(self.opts["id"], mod)
-                        if "tag" in data:
-                            tag += data.pop("tag")
-                        if "id" not in data:
-                            data["id"] = self.opts["id"]
-                        ret.append(
-                            {"tag": tag, "data": data, "beacon_name": beacon_name}
-                        )
+                    events = self._format_events(mod, beacon_name, raw)
+                    stats["events"] += len(events)
+                    ret.extend(events)
                     if runonce:
                         self.disable_beacon(mod)
             else:
                 log.warning("Unable to process beacon %s", mod)
+
+        for mod in set(self.watchers) - watching:
+            self._stop_watcher(mod)
         return ret
 
+    def _format_events(self, mod, beacon_name, raw):
+        """
+        Turn the data returned or emitted by a beacon into events
+        """
+        ret = []
+        for data in raw:
+            tag = "salt/beacon/{}/{}/".format(self.opts["id"], mod)
+            if "tag" in data:
+                tag += data.pop("tag")
+            if "id" not in data:
+                data["id"] = self.opts["id"]
+            ret.append({"tag": tag, "data": data, "beacon_name": beacon_name})
+        return ret
+
+    def _state_running(self):
+        for job in salt.utils.minion.running(self.opts):
+            if re.match("state.*", job["fun"]):
+                return True
+        return False
+
+    def _beacon_stats(self, mod):
+        return self.stats.setdefault(mod, {"calls": 0, "cpu": 0.0, "events": 0})
+
+    def _can_watch(self, beacon_name):
+        """
+        Return ``True`` if the beacon can be run as an event-driven beacon
+        """
+        return (
+            self.io_loop is not None
+            and self.fire is not None
+            and self.opts.get("beacons_event_driven", True)
+            and "{}.watch".format(beacon_name) in self.beacons
+        )
+
+    def _start_watcher(self, mod, beacon_name, raw_config, b_config, beacon_config):
+        """
+        Register an event-driven beacon on the IOLoop
+        """
+        self._stop_watcher(mod)
+        # The interval is left in the configuration, event-driven beacons can
+        # use it as the period of the sources they have to poll
+        if self._determine_beacon_config(beacon_config, "disable_during_state_run"):
+            b_config = self._trim_config(b_config, mod, "disable_during_state_run")
+        runonce = self._determine_beacon_config(beacon_config, "run_once")
+        skip_during_state_run = self._determine_beacon_config(
+            beacon_config, "disable_during_state_run"
+        )
+        stats = self._beacon_stats(mod)
+
+        def _emit(raw):
+            if skip_during_state_run and self._state_running():
+                log.trace("Skipping beacon %s events. State run in progress.", mod)
+                return
+            events = self._format_events(mod, beacon_name, raw)
+            stats["events"] += len(events)
+            self.fire(events)
+            if runonce:
+                self._stop_watcher(mod)
+                self.disable_beacon(mod)
+
+        watcher = BeaconWatcher(mod, self.io_loop, _emit, stats)
+        watcher.config = copy.deepcopy(raw_config)
+        watcher.add_closer(lambda: self._close_beacon(beacon_name, b_config[mod]))
+        self.watchers[mod] = watcher
+        log.debug("Beacon %s is watching for events", mod)
+        watcher._run(
+            self.beacons["{}.watch".format(beacon_name)], b_config[mod], watcher
+        )
+
+    def _close_beacon(self, beacon_name, config):
+        close_str = "{}.close".format(beacon_name)
+        if close_str in self.beacons:
+            self.beacons[close_str](config)
+
+    def _stop_watcher(self, mod):
+        watcher = self.watchers.pop(mod, None)
+        if watcher is not None:
+            log.debug("Beacon %s stopped watching for events", mod)
+            watcher.close()
+
+    def close_watchers(self):
+        """
+        Stop all the event-driven beacons
+        """
+        for mod in list(self.watchers):
+            self._stop_watcher(mod)
+
     def _trim_config(self, b_config, mod, key):
         """
         Take a beacon configuration and strip out the interval bits
@@ -301,6 +574,26 @@ class Beacon:
 
         return True
 
+    def list_stats(self):
+        """
+        List the number of calls, CPU time in seconds and number of events of
+        each beacon
+
+        .. versionadded:: 3007.0
+        """
+        stats = {}
+        for mod, mod_stats in self.stats.items():
+            stats[mod] = dict(mod_stats, event_driven=mod in self.watchers)
+
+        # Fire the complete event back along with the beacon stats
+        with salt.utils.event.get_event("minion", opts=self.opts) as evt:
+            evt.fire_event(
+                {"complete": True, "stats": stats},
+                tag="/salt/minion/minion_beacons_stats_complete",
+            )
+
+        return True
+
     def validate_beacon(self, name, beacon_data):
         """
         Return available beacon functions
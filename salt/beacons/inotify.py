@@ -345,6 +345,34 @@ def beacon(config):
     return ret
 
 
+def watch(config, watcher):
+    """
+    Watch the configured files from the minion's IOLoop, firing events as
+    soon as the kernel reports them instead of on each beacon interval. Paths
+    which do not exist yet are checked for every ``interval`` seconds.
+
+    .. versionadded:: 3007.0
+    """
+    _config = salt.utils.beacons.list_to_dict(config)
+
+    # Set up the notifier and add the watches
+    beacon(config)
+    notifier = _get_notifier(_config)
+    wm = notifier._watch_manager
+
+    def _missing():
+        current = {watch.path for watch in wm.watches.values()}
+        return [path for path in _config.get("files", ()) if path not in current]
+
+    def _poll():
+        if any(os.path.exists(path) for path in _missing()):
+            watcher.emit(beacon(config))
+
+    watcher.add_fd(wm.get_fd(), lambda: watcher.emit(beacon(config)))
+    if _missing():
+        watcher.call_every(_config.get("interval", 1), _poll)
+
+
 def close(config):
     if "inotify.notifier" in __context__:
         __context__["inotify.notifier"].stop()
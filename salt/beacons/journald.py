@@ -100,3 +100,25 @@ def beacon(config):
                 sub.update({"tag": name})
                 ret.append(sub)
     return ret
+
+
+def watch(config, watcher):
+    """
+    Watch the journal file descriptor from the minion's IOLoop, firing events
+    as soon as matching entries are written instead of on each beacon
+    interval.
+
+    .. versionadded:: 3007.0
+    """
+    journal = _get_journal()
+
+    def _process():
+        if journal.process() != systemd.journal.NOP:
+            watcher.emit(beacon(config))
+
+    def _close():
+        __context__.pop("systemd.journald", None)
+        journal.close()
+
+    watcher.add_fd(journal.fileno(), _process)
+    watcher.add_closer(_close)
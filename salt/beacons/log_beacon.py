@@ -148,3 +148,24 @@ def beacon(config):
                     event["error"] = "bad match"
                     ret.append(event)
     return ret
+
+
+def watch(config, watcher):
+    """
+    Read the log file whenever it changes, instead of on each beacon
+    interval. Changes are detected with inotify when pyinotify is installed,
+    otherwise the file is checked every ``interval`` seconds.
+
+    .. versionadded:: 3007.0
+    """
+    _config = salt.utils.beacons.list_to_dict(config)
+    # Record the current end of the file, or report the missing file option
+    ret = beacon(config)
+    if "file" not in _config:
+        watcher.emit(ret)
+        return
+    watcher.watch_path(
+        _config["file"],
+        lambda: watcher.emit(beacon(config)),
+        interval=_config.get("interval", 1),
+    )
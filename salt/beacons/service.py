@@ -11,6 +11,10 @@ log = logging.getLogger(__name__)
 
 LAST_STATUS = {}
 
+# systemd links the invocation ID of each running unit here, the directory
+# changes whenever a unit starts or stops
+SYSTEMD_UNITS_DIR = "/run/systemd/units"
+
 __virtualname__ = "service"
 
 
@@ -166,3 +170,34 @@ def beacon(config):
             ret.append(ret_dict)
 
     return ret
+
+
+def watch(config, watcher):
+    """
+    Check the services from the minion's IOLoop. When every service only
+    reports changes (``onchangeonly``) and systemd is running, the services
+    are only checked when a unit starts or stops, otherwise they are checked
+    every ``interval`` seconds.
+
+    .. versionadded:: 3007.0
+    """
+    _config = salt.utils.beacons.list_to_dict(config)
+    services = _config.get("services", {})
+
+    def _check():
+        watcher.emit(beacon(config))
+
+    def _check_delayed():
+        if any("time" in LAST_STATUS.get(service, {}) for service in services):
+            _check()
+
+    _check()
+    onchangeonly = all(
+        (services[service] or {}).get("onchangeonly") is True for service in services
+    )
+    if onchangeonly and os.path.isdir(SYSTEMD_UNITS_DIR):
+        watcher.watch_path(SYSTEMD_UNITS_DIR, _check)
+        # Events of services with a delay are fired once it is over
+        watcher.call_every(1, _check_delayed)
+    else:
+        watcher.call_every(_config.get("interval", 1), _check)
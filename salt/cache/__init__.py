@@ -6,11 +6,16 @@ Loader mechanism for caching data, with data expiration, etc.
 
 
 import logging
+import os
 import time
 
 import salt.config
 import salt.loader
+import salt.payload
 import salt.syspaths
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.process
 from salt.utils.odict import OrderedDict
 
 log = logging.getLogger(__name__)
@@ -257,41 +262,181 @@ class Cache:
         fun = "{}.contains".format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def fetch_many(self, keys):
+        """
+        Fetch the data of several keys, possibly from different banks, at
+        once. Drivers providing a ``fetch_many`` function do it in bulk,
+        others fall back to one ``fetch`` per key.
+
+        .. versionadded:: 3007.0
+
+        :param keys:
+            An iterable of ``(bank, key)`` pairs.
+
+        :return:
+            A dict mapping each ``(bank, key)`` pair to what :py:meth:`fetch`
+            returns for it.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        fun = "{}.fetch_many".format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](keys, **self._kwargs)
+        return {(bank, key): self.fetch(bank, key) for bank, key in keys}
+
+    def store_many(self, data):
+        """
+        Store the data of several keys, possibly in different banks, at once.
+        Drivers providing a ``store_many`` function do it in bulk, others fall
+        back to one ``store`` per key.
+
+        .. versionadded:: 3007.0
+
+        :param data:
+            A dict mapping ``(bank, key)`` pairs to the data to store.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        if not data:
+            return
+        fun = "{}.store_many".format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](data, **self._kwargs)
+        for (bank, key), value in data.items():
+            self.store(bank, key, value)
+
+    def flush_many(self, keys):
+        """
+        Remove several keys, possibly from different banks, at once. Drivers
+        providing a ``flush_many`` function do it in bulk, others fall back to
+        one ``flush`` per key. A ``None`` key removes the whole bank, as with
+        :py:meth:`flush`.
+
+        .. versionadded:: 3007.0
+
+        :param keys:
+            An iterable of ``(bank, key)`` pairs.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        keys = list(keys)
+        fun = "{}.flush_many".format(self.driver)
+        if fun in self.modules:
+            for bank, key in keys:
+                if key is None:
+                    self.flush(bank)
+            keys = [(bank, key) for bank, key in keys if key is not None]
+            if keys:
+                self.modules[fun](keys, **self._kwargs)
+            return
+        for bank, key in keys:
+            self.flush(bank, key)
+
+    def list_with_data(self, bank, key=None):
+        """
+        Return the entries of a bank along with their data. Drivers providing
+        a ``list_with_data`` function do it in bulk, others fall back to
+        :py:meth:`list` followed by :py:meth:`fetch_many`.
+
+        .. versionadded:: 3007.0
+
+        :param bank:
+            The name of the location inside the cache which will hold the key
+            and its associated data.
+
+        :param key:
+            If given, the entries of ``bank`` are themselves banks, and the
+            data of their ``key`` is returned. E.g. the data of every minion
+            is returned by ``list_with_data("minions", "data")``.
+
+        :return:
+            A dict mapping each entry of the bank to its data.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        fun = "{}.list_with_data".format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank, key, **self._kwargs)
+        names = self.list(bank)
+        if key is None:
+            keys = [(bank, name) for name in names]
+        else:
+            keys = [("{}/{}".format(bank, name), key) for name in names]
+        data = self.fetch_many(keys)
+        return {name: data[pair] for name, pair in zip(names, keys)}
+
 
 class MemCache(Cache):
     """
-    Short-lived in-memory cache store keeping values on time and/or size (count)
-    basis.
+    Short-lived in-memory cache store keeping values on time, size (count)
+    and/or memory (bytes) basis. When full, the least recently used values are
+    evicted first.
+
+    Hits, misses and evictions are counted per bank group, that is the first
+    component of the bank name, e.g. ``minions`` for ``minions/alpha``. The
+    counters of each worker are periodically written to the cache directory,
+    see :py:func:`memcache_stats`.
     """
 
     # {<storage_id>: odict({<key>: [atime, data], ...}), ...}
     data = {}
+    # {<storage_id>: {<key>: <size in bytes>, ...}, ...}
+    sizes = {}
+    # {<storage_id>: <total size in bytes>, ...}
+    used = {}
+    # {<storage_id>: {<bank group>: {"hit": 0, "miss": 0, "evict": 0}, ...}, ...}
+    stats = {}
+    # The last time the stats of this process have been written
+    stats_written = 0
 
     def __init__(self, opts, **kwargs):
         super().__init__(opts, **kwargs)
         self.expire = opts.get("memcache_expire_seconds", 10)
         self.max = opts.get("memcache_max_items", 1024)
+        self.max_bytes = opts.get("memcache_max_bytes", 0)
         self.cleanup = opts.get("memcache_full_cleanup", False)
         self.debug = opts.get("memcache_debug", False)
+        self.stats_interval = opts.get("memcache_stats_interval", 0)
         if self.debug:
             self.call = 0
             self.hit = 0
         self._storage = None
+        self._storage_id = None
+        self._sizes = None
+        self._stats = None
 
     @classmethod
     def __cleanup(cls, expire):
         now = time.time()
-        for storage in cls.data.values():
+        for storage_id, storage in cls.data.items():
             for key, data in list(storage.items()):
                 if data[0] + expire < now:
                     del storage[key]
+                    cls._drop_size(storage_id, key)
                 else:
                     break
 
+    @classmethod
+    def _drop_size(cls, storage_id, key):
+        size = cls.sizes.get(storage_id, {}).pop(key, 0)
+        if size:
+            cls.used[storage_id] -= size
+
     def _get_storage_id(self):
         fun = "{}.storage_id".format(self.driver)
         if fun in self.modules:
-            return self.modules[fun](self.kwargs)
+            return self.modules[fun](self._kwargs)
         else:
             return self.driver
 
@@ -302,53 +447,226 @@ class MemCache(Cache):
             if storage_id not in MemCache.data:
                 MemCache.data[storage_id] = OrderedDict()
             self._storage = MemCache.data[storage_id]
+            self._storage_id = storage_id
+            self._sizes = MemCache.sizes.setdefault(storage_id, {})
+            self._stats = MemCache.stats.setdefault(storage_id, {})
+            MemCache.used.setdefault(storage_id, 0)
         return self._storage
 
-    def fetch(self, bank, key):
+    def _count(self, bank, counter):
+        group = bank.split("/", 1)[0]
+        if group not in self._stats:
+            self._stats[group] = {"hit": 0, "miss": 0, "evict": 0}
+        self._stats[group][counter] += 1
+
+    def _lookup(self, pair, now):
+        """
+        Return the in-memory record of ``pair``, or ``None`` if there is none
+        or it is expired, and update the counters
+        """
         if self.debug:
             self.call += 1
+        record = self.storage.pop(pair, None)
+        if record is None or record[0] + self.expire < now:
+            MemCache._drop_size(self._storage_id, pair)
+            self._count(pair[0], "miss")
+            return None
+        self._count(pair[0], "hit")
+        if self.debug:
+            self.hit += 1
+            log.debug(
+                "MemCache stats (call/hit/rate): %s/%s/%s",
+                self.call,
+                self.hit,
+                float(self.hit) / self.call,
+            )
+        # update atime
+        record[0] = now
+        self.storage[pair] = record
+        return record
+
+    def _forget(self, pair):
+        self.storage.pop(pair, None)
+        MemCache._drop_size(self._storage_id, pair)
+
+    def _full(self):
+        if self.max and len(self.storage) > self.max:
+            return True
+        return bool(self.max_bytes) and MemCache.used[self._storage_id] > self.max_bytes
+
+    def _remember(self, pair, data, now):
+        self._forget(pair)
+        if self.max_bytes:
+            try:
+                size = len(salt.payload.dumps(data))
+            except Exception:  # pylint: disable=broad-except
+                size = 0
+            if size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            self._sizes[pair] = size
+            MemCache.used[self._storage_id] += size
+        self.storage[pair] = [now, data]
+        if self._full() and self.cleanup:
+            MemCache.__cleanup(self.expire)
+        while self._full() and len(self.storage) > 1:
+            evicted, _ = self.storage.popitem(last=False)
+            MemCache._drop_size(self._storage_id, evicted)
+            self._count(evicted[0], "evict")
+        self._write_stats(now)
+
+    def _write_stats(self, now):
+        if not self.stats_interval or not self.opts.get("cachedir"):
+            return
+        if now - MemCache.stats_written < self.stats_interval:
+            return
+        MemCache.stats_written = now
+        write_memcache_stats(self.opts["cachedir"], now)
+
+    def fetch(self, bank, key):
         now = time.time()
-        record = self.storage.pop((bank, key), None)
+        record = self._lookup((bank, key), now)
         # Have a cached value for the key
-        if record is not None and record[0] + self.expire >= now:
-            if self.debug:
-                self.hit += 1
-                log.debug(
-                    "MemCache stats (call/hit/rate): %s/%s/%s",
-                    self.call,
-                    self.hit,
-                    float(self.hit) / self.call,
-                )
-            # update atime and return
-            record[0] = now
-            self.storage[(bank, key)] = record
+        if record is not None:
             return record[1]
 
         # Have no value for the key or value is expired
         data = super().fetch(bank, key)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [now, data]
+        self._remember((bank, key), data, now)
         return data
 
     def store(self, bank, key, data):
-        self.storage.pop((bank, key), None)
+        self._forget((bank, key))
         super().store(bank, key, data)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [time.time(), data]
+        self._remember((bank, key), data, time.time())
 
     def flush(self, bank, key=None):
         if key is None:
             for bank_, key_ in tuple(self.storage):
                 if bank == bank_:
-                    self.storage.pop((bank_, key_))
+                    self._forget((bank_, key_))
         else:
-            self.storage.pop((bank, key), None)
+            self._forget((bank, key))
         super().flush(bank, key)
+
+    def fetch_many(self, keys):
+        if "{}.fetch_many".format(self.driver) not in self.modules:
+            # Cache.fetch_many falls back to self.fetch
+            return super().fetch_many(keys)
+        now = time.time()
+        ret = {}
+        missing = []
+        for pair in keys:
+            record = self._lookup(pair, now)
+            if record is not None:
+                ret[pair] = record[1]
+            else:
+                missing.append(pair)
+        if missing:
+            fetched = super().fetch_many(missing)
+            for pair in missing:
+                self._remember(pair, fetched[pair], now)
+                ret[pair] = fetched[pair]
+        return ret
+
+    def store_many(self, data):
+        for pair in data:
+            self._forget(pair)
+        super().store_many(data)
+        now = time.time()
+        for pair, value in data.items():
+            self._remember(pair, value, now)
+
+    def flush_many(self, keys):
+        keys = list(keys)
+        for pair in keys:
+            self._forget(pair)
+        super().flush_many(keys)
+
+
+def _memcache_stats_dir(cachedir):
+    return os.path.join(cachedir, "memcache_stats")
+
+
+def write_memcache_stats(cachedir, now=None):
+    """
+    Write the memcache counters of the current process to the cache directory
+
+    .. versionadded:: 3007.0
+    """
+    snapshot = {"pid": os.getpid(), "time": now or time.time(), "storages": {}}
+    for storage_id, storage in MemCache.data.items():
+        groups = {}
+        for group, counters in MemCache.stats.get(storage_id, {}).items():
+            groups[group] = dict(counters, items=0, bytes=0)
+        sizes = MemCache.sizes.get(storage_id, {})
+        for pair in storage:
+            group = pair[0].split("/", 1)[0]
+            if group not in groups:
+                groups[group] = {
+                    "hit": 0,
+                    "miss": 0,
+                    "evict": 0,
+                    "items": 0,
+                    "bytes": 0,
+                }
+            groups[group]["items"] += 1
+            groups[group]["bytes"] += sizes.get(pair, 0)
+        snapshot["storages"][str(storage_id)] = groups
+    path = _memcache_stats_dir(cachedir)
+    try:
+        os.makedirs(path, exist_ok=True)
+        with salt.utils.atomicfile.atomic_open(
+            os.path.join(path, "{}.p".format(os.getpid())), "wb"
+        ) as fh_:
+            salt.payload.dump(snapshot, fh_)
+    except OSError as exc:
+        log.debug("Unable to write the memcache stats: %s", exc)
+
+
+def memcache_stats(cachedir):
+    """
+    Return the memcache counters of the running master workers, summed per
+    storage and bank group. Each bank group reports the ``hit``, ``miss`` and
+    ``evict`` counters, the ``items`` held in memory and their size in
+    ``bytes`` (only measured when ``memcache_max_bytes`` is set), and the
+    ``hit_rate``.
+
+    .. versionadded:: 3007.0
+    """
+    ret = {}
+    path = _memcache_stats_dir(cachedir)
+    if not os.path.isdir(path):
+        return ret
+    for name in os.listdir(path):
+        if not name.endswith(".p"):
+            continue
+        fn_ = os.path.join(path, name)
+        try:
+            with salt.utils.files.fopen(fn_, "rb") as fh_:
+                snapshot = salt.payload.load(fh_)
+        except (OSError, ValueError) as exc:
+            log.debug("Unable to read the memcache stats in %s: %s", fn_, exc)
+            continue
+        if not isinstance(snapshot, dict):
+            continue
+        if not salt.utils.process.os_is_running(snapshot.get("pid")):
+            # Left behind by a worker which is gone
+            try:
+                os.remove(fn_)
+            except OSError:
+                pass
+            continue
+        for storage_id, groups in snapshot.get("storages", {}).items():
+            storage = ret.setdefault(storage_id, {})
+            for group, counters in groups.items():
+                total = storage.setdefault(group, {})
+                for counter, value in counters.items():
+                    total[counter] = total.get(counter, 0) + value
+    for storage in ret.values():
+        for counters in storage.values():
+            lookups = counters.get("hit", 0) + counters.get("miss", 0)
+            counters["hit_rate"] = (
+                float(counters.get("hit", 0)) / lookups if lookups else 0.0
+            )
+    return ret
@@ -56,6 +56,7 @@ value to ``consul``:
 
 """
 
+import base64
 import logging
 import time
 
@@ -73,6 +74,8 @@ except ImportError:
 log = logging.getLogger(__name__)
 api = None
 _tstamp_suffix = ".tstamp"
+# Maximum number of operations in a single Consul transaction
+_TXN_OPS = 64
 
 
 # Define the module's virtual name
@@ -148,6 +151,114 @@ def fetch(bank, key):
         )
 
 
+def _txn(operations):
+    """
+    Run KV operations in as few Consul transactions as possible
+    """
+    for idx in range(0, len(operations), _TXN_OPS):
+        api.txn.put(operations[idx : idx + _TXN_OPS])
+
+
+def store_many(data):
+    """
+    Store several key values using Consul transactions.
+    """
+    if not hasattr(api, "txn"):
+        for (bank, key), value in data.items():
+            store(bank, key, value)
+        return
+    tstamp = base64.b64encode(salt.payload.dumps(int(time.time()))).decode()
+    operations = []
+    for (bank, key), value in data.items():
+        c_key = "{}/{}".format(bank, key)
+        operations.append(
+            {
+                "KV": {
+                    "Verb": "set",
+                    "Key": c_key,
+                    "Value": base64.b64encode(salt.payload.dumps(value)).decode(),
+                }
+            }
+        )
+        operations.append(
+            {"KV": {"Verb": "set", "Key": c_key + _tstamp_suffix, "Value": tstamp}}
+        )
+    try:
+        _txn(operations)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError("There was an error writing the keys: {}".format(exc))
+
+
+def fetch_many(keys):
+    """
+    Fetch several key values using Consul transactions, reading only the
+    requested keys.
+    """
+    if not hasattr(api, "txn"):
+        return {(bank, key): fetch(bank, key) for bank, key in keys}
+    c_keys = {"{}/{}".format(bank, key): (bank, key) for bank, key in keys}
+    # A "get" of a missing key fails the whole transaction, "get-tree" does not
+    # and also returns the timestamp of the key, which is skipped.
+    operations = [{"KV": {"Verb": "get-tree", "Key": c_key}} for c_key in c_keys]
+    ret = {pair: {} for pair in keys}
+    try:
+        for idx in range(0, len(operations), _TXN_OPS):
+            result = api.txn.put(operations[idx : idx + _TXN_OPS])
+            for item in (result or {}).get("Results") or []:
+                value = item.get("KV") or {}
+                if value.get("Key") in c_keys and value.get("Value") is not None:
+                    ret[c_keys[value["Key"]]] = salt.payload.loads(
+                        base64.b64decode(value["Value"])
+                    )
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError("There was an error reading the keys: {}".format(exc))
+    return ret
+
+
+def flush_many(keys):
+    """
+    Remove several keys using Consul transactions.
+    """
+    if not hasattr(api, "txn"):
+        for bank, key in keys:
+            flush(bank, key)
+        return
+    operations = []
+    for bank, key in keys:
+        c_key = "{}/{}".format(bank, key)
+        operations.append({"KV": {"Verb": "delete", "Key": c_key}})
+        operations.append({"KV": {"Verb": "delete", "Key": c_key + _tstamp_suffix}})
+    try:
+        _txn(operations)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError("There was an error removing the keys: {}".format(exc))
+
+
+def list_with_data(bank, key=None):
+    """
+    Return the entries of a bank along with their data with a single
+    recursive read. If ``key`` is given, return the data of ``key`` in each
+    sub-bank of ``bank``.
+    """
+    try:
+        _, values = api.kv.get(bank + "/", recurse=True)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError(
+            "There was an error reading the bank, {}: {}".format(bank, exc)
+        )
+    ret = {}
+    for value in values or []:
+        path = value["Key"][len(bank) + 1 :].split("/")
+        if key is None:
+            if len(path) != 1 or path[0].endswith(_tstamp_suffix):
+                continue
+        elif len(path) != 2 or path[1] != key:
+            continue
+        if value["Value"] is not None:
+            ret[path[0]] = salt.payload.loads(value["Value"])
+    return ret
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content.
@@ -170,6 +170,44 @@ def fetch(bank, key):
         )
 
 
+def _read_leaves(bank):
+    """
+    Return the values of all the leaves under a bank, read recursively with
+    a single request.
+    """
+    path = "{}/{}".format(path_prefix, bank)
+    try:
+        result = client.read(path, recursive=True)
+    except etcd.EtcdKeyNotFound:
+        return {}
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError(
+            "There was an error reading the bank, {}: {}".format(path, exc)
+        )
+    return {leaf.key: leaf.value for leaf in result.leaves if not leaf.dir}
+
+
+def list_with_data(bank, key=None):
+    """
+    Return the entries of a bank along with their data with a single
+    recursive read. If ``key`` is given, return the data of ``key`` in each
+    sub-bank of ``bank``.
+    """
+    _init_client()
+    prefix = "{}/{}/".format(path_prefix, bank)
+    ret = {}
+    for leaf_key, value in _read_leaves(bank).items():
+        path = leaf_key[len(prefix) :].split("/")
+        if key is None:
+            if len(path) != 1 or path[0].endswith(_tstamp_suffix):
+                continue
+        elif len(path) != 2 or path[1] != key:
+            continue
+        if value is not None:
+            ret[path[0]] = salt.payload.loads(base64.b64decode(value))
+    return ret
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content.
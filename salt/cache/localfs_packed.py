@@ -0,0 +1,152 @@
+"""
+Cache data in packed segment files on the local filesystem.
+
+.. versionadded:: 3007.0
+
+The ``localfs_packed`` Minion cache module is a drop-in alternative to the
+``localfs`` module for banks holding many keys, like the ``minions`` bank of a
+master with many minions. Instead of one file per key, the keys are appended
+to a small number of segment files, see :py:mod:`salt.utils.packstore`, which
+saves a file creation and a rename on every write and a file open on every
+read.
+
+The data is kept under the ``packed`` directory of the ``cachedir``, separate
+from the ``localfs`` cache, so switching between both modules starts with an
+empty cache.
+
+.. code-block:: yaml
+
+    cache: localfs_packed
+"""
+
+import logging
+import os
+
+import salt.payload
+import salt.syspaths
+import salt.utils.packstore
+from salt.exceptions import SaltCacheError
+
+log = logging.getLogger(__name__)
+
+__func_alias__ = {"list_": "list"}
+
+
+def __cachedir(kwargs=None):
+    if kwargs and "cachedir" in kwargs:
+        return kwargs["cachedir"]
+    return __opts__.get("cachedir", salt.syspaths.CACHE_DIR)
+
+
+def init_kwargs(kwargs):
+    return {"cachedir": __cachedir(kwargs)}
+
+
+def get_storage_id(kwargs):
+    return ("localfs_packed", __cachedir(kwargs))
+
+
+def _store(cachedir):
+    return salt.utils.packstore.get_store(os.path.join(cachedir, "packed"))
+
+
+def store(bank, key, data, cachedir):
+    """
+    Store information in a segment file.
+    """
+    store_many({(bank, key): data}, cachedir)
+
+
+def store_many(data, cachedir):
+    """
+    Store several keys, appending them to each segment file at once.
+    """
+    try:
+        _store(cachedir).store_many(
+            {pair: salt.payload.dumps(value) for pair, value in data.items()}
+        )
+    except (OSError, ValueError) as exc:
+        raise SaltCacheError(
+            "There was an error writing the cache in {}: {}".format(cachedir, exc)
+        )
+
+
+def fetch(bank, key, cachedir):
+    """
+    Fetch information from a segment file.
+    """
+    try:
+        ret = _store(cachedir).fetch(bank, key)
+    except (OSError, ValueError) as exc:
+        raise SaltCacheError(
+            'There was an error reading the cache key "{}/{}": {}'.format(
+                bank, key, exc
+            )
+        )
+    if ret is None:
+        log.debug('Cache key "%s/%s" does not exist', bank, key)
+        return {}
+    return salt.payload.loads(ret[0])
+
+
+def updated(bank, key, cachedir):
+    """
+    Return the epoch of the last time the key was stored
+    """
+    try:
+        ret = _store(cachedir).fetch(bank, key)
+    except (OSError, ValueError) as exc:
+        raise SaltCacheError(
+            'There was an error reading the cache key "{}/{}": {}'.format(
+                bank, key, exc
+            )
+        )
+    if ret is None:
+        log.warning('Cache key "%s/%s" does not exist', bank, key)
+        return None
+    return int(ret[1])
+
+
+def flush(bank, key=None, cachedir=None):
+    """
+    Remove the key from the cache bank with all the key content.
+    """
+    return flush_many([(bank, key)], cachedir)
+
+
+def flush_many(keys, cachedir=None):
+    """
+    Remove several keys, a ``None`` key removes the whole bank.
+    """
+    if cachedir is None:
+        cachedir = __cachedir()
+    try:
+        return _store(cachedir).delete_many(keys)
+    except (OSError, ValueError) as exc:
+        raise SaltCacheError(
+            "There was an error removing from the cache in {}: {}".format(cachedir, exc)
+        )
+
+
+def list_(bank, cachedir):
+    """
+    Return an iterable object containing all entries stored in the specified bank.
+    """
+    try:
+        return _store(cachedir).list(bank)
+    except (OSError, ValueError) as exc:
+        raise SaltCacheError(
+            'There was an error listing the cache bank "{}": {}'.format(bank, exc)
+        )
+
+
+def contains(bank, key, cachedir):
+    """
+    Checks if the specified bank contains the specified key.
+    """
+    try:
+        return _store(cachedir).contains(bank, key)
+    except (OSError, ValueError) as exc:
+        raise SaltCacheError(
+            'There was an error accessing the cache bank "{}": {}'.format(bank, exc)
+        )
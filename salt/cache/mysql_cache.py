@@ -80,6 +80,8 @@ except ImportError:
 _DEFAULT_DATABASE_NAME = "salt_cache"
 _DEFAULT_CACHE_TABLE_NAME = "cache"
 _RECONNECT_INTERVAL_SEC = 0.050
+# Number of rows handled by a single multi-row statement
+_BATCH_SIZE = 500
 
 log = logging.getLogger(__name__)
 
@@ -285,6 +287,95 @@ def fetch(bank, key):
     return salt.payload.loads(r[0])
 
 
+def _batches(items):
+    items = list(items)
+    for idx in range(0, len(items), _BATCH_SIZE):
+        yield items[idx : idx + _BATCH_SIZE]
+
+
+def store_many(data):
+    """
+    Store several key values with multi-row statements.
+    """
+    _init_client()
+    for batch in _batches(data.items()):
+        query = "REPLACE INTO {} (bank, etcd_key, data) values{}".format(
+            __context__["mysql_table_name"], ",".join(["(%s,%s,%s)"] * len(batch))
+        )
+        args = []
+        for (bank, key), value in batch:
+            args.extend((bank, key, salt.payload.dumps(value)))
+        cur, _ = run_query(__context__.get("mysql_client"), query, args=args)
+        cur.close()
+
+
+def fetch_many(keys):
+    """
+    Fetch several key values with multi-row statements.
+    """
+    _init_client()
+    ret = {pair: {} for pair in keys}
+    for batch in _batches(keys):
+        query = (
+            "SELECT bank, etcd_key, data FROM {} WHERE (bank, etcd_key) IN ({})".format(
+                __context__["mysql_table_name"], ",".join(["(%s,%s)"] * len(batch))
+            )
+        )
+        args = [item for pair in batch for item in pair]
+        cur, _ = run_query(__context__.get("mysql_client"), query, args=args)
+        for bank, key, data in cur.fetchall():
+            if (bank, key) in ret:
+                ret[(bank, key)] = salt.payload.loads(data)
+        cur.close()
+    return ret
+
+
+def flush_many(keys):
+    """
+    Remove several keys with multi-row statements.
+    """
+    _init_client()
+    for batch in _batches(keys):
+        query = "DELETE FROM {} WHERE (bank, etcd_key) IN ({})".format(
+            __context__["mysql_table_name"], ",".join(["(%s,%s)"] * len(batch))
+        )
+        args = [item for pair in batch for item in pair]
+        cur, _ = run_query(__context__["mysql_client"], query, args=args)
+        cur.close()
+
+
+def list_with_data(bank, key=None):
+    """
+    Return the entries of a bank along with their data with a single query.
+    If ``key`` is given, return the data of ``key`` in each sub-bank of
+    ``bank``.
+    """
+    _init_client()
+    if key is None:
+        query = "SELECT etcd_key, data FROM {} WHERE bank=%s".format(
+            __context__["mysql_table_name"]
+        )
+        cur, _ = run_query(__context__.get("mysql_client"), query, args=(bank,))
+        ret = {name: salt.payload.loads(data) for name, data in cur.fetchall()}
+        cur.close()
+        return ret
+    prefix = "{}/".format(bank)
+    pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    query = "SELECT bank, data FROM {} WHERE bank LIKE %s AND etcd_key=%s".format(
+        __context__["mysql_table_name"]
+    )
+    cur, _ = run_query(
+        __context__.get("mysql_client"), query, args=(pattern + "%", key)
+    )
+    ret = {}
+    for sub_bank, data in cur.fetchall():
+        name = sub_bank[len(prefix) :]
+        if name and "/" not in name:
+            ret[name] = salt.payload.loads(data)
+    cur.close()
+    return ret
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content.
@@ -423,6 +423,67 @@ def fetch(bank, key):
     return salt.payload.loads(redis_value)
 
 
+def store_many(data):
+    """
+    Store the data of several keys in a single Redis pipeline.
+    """
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    tstamp = salt.payload.dumps(int(time.time()))
+    banks = set()
+    try:
+        for (bank, key), value in data.items():
+            if bank not in banks:
+                _build_bank_hier(bank, redis_pipe)
+                banks.add(bank)
+            redis_pipe.set(_get_key_redis_key(bank, key), salt.payload.dumps(value))
+            redis_pipe.sadd(_get_bank_keys_redis_key(bank), key)
+            redis_pipe.set(_get_timestamp_key(bank=bank, key=key), tstamp)
+        log.debug("Setting the values of %d keys", len(data))
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = "Cannot set the Redis cache keys: {rerr}".format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+
+
+def fetch_many(keys):
+    """
+    Fetch the data of several keys with a single Redis MGET.
+    """
+    redis_server = _get_redis_server()
+    redis_keys = [_get_key_redis_key(bank, key) for bank, key in keys]
+    try:
+        redis_values = redis_server.mget(redis_keys)
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = "Cannot fetch the Redis cache keys: {rerr}".format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return {
+        pair: {} if redis_value is None else salt.payload.loads(redis_value)
+        for pair, redis_value in zip(keys, redis_values)
+    }
+
+
+def flush_many(keys):
+    """
+    Remove several keys in a single Redis pipeline.
+    """
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    for bank, key in keys:
+        redis_pipe.delete(_get_key_redis_key(bank, key))
+        redis_pipe.delete(_get_timestamp_key(bank=bank, key=key))
+        redis_pipe.srem(_get_bank_keys_redis_key(bank), key)
+    try:
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = "Cannot flush the Redis cache keys: {rerr}".format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return True
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content. If no key is specified, remove
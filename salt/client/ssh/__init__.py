@@ -2,8 +2,10 @@
 Create ssh executor system
 """
 
+import asyncio
 import base64
 import binascii
+import concurrent.futures
 import copy
 import datetime
 import gc
@@ -21,6 +23,7 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import uuid
 from collections import deque
@@ -223,6 +226,9 @@ class SSH(MultiprocessingStateMixin):
     """
 
     ROSTER_UPDATE_FLAG = "#__needs_update"
+    # Number of hosts whose sessions are claimed under a single lock by the
+    # asyncio engine
+    SESSION_BATCH = 256
 
     def __init__(self, opts, context=None):
         self.opts = copy.deepcopy(opts)
@@ -339,12 +345,20 @@ class SSH(MultiprocessingStateMixin):
             self.opts["ssh_wipe"] = "True"
         self.returners = salt.loader.returners(self.opts, {})
         self.fsclient = salt.fileclient.FSClient(self.opts)
-        self.thin = salt.utils.thin.gen_thin(
-            self.opts["cachedir"],
-            extra_mods=self.opts.get("thin_extra_mods"),
-            overwrite=self.opts["regen_thin"],
-            extended_cfg=self.opts.get("ssh_ext_alternatives"),
-        )
+        if thin_layers_enabled(self.opts):
+            salt.utils.thin.gen_thin_layers(
+                self.opts["cachedir"],
+                extra_mods=self.opts.get("thin_extra_mods"),
+                overwrite=self.opts["regen_thin"],
+            )
+            self.thin = salt.utils.thin.thin_path(self.opts["cachedir"])
+        else:
+            self.thin = salt.utils.thin.gen_thin(
+                self.opts["cachedir"],
+                extra_mods=self.opts.get("thin_extra_mods"),
+                overwrite=self.opts["regen_thin"],
+                extended_cfg=self.opts.get("ssh_ext_alternatives"),
+            )
         self.mods = mod_data(self.fsclient)
         self.cache = salt.cache.Cache(self.opts)
         self.master_id = self.opts["id"]
@@ -605,6 +619,12 @@ class SSH(MultiprocessingStateMixin):
         """
         LOG_LOCK.release()
         salt.loader.LOAD_LOCK.release()
+        que.put(self._run_routine(opts, host, target, mine=mine))
+
+    def _run_routine(self, opts, host, target, mine=False):
+        """
+        Run the routine for a single host and return its result
+        """
         single = Single(
             opts,
             opts["argv"],
@@ -634,13 +654,269 @@ class SSH(MultiprocessingStateMixin):
                 "stderr": stderr,
                 "retcode": retcode,
             }
-        que.put(ret)
+        return ret
+
+    def _prepare_target(self, host):
+        """
+        Fill in the defaults of a target. Returns the return to yield for the
+        host if it cannot be run, ``None`` otherwise.
+        """
+        for default in self.defaults:
+            if default not in self.targets[host]:
+                self.targets[host][default] = self.defaults[default]
+        if "host" not in self.targets[host]:
+            self.targets[host]["host"] = host
+        if self.targets[host].get("winrm") and not HAS_WINSHELL:
+            log_msg = (
+                "Please contact sales@saltstack.com for access to the"
+                " enterprise saltwinshell module."
+            )
+            log.debug(log_msg)
+            no_ret = {
+                "fun_args": [],
+                "jid": None,
+                "return": log_msg,
+                "retcode": 1,
+                "fun": "",
+                "id": host,
+            }
+            return {host: no_ret}
+        return None
+
+    def _session_busy(self, cached_session, now):
+        """
+        Return ``True`` if the cached session shows the host is still being
+        run by another salt-ssh process
+        """
+        if cached_session is None or "ts" not in cached_session:
+            return False
+        if (
+            "pid" not in cached_session
+            or cached_session.get("master_id", self.master_id) != self.master_id
+        ):
+            return False
+        prev_session_running = now - cached_session["ts"]
+        pid_running = (
+            False
+            if cached_session["pid"] == 0
+            else cached_session.get("running", False)
+            or self._pid_exists(cached_session["pid"])
+        )
+        return (pid_running and prev_session_running < self.max_pid_wait) or (
+            not pid_running and prev_session_running < self.ssh_session_grace_time
+        )
+
+    def _claim_sessions(self, hosts):
+        """
+        Claim the sessions of a batch of hosts under a single lock. Returns the
+        list of claimed hosts and the list of hosts which are still busy.
+        """
+        claimed = []
+        busy = []
+        with salt.utils.files.flopen(self.session_flock_file, "w"):
+            now = time.time()
+            for host in hosts:
+                if self._session_busy(self.cache.fetch("salt-ssh/session", host), now):
+                    busy.append(host)
+                    continue
+                self.cache.store(
+                    "salt-ssh/session",
+                    host,
+                    {
+                        "pid": os.getpid(),
+                        "master_id": self.master_id,
+                        "ts": now,
+                        "running": True,
+                    },
+                )
+                claimed.append(host)
+        return claimed, busy
+
+    def _release_sessions(self, hosts):
+        """
+        Mark the sessions of a batch of hosts as finished under a single lock
+        """
+        if not hosts:
+            return
+        with salt.utils.files.flopen(self.session_flock_file, "w"):
+            now = time.time()
+            for host in hosts:
+                self.cache.store(
+                    "salt-ssh/session",
+                    host,
+                    {
+                        "pid": 0,
+                        "master_id": self.master_id,
+                        "ts": now,
+                        "running": False,
+                    },
+                )
+
+    async def _exec_shell_cmd(self, semaphore, tasks, shell, cmd, key_accept, retries):
+        """
+        Run an ssh or scp command of a routine from the event loop, at most
+        ``ssh_async_max_conns`` of them at once
+        """
+        tasks.add(asyncio.current_task())
+        try:
+            async with semaphore:
+                if shell.needs_terminal(key_accept):
+                    # The prompts are answered on a terminal, which is driven
+                    # from a thread
+                    return await asyncio.get_running_loop().run_in_executor(
+                        None, shell._run_cmd_term, cmd, key_accept, retries
+                    )
+                return await shell._run_cmd_async(cmd)
+        finally:
+            tasks.discard(asyncio.current_task())
+
+    def _run_routine_threaded(self, routine_lock, runner, opts, host, target, mine):
+        """
+        Run the routine of a host in a worker thread. Salt code, such as the
+        loader, is not run by several threads at once: the routine holds
+        ``routine_lock`` except while its ssh and scp commands run.
+        """
+        with routine_lock, salt.client.ssh.shell.cmd_runner(runner):
+            return self._run_routine(opts, host, target, mine=mine)
+
+    async def _run_targets(self, results, mine=False):
+        """
+        Run the routines of all targets from a single event loop, putting
+        their returns on the ``results`` queue as they complete
+        """
+        loop = asyncio.get_running_loop()
+        limit = max(int(self.opts.get("ssh_async_max_conns", 100)), 1)
+        semaphore = asyncio.Semaphore(limit)
+        routine_lock = threading.Lock()
+        stopping = threading.Event()
+        tasks = set()
+
+        def runner(shell, cmd, key_accept=False, passwd_retries=3):
+            if stopping.is_set():
+                raise asyncio.CancelledError()
+            future = asyncio.run_coroutine_threadsafe(
+                self._exec_shell_cmd(
+                    semaphore, tasks, shell, cmd, key_accept, passwd_retries
+                ),
+                loop,
+            )
+            routine_lock.release()
+            try:
+                return future.result()
+            finally:
+                routine_lock.acquire()
+
+        pending = deque(self.targets)
+        running = {}
+        # The routines mostly wait for their commands, each host in flight
+        # gets a thread
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=limit, thread_name_prefix="salt-ssh"
+        )
+        try:
+            while pending or running:
+                batch = []
+                while pending and len(batch) < min(
+                    limit - len(running), self.SESSION_BATCH
+                ):
+                    batch.append(pending.popleft())
+                ready = []
+                for host in batch:
+                    no_ret = self._prepare_target(host)
+                    if no_ret:
+                        await results.put(no_ret)
+                    else:
+                        ready.append(host)
+                claimed, busy = self._claim_sessions(ready) if ready else ([], [])
+                pending.extend(busy)
+                for host in claimed:
+                    future = loop.run_in_executor(
+                        executor,
+                        self._run_routine_threaded,
+                        routine_lock,
+                        runner,
+                        copy.deepcopy(self.opts),
+                        host,
+                        self.targets[host],
+                        mine,
+                    )
+                    running[future] = host
+                if not running:
+                    if pending:
+                        # Every remaining host is run by another session
+                        await asyncio.sleep(0.3)
+                    continue
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=0.3 if busy else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                finished = []
+                for future in done:
+                    host = running.pop(future)
+                    finished.append(host)
+                    try:
+                        ret = future.result()
+                    except Exception as exc:  # pylint: disable=broad-except
+                        error = (
+                            "Target '{}' did not return any data, "
+                            "probably due to an error.".format(host)
+                        )
+                        log.error(error)
+                        log.error("Error running host '%s': %s", host, exc)
+                        ret = {"id": host, "ret": error}
+                    await results.put({ret["id"]: ret["ret"]})
+                self._release_sessions(finished)
+        finally:
+            # Stop the routines still running, killing their commands
+            stopping.set()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.run_in_executor(None, executor.shutdown, True)
+
+    async def _new_queue(self):
+        return asyncio.Queue()
+
+    def _handle_ssh_asyncio(self, mine=False):
+        """
+        Execute the routines from an asyncio event loop, running up to
+        ``ssh_async_max_conns`` hosts at once, and yield the returns as they
+        come in
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(self._new_queue())
+            main = loop.create_task(self._run_targets(results, mine=mine))
+            main.add_done_callback(lambda _: results.put_nowait(None))
+            try:
+                while True:
+                    ret = loop.run_until_complete(results.get())
+                    if ret is None:
+                        break
+                    yield ret
+            finally:
+                if not main.done():
+                    main.cancel()
+                loop.run_until_complete(asyncio.gather(main, return_exceptions=True))
+            # Raise any error of the engine itself
+            main.result()
+        finally:
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
 
     def handle_ssh(self, mine=False):
         """
         Spin up the needed threads or processes and execute the subsequent
         routines
         """
+        if self.opts.get("ssh_engine") == "asyncio":
+            if not self.targets:
+                log.error("No matching targets found in roster.")
+                return
+            yield from self._handle_ssh_asyncio(mine=mine)
+            self.close_control_masters()
+            return
         que = multiprocessing.Queue()
         running = {}
         targets_queue = deque(self.targets.keys())
@@ -659,28 +935,10 @@ class SSH(MultiprocessingStateMixin):
                     continue
                 with salt.utils.files.flopen(self.session_flock_file, "w"):
                     cached_session = self.cache.fetch("salt-ssh/session", host)
-                    if cached_session is not None and "ts" in cached_session:
-                        prev_session_running = time.time() - cached_session["ts"]
-                        if (
-                            "pid" in cached_session
-                            and cached_session.get("master_id", self.master_id)
-                            == self.master_id
-                        ):
-                            pid_running = (
-                                False
-                                if cached_session["pid"] == 0
-                                else cached_session.get("running", False)
-                                or self._pid_exists(cached_session["pid"])
-                            )
-                            if (
-                                pid_running and prev_session_running < self.max_pid_wait
-                            ) or (
-                                not pid_running
-                                and prev_session_running < self.ssh_session_grace_time
-                            ):
-                                targets_queue.append(host)
-                                time.sleep(0.3)
-                                continue
+                    if self._session_busy(cached_session, time.time()):
+                        targets_queue.append(host)
+                        time.sleep(0.3)
+                        continue
                     self.cache.store(
                         "salt-ssh/session",
                         host,
@@ -691,28 +949,11 @@ class SSH(MultiprocessingStateMixin):
                             "running": True,
                         },
                     )
-                for default in self.defaults:
-                    if default not in self.targets[host]:
-                        self.targets[host][default] = self.defaults[default]
-                if "host" not in self.targets[host]:
-                    self.targets[host]["host"] = host
-                if self.targets[host].get("winrm") and not HAS_WINSHELL:
+                no_ret = self._prepare_target(host)
+                if no_ret:
                     returned.add(host)
                     rets.add(host)
-                    log_msg = (
-                        "Please contact sales@saltstack.com for access to the"
-                        " enterprise saltwinshell module."
-                    )
-                    log.debug(log_msg)
-                    no_ret = {
-                        "fun_args": [],
-                        "jid": None,
-                        "return": log_msg,
-                        "retcode": 1,
-                        "fun": "",
-                        "id": host,
-                    }
-                    yield {host: no_ret}
+                    yield no_ret
                     continue
                 args = (
                     que,
@@ -814,6 +1055,25 @@ class SSH(MultiprocessingStateMixin):
                 self.targets
             ) >= len(running):
                 time.sleep(0.1)
+        self.close_control_masters()
+
+    def close_control_masters(self):
+        """
+        Close the multiplexed ssh connections to the targets, unless they are
+        kept open for the next runs
+        """
+        if not self.opts.get("ssh_multiplex") or self.opts.get("ssh_control_keep"):
+            return
+        for host, target in self.targets.items():
+            if target.get("winrm"):
+                continue
+            path = salt.client.ssh.shell.control_path(
+                self.opts,
+                target.get("host", host),
+                target.get("user", self.defaults["user"]),
+                target.get("port", self.defaults["port"]),
+            )
+            salt.client.ssh.shell.close_control_master(target.get("host", host), path)
 
     def run_iter(self, mine=False, jid=None):
         """
@@ -1135,6 +1395,15 @@ class Single:
             arch, _, _ = self.shell.exec_cmd("powershell $ENV:PROCESSOR_ARCHITECTURE")
             self.arch = arch.strip()
         self.thin = thin if thin else salt.utils.thin.thin_path(opts["cachedir"])
+        if "_caller_cachedir" in self.opts:
+            self.thin_cachedir = self.opts["_caller_cachedir"]
+        else:
+            self.thin_cachedir = self.opts["cachedir"]
+        self.thin_layers = None
+        if not self.winrm and thin_layers_enabled(self.opts):
+            self.thin_layers = salt.utils.thin.layer_sums(
+                self.thin_cachedir, extra_mods=self.opts.get("thin_extra_mods")
+            )
 
     def __arg_comps(self):
         """
@@ -1209,15 +1478,26 @@ class Single:
         )
         return retcode == 0
 
-    def deploy(self):
+    def deploy(self, layers=None):
         """
-        Deploy salt-thin
+        Deploy salt-thin, or only the given thin layers when deploying it in
+        layers
         """
         if not self.check_venv_hash_file():
-            self.shell.send(
-                self.thin,
-                os.path.join(self.thin_dir, "salt-thin.tgz"),
-            )
+            if self.thin_layers:
+                for digest in layers or self.thin_layers.values():
+                    if digest not in self.thin_layers.values():
+                        log.error("Unknown thin layer requested: %s", digest)
+                        continue
+                    self.shell.send(
+                        salt.utils.thin.layer_path(self.thin_cachedir, digest),
+                        os.path.join(self.thin_dir, "{}.tgz".format(digest)),
+                    )
+            else:
+                self.shell.send(
+                    self.thin,
+                    os.path.join(self.thin_dir, "salt-thin.tgz"),
+                )
         self.deploy_ext()
         return True
 
@@ -1339,6 +1619,7 @@ class Single:
             opts_pkg["thin_dir"] = self.opts["thin_dir"]
             opts_pkg["master_tops"] = self.opts["master_tops"]
             opts_pkg["extra_filerefs"] = self.opts.get("extra_filerefs", "")
+            opts_pkg["ssh_thin_layers"] = thin_layers_enabled(self.opts)
             opts_pkg["__master_opts__"] = self.context["master_opts"]
             if "known_hosts_file" in self.opts:
                 opts_pkg["known_hosts_file"] = self.opts["known_hosts_file"]
@@ -1484,11 +1765,12 @@ class Single:
         else:
             sudo = ""
         sudo_user = self.target["sudo_user"]
-        if "_caller_cachedir" in self.opts:
-            cachedir = self.opts["_caller_cachedir"]
+        if self.thin_layers:
+            thin_code_digest, thin_sum = "'0'", ""
         else:
-            cachedir = self.opts["cachedir"]
-        thin_code_digest, thin_sum = salt.utils.thin.thin_sum(cachedir, "sha1")
+            thin_code_digest, thin_sum = salt.utils.thin.thin_sum(
+                self.thin_cachedir, "sha1"
+            )
         debug = ""
         if not self.opts.get("log_level"):
             self.opts["log_level"] = "info"
@@ -1509,6 +1791,7 @@ OPTIONS.wipe = {wipe}
 OPTIONS.tty = {tty}
 OPTIONS.cmd_umask = {cmd_umask}
 OPTIONS.code_checksum = {code_checksum}
+OPTIONS.layers = {layers}
 ARGS = {arguments}\n'''.format(
             config=self.minion_config,
             delimeter=RSTR,
@@ -1521,6 +1804,7 @@ ARGS = {arguments}\n'''.format(
             tty=self.tty,
             cmd_umask=self.cmd_umask,
             code_checksum=thin_code_digest,
+            layers=self.thin_layers,
             arguments=self.argv,
         )
         py_code = SSH_PY_SHIM.replace("#%%OPTS", arg_str)
@@ -1670,11 +1954,12 @@ ARGS = {arguments}\n'''.format(
             # is a SHIM command for the master.
             shim_command = re.split(r"\r?\n", stdout, 1)[0].strip()
             log.debug("SHIM retcode(%s) and command: %s", retcode, shim_command)
+            shim_command, _, shim_args = shim_command.partition(" ")
             if (
-                "deploy" == shim_command
+                shim_command in ("deploy", "layers")
                 and retcode == salt.defaults.exitcodes.EX_THIN_DEPLOY
             ):
-                self.deploy()
+                self.deploy(layers=shim_args.split() or None)
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
                 if not re.search(RSTR_RE, stdout) or not re.search(RSTR_RE, stderr):
                     if not self.tty:
@@ -1860,6 +2145,13 @@ def salt_refs(data):
     return ret
 
 
+def thin_layers_enabled(opts):
+    """
+    Return ``True`` if salt-thin is deployed in layers
+    """
+    return bool(opts.get("ssh_thin_layers")) and not opts.get("ssh_ext_alternatives")
+
+
 def mod_data(fsclient):
     """
     Generate the module arguments for the shim data
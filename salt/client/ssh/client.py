@@ -55,8 +55,11 @@ class SSHClient:
             ("ssh_keepalive", bool),
             ("ssh_keepalive_interval", int),
             ("ssh_keepalive_count_max", int),
+            ("ssh_multiplex", bool),
             ("ssh_options", list),
             ("ssh_max_procs", int),
+            ("ssh_engine", str),
+            ("ssh_async_max_conns", int),
             ("ssh_askpass", bool),
             ("ssh_key_deploy", bool),
             ("ssh_update_roster", bool),
@@ -2,12 +2,21 @@
 Manage transport commands via ssh
 """
 
+import asyncio
+import codecs
+import contextlib
+import errno
+import hashlib
 import logging
 import os
 import re
 import shlex
+import socket
+import stat
 import subprocess
 import sys
+import tempfile
+import threading
 import time
 
 import salt.defaults.exitcodes
@@ -34,6 +43,25 @@ RSTR = "_edbc7885e4f9aac9b83b35999b68d015148caf467b78fa39c05f669c0ff89878"
 RSTR_RE = re.compile(r"(?:^|\r?\n)" + RSTR + r"(?:\r?\n|$)")
 
 
+# The function running the ssh and scp commands of the shells of a thread, see
+# cmd_runner
+_CMD_RUNNER = threading.local()
+
+
+@contextlib.contextmanager
+def cmd_runner(runner):
+    """
+    Run the ssh and scp commands of the shells used by the current thread with
+    ``runner(shell, cmd, key_accept, passwd_retries)``, which returns the
+    ``(stdout, stderr, retcode)`` of the command
+    """
+    _CMD_RUNNER.runner = runner
+    try:
+        yield
+    finally:
+        _CMD_RUNNER.runner = None
+
+
 def gen_key(path):
     """
     Generate a key for use with salt-ssh
@@ -45,6 +73,97 @@ def gen_key(path):
     subprocess.call(cmd)
 
 
+# The longest path of a unix socket, the size of sun_path minus the final NUL
+MAX_SOCKET_PATH = 107
+# The length of the control socket names, see control_path
+CONTROL_SOCKET_NAME_LEN = len("/") + 24 + len(".sock")
+# ssh first binds the control socket to its path followed by a dot and 16
+# random characters
+CONTROL_SOCKET_TEMP_SUFFIX_LEN = 17
+
+
+def control_dir(opts):
+    """
+    Return the directory holding the ControlMaster sockets used to multiplex
+    ssh connections, or ``None`` if it cannot be used safely
+    """
+    path = opts.get("ssh_control_path") or os.path.join(opts["cachedir"], "ssh_control")
+    if (
+        len(path) + CONTROL_SOCKET_NAME_LEN + CONTROL_SOCKET_TEMP_SUFFIX_LEN
+        > MAX_SOCKET_PATH
+    ):
+        path = os.path.join(tempfile.gettempdir(), "salt-ssh-{}".format(os.getuid()))
+    try:
+        os.makedirs(path, mode=0o700)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            log.warning("Unable to create the ssh control directory %s: %s", path, exc)
+            return None
+    st = os.lstat(path)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    ):
+        log.warning(
+            "Not multiplexing ssh connections, %s is not a private directory", path
+        )
+        return None
+    return path
+
+
+def control_path(opts, host, user=None, port=None):
+    """
+    Return the ControlMaster socket shared by the ssh connections to the same
+    host, user and port, or ``None`` if connections are not multiplexed
+    """
+    if not opts.get("ssh_multiplex"):
+        return None
+    directory = control_dir(opts)
+    if directory is None:
+        return None
+    key = "{}@{}:{}".format(user or "", host.strip("[]"), port or "")
+    path = os.path.join(
+        directory, hashlib.sha256(key.encode()).hexdigest()[:24] + ".sock"
+    )
+    if os.path.exists(path):
+        # A socket left behind by a master which died makes ssh give up on
+        # multiplexing
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            log.debug("Removing stale ssh control socket %s", path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        finally:
+            sock.close()
+    return path
+
+
+def close_control_master(host, path):
+    """
+    Ask the ControlMaster listening on ``path`` to exit
+    """
+    if not path or not os.path.exists(path):
+        return False
+    cmd = ["ssh", "-o", "ControlPath={}".format(path), "-O", "exit", host.strip("[]")]
+    try:
+        subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        log.debug("Unable to close the ssh control master for %s: %s", host, exc)
+        return False
+    return True
+
+
 def gen_shell(opts, **kwargs):
     """
     Return the correct shell interface for the target system
@@ -107,6 +226,7 @@ class Shell:
         self.identities_only = identities_only
         self.remote_port_forwards = remote_port_forwards
         self.ssh_options = "" if ssh_options is None else ssh_options
+        self.control_path = control_path(opts, self.host, user, port)
 
     def get_error(self, errstr):
         """
@@ -209,6 +329,18 @@ class Shell:
     def _ssh_opts(self):
         return " ".join(["-o {}".format(opt) for opt in self.ssh_options])
 
+    def _control_opts(self):
+        """
+        Return the options sharing a single connection to the host between
+        all the ssh and scp commands run against it
+        """
+        options = [
+            "ControlMaster=auto",
+            "ControlPath={}".format(self.control_path),
+            "ControlPersist={}".format(self.opts.get("ssh_control_persist", 60)),
+        ]
+        return " ".join(["-o {}".format(opt) for opt in options])
+
     def _copy_id_str_old(self):
         """
         Return the string to execute ssh-copy-id
@@ -281,6 +413,8 @@ class Shell:
             )
         if self.ssh_options:
             command.append(self._ssh_opts())
+        if self.control_path:
+            command.append(self._control_opts())
 
         command.append(cmd)
 
@@ -395,11 +529,82 @@ class Shell:
 
     def _run_cmd(self, cmd, key_accept=False, passwd_retries=3):
         """
-        Execute a shell command via VT. This is blocking and assumes that ssh
-        is being run
+        Execute a shell command, with the runner of the thread if it has one,
+        see :py:func:`cmd_runner`, or via VT
         """
         if not cmd:
             return "", "No command or passphrase", 245
+        runner = getattr(_CMD_RUNNER, "runner", None)
+        if runner is not None:
+            return runner(self, cmd, key_accept, passwd_retries)
+        return self._run_cmd_term(cmd, key_accept, passwd_retries)
+
+    def needs_terminal(self, key_accept=False):
+        """
+        Whether ssh may have to prompt for a password, a key passphrase or the
+        acceptance of a host key, which it only does on a terminal
+        """
+        return bool(key_accept or self.passwd or self.priv_passwd)
+
+    async def _run_cmd_async(self, cmd):
+        """
+        Execute a shell command as a subprocess of the running event loop.
+        There is no terminal, so the command must not need to prompt, see
+        :py:meth:`needs_terminal`.
+        """
+        if not cmd:
+            return "", "No command or passphrase", 245
+        proc = await asyncio.create_subprocess_exec(
+            *self._split_cmd(cmd),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Without a controlling terminal ssh fails instead of prompting
+            start_new_session=True,
+        )
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+        try:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            ret_stdout = ""
+            results = False
+            while True:
+                chunk = await proc.stdout.read(65536)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                ret_stdout += text
+                # The prompts may be split across reads
+                buff = ret_stdout[-(len(text) + 256) :]
+                if not results and RSTR_RE.search(buff):
+                    # We're getting results back, sudo is done prompting
+                    results = True
+                if not results and SUDO_PROMPT_RE.search(buff):
+                    return "", "Sudo password is required but not provided", 254
+                if buff.endswith("_||ext_mods||_"):
+                    mods_raw = (
+                        salt.utils.json.dumps(self.mods, separators=(",", ":"))
+                        + "|_E|0|"
+                    )
+                    proc.stdin.write((mods_raw + os.linesep).encode())
+                    await proc.stdin.drain()
+            ret_stdout += decoder.decode(b"", final=True)
+            ret_stderr = (await stderr_task).decode(errors="replace")
+            return ret_stdout, ret_stderr, await proc.wait()
+        finally:
+            if proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+            if not stderr_task.done():
+                stderr_task.cancel()
+
+    def _run_cmd_term(self, cmd, key_accept=False, passwd_retries=3):
+        """
+        Execute a shell command via VT. This is blocking and assumes that ssh
+        is being run
+        """
 
         log_sanitize = None
         if self.passwd:
@@ -180,6 +180,71 @@ def unpack_thin(thin_path):
     reset_time(OPTIONS.saltdir)
 
 
+def unpack_layer(name, layer_path, digest):
+    """
+    Unpack a thin layer in place of its previous version. The meta layer is
+    unpacked at the top of the thin directory, the others under ``layers``.
+    """
+    layers_dir = os.path.join(OPTIONS.saltdir, "layers")
+    if name == "meta":
+        dest = OPTIONS.saltdir
+    else:
+        dest = os.path.join(layers_dir, name)
+    old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
+    try:
+        if not os.path.isdir(layers_dir):
+            os.makedirs(layers_dir)
+        if dest != OPTIONS.saltdir and os.path.exists(dest):
+            shutil.rmtree(dest)
+        tfile = tarfile.TarFile.gzopen(layer_path)
+        tfile.extractall(path=dest)
+        tfile.close()
+        with open(os.path.join(layers_dir, name + ".digest"), "w") as fp_:
+            fp_.write(digest)
+    finally:
+        os.umask(old_umask)  # pylint: disable=blacklisted-function
+    try:
+        os.unlink(layer_path)
+    except OSError:
+        pass
+    reset_time(dest)
+
+
+def check_layers():
+    """
+    Unpack the thin layers which were sent and signal the ones which are
+    missing or outdated, so that only those get deployed.
+    """
+    if not os.path.isdir(OPTIONS.saltdir) or os.path.exists(
+        os.path.join(OPTIONS.saltdir, "code-checksum")
+    ):
+        # Also replace a thin which was deployed as a single archive
+        need_deployment()
+    missing = []
+    for name, digest in sorted(OPTIONS.layers.items()):
+        layer_path = os.path.join(OPTIONS.saltdir, digest + ".tgz")
+        if os.path.isfile(layer_path):
+            if get_hash(layer_path, "sha256") == digest:
+                unpack_layer(name, layer_path, digest)
+                continue
+            os.unlink(layer_path)
+        else:
+            digest_path = os.path.join(OPTIONS.saltdir, "layers", name + ".digest")
+            try:
+                with open(digest_path, "r") as fp_:
+                    if fp_.read().strip() == digest:
+                        continue
+            except (IOError, OSError):
+                pass
+        missing.append(digest)
+    if missing:
+        # Delimiter emitted on stdout *only* to indicate shim message to master.
+        sys.stdout.write(
+            "{0}\nlayers {1}\n".format(OPTIONS.delimiter, " ".join(missing))
+        )
+        sys.exit(EX_THIN_DEPLOY)
+
+
 def need_ext():
     """
     Signal that external modules need to be deployed.
@@ -320,7 +385,9 @@ def main(argv):  # pylint: disable=W0613
     if venv_salt_call is None:
         # Use Salt thin only if Salt Bundle (venv-salt-minion) is not available
         thin_path = os.path.join(OPTIONS.saltdir, THIN_ARCHIVE)
-        if os.path.isfile(thin_path):
+        if getattr(OPTIONS, "layers", None):
+            check_layers()
+        elif os.path.isfile(thin_path):
             if OPTIONS.checksum != get_hash(thin_path, OPTIONS.hashfunc):
                 need_deployment()
             unpack_thin(thin_path)
@@ -203,6 +203,13 @@ VALID_OPTS = immutabletypes.freeze(
         "append_minionid_config_dirs": list,
         # Flag to cache jobs locally.
         "cache_jobs": bool,
+        # Keep the list of installed packages on disk until the package
+        # database changes
+        "pkg_snapshot_cache": bool,
+        # Reuse the hash sums of files which did not change since they were hashed
+        "file_digest_cache": bool,
+        # The number of source files file.recurse fetches at once
+        "file_recurse_workers": int,
         # The path to the salt configuration file
         "conf_file": str,
         # The directory containing unix sockets for things like the event bus
@@ -311,6 +318,18 @@ VALID_OPTS = immutabletypes.freeze(
         "ipv6": (type(None), bool),
         # The chunk size to use when streaming files with the file server
         "file_buffer_size": int,
+        # Store files cached by the fileclient in a content-addressed blob store
+        "file_cache_blobstore": bool,
+        # The size budget in bytes of the fileclient blob store, 0 is unlimited
+        "file_cache_blobstore_max_size": int,
+        # The number of chunk requests the fileclient keeps in flight per file
+        "file_transfer_window": int,
+        # The gzip compression level to request file chunks with
+        "file_transfer_gzip": (type(None), int),
+        # Fetch changed files at least this large as a delta, 0 disables it
+        "file_delta_threshold": int,
+        # Do not compute deltas of fileserver files larger than this, 0 is unlimited
+        "file_delta_max_size": int,
         # The TCP port on which minion events should be published if ipc_mode is TCP
         "tcp_pub_port": int,
         # The TCP port on which minion events should be pulled if ipc_mode is TCP
@@ -392,6 +411,8 @@ VALID_OPTS = immutabletypes.freeze(
         "state_auto_order": bool,
         # Fire events as state chunks are processed by the state compiler
         "state_events": bool,
+        # Reuse the result of identical onlyif and unless checks within a state run
+        "state_check_memo": bool,
         # The number of seconds a minion should wait before retry when attempting authentication
         "acceptance_wait_time": float,
         # The number of seconds a minion should wait before giving up during authentication
@@ -562,6 +583,8 @@ VALID_OPTS = immutabletypes.freeze(
         "git_pillar_refspecs": list,
         "git_pillar_includes": bool,
         "git_pillar_verify_config": bool,
+        "git_pillar_fetch_workers": int,
+        "git_pillar_fetch_timeout": int,
         # NOTE: gitfs_base, gitfs_fallback, gitfs_mountpoint, and gitfs_root omitted
         # here because their values could conceivably be loaded as non-string types,
         # which is OK because gitfs will normalize them to strings. But rather than
@@ -579,6 +602,8 @@ VALID_OPTS = immutabletypes.freeze(
         "gitfs_ref_types": list,
         "gitfs_refspecs": list,
         "gitfs_disable_saltenv_mapping": bool,
+        "gitfs_fetch_workers": int,
+        "gitfs_fetch_timeout": int,
         "hgfs_remotes": list,
         "hgfs_mountpoint": str,
         "hgfs_root": str,
@@ -709,6 +734,18 @@ VALID_OPTS = immutabletypes.freeze(
         "reactor_worker_threads": int,
         # The queue size for workers in the reactor
         "reactor_worker_hwm": int,
+        # Interval, in seconds, at which the reactor fires its metrics, 0 disables
+        "reactor_stats_interval": int,
+        # Window, in seconds, during which identical reactions are coalesced
+        "reactor_coalesce_window": (int, float),
+        # The number of reactions per second each reactor may dispatch
+        "reactor_rate_limit": (int, float),
+        # The number of runner/wheel reactions of a reactor which may run at once
+        "reactor_max_concurrency": int,
+        # The number of reactions which may wait for their reactor's limits
+        "reactor_backlog_size": int,
+        # Which reaction to drop when the backlog is full, drop_new or drop_oldest
+        "reactor_overflow_policy": str,
         # Defines engines. See https://docs.saltproject.io/en/latest/topics/engines/
         "engines": list,
         # Whether or not to store runner returns in the job cache
@@ -755,6 +792,8 @@ VALID_OPTS = immutabletypes.freeze(
         "winrepo_pubkey": str,
         "winrepo_passphrase": str,
         "winrepo_refspecs": list,
+        "winrepo_fetch_workers": int,
+        "winrepo_fetch_timeout": int,
         # Set a hard limit for the amount of memory modules can consume on a minion.
         "modules_max_memory": int,
         # Blacklist specific core grains to be filtered
@@ -763,6 +802,11 @@ VALID_OPTS = immutabletypes.freeze(
         "grains_refresh_every": int,
         # Enable grains refresh prior to any operation
         "grains_refresh_pre_exec": bool,
+        # Cache the result of grain modules or functions: {<module or function>: <ttl or
+        # {"ttl": <seconds>, "watch": [<path>, ...]}>}
+        "grains_module_cache": dict,
+        # The number of threads collecting grains concurrently
+        "grains_parallel": int,
         # Use lspci to gather system data for grains on a minion
         "enable_lspci": bool,
         # The number of seconds for the salt client to wait for additional syndics to
@@ -813,6 +857,20 @@ VALID_OPTS = immutabletypes.freeze(
         "syndic_event_forward_timeout": float,
         # The length that the syndic event queue must hit before events are popped off and forwarded
         "syndic_jid_forward_cache_hwm": int,
+        # The maximum number of minion returns, or events, a syndic forwards in a single message
+        "syndic_forward_batch_size": int,
+        # Compress the batches of returns and events forwarded by a syndic
+        "syndic_forward_compress": bool,
+        # The number of minion returns a syndic keeps waiting for its masters before spooling them
+        "syndic_forward_queue_hwm": int,
+        # The number of events a syndic keeps waiting for its masters before dropping the oldest
+        "syndic_forward_events_hwm": int,
+        # Spool the returns to disk rather than dropping them when the queue is full
+        "syndic_forward_spool": bool,
+        # How often, in seconds, the syndic fires an event with its forwarding stats
+        "syndic_forward_stats_interval": int,
+        # The ids of the syndics allowed to forward compressed batches
+        "syndic_compressed_ids": list,
         # Salt SSH configuration
         "ssh_passwd": str,
         "ssh_port": str,
@@ -830,6 +888,19 @@ VALID_OPTS = immutabletypes.freeze(
         "ssh_config_file": str,
         "ssh_merge_pillar": bool,
         "ssh_run_pre_flight": bool,
+        # Share one connection per host, user and port between the ssh
+        # commands of a salt-ssh run
+        "ssh_multiplex": bool,
+        "ssh_control_path": str,
+        "ssh_control_persist": int,
+        "ssh_control_keep": bool,
+        # How salt-ssh runs its targets, either one process per target
+        # ("process") or from a single asyncio event loop ("asyncio")
+        "ssh_engine": str,
+        # The number of ssh and scp commands the asyncio engine runs at once
+        "ssh_async_max_conns": int,
+        # Deploy salt-thin as separately cached and verified layers
+        "ssh_thin_layers": bool,
         "cluster_mode": bool,
         "sqlite_queue_dir": str,
         "queue_dirs": list,
@@ -852,6 +923,8 @@ VALID_OPTS = immutabletypes.freeze(
         "cache_sreqs": bool,
         # Can be set to override the python_shell=False default in the cmd module
         "cmd_safe": bool,
+        # Run the commands of the cmd module through a shell kept by the job
+        "cmd_worker_shell": bool,
         # Used by salt-api for master requests timeout
         "rest_timeout": int,
         # If set, all minion exec module actions will be rerouted through sudo as this user
@@ -895,8 +968,13 @@ VALID_OPTS = immutabletypes.freeze(
         "memcache_max_items": int,
         # Each time a cache storage got full cleanup all the expired items not just the oldest one.
         "memcache_full_cleanup": bool,
+        # Set a memcache limit in bytes per cache storage, 0 disables the limit.
+        "memcache_max_bytes": int,
         # Enable collecting the memcache stats and log it on `debug` log level.
         "memcache_debug": bool,
+        # How often, in seconds, each worker writes its memcache counters for the
+        # cache.memcache_stats runner. 0 disables it.
+        "memcache_stats_interval": int,
         # Thin and minimal Salt extra modules
         "thin_extra_mods": str,
         "min_extra_mods": str,
@@ -919,6 +997,9 @@ VALID_OPTS = immutabletypes.freeze(
         # Controls whether beacons are set up before a connection
         # to the master is attempted.
         "beacons_before_connect": bool,
+        # Controls whether beacons which support it watch for events on the
+        # minion's IOLoop instead of being polled
+        "beacons_event_driven": bool,
         # Controls whether the scheduler is set up before a connection
         # to the master is attempted.
         "scheduler_before_connect": bool,
@@ -1031,10 +1112,15 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "cachedir": os.path.join(salt.syspaths.CACHE_DIR, "minion"),
         "append_minionid_config_dirs": [],
         "cache_jobs": False,
+        "pkg_snapshot_cache": True,
+        "file_digest_cache": False,
+        "file_recurse_workers": 1,
         "grains_blacklist": [],
         "grains_cache": False,
         "grains_cache_expiration": 300,
         "grains_deep_merge": False,
+        "grains_module_cache": {},
+        "grains_parallel": 0,
         "conf_file": os.path.join(salt.syspaths.CONFIG_DIR, "minion"),
         "sock_dir": os.path.join(salt.syspaths.SOCK_DIR, "minion"),
         "sock_pool_size": 1,
@@ -1122,6 +1208,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "git_pillar_passphrase": "",
         "git_pillar_refspecs": _DFLT_REFSPECS,
         "git_pillar_includes": True,
+        "git_pillar_fetch_workers": 4,
+        "git_pillar_fetch_timeout": 0,
         "gitfs_remotes": [],
         "gitfs_mountpoint": "",
         "gitfs_root": "",
@@ -1141,6 +1229,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "gitfs_ref_types": ["branch", "tag", "sha"],
         "gitfs_refspecs": _DFLT_REFSPECS,
         "gitfs_disable_saltenv_mapping": False,
+        "gitfs_fetch_workers": 4,
+        "gitfs_fetch_timeout": 0,
         "unique_jid": False,
         "hash_type": "sha256",
         "optimization_order": [0, 1, 2],
@@ -1170,6 +1260,11 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "ipc_write_buffer": _DFLT_IPC_WBUFFER,
         "ipv6": None,
         "file_buffer_size": 262144,
+        "file_cache_blobstore": False,
+        "file_cache_blobstore_max_size": 0,
+        "file_transfer_window": 1,
+        "file_transfer_gzip": None,
+        "file_delta_threshold": 0,
         "tcp_pub_port": 4510,
         "tcp_pull_port": 4511,
         "tcp_authentication_retries": 5,
@@ -1200,6 +1295,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_plan": False,
+        "state_check_memo": False,
         "state_queue": False,
         "snapper_states": False,
         "snapper_states_config": "root",
@@ -1243,11 +1340,19 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "winrepo_pubkey": "",
         "winrepo_passphrase": "",
         "winrepo_refspecs": _DFLT_REFSPECS,
+        "winrepo_fetch_workers": 4,
+        "winrepo_fetch_timeout": 0,
         "pidfile": os.path.join(salt.syspaths.PIDFILE_DIR, "salt-minion.pid"),
         "range_server": "range:80",
         "reactor_refresh_interval": 60,
         "reactor_worker_threads": 10,
         "reactor_worker_hwm": 10000,
+        "reactor_stats_interval": 0,
+        "reactor_coalesce_window": 0,
+        "reactor_rate_limit": 0,
+        "reactor_max_concurrency": 0,
+        "reactor_backlog_size": 10000,
+        "reactor_overflow_policy": "drop_new",
         "engines": [],
         "tcp_keepalive": True,
         "tcp_keepalive_idle": 300,
@@ -1275,6 +1380,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "zmq_monitor": True,
         "cache_sreqs": True,
         "cmd_safe": True,
+        "cmd_worker_shell": False,
         "sudo_user": "",
         "http_connect_timeout": 20.0,  # tornado default - 20 seconds
         "http_request_timeout": 1 * 60 * 60.0,  # 1 hour
@@ -1290,6 +1396,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "ssl": None,
         "multifunc_ordered": False,
         "beacons_before_connect": False,
+        "beacons_event_driven": True,
         "scheduler_before_connect": False,
         "cache": "localfs",
         "salt_cp_chunk_size": 65536,
@@ -1376,6 +1483,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "git_pillar_passphrase": "",
         "git_pillar_refspecs": _DFLT_REFSPECS,
         "git_pillar_includes": True,
+        "git_pillar_fetch_workers": 4,
+        "git_pillar_fetch_timeout": 0,
         "git_pillar_verify_config": True,
         "gitfs_remotes": [],
         "gitfs_mountpoint": "",
@@ -1396,6 +1505,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "gitfs_ref_types": ["branch", "tag", "sha"],
         "gitfs_refspecs": _DFLT_REFSPECS,
         "gitfs_disable_saltenv_mapping": False,
+        "gitfs_fetch_workers": 4,
+        "gitfs_fetch_timeout": 0,
         "hgfs_remotes": [],
         "hgfs_mountpoint": "",
         "hgfs_root": "",
@@ -1461,6 +1572,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "file_recv": False,
         "file_recv_max_size": 100,
         "file_buffer_size": 1048576,
+        "file_delta_max_size": 67108864,
         "file_ignore_regex": [],
         "file_ignore_glob": [],
         "fileserver_backend": ["roots"],
@@ -1523,6 +1635,12 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "reactor_refresh_interval": 60,
         "reactor_worker_threads": 10,
         "reactor_worker_hwm": 10000,
+        "reactor_stats_interval": 0,
+        "reactor_coalesce_window": 0,
+        "reactor_rate_limit": 0,
+        "reactor_max_concurrency": 0,
+        "reactor_backlog_size": 10000,
+        "reactor_overflow_policy": "drop_new",
         "engines": [],
         "event_return": "",
         "event_return_queue": 0,
@@ -1539,6 +1657,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_plan": False,
+        "state_check_memo": False,
         "search": "",
         "loop_interval": 60,
         "nodegroups": {},
@@ -1570,6 +1690,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "winrepo_pubkey": "",
         "winrepo_passphrase": "",
         "winrepo_refspecs": _DFLT_REFSPECS,
+        "winrepo_fetch_workers": 4,
+        "winrepo_fetch_timeout": 0,
         "syndic_wait": 5,
         "jinja_env": {},
         "jinja_sls_env": {},
@@ -1585,6 +1707,13 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "gather_job_timeout": 10,
         "syndic_event_forward_timeout": 0.5,
         "syndic_jid_forward_cache_hwm": 100,
+        "syndic_forward_batch_size": 1000,
+        "syndic_forward_compress": False,
+        "syndic_forward_queue_hwm": 100000,
+        "syndic_forward_events_hwm": 10000,
+        "syndic_forward_spool": True,
+        "syndic_forward_stats_interval": 60,
+        "syndic_compressed_ids": [],
         "regen_thin": False,
         "ssh_passwd": "",
         "ssh_priv_passwd": "",
@@ -1599,6 +1728,13 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "ssh_keepalive": True,
         "ssh_keepalive_interval": 60,
         "ssh_keepalive_count_max": 3,
+        "ssh_multiplex": False,
+        "ssh_control_path": "",
+        "ssh_control_persist": 60,
+        "ssh_control_keep": False,
+        "ssh_engine": "process",
+        "ssh_async_max_conns": 100,
+        "ssh_thin_layers": False,
         "ssh_log_file": os.path.join(salt.syspaths.LOGS_DIR, "ssh"),
         "ssh_config_file": os.path.join(salt.syspaths.HOME_DIR, ".ssh", "config"),
         "cluster_mode": False,
@@ -1622,8 +1758,10 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "cache": "localfs",
         "memcache_expire_seconds": 0,
         "memcache_max_items": 1024,
+        "memcache_max_bytes": 0,
         "memcache_full_cleanup": False,
         "memcache_debug": False,
+        "memcache_stats_interval": 60,
         "thin_extra_mods": "",
         "min_extra_mods": "",
         "ssl": None,
@@ -421,6 +421,7 @@ class RemoteFuncs:
         """
         fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = fs_.serve_file
+        self._serve_file_delta = fs_.serve_file_delta
         self._file_find = fs_._find_file
         self._file_hash = fs_.file_hash
         self._file_list = fs_.file_list
@@ -588,8 +589,9 @@ class RemoteFuncs:
         _res = checker.check_minions(load["tgt"], match_type, greedy=False)
         minions = _res["minions"]
         minion_side_acl = {}  # Cache minion-side ACL
-        for minion in minions:
-            mine_data = self.cache.fetch("minions/{}".format(minion), "mine")
+        for minion, mine_data in salt.utils.minions.iter_minion_data(
+            self.cache, minions, key="mine"
+        ):
             if not isinstance(mine_data, dict):
                 continue
             for function in functions_allowed:
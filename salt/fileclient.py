@@ -1,6 +1,8 @@
 """
 Classes that manage file clients
 """
+import collections
+import concurrent.futures
 import contextlib
 import errno
 import ftplib  # nosec
@@ -9,17 +11,23 @@ import logging
 import os
 import shutil
 import string
+import threading
+import time
 import urllib.error
 import urllib.parse
 
 import salt.channel.client
 import salt.client
 import salt.crypt
+import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
 import salt.fileserver
 import salt.loader
 import salt.payload
 import salt.utils.atomicfile
+import salt.utils.blobstore
 import salt.utils.data
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -56,6 +64,16 @@ def get_file_client(opts, pillar=False):
     )(opts)
 
 
+def _preallocate(fn_, size):
+    """
+    Reserve ``size`` bytes for an open file
+    """
+    try:
+        os.posix_fallocate(fn_.fileno(), 0, size)
+    except (AttributeError, OSError):
+        fn_.truncate(size)
+
+
 def decode_dict_keys_to_str(src):
     """
     Convert top level keys from bytes to strings if possible.
@@ -84,6 +102,8 @@ class Client:
     def __init__(self, opts):
         self.opts = opts
         self.utils = salt.loader.utils(self.opts)
+        # Statistics of the delta transfers made by this client, by local path
+        self.transfer_stats = {}
 
     # Add __setstate__ and __getstate__ so that the object may be
     # deep copied. It normally can't be deep copied because its
@@ -155,6 +175,18 @@ class Client:
             cachedir = os.path.join(self.opts["cachedir"], cachedir)
         return cachedir
 
+    def _blobstore(self, cachedir=None):
+        """
+        Return the content-addressed blob store for the cachedir, or ``None``
+        if :conf_minion:`file_cache_blobstore` is disabled
+        """
+        if not self.opts.get("file_cache_blobstore", False):
+            return None
+        return salt.utils.blobstore.BlobStore(
+            os.path.join(self.get_cachedir(cachedir), "blobs"),
+            max_size=self.opts.get("file_cache_blobstore_max_size", 0),
+        )
+
     def get_file(
         self, path, dest="", makedirs=False, saltenv="base", gzip=None, cachedir=None
     ):
@@ -194,18 +226,66 @@ class Client:
             use_etag=use_etag,
         )
 
-    def cache_files(self, paths, saltenv="base", cachedir=None):
+    def cache_files(self, paths, saltenv="base", cachedir=None, workers=1):
         """
         Download a list of files stored on the master and put them in the
         minion file cache
+
+        With ``workers`` above 1, up to that many files are fetched at once,
+        each worker thread using its own file client.
         """
         ret = []
         if isinstance(paths, str):
             paths = paths.split(",")
+        if workers > 1 and len(paths) > 1:
+            return self._map_concurrently(
+                "cache_file", paths, workers, saltenv, cachedir=cachedir
+            )
         for path in paths:
             ret.append(self.cache_file(path, saltenv, cachedir=cachedir))
         return ret
 
+    def hash_files(self, paths, saltenv="base", workers=1):
+        """
+        Return the hashes of a list of files, see :py:meth:`hash_file`
+
+        With ``workers`` above 1, up to that many files are hashed at once,
+        each worker thread using its own file client.
+        """
+        if isinstance(paths, str):
+            paths = paths.split(",")
+        if workers > 1 and len(paths) > 1:
+            return self._map_concurrently("hash_file", paths, workers, saltenv)
+        return [self.hash_file(path, saltenv) for path in paths]
+
+    def _map_concurrently(self, method, paths, workers, *args, **kwargs):
+        """
+        Call ``method`` on each of the paths from up to ``workers`` threads,
+        each with its own file client
+        """
+        local = threading.local()
+        clients = []
+
+        def _call(path):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = get_file_client(self.opts)
+                clients.append(client)
+            return getattr(client, method)(path, *args, **kwargs)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(workers, len(paths))
+            ) as executor:
+                return list(executor.map(_call, paths))
+        finally:
+            for client in clients:
+                stats = getattr(client, "transfer_stats", None)
+                if stats and isinstance(getattr(self, "transfer_stats", None), dict):
+                    self.transfer_stats.update(stats)
+                if hasattr(client, "destroy"):
+                    client.destroy()
+
     def cache_master(self, saltenv="base", cachedir=None):
         """
         Download and cache all files on a master in a specified environment
@@ -1202,10 +1282,54 @@ class RemoteClient(Client):
             path,
         )
 
+        # The content-addressed blob store lets us skip both hashing the
+        # local copy and the transfer when the same content has already been
+        # fetched, under any saltenv or path.
+        blobs = self._blobstore(cachedir)
+        hsum = hash_type = None
+        if blobs is not None and isinstance(hash_server, dict):
+            hsum = hash_server.get("hsum")
+            hash_type = hash_server.get("hash_type", "md5")
+            if not blobs.contains(hsum, hash_type):
+                hsum = None
+            elif blobs.is_linked(dest2check, hsum, hash_type):
+                return dest2check
+
         if dest2check and os.path.isfile(dest2check):
             hash_local = self.hash_file(dest2check, saltenv)
 
             if hash_local == hash_server:
+                if blobs is not None and not dest:
+                    self._store_blob(blobs, dest2check, hash_server)
+                return dest2check
+
+        if hsum is not None:
+            destdir = os.path.dirname(dest2check)
+            if not dest or makedirs or os.path.isdir(destdir):
+                try:
+                    if not os.path.isdir(destdir):
+                        os.makedirs(destdir)
+                    # Only link into the file cache, a file outside of it may
+                    # be modified in place which would corrupt the blob
+                    blobs.materialize(hsum, hash_type, dest2check, link=not dest)
+                    log.debug(
+                        "In saltenv '%s', '%s' served from the blob store",
+                        saltenv,
+                        path,
+                    )
+                    return dest2check
+                except OSError as exc:
+                    log.debug(
+                        "Unable to use the blob store for '%s': %s", dest2check, exc
+                    )
+
+        if dest2check and os.path.isfile(dest2check):
+            # Only the changed blocks of a large file need to be transferred
+            stats = self._get_file_delta(path, saltenv, dest2check, hash_server)
+            if stats:
+                self.transfer_stats[dest2check] = stats
+                if blobs is not None and not dest:
+                    self._store_blob(blobs, dest2check, hash_server)
                 return dest2check
 
         log.debug(
@@ -1215,11 +1339,14 @@ class RemoteClient(Client):
         transport_tries = 0
         path = self._check_proto(path)
         load = {"path": path, "saltenv": saltenv, "cmd": "_serve_file"}
+        if gzip is None:
+            gzip = self.opts.get("file_transfer_gzip")
         if gzip:
             gzip = int(gzip)
             load["gzip"] = gzip
 
         fn_ = None
+        dest_given = bool(dest)
         if dest:
             destdir = os.path.dirname(dest)
             if not os.path.isdir(destdir):
@@ -1231,6 +1358,19 @@ class RemoteClient(Client):
                             raise
                 else:
                     return False
+
+        window = self._transfer_window()
+        if window > 1:
+            fetched = dest or dest2check
+            if self._get_file_pipelined(load, fetched, hash_server, window):
+                log.info(
+                    "Fetching file from saltenv '%s', ** done ** '%s'", saltenv, path
+                )
+                if blobs is not None and not dest_given:
+                    self._store_blob(blobs, fetched, hash_server)
+                return fetched
+
+        if dest:
             # We need an open filehandle here, that's why we're not using a
             # with clause:
             # pylint: disable=resource-leakage
@@ -1259,7 +1399,11 @@ class RemoteClient(Client):
                             data["dest"], saltenv, cachedir=cachedir
                         ) as cache_dest:
                             dest = cache_dest
-                            with salt.utils.files.fopen(cache_dest, "wb+") as ofile:
+                            # Replace rather than truncate the file, it may be
+                            # a hard link into the blob store
+                            with salt.utils.atomicfile.atomic_open(
+                                cache_dest, "wb+"
+                            ) as ofile:
                                 ofile.write(data["data"])
                     if "hsum" in data and d_tries < 3:
                         # Master has prompted a file verification, if the
@@ -1325,6 +1469,8 @@ class RemoteClient(Client):
         if fn_:
             fn_.close()
             log.info("Fetching file from saltenv '%s', ** done ** '%s'", saltenv, path)
+            if blobs is not None and not dest_given:
+                self._store_blob(blobs, dest, hash_server, verify=True)
         else:
             log.debug(
                 "In saltenv '%s', we are ** missing ** the file '%s'", saltenv, path
@@ -1332,6 +1478,226 @@ class RemoteClient(Client):
 
         return dest
 
+    def _get_file_delta(self, path, saltenv, basis, hash_server):
+        """
+        Fetch a new version of a file as a delta against the copy at
+        ``basis``, which is replaced on success. Returns the transfer
+        statistics, or ``None`` if the caller should fall back to a full
+        transfer.
+        """
+        threshold = self.opts.get("file_delta_threshold", 0)
+        if not threshold:
+            return None
+        if not isinstance(hash_server, dict) or not hash_server.get("hsum"):
+            return None
+        try:
+            basis_size = os.path.getsize(basis)
+        except OSError:
+            return None
+        if basis_size < threshold:
+            return None
+
+        start = time.time()
+        block_size = salt.utils.filedelta.block_size(basis_size)
+        load = {
+            "path": self._check_proto(path),
+            "saltenv": saltenv,
+            "cmd": "_serve_file_delta",
+            "block_size": block_size,
+            "size": basis_size,
+            "signatures": salt.utils.filedelta.signatures(basis, block_size),
+        }
+        data = decode_dict_keys_to_str(self.channel.send(load, raw=True))
+        if not isinstance(data, dict) or not isinstance(data.get("ops"), list):
+            log.debug("No delta available for '%s', fetching whole file", path)
+            return None
+        try:
+            with salt.utils.atomicfile.atomic_open(basis, "wb+") as fn_:
+                received = salt.utils.filedelta.patch(
+                    basis, data["ops"], block_size, fn_
+                )
+                fn_.flush()
+                hash_type = salt.utils.stringutils.to_str(
+                    hash_server.get("hash_type", "md5")
+                )
+                hsum = salt.utils.hashutils.get_hash(fn_.name, hash_type)
+                if hsum != hash_server["hsum"]:
+                    raise MinionError(
+                        "Hash mismatch, expected {} but got {}".format(
+                            hash_server["hsum"], hsum
+                        )
+                    )
+                size = fn_.tell()
+        except (OSError, ValueError, MinionError) as exc:
+            log.warning(
+                "Delta transfer of '%s' failed, fetching whole file: %s", path, exc
+            )
+            return None
+        stats = {
+            "size": size,
+            "bytes_received": received,
+            "bytes_saved": max(size - received, 0),
+            "duration": round(time.time() - start, 3),
+        }
+        log.info(
+            "Fetched '%s' from saltenv '%s' as a delta, %d of %d bytes "
+            "transferred, %d bytes saved, in %ss",
+            path,
+            saltenv,
+            received,
+            size,
+            stats["bytes_saved"],
+            stats["duration"],
+        )
+        return stats
+
+    def _transfer_window(self):
+        """
+        Return the number of chunk requests which may be in flight at once
+        when fetching a file
+        """
+        try:
+            return max(int(self.opts.get("file_transfer_window", 1)), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def _get_file_pipelined(self, load, dest, hash_server, window):
+        """
+        Fetch a file from the master with up to ``window`` chunk requests in
+        flight at once. Each chunk is written at its offset into a preallocated
+        temporary file, so replies may arrive in any order, and the hash of the
+        complete file is verified once at the end. Returns ``True`` on success
+        and ``False`` if the caller should fall back to a serial transfer.
+        """
+        if not isinstance(hash_server, dict) or not hash_server.get("hsum"):
+            return False
+        fnd = self.channel.send(
+            {"path": load["path"], "saltenv": load["saltenv"], "cmd": "_file_find"}
+        )
+        try:
+            size = int(fnd["stat"][6])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return False
+        if size <= 0:
+            return False
+
+        if os.path.isdir(dest):
+            salt.utils.files.rm_rf(dest)
+        io_loop = salt.ext.tornado.ioloop.IOLoop()
+        try:
+            with salt.utils.atomicfile.atomic_open(dest, "wb+") as fn_:
+                _preallocate(fn_, size)
+                io_loop.run_sync(
+                    lambda: self._fetch_chunks(io_loop, load, fn_, size, window)
+                )
+                fn_.flush()
+                hash_type = salt.utils.stringutils.to_str(
+                    hash_server.get("hash_type", "md5")
+                )
+                hsum = salt.utils.hashutils.get_hash(fn_.name, hash_type)
+                if hsum != hash_server["hsum"]:
+                    raise MinionError(
+                        "Hash mismatch, expected {} but got {}".format(
+                            hash_server["hsum"], hsum
+                        )
+                    )
+        except Exception as exc:  # pylint: disable=broad-except
+            log.warning(
+                "Pipelined transfer of '%s' failed, falling back to serial "
+                "transfer: %s",
+                load["path"],
+                exc,
+            )
+            return False
+        finally:
+            io_loop.close()
+        return True
+
+    @salt.ext.tornado.gen.coroutine
+    def _fetch_chunks(self, io_loop, load, fn_, size, window):
+        """
+        Fetch all chunks of a file into ``fn_``, using ``window`` channels to
+        the master concurrently
+        """
+        channels = []
+        try:
+            channels.append(
+                salt.channel.client.AsyncReqChannel.factory(self.opts, io_loop=io_loop)
+            )
+            # The master decides the chunk size, learn it from the first chunk
+            data = yield self._fetch_chunk(channels[0], load, 0)
+            chunk_size = len(data)
+            if not chunk_size:
+                raise MinionError("Received an empty first chunk")
+            fn_.seek(0)
+            fn_.write(data)
+            offsets = collections.deque(range(chunk_size, size, chunk_size))
+            for _ in range(min(window, len(offsets)) - 1):
+                channels.append(
+                    salt.channel.client.AsyncReqChannel.factory(
+                        self.opts, io_loop=io_loop
+                    )
+                )
+
+            @salt.ext.tornado.gen.coroutine
+            def _worker(channel):
+                while offsets:
+                    loc = offsets.popleft()
+                    data = yield self._fetch_chunk(channel, load, loc)
+                    if len(data) != min(chunk_size, size - loc):
+                        raise MinionError(
+                            "Received {} bytes at offset {}".format(len(data), loc)
+                        )
+                    fn_.seek(loc)
+                    fn_.write(data)
+
+            yield [_worker(channel) for channel in channels]
+        finally:
+            for channel in channels:
+                channel.close()
+
+    @salt.ext.tornado.gen.coroutine
+    def _fetch_chunk(self, channel, load, loc):
+        """
+        Fetch the chunk of a file starting at ``loc``
+        """
+        load = dict(load, loc=loc)
+        data = yield channel.send(load, raw=True)
+        data = decode_dict_keys_to_str(data)
+        if data.get("gzip", None):
+            chunk = salt.utils.gzip_util.uncompress(data["data"])
+        else:
+            chunk = data["data"]
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        raise salt.ext.tornado.gen.Return(chunk)
+
+    def _store_blob(self, blobs, dest, hash_server, verify=False):
+        """
+        Add a cached file to the blob store, replacing the cache entry with a
+        hardlink if the content was already stored under another path. When
+        ``verify`` is ``True`` the file is first checked against the master's
+        hash.
+        """
+        if not isinstance(hash_server, dict) or not hash_server.get("hsum"):
+            return
+        hsum = hash_server["hsum"]
+        hash_type = hash_server.get("hash_type", "md5")
+        if verify:
+            try:
+                if salt.utils.hashutils.get_hash(dest, hash_type) != hsum:
+                    log.debug("Not storing '%s' as a blob, hash mismatch", dest)
+                    return
+            except (OSError, ValueError) as exc:
+                log.debug("Unable to hash '%s': %s", dest, exc)
+                return
+        blobs.add(dest, hsum, hash_type)
+        if not blobs.is_linked(dest, hsum, hash_type):
+            try:
+                blobs.materialize(hsum, hash_type, dest)
+            except OSError as exc:
+                log.debug("Unable to link '%s' to the blob store: %s", dest, exc)
+
     def file_list(self, saltenv="base", prefix=""):
         """
         List the files on the master
@@ -1462,6 +1828,18 @@ class FSClient(RemoteClient):
         self.channel = salt.fileserver.FSChan(opts)
         self.auth = DumbAuth()
 
+    def _transfer_window(self):
+        """
+        Files are read locally, there is nothing to pipeline
+        """
+        return 1
+
+    def _get_file_delta(self, path, saltenv, basis, hash_server):
+        """
+        Files are read locally, there is nothing to gain from a delta
+        """
+        return None
+
 
 # Provide backward compatibility for anyone directly using LocalClient (but no
 # one should be doing this).
@@ -496,6 +496,19 @@ class Fileserver:
                 ret[fsb] = self.servers[fstr]()
         return ret
 
+    def update_stats(self, back=None):
+        """
+        Return the statistics of the latest update of each remote for all of
+        the enabled fileserver backends which record them
+        """
+        back = self.backends(back)
+        ret = {}
+        for fsb in back:
+            fstr = "{}.update_stats".format(fsb)
+            if fstr in self.servers:
+                ret[fsb] = self.servers[fstr]()
+        return ret
+
     def envs(self, back=None, sources=False):
         """
         Return the environments for the named backend or all backends
@@ -628,6 +641,33 @@ class Fileserver:
             return self.servers[fstr](load, fnd)
         return ret
 
+    def serve_file_delta(self, load):
+        """
+        Serve the delta between a file and the block signatures of the copy
+        the minion already has. An empty dict is returned if the backend does
+        not support delta transfers or a full transfer would be cheaper.
+
+        .. versionadded:: 3007.0
+        """
+        ret = {}
+
+        if "env" in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop("env")
+
+        if "path" not in load or "saltenv" not in load:
+            return ret
+        if not isinstance(load["saltenv"], str):
+            load["saltenv"] = str(load["saltenv"])
+
+        fnd = self.find_file(load["path"], load["saltenv"])
+        if not fnd.get("back"):
+            return ret
+        fstr = "{}.serve_file_delta".format(fnd["back"])
+        if fstr in self.servers:
+            return self.servers[fstr](load, fnd)
+        return ret
+
     def __file_hash_and_stat(self, load):
         """
         Common code for hashing and stating files
@@ -146,6 +146,14 @@ def update_intervals():
     return _gitfs().update_intervals()
 
 
+def update_stats():
+    """
+    Returns the outcome and duration of the latest fetch of each configured
+    remote
+    """
+    return _gitfs().fetch_stats()
+
+
 def envs(ignore_cache=False):
     """
     Return a list of refs that can be used as environments
@@ -176,6 +184,16 @@ def serve_file(load, fnd):
     return _gitfs().serve_file(load, fnd)
 
 
+def serve_file_delta(load, fnd):
+    """
+    Return the delta between the file and the block signatures of the
+    minion's copy
+
+    .. versionadded:: 3007.0
+    """
+    return _gitfs().serve_file_delta(load, fnd)
+
+
 def file_hash(load, fnd):
     """
     Return a file hash, the hash type is set in the master config file
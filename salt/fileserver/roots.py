@@ -21,6 +21,7 @@ import os
 
 import salt.fileserver
 import salt.utils.event
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -118,6 +119,30 @@ def envs():
     return sorted(__opts__["file_roots"])
 
 
+def _file_in_root(saltenv, fpath):
+    """
+    Return whether ``fpath`` is under one of the file_roots of the saltenv, or
+    ``None`` if the saltenv is not configured
+    """
+    actual_saltenv = saltenv
+    if saltenv not in __opts__["file_roots"]:
+        if "__env__" in __opts__["file_roots"]:
+            log.debug(
+                "salt environment '%s' maps to __env__ file_roots directory", saltenv
+            )
+            saltenv = "__env__"
+        else:
+            return None
+    file_in_root = False
+    for root in __opts__["file_roots"][saltenv]:
+        if saltenv == "__env__":
+            root = root.replace("__env__", actual_saltenv)
+        # Refuse to serve file that is not under the root.
+        if salt.utils.verify.clean_path(root, fpath, subdir=True):
+            file_in_root = True
+    return file_in_root
+
+
 def serve_file(load, fnd):
     """
     Return a chunk from a file based on the data received
@@ -135,22 +160,9 @@ def serve_file(load, fnd):
     gzip = load.get("gzip", None)
     fpath = os.path.normpath(fnd["path"])
 
-    actual_saltenv = saltenv = load["saltenv"]
-    if saltenv not in __opts__["file_roots"]:
-        if "__env__" in __opts__["file_roots"]:
-            log.debug(
-                "salt environment '%s' maps to __env__ file_roots directory", saltenv
-            )
-            saltenv = "__env__"
-        else:
-            return fnd
-    file_in_root = False
-    for root in __opts__["file_roots"][saltenv]:
-        if saltenv == "__env__":
-            root = root.replace("__env__", actual_saltenv)
-        # Refuse to serve file that is not under the root.
-        if salt.utils.verify.clean_path(root, fpath, subdir=True):
-            file_in_root = True
+    file_in_root = _file_in_root(load["saltenv"], fpath)
+    if file_in_root is None:
+        return fnd
     if not file_in_root:
         return ret
 
@@ -164,6 +176,50 @@ def serve_file(load, fnd):
     return ret
 
 
+def serve_file_delta(load, fnd):
+    """
+    Return the delta between the file and the block signatures of the
+    minion's copy
+
+    .. versionadded:: 3007.0
+    """
+    if "env" in load:
+        # "env" is not supported; Use "saltenv".
+        load.pop("env")
+
+    ret = {}
+    if not all(x in load for x in ("path", "saltenv", "block_size", "signatures")):
+        return ret
+    if not fnd["path"]:
+        return ret
+    fpath = os.path.normpath(fnd["path"])
+    if not _file_in_root(load["saltenv"], fpath):
+        return ret
+    try:
+        ops = salt.utils.filedelta.delta(
+            fpath,
+            load["signatures"],
+            load["block_size"],
+            basis_size=load.get("size"),
+            max_size=__opts__.get("file_delta_max_size"),
+        )
+    except (OSError, ValueError) as exc:
+        log.debug("Unable to compute delta for %s: %s", fpath, exc)
+        return ret
+    if ops is None:
+        return ret
+    literal = salt.utils.filedelta.literal_size(ops)
+    log.debug(
+        "Serving %s as a delta, %d bytes of literal data, %d bytes saved",
+        fpath,
+        literal,
+        max(os.path.getsize(fpath) - literal, 0),
+    )
+    ret["ops"] = ops
+    ret.update(file_hash(load, fnd))
+    return ret
+
+
 def update():
     """
     When we are asked to update (regular interval) lets reap the cache
@@ -465,9 +465,11 @@ class Key:
             cache = salt.cache.factory(self.opts)
             clist = cache.list(self.ACC)
             if clist:
-                for minion in clist:
-                    if minion not in minions and minion not in preserve_minions:
-                        cache.flush("{}/{}".format(self.ACC, minion))
+                cache.flush_many(
+                    ("{}/{}".format(self.ACC, minion), None)
+                    for minion in clist
+                    if minion not in minions and minion not in preserve_minions
+                )
 
     def check_master(self):
         """
@@ -4,7 +4,10 @@ directories for python loadable code and organizes the code into the
 plugin interfaces used by Salt.
 """
 
+import concurrent.futures
 import contextlib
+import copy
+import fnmatch
 import inspect
 import logging
 import os
@@ -18,6 +21,7 @@ import salt.defaults.events
 import salt.defaults.exitcodes
 import salt.loader.context
 import salt.syspaths
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.dictupdate
@@ -1061,6 +1065,150 @@ def _load_cached_grains(opts, cfn):
         return None
 
 
+def _run_grain_func(funcs, key, proxy, grains_data):
+    """
+    Run a single grain function. Errors of grain functions which are not
+    part of the core grains are logged, and ``None`` is returned.
+    """
+    log.trace("Loading %s grain", key)
+    if key.startswith("core."):
+        return funcs[key]()
+    try:
+        # Grains are loaded too early to take advantage of the injected
+        # __proxy__ variable.  Pass an instance of that LazyLoader
+        # here instead to grains functions if the grains functions take
+        # one parameter.  Then the grains can have access to the
+        # proxymodule for retrieving information from the connected
+        # device.
+        parameters = inspect.signature(funcs[key]).parameters
+        kwargs = {}
+        if "proxy" in parameters:
+            kwargs["proxy"] = proxy
+        if "grains" in parameters:
+            kwargs["grains"] = grains_data
+        return funcs[key](**kwargs)
+    except Exception:  # pylint: disable=broad-except
+        if salt.utils.platform.is_proxy():
+            log.info(
+                "The following CRITICAL message may not be an error; the proxy may not be completely established yet."
+            )
+        log.critical(
+            "Failed to load grains defined in grain file %s in "
+            "function %s, error:\n",
+            key,
+            funcs[key],
+            exc_info=True,
+        )
+        return None
+
+
+def _grains_cache_policy(opts, key):
+    """
+    Return the ``(ttl, watched paths)`` configured in ``grains_module_cache``
+    for a grain function, looked up by function name first then by module
+    name, or ``None`` if its result is not cached.
+    """
+    policies = opts.get("grains_module_cache") or {}
+    policy = policies.get(key, policies.get(key.split(".", 1)[0]))
+    if policy is None:
+        return None
+    if isinstance(policy, dict):
+        return policy.get("ttl", 0), list(policy.get("watch", []))
+    return policy, []
+
+
+def _grains_watch_state(paths):
+    state = {}
+    for path in paths:
+        try:
+            state[path] = os.stat(path).st_mtime
+        except OSError:
+            state[path] = None
+    return state
+
+
+def _grains_cache_entry(opts, key, ret):
+    _, watch = _grains_cache_policy(opts, key)
+    return {"time": time.time(), "watch": _grains_watch_state(watch), "ret": ret}
+
+
+def _grains_cache_valid(opts, module_cache, key):
+    """
+    Return ``True`` if the cached result of a grain function can be used
+    """
+    policy = _grains_cache_policy(opts, key)
+    entry = module_cache.get(key)
+    if policy is None or not isinstance(entry, dict):
+        return False
+    ttl, watch = policy
+    if ttl and time.time() - entry.get("time", 0) > ttl:
+        return False
+    return entry.get("watch") == _grains_watch_state(watch)
+
+
+def _grains_module_cache_path(opts):
+    return os.path.join(opts["cachedir"], "grains.modules.cache.p")
+
+
+def _load_grains_module_cache(opts):
+    cfn = _grains_module_cache_path(opts)
+    if not os.path.isfile(cfn):
+        return {}
+    try:
+        with salt.utils.files.fopen(cfn, "rb") as fp_:
+            cache = salt.utils.data.decode(salt.payload.load(fp_), preserve_tuples=True)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("Unable to read the grains module cache %s: %s", cfn, exc)
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_grains_module_cache(opts, cache):
+    cfn = _grains_module_cache_path(opts)
+    with salt.utils.files.set_umask(0o077):
+        try:
+            with salt.utils.atomicfile.atomic_open(cfn, "wb") as fp_:
+                salt.payload.dump(cache, fp_)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error("Unable to write to grains module cache %s: %s", cfn, exc)
+
+
+def invalidate_grains_cache(opts, modules=None):
+    """
+    Drop cached grains so that they are collected again on the next grains
+    refresh.
+
+    .. versionadded:: 3007.0
+
+    :param dict opts: The Salt options dictionary
+    :param list modules: The grain modules, e.g. ``core``, or functions, e.g.
+                         ``core.hwdata``, whose results cached with
+                         ``grains_module_cache`` are dropped as well. Globs
+                         are accepted, ``*`` drops all of them. Only the
+                         ``grains_cache`` is dropped by default.
+    """
+    cfn = os.path.join(opts["cachedir"], "grains.cache.p")
+    try:
+        os.remove(cfn)
+    except OSError:
+        pass
+    if not modules:
+        return
+    cache = _load_grains_module_cache(opts)
+    stale = [
+        key
+        for key in cache
+        if any(
+            fnmatch.fnmatch(key, mod) or fnmatch.fnmatch(key.split(".", 1)[0], mod)
+            for mod in modules
+        )
+    ]
+    if stale:
+        for key in stale:
+            del cache[key]
+        _write_grains_module_cache(opts, cache)
+
+
 def grains(opts, force_refresh=False, proxy=None, context=None, loaded_base_name=None):
     """
     Return the functions for the dynamic grains and the values for the static
@@ -1136,74 +1284,77 @@ def grains(opts, force_refresh=False, proxy=None, context=None, loaded_base_name
     )
     if force_refresh:  # if we refresh, lets reload grain modules
         funcs.clear()
-    # Run core grains
-    for key in funcs:
-        if not key.startswith("core."):
-            continue
-        log.trace("Loading %s grain", key)
-        ret = funcs[key]()
-        if not isinstance(ret, dict):
-            continue
-        if blist:
-            for key in list(ret):
-                for block in blist:
-                    if salt.utils.stringutils.expr_match(key, block):
-                        del ret[key]
-                        log.trace("Filtering %s grain", key)
-            if not ret:
-                continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
-        else:
-            grains_data.update(ret)
+    # Core grains run first
+    keys = [key for key in funcs if key.startswith("core.")]
+    keys.extend(
+        key for key in funcs if not key.startswith("core.") and key != "_errors"
+    )
 
-    # Run the rest of the grains
-    for key in funcs:
-        if key.startswith("core.") or key == "_errors":
-            continue
-        try:
-            # Grains are loaded too early to take advantage of the injected
-            # __proxy__ variable.  Pass an instance of that LazyLoader
-            # here instead to grains functions if the grains functions take
-            # one parameter.  Then the grains can have access to the
-            # proxymodule for retrieving information from the connected
-            # device.
-            log.trace("Loading %s grain", key)
-            parameters = inspect.signature(funcs[key]).parameters
-            kwargs = {}
-            if "proxy" in parameters:
-                kwargs["proxy"] = proxy
-            if "grains" in parameters:
-                kwargs["grains"] = grains_data
-            ret = funcs[key](**kwargs)
-        except Exception:  # pylint: disable=broad-except
-            if salt.utils.platform.is_proxy():
-                log.info(
-                    "The following CRITICAL message may not be an error; the proxy may not be completely established yet."
-                )
-            log.critical(
-                "Failed to load grains defined in grain file %s in "
-                "function %s, error:\n",
-                key,
-                funcs[key],
-                exc_info=True,
-            )
-            continue
+    module_cache = {}
+    results = {}
+    if opts.get("grains_module_cache"):
+        module_cache = _load_grains_module_cache(opts)
+        for key in keys:
+            if _grains_cache_valid(opts, module_cache, key):
+                log.trace("Using cached %s grain", key)
+                results[key] = module_cache[key]["ret"]
+    cache_updated = False
+
+    workers = opts.get("grains_parallel", 0)
+    # Grain functions taking the grains collected so far must run in order
+    independent = [
+        key
+        for key in keys
+        if key not in results
+        and (
+            key.startswith("core.")
+            or "grains" not in inspect.signature(funcs[key]).parameters
+        )
+    ]
+    if workers > 1 and len(independent) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                key: pool.submit(_run_grain_func, funcs, key, proxy, grains_data)
+                for key in independent
+            }
+            for key, future in futures.items():
+                results[key] = future.result()
+                if _grains_cache_policy(opts, key) is not None and isinstance(
+                    results[key], dict
+                ):
+                    module_cache[key] = _grains_cache_entry(opts, key, results[key])
+                    cache_updated = True
+
+    for key in keys:
+        if key in results:
+            ret = results[key]
+        else:
+            ret = _run_grain_func(funcs, key, proxy, grains_data)
+            if _grains_cache_policy(opts, key) is not None and isinstance(ret, dict):
+                module_cache[key] = _grains_cache_entry(opts, key, ret)
+                cache_updated = True
         if not isinstance(ret, dict):
             continue
         if blist:
-            for key in list(ret):
+            ret = dict(ret)
+            for grain in list(ret):
                 for block in blist:
-                    if salt.utils.stringutils.expr_match(key, block):
-                        del ret[key]
-                        log.trace("Filtering %s grain", key)
+                    if salt.utils.stringutils.expr_match(grain, block):
+                        del ret[grain]
+                        log.trace("Filtering %s grain", grain)
             if not ret:
                 continue
         if grains_deep_merge:
+            if key in module_cache:
+                # Don't let the merge modify the cached grains
+                ret = copy.deepcopy(ret)
             salt.utils.dictupdate.update(grains_data, ret)
         else:
             grains_data.update(ret)
 
+    if cache_updated:
+        _write_grains_module_cache(opts, module_cache)
+
     if opts.get("proxy_merge_grains_in_module", True) and proxy:
         try:
             proxytype = proxy.opts["proxy"]["proxytype"]
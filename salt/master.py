@@ -52,6 +52,7 @@ import salt.utils.process
 import salt.utils.schedule
 import salt.utils.ssdp
 import salt.utils.stringutils
+import salt.utils.syndic
 import salt.utils.user
 import salt.utils.verify
 import salt.utils.zeromq
@@ -1208,6 +1209,7 @@ class AESFuncs(TransportMethods):
         "minion_publish",
         "revoke_auth",
         "_serve_file",
+        "_serve_file_delta",
         "_file_find",
         "_file_hash",
         "_file_hash_and_stat",
@@ -1252,6 +1254,7 @@ class AESFuncs(TransportMethods):
 
         self.fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = self.fs_.serve_file
+        self._serve_file_delta = self.fs_.serve_file_delta
         self._file_find = self.fs_._find_file
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
@@ -1403,6 +1406,24 @@ class AESFuncs(TransportMethods):
 
         return load
 
+    def __syndic_compressed(self, id_):
+        """
+        Check that compressed batches are accepted from the given syndic
+
+        :param str id_: The verified id of the sender
+        """
+        if any(
+            salt.utils.stringutils.expr_match(id_, expr)
+            for expr in self.opts["syndic_compressed_ids"]
+        ):
+            return True
+        log.warning(
+            "Refusing compressed batch from %s, which is not listed in "
+            "syndic_compressed_ids",
+            id_,
+        )
+        return False
+
     def _master_tops(self, load):
         """
         Return the results from an external node classifier if one is
@@ -1647,6 +1668,15 @@ class AESFuncs(TransportMethods):
         load = self.__verify_load(load, ("id", "tok"))
         if load is False:
             return {}
+        if "events_zlib" in load:
+            # Compressed batch of events forwarded by a syndic
+            if not self.__syndic_compressed(load["id"]):
+                return {}
+            try:
+                load["events"] = salt.utils.syndic.decompress(load.pop("events_zlib"))
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error("Invalid compressed events from %s: %s", load["id"], exc)
+                return {}
         # Route to master event bus
         self.masterapi._minion_event(load)
         # Process locally
@@ -1736,7 +1766,18 @@ class AESFuncs(TransportMethods):
 
         :param dict load: The minion payload
         """
-        loads = load.get("load")
+        if "load_zlib" in load:
+            # Compressed batch of returns
+            load = self.__verify_load(load, ("id", "tok"))
+            if load is False or not self.__syndic_compressed(load["id"]):
+                return
+            try:
+                loads = salt.utils.syndic.decompress(load["load_zlib"])
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error("Invalid compressed syndic returns: %s", exc)
+                return
+        else:
+            loads = load.get("load")
         if not isinstance(loads, list):
             loads = [load]  # support old syndics not aggregating returns
         for load in loads:
@@ -2,6 +2,7 @@
 Routines to set up a minion
 """
 import binascii
+import collections
 import contextlib
 import copy
 import functools
@@ -43,6 +44,7 @@ import salt.utils.ctx
 import salt.utils.data
 import salt.utils.dictdiffer
 import salt.utils.dictupdate
+import salt.utils.digestcache
 import salt.utils.error
 import salt.utils.event
 import salt.utils.files
@@ -54,6 +56,7 @@ import salt.utils.platform
 import salt.utils.process
 import salt.utils.schedule
 import salt.utils.ssdp
+import salt.utils.syndic
 import salt.utils.user
 import salt.utils.zeromq
 from salt._compat import ipaddress
@@ -1620,9 +1623,13 @@ class Minion(MinionBase):
         sync=True,
         timeout_handler=None,
         include_startup_grains=False,
+        compress=False,
     ):
         """
         Fire an event on the master, or drop message if unable to send.
+
+        .. versionchanged:: 3007.0
+            A list of ``events`` is sent compressed if ``compress`` is ``True``
         """
         load = {
             "id": self.opts["id"],
@@ -1630,7 +1637,9 @@ class Minion(MinionBase):
             "pretag": pretag,
             "tok": self.tok,
         }
-        if events:
+        if events and compress:
+            load["events_zlib"] = salt.utils.syndic.compress(events)
+        elif events:
             load["events"] = events
         elif data and tag:
             load["data"] = data
@@ -1863,13 +1872,19 @@ class Minion(MinionBase):
             executors[-1] = "sudo"  # replace the last one with sudo
         log.trace("Executors list %s", executors)  # pylint: disable=no-member
 
-        for name in executors:
-            fname = "{}.execute".format(name)
-            if fname not in self.executors:
-                raise SaltInvocationError("Executor '{}' is not available".format(name))
-            return_data = self.executors[fname](opts, data, func, args, kwargs)
-            if return_data is not None:
-                return return_data
+        try:
+            for name in executors:
+                fname = "{}.execute".format(name)
+                if fname not in self.executors:
+                    raise SaltInvocationError(
+                        "Executor '{}' is not available".format(name)
+                    )
+                return_data = self.executors[fname](opts, data, func, args, kwargs)
+                if return_data is not None:
+                    return return_data
+        finally:
+            # Write the file hash sums the job kept in memory
+            salt.utils.digestcache.flush()
 
         return None
 
@@ -2243,9 +2258,14 @@ class Minion(MinionBase):
         log.trace("ret_val = %s", ret_val)  # pylint: disable=no-member
         return ret_val
 
-    def _return_pub_multi(self, rets, ret_cmd="_return", timeout=60, sync=True):
+    def _return_pub_multi(
+        self, rets, ret_cmd="_return", timeout=60, sync=True, compress=False
+    ):
         """
         Return the data from the executed command to the master server
+
+        .. versionchanged:: 3007.0
+            The returns are sent compressed if ``compress`` is ``True``
         """
         if not isinstance(rets, list):
             rets = [rets]
@@ -2305,7 +2325,15 @@ class Minion(MinionBase):
                 # Local job cache has been enabled
                 salt.utils.minion.cache_jobs(self.opts, load["jid"], ret)
 
-        load = {"cmd": ret_cmd, "load": list(jids.values())}
+        if compress:
+            load = {
+                "cmd": ret_cmd,
+                "id": self.opts["id"],
+                "tok": self.tok,
+                "load_zlib": salt.utils.syndic.compress(list(jids.values())),
+            }
+        else:
+            load = {"cmd": ret_cmd, "load": list(jids.values())}
 
         def timeout_handler(*_):
             log.warning(
@@ -2422,7 +2450,29 @@ class Minion(MinionBase):
         if not self.beacons_leader:
             return
         log.debug("Refreshing beacons.")
-        self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+        if hasattr(self, "beacons"):
+            self.beacons.close_watchers()
+        self.beacons = self._new_beacons()
+
+    def _new_beacons(self):
+        """
+        Create the beacon system, event-driven beacons run on our IOLoop
+        """
+        return salt.beacons.Beacon(
+            self.opts,
+            self.functions,
+            io_loop=getattr(self, "io_loop", None),
+            fire=self._fire_beacons,
+        )
+
+    def _fire_beacons(self, beacons):
+        """
+        Send the events of event-driven beacons to the master
+        """
+        with salt.utils.event.get_event(
+            "minion", opts=self.opts, listen=False
+        ) as event:
+            event.fire_event({"beacons": beacons}, "__beacons_return")
 
     def matchers_refresh(self):
         """
@@ -2569,6 +2619,7 @@ class Minion(MinionBase):
                 {"include_opts": include_opts, "include_pillar": include_pillar},
             ),
             "list_available": ("list_available_beacons", {}),
+            "stats": ("list_stats", {}),
             "validate_beacon": (
                 "validate_beacon",
                 {"name": name, "beacon_data": beacon_data},
@@ -2916,7 +2967,7 @@ class Minion(MinionBase):
             #            self.matcher = Matcher(self.opts, self.functions)
             self.matchers = salt.loader.matchers(self.opts)
             if self.beacons_leader:
-                self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+                self.beacons = self._new_beacons()
             uid = salt.utils.user.get_uid(user=self.opts.get("user", None))
             self.proc_dir = get_proc_dir(self.opts["cachedir"], uid=uid)
             self.grains_cache = self.opts["grains"]
@@ -2934,7 +2985,9 @@ class Minion(MinionBase):
         self._setup_core()
         loop_interval = self.opts["loop_interval"]
         if "beacons" not in self.periodic_callbacks:
-            self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+            if hasattr(self, "beacons"):
+                self.beacons.close_watchers()
+            self.beacons = self._new_beacons()
 
             def handle_beacons():
                 # Process Beacons
@@ -3398,15 +3451,17 @@ class SyndicManager(MinionBase):
         self.max_auth_wait = self.opts["acceptance_wait_time_max"]
 
         self._has_master = threading.Event()
-        self.jid_forward_cache = set()
+        self.jid_forward_cache = salt.utils.syndic.JidCache(
+            self.opts["syndic_jid_forward_cache_hwm"]
+        )
 
         if io_loop is None:
             self.io_loop = salt.ext.tornado.ioloop.IOLoop.current()
         else:
             self.io_loop = io_loop
 
-        # List of events
-        self.raw_events = []
+        # Queue of events
+        self.raw_events = collections.deque()
         # Dict of rets: {master_id: {event_tag: job_ret, ...}, ...}
         self.job_rets = {}
         # List of delayed job_rets which was unable to send for some reason and will be resend to
@@ -3414,6 +3469,28 @@ class SyndicManager(MinionBase):
         self.delayed = []
         # Active pub futures: {master_id: (future, [job_ret, ...]), ...}
         self.pub_futures = {}
+        # Number of minion returns waiting in job_rets and delayed
+        self.pending_returns = 0
+        # When the oldest return still waiting was received: {master_id: time, ...}
+        self.pending_since = {}
+        self.delayed_since = None
+        self._forward_scheduled = False
+        # Returns are written to the spool when the masters can't keep up
+        self.spool = None
+        self.spooled = 0
+        if self.opts["syndic_forward_spool"]:
+            self.spool = salt.utils.syndic.Spool(
+                os.path.join(self.opts["cachedir"], "syndic_spool")
+            )
+            self.spooled = len(self.spool)
+        self.forward_stats = {
+            "batches": 0,
+            "events_dropped": 0,
+            "events_forwarded": 0,
+            "returns_dropped": 0,
+            "returns_forwarded": 0,
+            "returns_spooled": 0,
+        }
 
     def _spawn_syndics(self):
         """
@@ -3549,12 +3626,18 @@ class SyndicManager(MinionBase):
                     self._mark_master_dead(master)
                     del self.pub_futures[master]
                     # Add not sent data to the delayed list and try the next master
-                    self.delayed.extend(data)
+                    self._delay(data)
                     continue
             future = getattr(syndic_future.result(), func)(
-                values, "_syndic_return", timeout=self._return_retry_timer(), sync=False
+                values,
+                "_syndic_return",
+                timeout=self._return_retry_timer(),
+                sync=False,
+                compress=self.opts["syndic_forward_compress"],
             )
             self.pub_futures[master] = (future, values)
+            if hasattr(future, "add_done_callback"):
+                future.add_done_callback(functools.partial(self._pub_done, values))
             return True
         # Loop done and didn't exit: wasn't sent, try again later
         return False
@@ -3579,7 +3662,94 @@ class SyndicManager(MinionBase):
 
     def _reset_event_aggregation(self):
         self.job_rets = {}
-        self.raw_events = []
+        self.raw_events = collections.deque()
+        self.pending_returns = sum(
+            salt.utils.syndic.count_returns(jdict) for jdict in self.delayed
+        )
+        self.pending_since = {}
+
+    def _delay(self, values):
+        """
+        Queue job returns to be sent to any available master
+        """
+        self.delayed.extend(values)
+        self.pending_returns += sum(
+            salt.utils.syndic.count_returns(jdict) for jdict in values
+        )
+        if self.delayed_since is None:
+            self.delayed_since = time.time()
+
+    def _pub_done(self, values, future):
+        """
+        Count the returns a master took, and forward the next batch as soon
+        as it took them. Returns a master failed to take are queued again by
+        :py:meth:`_return_pub_syndic`, they are counted when they are sent
+        again.
+        """
+        if future.exception():
+            return
+        self.forward_stats["returns_forwarded"] += sum(
+            salt.utils.syndic.count_returns(jdict) for jdict in values
+        )
+        self.forward_stats["batches"] += 1
+        self._schedule_forward()
+
+    def _schedule_forward(self):
+        if not self._forward_scheduled:
+            self._forward_scheduled = True
+            self.io_loop.add_callback(self._forward_events)
+
+    def _spool_returns(self):
+        """
+        Move all the waiting returns to the spool, or drop them when the spool
+        is disabled or fails, when the masters don't keep up with the returns
+        """
+        values = list(self.delayed)
+        for rets in self.job_rets.values():
+            values.extend(rets.values())
+        count = self.pending_returns
+        self.delayed = []
+        self.job_rets = {}
+        self.pending_returns = 0
+        self.pending_since = {}
+        self.delayed_since = None
+        if self.spool is not None and self.spool.put(values):
+            log.warning(
+                "Spooled %d minion returns, the masters are not keeping up", count
+            )
+            self.spooled += 1
+            self.forward_stats["returns_spooled"] += count
+        else:
+            log.error(
+                "Dropped %d minion returns, the masters are not keeping up", count
+            )
+            self.forward_stats["returns_dropped"] += count
+
+    def get_forward_stats(self):
+        """
+        Return the counters of the forwarding of events and returns, along with
+        the number of items waiting and the age in seconds of the oldest waiting
+        return
+        """
+        stats = dict(self.forward_stats)
+        stats["pending_events"] = len(self.raw_events)
+        stats["pending_returns"] = self.pending_returns
+        stats["spooled_batches"] = self.spooled
+        since = list(self.pending_since.values())
+        if self.delayed_since is not None:
+            since.append(self.delayed_since)
+        stats["forward_lag"] = time.time() - min(since) if since else 0.0
+        return stats
+
+    def _fire_forward_stats(self):
+        stats = self.get_forward_stats()
+        log.debug("Syndic forward stats: %s", stats)
+        try:
+            self.local.event.fire_event(
+                stats, tagify([self.opts["id"], "forward_stats"], "syndic")
+            )
+        except Exception:  # pylint: disable=broad-except
+            log.debug("Unable to fire the syndic forward stats", exc_info=True)
 
     def reconnect_event_bus(self, something):
         future = self.local.event.set_event_handler(self._process_event)
@@ -3600,8 +3770,6 @@ class SyndicManager(MinionBase):
         log.debug("SyndicManager '%s' trying to tune in", self.opts["id"])
 
         # register the event sub to the poller
-        self.job_rets = {}
-        self.raw_events = []
         self._reset_event_aggregation()
         future = self.local.event.set_event_handler(self._process_event)
         self.io_loop.add_future(future, self.reconnect_event_bus)
@@ -3613,6 +3781,13 @@ class SyndicManager(MinionBase):
         )
         self.forward_events.start()
 
+        if self.opts["syndic_forward_stats_interval"] > 0:
+            self.forward_stats_callback = salt.ext.tornado.ioloop.PeriodicCallback(
+                self._fire_forward_stats,
+                self.opts["syndic_forward_stats_interval"] * 1000,
+            )
+            self.forward_stats_callback.start()
+
         # Make sure to gracefully handle SIGUSR1
         enable_sigusr1_handler()
 
@@ -3642,6 +3817,7 @@ class SyndicManager(MinionBase):
 
             master = data.get("master_id")
             jdict = self.job_rets.setdefault(master, {}).setdefault(mtag, {})
+            self.pending_since.setdefault(master, time.time())
             if not jdict:
                 jdict["__fun__"] = data.get("fun")
                 jdict["__jid__"] = data["jid"]
@@ -3652,14 +3828,6 @@ class SyndicManager(MinionBase):
                 if data["jid"] not in self.jid_forward_cache:
                     jdict["__load__"].update(self.mminion.returners[fstr](data["jid"]))
                     self.jid_forward_cache.add(data["jid"])
-                    if (
-                        len(self.jid_forward_cache)
-                        > self.opts["syndic_jid_forward_cache_hwm"]
-                    ):
-                        # Pop the oldest jid from the cache
-                        tmp = sorted(list(self.jid_forward_cache))
-                        tmp.pop(0)
-                        self.jid_forward_cache = set(tmp)
             if master is not None:
                 # __'s to make sure it doesn't print out on the master cli
                 jdict["__master_id__"] = master
@@ -3667,7 +3835,14 @@ class SyndicManager(MinionBase):
             for key in "return", "retcode", "success", "fun_args":
                 if key in data:
                     ret[key] = data[key]
+            if data["id"] not in jdict:
+                self.pending_returns += 1
             jdict[data["id"]] = ret
+            if self.pending_returns > self.opts["syndic_forward_queue_hwm"]:
+                self._spool_returns()
+            elif self.pending_returns >= self.opts["syndic_forward_batch_size"]:
+                # Don't wait for the next interval to send a full batch
+                self._schedule_forward()
         else:
             # TODO: config to forward these? If so we'll have to keep track of who
             # has seen them
@@ -3676,12 +3851,22 @@ class SyndicManager(MinionBase):
                 # Add generic event aggregation here
                 if "retcode" not in data:
                     self.raw_events.append({"data": data, "tag": mtag})
+                    if len(self.raw_events) > self.opts["syndic_forward_events_hwm"]:
+                        # Events are best effort, drop the oldest one
+                        self.raw_events.popleft()
+                        self.forward_stats["events_dropped"] += 1
+                    elif len(self.raw_events) >= self.opts["syndic_forward_batch_size"]:
+                        self._schedule_forward()
 
     def _forward_events(self):
         log.trace("Forwarding events")  # pylint: disable=no-member
-        if self.raw_events:
-            events = self.raw_events
-            self.raw_events = []
+        self._forward_scheduled = False
+        batch_size = max(self.opts["syndic_forward_batch_size"], 1)
+        while self.raw_events:
+            events = [
+                self.raw_events.popleft()
+                for _ in range(min(batch_size, len(self.raw_events)))
+            ]
             self._call_syndic(
                 "_fire_master",
                 kwargs={
@@ -3689,17 +3874,48 @@ class SyndicManager(MinionBase):
                     "pretag": tagify(self.opts["id"], base="syndic"),
                     "timeout": self._return_retry_timer(),
                     "sync": False,
+                    "compress": self.opts["syndic_forward_compress"],
                 },
             )
+            self.forward_stats["events_forwarded"] += len(events)
+        if (
+            not self.delayed
+            and self.spooled
+            and self.pending_returns < self.opts["syndic_forward_queue_hwm"] // 2
+        ):
+            values = self.spool.pop()
+            self.spooled = len(self.spool)
+            if values:
+                self._delay(values)
         if self.delayed:
-            res = self._return_pub_syndic(self.delayed)
-            if res:
-                self.delayed = []
+            batch, rest = salt.utils.syndic.take_batch(self.delayed, batch_size)
+            if self._return_pub_syndic(batch):
+                self._dequeued(batch)
+                self.delayed = rest
+                self.delayed_since = time.time() if rest else None
         for master in list(self.job_rets.keys()):
-            values = list(self.job_rets[master].values())
-            res = self._return_pub_syndic(values, master_id=master)
-            if res:
-                del self.job_rets[master]
+            rets = self.job_rets[master]
+            tags = list(rets)
+            batch, rest = salt.utils.syndic.take_batch(
+                [rets[tag] for tag in tags], batch_size
+            )
+            if self._return_pub_syndic(batch, master_id=master):
+                self._dequeued(batch)
+                if rest:
+                    self.job_rets[master] = dict(zip(tags[-len(rest) :], rest))
+                    self.pending_since[master] = time.time()
+                else:
+                    del self.job_rets[master]
+                    self.pending_since.pop(master, None)
+
+    def _dequeued(self, batch):
+        """
+        Account for a batch handed to a master, which is counted as forwarded
+        once the master took it, see :py:meth:`_pub_done`
+        """
+        self.pending_returns -= sum(
+            salt.utils.syndic.count_returns(jdict) for jdict in batch
+        )
 
     def destroy(self):
         if self._closing is True:
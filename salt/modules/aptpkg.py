@@ -1518,6 +1518,12 @@ def list_pkgs(
     if "pkg.list_pkgs" in __context__ and kwargs.get("use_context", True):
         return _list_pkgs_from_context(versions_as_list, removed, purge_desired)
 
+    stamp = salt.utils.pkg.snapshot_stamp(salt.utils.pkg.DPKG_PATHS)
+    ret = salt.utils.pkg.load_snapshot(__opts__, "aptpkg", stamp)
+    if ret is not None:
+        __context__["pkg.list_pkgs"] = ret
+        return _list_pkgs_from_context(versions_as_list, removed, purge_desired)
+
     ret = {"installed": {}, "removed": {}, "purge_desired": {}}
     cmd = [
         "dpkg-query",
@@ -1555,6 +1561,7 @@ def list_pkgs(
     for pkglist_type in ("installed", "removed", "purge_desired"):
         __salt__["pkg_resource.sort_pkglist"](ret[pkglist_type])
 
+    salt.utils.pkg.save_snapshot(__opts__, "aptpkg", stamp, ret)
     __context__["pkg.list_pkgs"] = copy.deepcopy(ret)
 
     if removed:
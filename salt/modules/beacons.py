@@ -124,6 +124,43 @@ def list_available(return_yaml=True, **kwargs):
         return {"beacons": {}}
 
 
+def stats(**kwargs):
+    """
+    Return the number of calls, CPU time in seconds and number of events of
+    each beacon running on the minion, and whether it is event-driven
+
+    .. versionadded:: 3007.0
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' beacons.stats
+    """
+    ret = {}
+
+    try:
+        with salt.utils.event.get_event(
+            "minion", opts=__opts__, listen=True
+        ) as event_bus:
+            res = __salt__["event.fire"]({"func": "stats"}, "manage_beacons")
+            if res:
+                event_ret = event_bus.get_event(
+                    tag="/salt/minion/minion_beacons_stats_complete",
+                    wait=kwargs.get("timeout", default_event_wait),
+                )
+                if event_ret and event_ret["complete"]:
+                    ret = event_ret["stats"]
+    except KeyError:
+        # Effectively a no-op, since we can't really return without an event system
+        return {
+            "result": False,
+            "comment": "Event module not available. Beacon stats failed.",
+        }
+
+    return ret
+
+
 def add(name, beacon_data, **kwargs):
     """
     Add a beacon on the minion
@@ -16,6 +16,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 
@@ -28,6 +29,7 @@ import salt.utils.path
 import salt.utils.pkg
 import salt.utils.platform
 import salt.utils.powershell
+import salt.utils.shellworker
 import salt.utils.stringutils
 import salt.utils.templates
 import salt.utils.timed_subprocess
@@ -72,6 +74,13 @@ log = logging.getLogger(__name__)
 
 DEFAULT_SHELL = salt.grains.extra.shell()["shell"]
 
+# Worker shells kept by a job, see the cmd_worker_shell minion option
+MAX_WORKER_SHELLS = 8
+# The shells a worker shell can be, its protocol needs a POSIX shell which is
+# not restricted
+WORKER_SHELLS = ("sh", "bash", "dash", "ksh", "zsh")
+_WORKER_SHELLS_LOCK = threading.Lock()
+
 
 # Overwriting the cmd python module makes debugging modules with pdb a bit
 # harder so lets do it this way instead.
@@ -284,6 +293,156 @@ def _prep_powershell_cmd(shell, cmd, stack, encoded_cmd):
     return cmd
 
 
+def _use_worker_shell():
+    """
+    Whether commands should run through a worker shell, see the
+    ``cmd_worker_shell`` minion option
+    """
+    return (
+        "__opts__" in globals()
+        and "__context__" in globals()
+        and bool(__opts__.get("cmd_worker_shell", False))
+        and not salt.utils.platform.is_windows()
+    )
+
+
+def _worker_shell_path(shell, python_shell):
+    """
+    Return the shell to run a command through with ``cmd_worker_shell``, or
+    ``None`` if the command has to run on its own. Commands which are not run
+    by a shell use ``/bin/sh``.
+    """
+    if not python_shell:
+        shell = "/bin/sh"
+    if (
+        not shell
+        or os.path.basename(shell) not in WORKER_SHELLS
+        or not os.path.isabs(shell)
+        or not os.access(shell, os.X_OK)
+    ):
+        return None
+    return shell
+
+
+def _get_worker_shell(shell, run_env, runas, group):
+    """
+    Return the worker shell of the job running commands with this shell,
+    environment, user and group, starting it if needed
+    """
+    with _WORKER_SHELLS_LOCK:
+        workers = __context__.setdefault("cmd.worker_shells", {})
+        key = (shell, runas, group, tuple(sorted(run_env.items())))
+        if key not in workers:
+            while len(workers) >= MAX_WORKER_SHELLS:
+                workers.pop(next(iter(workers))).stop()
+            preexec_fn = None
+            if runas or group:
+                preexec_fn = functools.partial(
+                    salt.utils.user.chugid_and_umask, runas, None, group
+                )
+            workers[key] = salt.utils.shellworker.ShellWorker(
+                shell, env=run_env, preexec_fn=preexec_fn
+            )
+        return workers[key]
+
+
+def _get_runas_env(runas, group, shell, use_sudo, log_callback):
+    """
+    Return the login environment of the runas user
+    """
+    # Getting the environment for the runas user
+    # Use markers to thwart any stdout noise
+    # There must be a better way to do this.
+    import uuid
+
+    marker = "<<<" + str(uuid.uuid4()) + ">>>"
+    marker_b = marker.encode(__salt_system_encoding__)
+    py_code = (
+        "import sys, os, itertools; sys.stdout.write('{0}'); "
+        "sys.stdout.write('\\0'.join(itertools.chain(*os.environ.items()))); "
+        "sys.stdout.write('{0}');".format(marker)
+    )
+
+    if use_sudo:
+        env_cmd = ["sudo"]
+        # runas is optional if use_sudo is set.
+        if runas:
+            env_cmd.extend(["-u", runas])
+        if group:
+            env_cmd.extend(["-g", group])
+        if shell != DEFAULT_SHELL:
+            env_cmd.extend(["-s", "--", shell, "-c"])
+        else:
+            env_cmd.extend(["-i", "--"])
+    elif __grains__["os"] in ["FreeBSD"]:
+        env_cmd = [
+            "su",
+            "-",
+            runas,
+            "-c",
+        ]
+    elif __grains__["os_family"] in ["Solaris"]:
+        env_cmd = ["su", "-", runas, "-c"]
+    elif __grains__["os_family"] in ["AIX"]:
+        env_cmd = ["su", "-", runas, "-c"]
+    else:
+        env_cmd = ["su", "-s", shell, "-", runas, "-c"]
+
+    if not salt.utils.pkg.check_bundled():
+        if __grains__["os"] in ["FreeBSD"]:
+            env_cmd.extend(["{} -c {}".format(shell, sys.executable)])
+        else:
+            env_cmd.extend([sys.executable])
+    else:
+        with tempfile.NamedTemporaryFile("w", delete=False) as fp:
+            if __grains__["os"] in ["FreeBSD"]:
+                env_cmd.extend(
+                    ["{} -c {} python {}".format(shell, sys.executable, fp.name)]
+                )
+            else:
+                env_cmd.extend(["{} python {}".format(sys.executable, fp.name)])
+            fp.write(py_code)
+            shutil.chown(fp.name, runas)
+
+    msg = "env command: {}".format(env_cmd)
+    log.debug(log_callback(msg))
+    env_bytes, env_encoded_err = subprocess.Popen(
+        env_cmd,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stdin=subprocess.PIPE,
+    ).communicate(salt.utils.stringutils.to_bytes(py_code))
+    if salt.utils.pkg.check_bundled():
+        os.remove(fp.name)
+    marker_count = env_bytes.count(marker_b)
+    if marker_count == 0:
+        # Possibly PAM prevented the login
+        log.error(
+            "Environment could not be retrieved for user '%s': " "stderr=%r stdout=%r",
+            runas,
+            env_encoded_err,
+            env_bytes,
+        )
+        # Ensure that we get an empty env_runas dict below since we
+        # were not able to get the environment.
+        env_bytes = b""
+    elif marker_count != 2:
+        raise CommandExecutionError(
+            "Environment could not be retrieved for user '{}'",
+            info={"stderr": repr(env_encoded_err), "stdout": repr(env_bytes)},
+        )
+    else:
+        # Strip the marker
+        env_bytes = env_bytes.split(marker_b)[1]
+
+    env_runas = dict(list(zip(*[iter(env_bytes.split(b"\0"))] * 2)))
+
+    return {
+        salt.utils.stringutils.to_str(k): salt.utils.stringutils.to_str(v)
+        for k, v in env_runas.items()
+    }
+
+
 def _run(
     cmd,
     cwd=None,
@@ -502,102 +661,17 @@ def _run(
 
     if runas or group:
         try:
-            # Getting the environment for the runas user
-            # Use markers to thwart any stdout noise
-            # There must be a better way to do this.
-            import uuid
-
-            marker = "<<<" + str(uuid.uuid4()) + ">>>"
-            marker_b = marker.encode(__salt_system_encoding__)
-            py_code = (
-                "import sys, os, itertools; sys.stdout.write('{0}'); "
-                "sys.stdout.write('\\0'.join(itertools.chain(*os.environ.items()))); "
-                "sys.stdout.write('{0}');".format(marker)
-            )
-
-            if use_sudo:
-                env_cmd = ["sudo"]
-                # runas is optional if use_sudo is set.
-                if runas:
-                    env_cmd.extend(["-u", runas])
-                if group:
-                    env_cmd.extend(["-g", group])
-                if shell != DEFAULT_SHELL:
-                    env_cmd.extend(["-s", "--", shell, "-c"])
-                else:
-                    env_cmd.extend(["-i", "--"])
-            elif __grains__["os"] in ["FreeBSD"]:
-                env_cmd = [
-                    "su",
-                    "-",
-                    runas,
-                    "-c",
-                ]
-            elif __grains__["os_family"] in ["Solaris"]:
-                env_cmd = ["su", "-", runas, "-c"]
-            elif __grains__["os_family"] in ["AIX"]:
-                env_cmd = ["su", "-", runas, "-c"]
-            else:
-                env_cmd = ["su", "-s", shell, "-", runas, "-c"]
-
-            if not salt.utils.pkg.check_bundled():
-                if __grains__["os"] in ["FreeBSD"]:
-                    env_cmd.extend(["{} -c {}".format(shell, sys.executable)])
-                else:
-                    env_cmd.extend([sys.executable])
+            if _use_worker_shell():
+                # Capture the environment once per job
+                runas_envs = __context__.setdefault("cmd.runas_env", {})
             else:
-                with tempfile.NamedTemporaryFile("w", delete=False) as fp:
-                    if __grains__["os"] in ["FreeBSD"]:
-                        env_cmd.extend(
-                            [
-                                "{} -c {} python {}".format(
-                                    shell, sys.executable, fp.name
-                                )
-                            ]
-                        )
-                    else:
-                        env_cmd.extend(["{} python {}".format(sys.executable, fp.name)])
-                    fp.write(py_code)
-                    shutil.chown(fp.name, runas)
-
-            msg = "env command: {}".format(env_cmd)
-            log.debug(log_callback(msg))
-            env_bytes, env_encoded_err = subprocess.Popen(
-                env_cmd,
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-            ).communicate(salt.utils.stringutils.to_bytes(py_code))
-            if salt.utils.pkg.check_bundled():
-                os.remove(fp.name)
-            marker_count = env_bytes.count(marker_b)
-            if marker_count == 0:
-                # Possibly PAM prevented the login
-                log.error(
-                    "Environment could not be retrieved for user '%s': "
-                    "stderr=%r stdout=%r",
-                    runas,
-                    env_encoded_err,
-                    env_bytes,
+                runas_envs = {}
+            env_key = (runas, group, shell)
+            if env_key not in runas_envs:
+                runas_envs[env_key] = _get_runas_env(
+                    runas, group, shell, use_sudo, log_callback
                 )
-                # Ensure that we get an empty env_runas dict below since we
-                # were not able to get the environment.
-                env_bytes = b""
-            elif marker_count != 2:
-                raise CommandExecutionError(
-                    "Environment could not be retrieved for user '{}'",
-                    info={"stderr": repr(env_encoded_err), "stdout": repr(env_bytes)},
-                )
-            else:
-                # Strip the marker
-                env_bytes = env_bytes.split(marker_b)[1]
-
-            env_runas = dict(list(zip(*[iter(env_bytes.split(b"\0"))] * 2)))
-
-            env_runas = {
-                salt.utils.stringutils.to_str(k): salt.utils.stringutils.to_str(v)
-                for k, v in env_runas.items()
-            }
+            env_runas = dict(runas_envs[env_key])
             env_runas.update(env)
 
             # Fix platforms like Solaris that don't set a USER env var in the
@@ -743,7 +817,33 @@ def _run(
             if change_windows_codepage:
                 salt.utils.win_chcp.set_codepage_id(windows_codepage)
             try:
-                proc = salt.utils.timed_subprocess.TimedProc(cmd, **new_kwargs)
+                worker_shell = None
+                if (
+                    _use_worker_shell()
+                    and not bg
+                    and with_communicate
+                    and stdin is None
+                    and stdout == subprocess.PIPE
+                    and stderr in (subprocess.PIPE, subprocess.STDOUT)
+                    and (
+                        python_shell
+                        or cmd
+                        and shutil.which(cmd[0], path=run_env.get("PATH")) is not None
+                    )
+                ):
+                    worker_shell = _worker_shell_path(shell, python_shell)
+                if worker_shell is not None:
+                    proc = salt.utils.shellworker.WorkerProc(
+                        _get_worker_shell(worker_shell, run_env, runas, group),
+                        cmd,
+                        shell=python_shell,
+                        cwd=cwd,
+                        umask=_umask,
+                        timeout=timeout,
+                        merge_stderr=stderr == subprocess.STDOUT,
+                    )
+                else:
+                    proc = salt.utils.timed_subprocess.TimedProc(cmd, **new_kwargs)
             except OSError as exc:
                 msg = "Unable to run command '{}' with the context '{}', reason: {}".format(
                     cmd if output_loglevel is not None else "REDACTED",
@@ -762,6 +862,15 @@ def _run(
                 # ok return code for timeouts?
                 ret["retcode"] = 1
                 return ret
+            except OSError as exc:
+                if worker_shell is None:
+                    raise
+                # The worker shell died or did not follow its protocol
+                raise CommandExecutionError(
+                    "Unable to run command '{}' through the worker shell: {}".format(
+                        cmd if output_loglevel is not None else "REDACTED", exc
+                    )
+                )
         finally:
             if change_windows_codepage:
                 salt.utils.win_chcp.set_codepage_id(previous_windows_codepage)
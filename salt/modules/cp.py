@@ -164,6 +164,16 @@ def _client():
     return salt.fileclient.get_file_client(__opts__)
 
 
+def _record_transfer_stats(client):
+    """
+    Keep the statistics of delta transfers made by the client in __context__,
+    so that states can report them
+    """
+    stats = getattr(client, "transfer_stats", None)
+    if stats and isinstance(stats, dict):
+        __context__.setdefault("cp.transfer_stats", {}).update(stats)
+
+
 def _render_filenames(path, dest, saltenv, template, **kw):
     """
     Process markup in the :param:`path` and :param:`dest` variables (NOT the
@@ -280,7 +290,9 @@ def get_file(
         return ""
     else:
         with _client() as client:
-            return client.get_file(path, dest, makedirs, saltenv, gzip)
+            ret = client.get_file(path, dest, makedirs, saltenv, gzip)
+            _record_transfer_stats(client)
+            return ret
 
 
 def envs():
@@ -550,6 +562,7 @@ def cache_file(path, saltenv=None, source_hash=None, verify_ssl=True, use_etag=F
             verify_ssl=verify_ssl,
             use_etag=use_etag,
         )
+        _record_transfer_stats(client)
     if not result and not use_etag:
         log.error("Unable to cache file '%s' from saltenv '%s'.", path, saltenv)
     if path_is_remote:
@@ -588,11 +601,14 @@ def cache_dest(url, saltenv=None):
         return client.cache_dest(url, saltenv)
 
 
-def cache_files(paths, saltenv=None):
+def cache_files(paths, saltenv=None, workers=1):
     """
     .. versionchanged:: 3005
         ``saltenv`` will use value from config if not explicitly set
 
+    .. versionchanged:: 3007.0
+        The ``workers`` argument was added
+
     Used to gather many files from the Master, the gathered files will be
     saved in the minion cachedir reflective to the paths retrieved from the
     Master
@@ -626,11 +642,20 @@ def cache_files(paths, saltenv=None):
     .. note::
         It may be necessary to quote the URL when using the querystring method,
         depending on the shell being used to run the command.
+
+    workers : 1
+        The number of files to fetch at once
+
+        .. code-block:: bash
+
+            salt '*' cp.cache_files salt://foo/bar.conf,salt://foo/baz.conf workers=4
     """
     if not saltenv:
         saltenv = __opts__["saltenv"] or "base"
     with _client() as client:
-        return client.cache_files(paths, saltenv)
+        ret = client.cache_files(paths, saltenv, workers=workers)
+        _record_transfer_stats(client)
+        return ret
 
 
 def cache_dir(
@@ -868,6 +893,28 @@ def hash_file(path, saltenv=None):
         return client.hash_file(path, saltenv)
 
 
+def hash_files(paths, saltenv=None, workers=1):
+    """
+    .. versionadded:: 3007.0
+
+    Return the hashes of a list of files, like :py:func:`hash_file`, in the
+    same order. A file which is not found gets an empty hash.
+
+    workers : 1
+        The number of files to hash at once
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' cp.hash_files salt://foo/bar.conf,salt://foo/baz.conf workers=4
+    """
+    if not saltenv:
+        saltenv = __opts__["saltenv"] or "base"
+    with _client() as client:
+        return client.hash_files(paths, saltenv, workers=workers)
+
+
 def stat_file(path, saltenv=None, octal=True):
     """
     .. versionchanged:: 3005
@@ -31,6 +31,7 @@ from collections.abc import Iterable, Mapping
 import salt.utils.args
 import salt.utils.atomicfile
 import salt.utils.data
+import salt.utils.digestcache
 import salt.utils.filebuffer
 import salt.utils.files
 import salt.utils.find
@@ -756,7 +757,26 @@ def get_hash(path, form="sha256", chunk_size=65536):
 
         salt '*' file.get_hash /etc/shadow
     """
-    return salt.utils.hashutils.get_hash(os.path.expanduser(path), form, chunk_size)
+    path = os.path.expanduser(path)
+    cachedir = _digest_cachedir()
+    if cachedir:
+        return salt.utils.digestcache.get_hash(cachedir, path, form, chunk_size)
+    return salt.utils.hashutils.get_hash(path, form, chunk_size)
+
+
+def _digest_cachedir():
+    """
+    Return the cachedir holding the digest cache, or ``None`` if the
+    ``file_digest_cache`` option is disabled
+    """
+    try:
+        opts = __opts__
+    except NameError:
+        # Imported by another module without the loader
+        return None
+    if not opts.get("file_digest_cache", False):
+        return None
+    return opts.get("cachedir")
 
 
 def get_source_sum(
@@ -22,6 +22,7 @@ import salt.client
 import salt.client.ssh.client
 import salt.config
 import salt.defaults.events
+import salt.loader
 import salt.payload
 import salt.runner
 import salt.state
@@ -381,16 +382,31 @@ def refresh_grains(**kwargs):
     refresh_pillar : True
         Set to ``False`` to keep pillar data from being refreshed.
 
+    modules
+        .. versionadded:: 3007.0
+
+        A list, or comma-separated string, of grain modules (e.g. ``core``)
+        or grain functions (e.g. ``core.hwdata``) whose results cached with
+        :conf_minion:`grains_module_cache` are collected again. Globs are
+        accepted, use ``*`` to collect all of them again. By default the
+        cached results are kept until their time to live expires.
+
     CLI Examples:
 
     .. code-block:: bash
 
         salt '*' saltutil.refresh_grains
+        salt '*' saltutil.refresh_grains modules=disks,core.hwdata
+        salt '*' saltutil.refresh_grains modules='*'
     """
     kwargs = salt.utils.args.clean_kwargs(**kwargs)
     _refresh_pillar = kwargs.pop("refresh_pillar", True)
+    modules = kwargs.pop("modules", None)
     if kwargs:
         salt.utils.args.invalid_kwargs(kwargs)
+    if isinstance(modules, str):
+        modules = [mod.strip() for mod in modules.split(",") if mod.strip()]
+    salt.loader.invalidate_grains_cache(__opts__, modules)
     # Modules and pillar need to be refreshed in case grains changes affected
     # them, and the module refresh process reloads the grains and assigns the
     # newly-reloaded grains to each execution module's __grains__ dunder.
@@ -312,6 +312,58 @@ def _get_domain(conn, *vms, **kwargs):
     return len(ret) == 1 and not kwargs.get("iterable") and ret[0] or ret
 
 
+def _get_domains_stats(conn, vm_=None, stats=0, inactive=True):
+    """
+    Return the ``(domain, stats)`` pairs of the named VM or of all the VMs,
+    collecting the libvirt statistics of all the domains in a single call.
+
+    The stats of a domain are an empty dict when the libvirt driver can not
+    collect them in bulk.
+
+    :param conn: libvirt connection object
+    :param vm_: name of the domain
+    :param stats: the ``VIR_DOMAIN_STATS_*`` groups of statistics to collect
+    :param inactive: False to only return the running domains
+    """
+    if vm_:
+        domains = [_get_domain(conn, vm_)]
+    else:
+        domains = None
+    try:
+        if domains is not None:
+            records = conn.domainListGetStats(domains, stats)
+        else:
+            flags = 0
+            if not inactive:
+                flags = libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_ACTIVE
+            records = conn.getAllDomainStats(stats, flags)
+        if not isinstance(records, (list, tuple)):
+            raise TypeError("unexpected result: {}".format(records))
+        return [(dom, record) for dom, record in records]
+    except (AttributeError, TypeError, ValueError, libvirt.libvirtError) as err:
+        log.debug("Unable to collect the domains statistics in bulk: %s", err)
+    if domains is None:
+        domains = _get_domain(conn, iterable=True, inactive=inactive)
+    return [(dom, {}) for dom in domains]
+
+
+def _get_domain_info(dom, stats):
+    """
+    Return the values of ``dom.info()`` from the bulk statistics of the
+    domain, only calling ``dom.info()`` if they are missing some of them.
+    """
+    keys = (
+        "state.state",
+        "balloon.maximum",
+        "balloon.current",
+        "vcpu.current",
+        "cpu.time",
+    )
+    if all(key in stats for key in keys):
+        return [stats[key] for key in keys]
+    return dom.info()
+
+
 def _parse_qemu_img_info(info):
     """
     Parse qemu-img info JSON output into disk infos dictionary
@@ -370,7 +422,7 @@ def _parse_qemu_img_info(info):
     return disks[0]
 
 
-def _get_uuid(dom):
+def _get_uuid(dom, doc=None):
     """
     Return a uuid from the named vm
 
@@ -380,10 +432,12 @@ def _get_uuid(dom):
 
         salt '*' virt.get_uuid <domain>
     """
-    return ElementTree.fromstring(get_xml(dom)).find("uuid").text
+    if doc is None:
+        doc = ElementTree.fromstring(get_xml(dom))
+    return doc.find("uuid").text
 
 
-def _get_on_poweroff(dom):
+def _get_on_poweroff(dom, doc=None):
     """
     Return `on_poweroff` setting from the named vm
 
@@ -393,11 +447,13 @@ def _get_on_poweroff(dom):
 
         salt '*' virt.get_on_restart <domain>
     """
-    node = ElementTree.fromstring(get_xml(dom)).find("on_poweroff")
+    if doc is None:
+        doc = ElementTree.fromstring(get_xml(dom))
+    node = doc.find("on_poweroff")
     return node.text if node is not None else ""
 
 
-def _get_on_reboot(dom):
+def _get_on_reboot(dom, doc=None):
     """
     Return `on_reboot` setting from the named vm
 
@@ -407,11 +463,13 @@ def _get_on_reboot(dom):
 
         salt '*' virt.get_on_reboot <domain>
     """
-    node = ElementTree.fromstring(get_xml(dom)).find("on_reboot")
+    if doc is None:
+        doc = ElementTree.fromstring(get_xml(dom))
+    node = doc.find("on_reboot")
     return node.text if node is not None else ""
 
 
-def _get_on_crash(dom):
+def _get_on_crash(dom, doc=None):
     """
     Return `on_crash` setting from the named vm
 
@@ -421,17 +479,22 @@ def _get_on_crash(dom):
 
         salt '*' virt.get_on_crash <domain>
     """
-    node = ElementTree.fromstring(get_xml(dom)).find("on_crash")
+    if doc is None:
+        doc = ElementTree.fromstring(get_xml(dom))
+    node = doc.find("on_crash")
     return node.text if node is not None else ""
 
 
-def _get_nics(dom):
+def _get_nics(dom, doc=None):
     """
     Get domain network interfaces from a libvirt domain object.
+
+    ``doc`` is the already parsed inactive XML definition of the domain.
     """
     nics = {}
     # Don't expose the active configuration since it may be changed by libvirt
-    doc = ElementTree.fromstring(dom.XMLDesc(libvirt.VIR_DOMAIN_XML_INACTIVE))
+    if doc is None:
+        doc = ElementTree.fromstring(dom.XMLDesc(libvirt.VIR_DOMAIN_XML_INACTIVE))
     for iface_node in doc.findall("devices/interface"):
         nic = {}
         nic["type"] = iface_node.get("type")
@@ -462,7 +525,7 @@ def _get_nics(dom):
     return nics
 
 
-def _get_graphics(dom):
+def _get_graphics(dom, doc=None):
     """
     Get domain graphics from a libvirt domain object.
     """
@@ -473,19 +536,21 @@ def _get_graphics(dom):
         "port": "None",
         "type": "None",
     }
-    doc = ElementTree.fromstring(dom.XMLDesc(0))
+    if doc is None:
+        doc = ElementTree.fromstring(dom.XMLDesc(0))
     for g_node in doc.findall("devices/graphics"):
         for key, value in g_node.attrib.items():
             out[key] = value
     return out
 
 
-def _get_loader(dom):
+def _get_loader(dom, doc=None):
     """
     Get domain loader from a libvirt domain object.
     """
     out = {"path": "None"}
-    doc = ElementTree.fromstring(dom.XMLDesc(0))
+    if doc is None:
+        doc = ElementTree.fromstring(dom.XMLDesc(0))
     for g_node in doc.findall("os/loader"):
         out["path"] = g_node.text
         for key, value in g_node.attrib.items():
@@ -493,14 +558,20 @@ def _get_loader(dom):
     return out
 
 
-def _get_disks(conn, dom):
+def _get_disks(conn, dom, doc=None, all_volumes=None):
     """
     Get domain disks from a libvirt domain object.
+
+    ``doc`` is the already parsed XML definition of the domain and
+    ``all_volumes`` the result of ``_get_all_volumes_paths``, to share them
+    between several calls.
     """
     disks = {}
-    doc = ElementTree.fromstring(dom.XMLDesc(0))
+    if doc is None:
+        doc = ElementTree.fromstring(dom.XMLDesc(0))
     # Get the path, pool, volume name of each volume we can
-    all_volumes = _get_all_volumes_paths(conn)
+    if all_volumes is None:
+        all_volumes = _get_all_volumes_paths(conn)
     for elem in doc.findall("devices/disk"):
         source = elem.find("source")
         if source is None:
@@ -4329,35 +4400,55 @@ def vm_info(vm_=None, **kwargs):
         salt '*' virt.vm_info
     """
 
-    def _info(conn, dom):
+    conn = __get_conn(**kwargs)
+    info = _vm_info(conn, vm_)
+    conn.close()
+    return info
+
+
+def _vm_info(conn, vm_=None):
+    """
+    Internal variant of vm_info taking a libvirt connection as parameter
+    """
+
+    def _info(dom, stats, all_volumes):
         """
         Compute the infos of a domain
         """
-        raw = dom.info()
+        raw = _get_domain_info(dom, stats)
+        # Parse each definition of the domain only once
+        doc = ElementTree.fromstring(dom.XMLDesc(0))
+        inactive_doc = ElementTree.fromstring(
+            dom.XMLDesc(libvirt.VIR_DOMAIN_XML_INACTIVE)
+        )
         return {
             "cpu": raw[3],
             "cputime": int(raw[4]),
-            "disks": _get_disks(conn, dom),
-            "graphics": _get_graphics(dom),
-            "nics": _get_nics(dom),
-            "uuid": _get_uuid(dom),
-            "loader": _get_loader(dom),
-            "on_crash": _get_on_crash(dom),
-            "on_reboot": _get_on_reboot(dom),
-            "on_poweroff": _get_on_poweroff(dom),
+            "disks": _get_disks(conn, dom, doc, all_volumes),
+            "graphics": _get_graphics(dom, doc),
+            "nics": _get_nics(dom, inactive_doc),
+            "uuid": _get_uuid(dom, doc),
+            "loader": _get_loader(dom, doc),
+            "on_crash": _get_on_crash(dom, doc),
+            "on_reboot": _get_on_reboot(dom, doc),
+            "on_poweroff": _get_on_poweroff(dom, doc),
             "maxMem": int(raw[1]),
             "mem": int(raw[2]),
             "state": VIRT_STATE_NAME_MAP.get(raw[0], "unknown"),
         }
 
     info = {}
-    conn = __get_conn(**kwargs)
-    if vm_:
-        info[vm_] = _info(conn, _get_domain(conn, vm_))
-    else:
-        for domain in _get_domain(conn, iterable=True):
-            info[domain.name()] = _info(conn, domain)
-    conn.close()
+    domains = _get_domains_stats(
+        conn,
+        vm_,
+        libvirt.VIR_DOMAIN_STATS_STATE
+        | libvirt.VIR_DOMAIN_STATS_CPU_TOTAL
+        | libvirt.VIR_DOMAIN_STATS_BALLOON
+        | libvirt.VIR_DOMAIN_STATS_VCPU,
+    )
+    all_volumes = _get_all_volumes_paths(conn) if domains else {}
+    for domain, stats in domains:
+        info[vm_ or domain.name()] = _info(domain, stats, all_volumes)
     return info
 
 
@@ -4386,22 +4477,19 @@ def vm_state(vm_=None, **kwargs):
         salt '*' virt.vm_state <domain>
     """
 
-    def _info(dom):
+    def _info(dom, stats):
         """
         Compute domain state
         """
-        state = ""
-        raw = dom.info()
-        state = VIRT_STATE_NAME_MAP.get(raw[0], "unknown")
-        return state
+        state = stats.get("state.state")
+        if state is None:
+            state = dom.info()[0]
+        return VIRT_STATE_NAME_MAP.get(state, "unknown")
 
     info = {}
     conn = __get_conn(**kwargs)
-    if vm_:
-        info[vm_] = _info(_get_domain(conn, vm_))
-    else:
-        for domain in _get_domain(conn, iterable=True):
-            info[domain.name()] = _info(domain)
+    for domain, stats in _get_domains_stats(conn, vm_, libvirt.VIR_DOMAIN_STATS_STATE):
+        info[vm_ or domain.name()] = _info(domain, stats)
     conn.close()
     return info
 
@@ -4892,7 +4980,7 @@ def full_info(**kwargs):
         "freecpu": _freecpu(conn),
         "freemem": _freemem(conn),
         "node_info": _node_info(conn),
-        "vm_info": vm_info(),
+        "vm_info": _vm_info(conn),
     }
     conn.close()
     return info
@@ -5849,11 +5937,11 @@ def vm_cputime(vm_=None, **kwargs):
     conn = __get_conn(**kwargs)
     host_cpus = conn.getInfo()[2]
 
-    def _info(dom):
+    def _info(dom, stats):
         """
         Compute cputime info of a domain
         """
-        raw = dom.info()
+        raw = _get_domain_info(dom, stats)
         vcpus = int(raw[3])
         cputime = int(raw[4])
         cputime_percent = 0
@@ -5866,11 +5954,15 @@ def vm_cputime(vm_=None, **kwargs):
         }
 
     info = {}
-    if vm_:
-        info[vm_] = _info(_get_domain(conn, vm_))
-    else:
-        for domain in _get_domain(conn, iterable=True):
-            info[domain.name()] = _info(domain)
+    for domain, stats in _get_domains_stats(
+        conn,
+        vm_,
+        libvirt.VIR_DOMAIN_STATS_STATE
+        | libvirt.VIR_DOMAIN_STATS_CPU_TOTAL
+        | libvirt.VIR_DOMAIN_STATS_BALLOON
+        | libvirt.VIR_DOMAIN_STATS_VCPU,
+    ):
+        info[vm_ or domain.name()] = _info(domain, stats)
     conn.close()
     return info
 
@@ -5917,11 +6009,10 @@ def vm_netstats(vm_=None, **kwargs):
         salt '*' virt.vm_netstats
     """
 
-    def _info(dom):
+    def _info(dom, stats):
         """
         Compute network stats of a domain
         """
-        nics = _get_nics(dom)
         ret = {
             "rx_bytes": 0,
             "rx_packets": 0,
@@ -5932,6 +6023,22 @@ def vm_netstats(vm_=None, **kwargs):
             "tx_errs": 0,
             "tx_drop": 0,
         }
+        if "net.count" in stats:
+            for idx in range(stats["net.count"]):
+                for key, stat in (
+                    ("rx_bytes", "rx.bytes"),
+                    ("rx_packets", "rx.pkts"),
+                    ("rx_errs", "rx.errs"),
+                    ("rx_drop", "rx.drop"),
+                    ("tx_bytes", "tx.bytes"),
+                    ("tx_packets", "tx.pkts"),
+                    ("tx_errs", "tx.errs"),
+                    ("tx_drop", "tx.drop"),
+                ):
+                    ret[key] += stats.get("net.{}.{}".format(idx, stat), 0)
+            return ret
+
+        nics = _get_nics(dom)
         for attrs in nics.values():
             if "target" in attrs:
                 dev = attrs["target"]
@@ -5949,11 +6056,10 @@ def vm_netstats(vm_=None, **kwargs):
 
     info = {}
     conn = __get_conn(**kwargs)
-    if vm_:
-        info[vm_] = _info(_get_domain(conn, vm_))
-    else:
-        for domain in _get_domain(conn, iterable=True):
-            info[domain.name()] = _info(domain)
+    for domain, stats in _get_domains_stats(
+        conn, vm_, libvirt.VIR_DOMAIN_STATS_INTERFACE
+    ):
+        info[vm_ or domain.name()] = _info(domain, stats)
     conn.close()
     return info
 
@@ -6001,17 +6107,30 @@ def vm_diskstats(vm_=None, **kwargs):
         """
         Extract the disk devices names from the domain XML definition
         """
-        doc = ElementTree.fromstring(get_xml(dom, **kwargs))
+        doc = ElementTree.fromstring(dom.XMLDesc(0))
         return [target.get("dev") for target in doc.findall("devices/disk/target")]
 
-    def _info(dom):
+    def _info(dom, stats):
         """
         Compute the disk stats of a domain
         """
+        ret = {"rd_req": 0, "rd_bytes": 0, "wr_req": 0, "wr_bytes": 0, "errs": 0}
+        if "block.count" in stats:
+            for idx in range(stats["block.count"]):
+                for key, stat in (
+                    ("rd_req", "rd.reqs"),
+                    ("rd_bytes", "rd.bytes"),
+                    ("wr_req", "wr.reqs"),
+                    ("wr_bytes", "wr.bytes"),
+                ):
+                    ret[key] += stats.get("block.{}.{}".format(idx, stat), 0)
+                # Like blockStats, report -1 when the driver has no error count
+                ret["errs"] += stats.get("block.{}.errors".format(idx), -1)
+            return ret
+
         # Do not use get_disks, since it uses qemu-img and is very slow
         # and unsuitable for any sort of real time statistics
         disks = get_disk_devs(dom)
-        ret = {"rd_req": 0, "rd_bytes": 0, "wr_req": 0, "wr_bytes": 0, "errs": 0}
         for disk in disks:
             stats = dom.blockStats(disk)
             ret["rd_req"] += stats[0]
@@ -6024,12 +6143,11 @@ def vm_diskstats(vm_=None, **kwargs):
 
     info = {}
     conn = __get_conn(**kwargs)
-    if vm_:
-        info[vm_] = _info(_get_domain(conn, vm_))
-    else:
-        # Can not run function blockStats on inactive VMs
-        for domain in _get_domain(conn, iterable=True, inactive=False):
-            info[domain.name()] = _info(domain)
+    # Can not run function blockStats on inactive VMs
+    for domain, stats in _get_domains_stats(
+        conn, vm_, libvirt.VIR_DOMAIN_STATS_BLOCK, inactive=False
+    ):
+        info[vm_ or domain.name()] = _info(domain, stats)
     conn.close()
     return info
 
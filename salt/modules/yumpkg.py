@@ -742,6 +742,14 @@ def list_pkgs(versions_as_list=False, **kwargs):
     if contextkey in __context__ and kwargs.get("use_context", True):
         return _list_pkgs_from_context(versions_as_list, contextkey, attr)
 
+    stamp = salt.utils.pkg.snapshot_stamp(salt.utils.pkg.RPMDB_PATHS)
+    ret = salt.utils.pkg.load_snapshot(__opts__, "yumpkg", stamp)
+    if ret is not None:
+        __context__[contextkey] = ret
+        return __salt__["pkg_resource.format_pkg_list"](
+            __context__[contextkey], versions_as_list, attr
+        )
+
     ret = {}
     cmd = [
         "rpm",
@@ -774,6 +782,7 @@ def list_pkgs(versions_as_list=False, **kwargs):
     for pkgname in ret:
         ret[pkgname] = sorted(ret[pkgname], key=lambda d: d["version"])
 
+    salt.utils.pkg.save_snapshot(__opts__, "yumpkg", stamp, ret)
     __context__[contextkey] = ret
 
     return __salt__["pkg_resource.format_pkg_list"](
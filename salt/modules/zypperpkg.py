@@ -919,6 +919,53 @@ def _list_pkgs_from_context(versions_as_list, contextkey, attr):
     )
 
 
+def _list_rpm_pkgs(root=None):
+    """
+    Return the packages of the rpm database, without the GPG public keys
+    """
+    ret = {}
+    cmd = ["rpm"]
+    if root:
+        cmd.extend(["--root", root])
+    cmd.extend(
+        [
+            "-qa",
+            "--queryformat",
+            salt.utils.pkg.rpm.QUERYFORMAT.replace("%{REPOID}", "(none)") + "\n",
+        ]
+    )
+    output = __salt__["cmd.run"](cmd, python_shell=False, output_loglevel="trace")
+    for line in output.splitlines():
+        pkginfo = salt.utils.pkg.rpm.parse_pkginfo(line, osarch=__grains__["osarch"])
+        if pkginfo:
+            # see rpm version string rules available at https://goo.gl/UGKPNd
+            pkgver = pkginfo.version
+            epoch = None
+            release = None
+            if ":" in pkgver:
+                epoch, pkgver = pkgver.split(":", 1)
+            if "-" in pkgver:
+                pkgver, release = pkgver.split("-", 1)
+            all_attr = {
+                "epoch": epoch,
+                "version": pkgver,
+                "release": release,
+                "arch": pkginfo.arch,
+                "install_date": pkginfo.install_date,
+                "install_date_time_t": pkginfo.install_date_time_t,
+            }
+            __salt__["pkg_resource.add_pkg"](ret, pkginfo.name, all_attr)
+
+    _ret = {}
+    for pkgname in ret:
+        # Filter out GPG public keys packages
+        if pkgname.startswith("gpg-pubkey"):
+            continue
+        _ret[pkgname] = sorted(ret[pkgname], key=lambda d: d["version"])
+
+    return _ret
+
+
 def list_pkgs(versions_as_list=False, root=None, includes=None, **kwargs):
     """
     List the packages currently installed as a dict. By default, the dict
@@ -985,45 +1032,11 @@ def list_pkgs(versions_as_list=False, root=None, includes=None, **kwargs):
     if contextkey in __context__ and kwargs.get("use_context", True):
         return _list_pkgs_from_context(versions_as_list, contextkey, attr)
 
-    ret = {}
-    cmd = ["rpm"]
-    if root:
-        cmd.extend(["--root", root])
-    cmd.extend(
-        [
-            "-qa",
-            "--queryformat",
-            salt.utils.pkg.rpm.QUERYFORMAT.replace("%{REPOID}", "(none)") + "\n",
-        ]
-    )
-    output = __salt__["cmd.run"](cmd, python_shell=False, output_loglevel="trace")
-    for line in output.splitlines():
-        pkginfo = salt.utils.pkg.rpm.parse_pkginfo(line, osarch=__grains__["osarch"])
-        if pkginfo:
-            # see rpm version string rules available at https://goo.gl/UGKPNd
-            pkgver = pkginfo.version
-            epoch = None
-            release = None
-            if ":" in pkgver:
-                epoch, pkgver = pkgver.split(":", 1)
-            if "-" in pkgver:
-                pkgver, release = pkgver.split("-", 1)
-            all_attr = {
-                "epoch": epoch,
-                "version": pkgver,
-                "release": release,
-                "arch": pkginfo.arch,
-                "install_date": pkginfo.install_date,
-                "install_date_time_t": pkginfo.install_date_time_t,
-            }
-            __salt__["pkg_resource.add_pkg"](ret, pkginfo.name, all_attr)
-
-    _ret = {}
-    for pkgname in ret:
-        # Filter out GPG public keys packages
-        if pkgname.startswith("gpg-pubkey"):
-            continue
-        _ret[pkgname] = sorted(ret[pkgname], key=lambda d: d["version"])
+    stamp = salt.utils.pkg.snapshot_stamp(salt.utils.pkg.RPMDB_PATHS, root=root)
+    _ret = salt.utils.pkg.load_snapshot(__opts__, "zypperpkg", stamp, root=root)
+    if _ret is None:
+        _ret = _list_rpm_pkgs(root)
+        salt.utils.pkg.save_snapshot(__opts__, "zypperpkg", stamp, _ret, root=root)
 
     for include in includes:
         if include == "product":
@@ -227,6 +227,28 @@ def _json_dumps(obj, **kwargs):
     return salt.utils.json.dumps(obj, _json_module=_json, **kwargs)
 
 
+def _event_filter(handler):
+    """
+    Return the arguments of :py:meth:`EventListener.get_event` only selecting
+    the events a client subscribed to with the ``tag`` and ``fields`` query
+    arguments of its request
+    """
+    kwargs = {}
+    tags = handler.get_query_arguments("tag")
+    if tags:
+        kwargs["tag"] = tuple(sorted(set(tags)))
+        kwargs["matcher"] = EventListener.any_prefix_matcher
+    fields = [
+        field
+        for arg in handler.get_query_arguments("fields")
+        for field in arg.split(",")
+        if field
+    ]
+    if fields:
+        kwargs["fields"] = fields
+    return kwargs
+
+
 # The clients rest_cherrypi supports. We want to mimic the interface, but not
 #     necessarily use the same API under the hood
 # # all of these require coordinating minion stuff
@@ -241,6 +263,9 @@ def _json_dumps(obj, **kwargs):
 AUTH_TOKEN_HEADER = "X-Auth-Token"
 AUTH_COOKIE_NAME = "session_id"
 
+# The number of minion results written between two flushes of a streamed job
+JOB_STREAM_CHUNK_SIZE = 100
+
 
 class TimeoutException(Exception):
     pass
@@ -289,6 +314,9 @@ class EventListener:
         # map of future -> timeout_callback
         self.timeout_map = {}
 
+        # map of future -> keys of the event data to return
+        self.fields_map = {}
+
         self.event.set_event_handler(self._handle_event_socket_recv)
 
     def clean_by_request(self, request):
@@ -306,6 +334,7 @@ class EventListener:
                     self.timeout_map[future]
                 )
                 del self.timeout_map[future]
+            self.fields_map.pop(future, None)
 
         del self.request_map[request]
 
@@ -321,6 +350,24 @@ class EventListener:
             raise TypeError("mtag or tag can not be None")
         return mtag == tag
 
+    @staticmethod
+    def any_prefix_matcher(mtag, tags):
+        if mtag is None or tags is None:
+            raise TypeError("mtag or tags can not be None")
+        return any(mtag.startswith(tag) for tag in tags)
+
+    @staticmethod
+    def select_fields(event, fields):
+        """
+        Only keep the given keys of the data of an event
+        """
+        if fields is None or not isinstance(event.get("data"), dict):
+            return event
+        return {
+            "tag": event["tag"],
+            "data": {key: event["data"][key] for key in fields if key in event["data"]},
+        }
+
     def get_event(
         self,
         request,
@@ -328,9 +375,13 @@ class EventListener:
         matcher=prefix_matcher.__func__,
         callback=None,
         timeout=None,
+        fields=None,
     ):
         """
         Get an event (asynchronous of course) return a future that will get it later
+
+        If ``fields`` is a list, only these keys of the data of the event are
+        set in the result of the future.
         """
         future = Future()
         if callback is not None:
@@ -344,6 +395,8 @@ class EventListener:
         # add this tag and future to the callbacks
         self.tag_map[(tag, matcher)].append(future)
         self.request_map[request].append((tag, matcher, future))
+        if fields is not None:
+            self.fields_map[future] = fields
 
         if timeout:
             timeout_future = salt.ext.tornado.ioloop.IOLoop.current().call_later(
@@ -361,6 +414,7 @@ class EventListener:
             return
         if not future.done():
             future.set_exception(TimeoutException())
+            self.fields_map.pop(future, None)
         # We need to remove it from the map even if we didn't explicitly time it out
         # Otherwise, we get a memory leak in the tag_map
         if future in self.tag_map[(tag, matcher)] and future.done():
@@ -385,11 +439,15 @@ class EventListener:
             if not is_matched:
                 continue
 
-            for future in futures:
+            for future in list(futures):
                 if future.done():
                     continue
-                future.set_result({"data": data, "tag": mtag})
-                self.tag_map[(tag, matcher)].remove(future)
+                future.set_result(
+                    self.select_fields(
+                        {"data": data, "tag": mtag}, self.fields_map.pop(future, None)
+                    )
+                )
+                futures.remove(future)
                 if future in self.timeout_map:
                     salt.ext.tornado.ioloop.IOLoop.current().remove_timeout(
                         self.timeout_map[future]
@@ -912,12 +970,28 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
         """
         Disbatch all lowstates to the appropriate clients
         """
+        ret = yield self._disbatch_lowstate()
+        if ret is None:
+            return
+
+        try:
+            self.write(self.serialize({"return": ret}))
+            self.finish()
+        except RuntimeError:
+            pass  # Do we need any logging here?
+
+    @salt.ext.tornado.gen.coroutine
+    def _disbatch_lowstate(self):
+        """
+        Disbatch all lowstates to the appropriate clients and return the list
+        of their returns, or ``None`` if the request was already answered
+        """
         ret = []
 
         # check clients before going, we want to throw 400 if one is bad
         for low in self.lowstate:
             if not self._verify_client(low):
-                return
+                raise salt.ext.tornado.gen.Return(None)
 
             # Make sure we have 'token' or 'username'/'password' in each low chunk.
             # Salt will verify the credentials are correct.
@@ -944,11 +1018,7 @@ class SaltAPIHandler(BaseSaltAPIHandler):  # pylint: disable=W0223
                 ret.append("Unexpected exception while handling request: {}".format(ex))
                 log.error("Unexpected exception while handling request:", exc_info=True)
 
-        try:
-            self.write(self.serialize({"return": ret}))
-            self.finish()
-        except RuntimeError:
-            pass  # Do we need any logging here?
+        raise salt.ext.tornado.gen.Return(ret)
 
     @salt.ext.tornado.gen.coroutine
     def get_minion_returns(
@@ -1332,7 +1402,7 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
     A convenience endpoint for job cache data
     """
 
-    @salt.ext.tornado.web.asynchronous
+    @salt.ext.tornado.gen.coroutine
     def get(self, jid=None):  # pylint: disable=W0221
         """
         A convenience URL for getting lists of previously run jobs or getting
@@ -1342,10 +1412,23 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
 
             List jobs or show a single job from the job cache.
 
+            :query limit: only return this number of jobs, the most recent
+                ones first, or the results of this number of minions of a job
+            :query cursor: the ``next_cursor`` of the previous page
+
             :status 200: |200|
+            :status 400: |400|
             :status 401: |401|
             :status 406: |406|
 
+        .. versionchanged:: 3007.0
+
+            The ``limit`` and ``cursor`` query arguments page through the jobs
+            and through the minion results of a job. The response of a page
+            has a ``next_cursor`` key, which is ``null`` on the last page. The
+            minion results of a job are streamed by chunks of
+            ``JOB_STREAM_CHUNK_SIZE`` minions when JSON is requested.
+
         **Example request:**
 
         .. code-block:: bash
@@ -1413,6 +1496,29 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
                 - 1
                 - 2
                 - 6.9141387939453125e-06
+
+        **Example request:**
+
+        .. code-block:: bash
+
+            curl -i 'localhost:8000/jobs?limit=1&cursor=20121130104633606931'
+
+        **Example response:**
+
+        .. code-block:: text
+
+            HTTP/1.1 200 OK
+            Content-Length: 183
+            Content-Type: application/x-yaml
+
+            next_cursor: '20121130103912345678'
+            return:
+            - '20121130103912345678':
+                Arguments: []
+                Function: test.ping
+                Start Time: 2012, Nov 30 10:39:12.345678
+                Target: jerry
+                Target-type: glob
         """
         # if you aren't authenticated, redirect to login
         if not self._verify_auth():
@@ -1420,11 +1526,88 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
             return
 
         if jid:
-            self.lowstate = [{"fun": "jobs.list_job", "jid": jid, "client": "runner"}]
+            low = {"fun": "jobs.list_job", "jid": jid, "client": "runner"}
         else:
-            self.lowstate = [{"fun": "jobs.list_jobs", "client": "runner"}]
+            low = {"fun": "jobs.list_jobs", "client": "runner"}
 
-        self.disbatch()
+        limit = self.get_query_argument("limit", None)
+        cursor = self.get_query_argument("cursor", None)
+        if limit is not None:
+            try:
+                limit = int(limit)
+                if limit < 1:
+                    raise ValueError
+            except ValueError:
+                self.set_status(400)
+                self.write("400 Invalid limit: must be a positive integer")
+                self.finish()
+                return
+            low["limit"] = limit
+        if cursor is not None:
+            low["cursor"] = cursor
+        self.lowstate = [low]
+
+        paginated = limit is not None or cursor is not None
+        if not jid and not paginated:
+            yield self.disbatch()
+            return
+
+        ret = yield self._disbatch_lowstate()
+        if ret is None:
+            return
+
+        job = ret[0] if ret else None
+        extra = {}
+        if paginated:
+            extra["next_cursor"] = None
+            page = job.get("Result") if jid and isinstance(job, dict) else job
+            if limit is not None and isinstance(page, dict) and len(page) >= limit:
+                # Jobs are listed from the most recent, minions by their id
+                extra["next_cursor"] = max(page) if jid else min(page)
+
+        try:
+            if (
+                jid
+                and self.content_type == "application/json"
+                and isinstance(job, dict)
+                and isinstance(job.get("Result"), dict)
+            ):
+                yield self._stream_job(job, extra)
+            else:
+                self.write(self.serialize(dict({"return": ret}, **extra)))
+                self.finish()
+        except RuntimeError:
+            pass  # The client went away
+
+    @salt.ext.tornado.gen.coroutine
+    def _stream_job(self, job, extra):
+        """
+        Write the return of a job as JSON, flushing the results of its minions
+        by chunks instead of serializing them all at once
+        """
+        result = job.pop("Result")
+        self.set_header("Content-Type", self.content_type)
+        info = _json_dumps(job)
+        self.write('{"return": [' + info[:-1] + (", " if job else "") + '"Result": {')
+        for idx, (minion_id, minion_ret) in enumerate(result.items(), 1):
+            self.write(
+                "{}{}: {}".format(
+                    ", " if idx > 1 else "",
+                    _json_dumps(minion_id),
+                    _json_dumps(minion_ret),
+                )
+            )
+            if idx % JOB_STREAM_CHUNK_SIZE == 0:
+                yield self.flush()
+        self.write(
+            "}}}}]{}}}".format(
+                "".join(
+                    ", {}: {}".format(_json_dumps(key), _json_dumps(value))
+                    for key, value in extra.items()
+                )
+            )
+        )
+        self.finish()
 
 
 class RunSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
@@ -1514,10 +1697,20 @@ class EventsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
 
         .. http:get:: /events
 
+            :query tag: only send the events whose tag starts with this
+                prefix, may be given several times
+            :query fields: a comma separated list of the keys of the event
+                data to send, the other keys are left out
+
             :status 200: |200|
             :status 401: |401|
             :status 406: |406|
 
+        .. versionchanged:: 3007.0
+
+            The ``tag`` and ``fields`` query arguments are applied by the
+            server, the events a client did not subscribe to are not sent.
+
         **Example request:**
 
         .. code-block:: bash
@@ -1585,6 +1778,13 @@ class EventsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
                         echo $line
                     done
 
+        Here is an example of only receiving the return of the jobs, with
+        their function and minion:
+
+        .. code-block:: bash
+
+            curl -NsS 'localhost:8000/events?tag=salt/job/&fields=fun,id,return'
+
         Here is an example of using awk to filter events based on tag:
 
         .. code-block:: bash
@@ -1611,13 +1811,16 @@ class EventsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
         self.write("retry: {}\n".format(400))
         self.flush()
 
+        event_filter = _event_filter(self)
         while True:
             try:
                 if not self._verify_auth():
                     log.debug("Token is no longer valid")
                     break
 
-                event = yield self.application.event_listener.get_event(self)
+                event = yield self.application.event_listener.get_event(
+                    self, **event_filter
+                )
                 self.write("tag: {}\n".format(event.get("tag", "")))
                 self.write("data: {}\n\n".format(_json_dumps(event)))
                 self.flush()
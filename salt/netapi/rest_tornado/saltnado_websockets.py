@@ -66,6 +66,14 @@ Which results in the response
 In this example the ``token`` returned is ``d0ce6c1a37e99dcc0374392f272fe19c0090cca7`` and can be included
 in subsequent websocket requests (as part of the URL).
 
+.. versionadded:: 3007.0
+
+    Like for the ``/events`` end point, the ``tag`` query argument only sends
+    the events whose tag starts with the given prefix, and may be given
+    several times. The ``fields`` query argument is a comma separated list of
+    the keys of the event data to send, for instance
+    ``/all_events/<token>?tag=salt/job/&fields=fun,id,return``.
+
 The event stream can be easily consumed via JavaScript:
 
 .. code-block:: javascript
@@ -297,7 +305,7 @@ import salt.netapi
 import salt.utils.json
 
 from . import event_processor
-from .saltnado import _check_cors_origin
+from .saltnado import _check_cors_origin, _event_filter
 
 _json = salt.utils.json.import_json()
 
@@ -352,9 +360,12 @@ class AllEventsHandler(
 
             self.connected = True
 
+            event_filter = _event_filter(self)
             while True:
                 try:
-                    event = yield self.application.event_listener.get_event(self)
+                    event = yield self.application.event_listener.get_event(
+                        self, **event_filter
+                    )
                     self.write_message(salt.utils.json.dumps(event, _json_module=_json))
                 except Exception as err:  # pylint: disable=broad-except
                     log.info(
@@ -351,6 +351,7 @@ def _format_host(host, data, indent_level=1):
     hcolor = colors["GREEN"]
     hstrs = []
     nchanges = 0
+    nmemoized = 0
     strip_colors = __opts__.get("strip_colors", True)
 
     if isinstance(data, int):
@@ -397,6 +398,7 @@ def _format_host(host, data, indent_level=1):
             ret = data[tname]
             # Increment result counts
             rcounts.setdefault(ret["result"], 0)
+            nmemoized += ret.get("__checks_memoized__", 0)
 
             # unpack state compression counts
             compressed_count = 1
@@ -614,7 +616,11 @@ def _format_host(host, data, indent_level=1):
             None: "Not Run",
             "warnings": "Warnings",
         }
-        count_max_len = max([len(str(x)) for x in rcounts.values()] or [0])
+        if nmemoized:
+            rlabel["memoized"] = "Checks memoized"
+        count_max_len = max(
+            [len(str(x)) for x in list(rcounts.values()) + [nmemoized]] or [0]
+        )
         label_max_len = max([len(x) for x in rlabel.values()] or [0])
         line_max_len = label_max_len + count_max_len + 2  # +2 for ': '
         hstrs.append(
@@ -715,6 +721,14 @@ def _format_host(host, data, indent_level=1):
                     colors,
                 )
             )
+        if nmemoized:
+            # onlyif/unless checks reused from earlier states, see
+            # state_check_memo
+            hstrs.append(
+                colorfmt.format(
+                    colors["CYAN"], _counts(rlabel["memoized"], nmemoized), colors
+                )
+            )
         totals = "{0}\nTotal states run: {1:>{2}}".format(
             "-" * line_max_len,
             sum(rcounts.values()) - rcounts.get("warnings", 0),
@@ -466,3 +466,26 @@ def flush(bank, key=None, cachedir=None):
     except TypeError:
         cache = salt.cache.Cache(__opts__)
     return cache.flush(bank, key)
+
+
+def memcache_stats():
+    """
+    .. versionadded:: 3007.0
+
+    Return the in-memory cache counters of the running master workers, per
+    cache storage and bank group. Each bank group reports the ``hit``,
+    ``miss`` and ``evict`` counts, the ``items`` currently held in memory and
+    their size in ``bytes`` (only measured when ``memcache_max_bytes`` is set),
+    and the ``hit_rate``.
+
+    The counters are written by each worker at most every
+    ``memcache_stats_interval`` seconds, and only when the memcache is enabled
+    with ``memcache_expire_seconds``.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run cache.memcache_stats
+    """
+    return salt.cache.memcache_stats(__opts__["cachedir"])
@@ -360,6 +360,31 @@ def update(backend=None, **kwargs):
     return True
 
 
+def update_stats(backend=None):
+    """
+    .. versionadded:: 3007.0
+
+    Return the outcome of the latest update of each remote of the fileserver
+    backends which support it (currently only :mod:`gitfs
+    <salt.fileserver.gitfs>`), including how long the fetch took and the
+    error, if any, which made it fail.
+
+    backend
+        Narrow fileserver backends to a subset of the enabled ones. If all
+        passed backends start with a minus sign (``-``), then these backends
+        will be excluded from the enabled backends.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run fileserver.update_stats
+        salt-run fileserver.update_stats backend=git
+    """
+    fileserver = salt.fileserver.Fileserver(__opts__)
+    return fileserver.update_stats(back=backend)
+
+
 def clear_cache(backend=None):
     """
     .. versionadded:: 2015.5.0
@@ -173,7 +173,7 @@ def lookup_jid(
         return ret
 
 
-def list_job(jid, ext_source=None, display_progress=False):
+def list_job(jid, ext_source=None, display_progress=False, limit=None, cursor=None):
     """
     List a specific job given by its jid
 
@@ -185,12 +185,25 @@ def list_job(jid, ext_source=None, display_progress=False):
 
         .. versionadded:: 2015.8.8
 
+    limit
+        Only return the results of this number of minions, sorted by minion
+        id.
+
+        .. versionadded:: 3007.0
+
+    cursor
+        Only return the results of the minions whose id sorts after this one,
+        the last minion id of the previous page.
+
+        .. versionadded:: 3007.0
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run jobs.list_job 20130916125524463507
         salt-run jobs.list_job 20130916125524463507 --out=pprint
+        salt-run jobs.list_job 20130916125524463507 limit=100 cursor=minion042
     """
     ret = {"jid": jid}
     mminion = salt.minion.MasterMinion(__opts__)
@@ -205,6 +218,13 @@ def list_job(jid, ext_source=None, display_progress=False):
     job = mminion.returners["{}.get_load".format(returner)](jid)
     ret.update(_format_jid_instance(jid, job))
     ret["Result"] = mminion.returners["{}.get_jid".format(returner)](jid)
+    if limit is not None or cursor is not None:
+        ids = sorted(ret["Result"])
+        if cursor is not None:
+            ids = [minion_id for minion_id in ids if minion_id > str(cursor)]
+        if limit is not None:
+            ids = ids[: int(limit)]
+        ret["Result"] = {minion_id: ret["Result"][minion_id] for minion_id in ids}
 
     fstr = "{}.get_endtime".format(__opts__["master_job_cache"])
     if __opts__.get("job_cache_store_endtime") and fstr in mminion.returners:
@@ -224,6 +244,8 @@ def list_jobs(
     start_time=None,
     end_time=None,
     display_progress=False,
+    limit=None,
+    cursor=None,
 ):
     """
     List all detectable jobs and associated functions
@@ -292,11 +314,25 @@ def list_jobs(
 
     .. _dateutil: https://pypi.python.org/pypi/python-dateutil
 
+    **PAGINATION OPTIONS**
+
+    limit
+        Only return this number of jobs, the most recent ones first.
+
+        .. versionadded:: 3007.0
+
+    cursor
+        Only return the jobs older than this jid, the last jid of the previous
+        page.
+
+        .. versionadded:: 3007.0
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run jobs.list_jobs
+        salt-run jobs.list_jobs limit=100 cursor=20150316190000000000
         salt-run jobs.list_jobs search_function='test.*' search_target='localhost' search_metadata='{"bar": "foo"}'
         salt-run jobs.list_jobs start_time='2015, Mar 16 19:00' end_time='2015, Mar 18 22:00'
 
@@ -373,6 +409,14 @@ def list_jobs(
         if _match:
             mret[item] = ret[item]
 
+    if limit is not None or cursor is not None:
+        jids = sorted(mret, reverse=True)
+        if cursor is not None:
+            jids = [jid for jid in jids if jid < str(cursor)]
+        if limit is not None:
+            jids = jids[: int(limit)]
+        mret = {jid: mret[jid] for jid in jids}
+
     if outputter:
         return {"outputter": outputter, "data": mret}
     else:
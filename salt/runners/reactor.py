@@ -192,3 +192,35 @@ def set_leader(value=True):
 
         res = sevent.get_event(wait=30, tag="salt/reactors/manage/leader/value")
         return res["result"]
+
+
+def stats():
+    """
+    Return the metrics of the running reactor: the events and reactions it
+    handled, the latency of its reactor SLS files, and the state of its
+    dispatch queues, including dropped and coalesced reactions.
+
+    .. versionadded:: 3007.0
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run reactor.stats
+    """
+    if not _reactor_system_available():
+        raise CommandExecutionError("Reactor system is not running.")
+
+    with salt.utils.event.get_event(
+        "master",
+        __opts__["sock_dir"],
+        opts=__opts__,
+        listen=True,
+    ) as sevent:
+
+        master_key = salt.utils.master.get_master_key("root", __opts__)
+
+        __jid_event__.fire_event({"key": master_key}, "salt/reactors/manage/stats")
+
+        res = sevent.get_event(wait=30, tag="salt/reactors/manage/stats-results")
+        return res.get("stats")
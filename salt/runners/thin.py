@@ -45,6 +45,31 @@ def generate(
     )
 
 
+def generate_layers(extra_mods="", overwrite=False, so_mods=""):
+    """
+    Generate the salt-thin layers used when ``ssh_thin_layers`` is enabled
+    and return the digest of each layer. Optional additional mods to include
+    (e.g. mako) can be supplied as a comma delimited string.
+
+    .. versionadded:: 3007.0
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run thin.generate_layers
+        salt-run thin.generate_layers mako
+        salt-run thin.generate_layers overwrite=1
+    """
+    conf_mods = __opts__.get("thin_extra_mods")
+    if conf_mods:
+        extra_mods = ",".join([m for m in (conf_mods, extra_mods) if m])
+
+    return salt.utils.thin.gen_thin_layers(
+        __opts__["cachedir"], extra_mods, so_mods, overwrite
+    )
+
+
 def generate_min(
     extra_mods="",
     overwrite=False,
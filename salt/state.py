@@ -43,6 +43,7 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.immutabletypes as immutabletypes
+import salt.utils.json
 import salt.utils.msgpack
 import salt.utils.platform
 import salt.utils.process
@@ -128,6 +129,30 @@ STATE_RUNTIME_KEYWORDS = frozenset(
 STATE_INTERNAL_KEYWORDS = STATE_REQUISITE_KEYWORDS.union(
     STATE_REQUISITE_IN_KEYWORDS
 ).union(STATE_RUNTIME_KEYWORDS)
+# States using these keywords are never run in a planned transaction
+STATE_PLAN_EXCLUDED_KEYWORDS = frozenset(
+    [
+        "__agg__",
+        "__prereq__",
+        "check_cmd",
+        "creates",
+        "listen",
+        "onchanges",
+        "onchanges_any",
+        "onfail",
+        "onfail_any",
+        "onfail_all",
+        "onlyif",
+        "parallel",
+        "prereq",
+        "prerequired",
+        "retry",
+        "test",
+        "unless",
+        "watch",
+        "watch_any",
+    ]
+)
 
 
 def _odict_hashable(self):
@@ -787,6 +812,9 @@ class State:
         self.active = set()
         self.mod_init = set()
         self.pre = {}
+        self.planned = {}
+        self.check_memo = {}
+        self.check_memo_hits = 0
         self.__run_num = 0
         self.jid = jid
         self.instance_id = str(id(self))
@@ -955,6 +983,95 @@ class State:
                 self.state_con["loader_cache"][agg_fun] = False
         return low
 
+    @staticmethod
+    def _plannable(low):
+        """
+        Return whether the low chunk can be run in a planned transaction
+        """
+        return not any(key in low for key in STATE_PLAN_EXCLUDED_KEYWORDS)
+
+    def _mod_plan(self, low, running, chunks):
+        """
+        Run the low chunk in a single transaction together with the chunks of
+        the same state which are ready to run, see the ``state_plan`` option.
+        Returns the return data of the low chunk, or ``None`` if it was not
+        planned.
+        """
+        tag = _gen_tag(low)
+        if tag in self.planned or low.get("__prereq__") or low.get("__agg__"):
+            return None
+        plan_opt = self.functions["config.option"]("state_plan")
+        if plan_opt is True:
+            plan_opt = [low["state"]]
+        elif not isinstance(plan_opt, list):
+            return None
+        plan_fun = "{}.mod_plan".format(low["state"])
+        if (
+            low["state"] not in plan_opt
+            or plan_fun not in self.states
+            or self.opts.get("test", False)
+            or not self._plannable(low)
+        ):
+            return None
+        pending = []
+        ready = set()
+        for chunk in chunks:
+            chunk_tag = _gen_tag(chunk)
+            if chunk_tag == tag or chunk_tag in running or chunk_tag in self.planned:
+                continue
+            pending.append(chunk)
+            if (
+                chunk["state"] != low["state"]
+                or chunk["fun"] != low["fun"]
+                or not self._plannable(chunk)
+            ):
+                continue
+            try:
+                status, _ = self.check_requisite(chunk, running, chunks, pre=True)
+            except SaltRenderError:
+                continue
+            if status == "met":
+                ready.add(chunk_tag)
+        if not ready:
+            return None
+        plan = self.states[plan_fun](low, pending, ready)
+        if not plan:
+            return None
+        merged, members = plan
+        log.info(
+            "Running %d %s states in a single transaction",
+            len(members),
+            low["state"],
+        )
+        ret = self.call(merged, chunks, running)
+        if ret.get("result") is False:
+            # Let each state run on its own to report its own failure
+            log.info("The planned transaction failed, running the states separately")
+            return None
+        changes = ret.get("changes") or {}
+        names_by_tag = {_gen_tag(chunk): chunk["name"] for chunk in pending}
+        for member_tag, names in members.items():
+            if member_tag == tag:
+                continue
+            self.planned[member_tag] = {
+                "name": names_by_tag[member_tag],
+                "result": ret["result"],
+                "changes": {key: changes[key] for key in names if key in changes},
+                "comment": ret.get("comment", ""),
+            }
+        # The leader also gets the changes which no chunk asked for, like
+        # new dependencies
+        taken = {
+            key
+            for member_tag in members
+            if member_tag != tag
+            for key in self.planned[member_tag]["changes"]
+        }
+        ret["changes"] = {
+            key: value for key, value in changes.items() if key not in taken
+        }
+        return ret
+
     def _run_check(self, low_data):
         """
         Check that unless doesn't return 0, and that onlyif returns a 0.
@@ -1022,6 +1139,30 @@ class State:
 
         return ret
 
+    def _memoize_check(self, key, check):
+        """
+        Return the result of an onlyif or unless check, reusing the result of
+        the same check earlier in the state run if ``state_check_memo`` is
+        enabled and no state reported changes since.
+        """
+        if not self.opts.get("state_check_memo", False):
+            return check()
+        try:
+            key = salt.utils.json.dumps(key, sort_keys=True)
+        except (TypeError, ValueError):
+            return check()
+        if "__slot__" in key:
+            # Slots may render differently every time
+            return check()
+        if key in self.check_memo:
+            self.check_memo_hits += 1
+            result, retcode = self.check_memo[key]
+            self.state_con["retcode"] = retcode
+            return result
+        result = check()
+        self.check_memo[key] = (result, self.state_con.get("retcode", 0))
+        return result
+
     def _run_check_function(self, entry):
         """Format slot args and run unless/onlyif function."""
         fun = entry.pop("fun")
@@ -1063,8 +1204,11 @@ class State:
         for entry in low_data_onlyif:
             if isinstance(entry, str):
                 try:
-                    cmd = self.functions["cmd.retcode"](
-                        entry, ignore_retcode=True, python_shell=True, **cmd_opts
+                    cmd = self._memoize_check(
+                        ["cmd", entry, cmd_opts],
+                        lambda: self.functions["cmd.retcode"](
+                            entry, ignore_retcode=True, python_shell=True, **cmd_opts
+                        ),
                     )
                 except CommandExecutionError:
                     # Command failed, notify onlyif to skip running the item
@@ -1079,7 +1223,9 @@ class State:
                     return ret
 
                 get_return = entry.pop("get_return", None)
-                result = self._run_check_function(entry)
+                result = self._memoize_check(
+                    ["fun", entry], lambda: self._run_check_function(entry)
+                )
                 if get_return:
                     result = salt.utils.data.traverse_dict_and_list(result, get_return)
                 if self.state_con.get("retcode", 0):
@@ -1141,8 +1287,11 @@ class State:
         for entry in low_data_unless:
             if isinstance(entry, str):
                 try:
-                    cmd = self.functions["cmd.retcode"](
-                        entry, ignore_retcode=True, python_shell=True, **cmd_opts
+                    cmd = self._memoize_check(
+                        ["cmd", entry, cmd_opts],
+                        lambda: self.functions["cmd.retcode"](
+                            entry, ignore_retcode=True, python_shell=True, **cmd_opts
+                        ),
                     )
                     log.debug("Last command return code: %s", cmd)
                 except CommandExecutionError:
@@ -1157,7 +1306,9 @@ class State:
                     return ret
 
                 get_return = entry.pop("get_return", None)
-                result = self._run_check_function(entry)
+                result = self._memoize_check(
+                    ["fun", entry], lambda: self._run_check_function(entry)
+                )
                 if get_return:
                     result = salt.utils.data.traverse_dict_and_list(result, get_return)
                 if self.state_con.get("retcode", 0):
@@ -2268,6 +2419,7 @@ class State:
             low["name"].strip() if isinstance(low["name"], str) else low["name"],
             local_start_time.time().isoformat(),
         )
+        check_memo_hits = self.check_memo_hits
         errors = self.verify_data(low)
         if errors:
             ret = {
@@ -2385,6 +2537,9 @@ class State:
                             "Failed to meet global state conditions. State '%s' not called.",
                             low["name"],
                         )
+                    elif _gen_tag(low) in self.planned:
+                        # Already applied by the transaction of another state
+                        ret = self.planned.pop(_gen_tag(low))
                     elif not low.get("__prereq__") and low.get("parallel"):
                         # run the state call in parallel, but only if not in a prereq
                         ret = self.call_parallel(cdata, low)
@@ -2459,6 +2614,11 @@ class State:
         ret["__sls__"] = low.get("__sls__")
         ret["__run_num__"] = self.__run_num
         self.__run_num += 1
+        if self.check_memo_hits > check_memo_hits:
+            ret["__checks_memoized__"] = self.check_memo_hits - check_memo_hits
+        if ret.get("changes"):
+            # The memoized checks may not hold anymore
+            self.check_memo.clear()
         format_log(ret)
         self.check_refresh(low, ret)
         utc_finish_time = datetime.datetime.utcnow()
@@ -3242,7 +3402,9 @@ class State:
             if low.get("__prereq__"):
                 self.pre[tag] = self.call(low, chunks, running)
             else:
-                running[tag] = self.call(low, chunks, running)
+                running[tag] = self._mod_plan(low, running, chunks) or self.call(
+                    low, chunks, running
+                )
         elif status == "fail":
             # if the requisite that failed was due to a prereq on this low state
             # show the normal error
@@ -3803,6 +3965,12 @@ class BaseHighState:
             opts["state_aggregate"] = (
                 opts.get("state_aggregate") or mopts.get("state_aggregate") or False
             )
+            opts["state_plan"] = (
+                opts.get("state_plan") or mopts.get("state_plan") or False
+            )
+            opts["state_check_memo"] = (
+                opts.get("state_check_memo") or mopts.get("state_check_memo") or False
+            )
             opts["jinja_env"] = mopts.get("jinja_env", {})
             opts["jinja_sls_env"] = mopts.get("jinja_sls_env", {})
             opts["jinja_lstrip_blocks"] = mopts.get("jinja_lstrip_blocks", False)
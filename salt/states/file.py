@@ -303,7 +303,6 @@ import salt.utils.dateutils
 import salt.utils.dictdiffer
 import salt.utils.dictupdate
 import salt.utils.files
-import salt.utils.hashutils
 import salt.utils.path
 import salt.utils.platform
 import salt.utils.stringutils
@@ -700,6 +699,27 @@ def _error(ret, err_msg):
     return ret
 
 
+def _report_transfer_stats(ret, sfn, source):
+    """
+    Add the bandwidth and time saved by a delta transfer of the source file to
+    the state return
+    """
+    transfers = __context__.get("cp.transfer_stats")
+    if not transfers:
+        return
+    if not sfn and source and urllib.parse.urlparse(source).scheme == "salt":
+        sfn = __salt__["cp.is_cached"](source, __env__)
+    stats = transfers.pop(sfn, None) if sfn else None
+    if not stats:
+        return
+    ret["transfer"] = stats
+    msg = (
+        "Source file fetched as a delta: {bytes_received} of {size} bytes "
+        "transferred, {bytes_saved} bytes saved, in {duration}s".format(**stats)
+    )
+    ret["comment"] = "\n".join(x for x in (ret.get("comment"), msg) if x)
+
+
 def _check_directory(
     name,
     user=None,
@@ -720,11 +740,14 @@ def _check_directory(
     if recurse or clean:
         assert max_depth is None or not clean
         # walk path only once and store the result
-        walk_l = list(_depth_limited_walk(name, max_depth))
+        walk_l = list(_scandir_walk(name, max_depth))
         # root: (dirs, files) structure, compatible for python2.6
         walk_d = {}
-        for i in walk_l:
-            walk_d[i[0]] = (i[1], i[2])
+        for root, dirs, files in walk_l:
+            walk_d[root] = (
+                [entry.name for entry in dirs],
+                [entry.name for entry in files],
+            )
 
     if recurse:
         try:
@@ -741,43 +764,25 @@ def _check_directory(
 
         check_files = "ignore_files" not in recurse_set
         check_dirs = "ignore_dirs" not in recurse_set
+        file_mode = salt.utils.files.normalize_mode(file_mode)
+        # Compare the ids of the owners, instead of resolving the names of the
+        # owners of every file
+        uid = gid = None
+        if check_files and user is not None:
+            uid = __salt__["file.user_to_uid"](user)
+        if check_files and group is not None:
+            gid = __salt__["file.group_to_gid"](group)
         for root, dirs, files in walk_l:
             if check_files:
-                for fname in files:
-                    fchange = {}
-                    path = os.path.join(root, fname)
-                    stats = __salt__["file.stats"](path, None, follow_symlinks)
-                    if (
-                        user is not None
-                        and not user == stats.get("user")
-                        and not user == stats.get("uid")
-                    ):
-                        fchange["user"] = user
-                    if (
-                        group is not None
-                        and not group == stats.get("group")
-                        and not group == stats.get("gid")
-                    ):
-                        fchange["group"] = group
-                    smode = salt.utils.files.normalize_mode(stats.get("mode"))
-                    file_mode = salt.utils.files.normalize_mode(file_mode)
-                    if (
-                        file_mode is not None
-                        and file_mode != smode
-                        and (
-                            # Ignore mode for symlinks on linux based systems where we can not
-                            # change symlink file permissions
-                            follow_symlinks
-                            or stats.get("type") != "link"
-                            or not salt.utils.platform.is_linux()
-                        )
-                    ):
-                        fchange["mode"] = file_mode
+                for entry in files:
+                    fchange = _entry_meta_changes(
+                        entry, user, group, file_mode, uid, gid, follow_symlinks
+                    )
                     if fchange:
-                        changes[path] = fchange
+                        changes[entry.path] = fchange
             if check_dirs:
-                for name_ in dirs:
-                    path = os.path.join(root, name_)
+                for entry in dirs:
+                    path = entry.path
                     fchange = _check_dir_meta(
                         path, user, group, dir_mode, follow_symlinks
                     )
@@ -803,10 +808,10 @@ def _check_directory(
                     return {path: {"removed": "Removed due to clean"}}
 
         for root, dirs, files in walk_l:
-            for fname in files:
-                changes.update(_check_changes(fname))
-            for name_ in dirs:
-                changes.update(_check_changes(name_))
+            for entry in files:
+                changes.update(_check_changes(entry.name))
+            for entry in dirs:
+                changes.update(_check_changes(entry.name))
 
     if not os.path.isdir(name):
         changes[name] = {"directory": "new"}
@@ -3371,7 +3376,7 @@ def managed(
         return _error(ret, comment_)
     else:
         try:
-            return __salt__["file.manage_file"](
+            ret = __salt__["file.manage_file"](
                 name,
                 sfn,
                 ret,
@@ -3405,6 +3410,8 @@ def managed(
                 use_etag=use_etag,
                 **kwargs
             )
+            _report_transfer_stats(ret, sfn, source)
+            return ret
         except Exception as exc:  # pylint: disable=broad-except
             ret["changes"] = {}
             log.debug(traceback.format_exc())
@@ -3456,17 +3463,89 @@ def _get_recurse_set(recurse):
     return recurse_set
 
 
+def _scandir_walk(top, max_depth=None):
+    """
+    Walk the directory tree under root up till reaching max_depth, like
+    :py:func:`_depth_limited_walk`, but yield the ``os.DirEntry`` objects of
+    the directories and of the files instead of their names, so that their
+    type and stat results are only looked up once.
+    With max_depth=None (default), do not limit depth.
+    """
+    top = salt.utils.stringutils.to_str(top)
+    stack = [(top, 0)]
+    while stack:
+        root, depth = stack.pop()
+        try:
+            with os.scandir(root) as entries:
+                entries = list(entries)
+        except OSError:
+            # os.walk ignores the directories it cannot list too
+            continue
+        dirs = []
+        files = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                dirs.append(entry)
+            else:
+                files.append(entry)
+        if max_depth is not None and depth >= max_depth:
+            dirs = []
+        yield root, dirs, files
+        # Like os.walk, do not descend into symlinks to directories
+        stack.extend(
+            (entry.path, depth + 1)
+            for entry in reversed(dirs)
+            if not entry.is_symlink()
+        )
+
+
 def _depth_limited_walk(top, max_depth=None):
     """
     Walk the directory tree under root up till reaching max_depth.
     With max_depth=None (default), do not limit depth.
     """
-    for root, dirs, files in salt.utils.path.os_walk(top):
-        if max_depth is not None:
-            rel_depth = root.count(os.path.sep) - top.count(os.path.sep)
-            if rel_depth >= max_depth:
-                del dirs[:]
-        yield (str(root), list(dirs), list(files))
+    for root, dirs, files in _scandir_walk(top, max_depth):
+        yield (
+            str(root),
+            [entry.name for entry in dirs],
+            [entry.name for entry in files],
+        )
+
+
+def _entry_meta_changes(entry, user, group, mode, uid, gid, follow_symlinks=False):
+    """
+    Return the user, group and mode changes needed on the file of a
+    ``os.DirEntry``, without looking up the names of its owners. ``uid`` and
+    ``gid`` are the ids of ``user`` and ``group``.
+    """
+    try:
+        pstat = entry.stat(follow_symlinks=follow_symlinks)
+    except OSError:
+        pstat = None
+    changes = {}
+    if user is not None and (pstat is None or pstat.st_uid != uid):
+        changes["user"] = user
+    if group is not None and (pstat is None or pstat.st_gid != gid):
+        changes["group"] = group
+    if mode is not None:
+        smode = None
+        is_link = False
+        if pstat is not None:
+            smode = salt.utils.files.normalize_mode(oct(stat.S_IMODE(pstat.st_mode)))
+            is_link = stat.S_ISLNK(pstat.st_mode)
+        if mode != smode and (
+            # Ignore mode for symlinks on linux based systems where we can not
+            # change symlink file permissions
+            follow_symlinks
+            or not is_link
+            or not salt.utils.platform.is_linux()
+        ):
+            changes["mode"] = mode
+    return changes
 
 
 def directory(
@@ -4032,13 +4111,17 @@ def directory(
     errors = []
     if recurse or clean:
         # walk path only once and store the result
-        walk_l = list(_depth_limited_walk(name, max_depth))
+        walk_l = list(_scandir_walk(name, max_depth))
         # root: (dirs, files) structure, compatible for python2.6
         walk_d = {}
-        for i in walk_l:
-            walk_d[i[0]] = (i[1], i[2])
+        for root, dirs, files in walk_l:
+            walk_d[root] = (
+                [entry.name for entry in dirs],
+                [entry.name for entry in files],
+            )
 
     recurse_set = None
+    uid = gid = None
     if recurse:
         try:
             recurse_set = _get_recurse_set(recurse)
@@ -4098,10 +4181,29 @@ def directory(
         check_files = "ignore_files" not in recurse_set
         check_dirs = "ignore_dirs" not in recurse_set
 
+        def _up_to_date(entry, mode):
+            """
+            Tell from the stat result of the walk whether the path already
+            has the wanted owners and mode, to skip file.check_perms
+            """
+            if salt.utils.platform.is_windows() or entry.is_symlink():
+                return False
+            return not _entry_meta_changes(
+                entry,
+                user,
+                group,
+                salt.utils.files.normalize_mode(mode),
+                uid,
+                gid,
+                follow_symlinks,
+            )
+
         for root, dirs, files in walk_l:
             if check_files:
-                for fn_ in files:
-                    full = os.path.join(root, fn_)
+                for entry in files:
+                    if _up_to_date(entry, file_mode):
+                        continue
+                    full = entry.path
                     try:
                         if salt.utils.platform.is_windows():
                             ret = __salt__["file.check_perms"](
@@ -4122,8 +4224,10 @@ def directory(
                             errors.append(exc.strerror)
 
             if check_dirs:
-                for dir_ in dirs:
-                    full = os.path.join(root, dir_)
+                for entry in dirs:
+                    if _up_to_date(entry, dir_mode):
+                        continue
+                    full = entry.path
                     try:
                         if salt.utils.platform.is_windows():
                             ret = __salt__["file.check_perms"](
@@ -4179,6 +4283,30 @@ def directory(
     return ret
 
 
+def _changed_recurse_sources(mng_files, saltenv, workers):
+    """
+    Return the sources of file.recurse whose hash on the master differs from
+    the hash of their destination
+    """
+    sums = __salt__["cp.hash_files"](
+        [src for _, src in mng_files], saltenv, workers=workers
+    )
+    changed = []
+    for (dest, src), source_sum in zip(mng_files, sums):
+        if not source_sum:
+            # file.managed reports the missing source
+            continue
+        if os.path.isfile(dest):
+            try:
+                hsum = __salt__["file.get_hash"](dest, source_sum["hash_type"])
+            except (CommandExecutionError, OSError):
+                hsum = None
+            if hsum == source_sum["hsum"]:
+                continue
+        changed.append(src)
+    return changed
+
+
 def recurse(
     name,
     source,
@@ -4629,6 +4757,19 @@ def recurse(
         merge_ret(os.path.join(name, srelpath), _ret)
     for dirname in mng_dirs:
         manage_directory(dirname)
+    workers = __opts__.get("file_recurse_workers", 1)
+    if workers > 1 and len(mng_files) > 1:
+        # Fetch the sources which differ from their destination concurrently,
+        # the file.managed calls below then find them in the minion file cache
+        try:
+            if template:
+                sources = [src for _, src in mng_files]
+            else:
+                sources = _changed_recurse_sources(mng_files, senv, workers)
+            if sources:
+                __salt__["cp.cache_files"](sources, senv, workers=workers)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug("Unable to prefetch the sources of %s: %s", name, exc)
     for dest, src in mng_files:
         manage_file(dest, src, replace)
 
@@ -7541,8 +7682,8 @@ def copy_(
     if os.path.lexists(source) and os.path.lexists(name):
         # if this is a file which did not change, do not update
         if force and os.path.isfile(name):
-            hash1 = salt.utils.hashutils.get_hash(name)
-            hash2 = salt.utils.hashutils.get_hash(source)
+            hash1 = __salt__["file.get_hash"](name)
+            hash2 = __salt__["file.get_hash"](source)
             if hash1 == hash2:
                 changed = True
                 ret["comment"] = " ".join(
@@ -78,6 +78,7 @@ import salt.utils.versions
 from salt.exceptions import CommandExecutionError, MinionError, SaltInvocationError
 from salt.modules.pkg_resource import _repack_pkgs
 from salt.output import nested
+from salt.state import STATE_INTERNAL_KEYWORDS as _STATE_INTERNAL_KEYWORDS
 from salt.utils.functools import namespaced_function
 from salt.utils.odict import OrderedDict as _OrderedDict
 
@@ -3540,6 +3541,85 @@ def mod_aggregate(low, chunks, running):
     return low
 
 
+def _plan_pkgs(low):
+    """
+    Return the entries a chunk adds to the ``pkgs`` of a planned transaction,
+    or ``None`` if it cannot be planned
+    """
+    if "sources" in low or "hold" in low:
+        return None
+    if "pkgs" in low:
+        return list(low["pkgs"])
+    version = low.get("version")
+    if version is None:
+        return [low["name"]]
+    if low["fun"] == "installed":
+        return [{low["name"]: version}]
+    return None
+
+
+def _plan_options(low):
+    """
+    Return the options a chunk must share with the other chunks of a planned
+    transaction
+    """
+    return {
+        key: value
+        for key, value in low.items()
+        if not key.startswith("__")
+        and key not in ("name", "names", "pkgs", "version")
+        and key not in _STATE_INTERNAL_KEYWORDS
+    }
+
+
+def _plan_names(pkgs):
+    return [next(iter(pkg)) if isinstance(pkg, dict) else pkg for pkg in pkgs]
+
+
+def mod_plan(low, chunks, ready):
+    """
+    The mod_plan function merges the pkg chunks which are ready to run with
+    the same function and options as the present low data into a single
+    installation, upgrade or removal. ``chunks`` are the chunks which did not
+    run yet, in order, and ``ready`` the tags of those which can run now.
+
+    Returns the merged low data and the names of the packages of each merged
+    chunk by tag, or ``None`` if there is nothing to merge.
+
+    .. versionadded:: 3007.0
+    """
+    if low.get("fun") not in ("installed", "latest", "removed", "purged"):
+        return None
+    pkgs = _plan_pkgs(low)
+    if pkgs is None:
+        return None
+    options = _plan_options(low)
+    names = set(_plan_names(pkgs))
+    members = {__utils__["state.gen_tag"](low): _plan_names(pkgs)}
+    for chunk in chunks:
+        if chunk.get("state") == "pkgrepo":
+            # The packages which follow may come from this repository
+            break
+        tag = __utils__["state.gen_tag"](chunk)
+        if tag not in ready or chunk.get("fun") != low["fun"]:
+            continue
+        chunk_pkgs = _plan_pkgs(chunk)
+        if chunk_pkgs is None or _plan_options(chunk) != options:
+            continue
+        chunk_names = _plan_names(chunk_pkgs)
+        if names.intersection(chunk_names):
+            continue
+        names.update(chunk_names)
+        pkgs.extend(chunk_pkgs)
+        members[tag] = chunk_names
+    if len(members) < 2:
+        return None
+    merged = dict(low)
+    merged.pop("version", None)
+    merged["pkgs"] = pkgs
+    return merged, members
+
+
 def mod_watch(name, **kwargs):
     """
     Install/reinstall a package based on a watch requisite
@@ -0,0 +1,213 @@
+"""
+Content-addressed storage for files cached by the minion fileclient
+
+Blobs are stored under ``<cachedir>/blobs/<hash_type>/<xx>/<hsum>``, keyed by
+the hash the master reports for the file. Entries in the regular per-saltenv
+file cache are hardlinks to these blobs, so the same file reachable through
+several saltenvs or paths is only transferred and stored once.
+
+.. versionadded:: 3007.0
+"""
+import errno
+import logging
+import os
+import re
+import shutil
+
+import salt.utils.files
+import salt.utils.path
+
+log = logging.getLogger(__name__)
+
+HEX_RE = re.compile(r"^[0-9a-f]+$")
+HASH_TYPE_RE = re.compile(r"^[a-z0-9_]+$")
+
+
+class BlobStore:
+    """
+    Manage a directory of content-addressed blobs
+    """
+
+    def __init__(self, root, max_size=0):
+        self.root = root
+        self.max_size = max_size or 0
+
+    def path(self, hsum, hash_type):
+        """
+        Return the location of the blob for the given hash, or ``None`` if the
+        hash cannot be used as a blob key.
+        """
+        if not isinstance(hsum, str) or not isinstance(hash_type, str):
+            return None
+        hsum = hsum.lower()
+        hash_type = hash_type.lower()
+        if len(hsum) < 8 or not HEX_RE.match(hsum):
+            return None
+        if not HASH_TYPE_RE.match(hash_type):
+            return None
+        return salt.utils.path.join(self.root, hash_type, hsum[:2], hsum)
+
+    def contains(self, hsum, hash_type):
+        """
+        Return ``True`` if a blob for the given hash is present
+        """
+        blob = self.path(hsum, hash_type)
+        return blob is not None and os.path.isfile(blob)
+
+    def is_linked(self, dest, hsum, hash_type):
+        """
+        Return ``True`` if ``dest`` is a hardlink to the blob for the given
+        hash. This lets callers trust the content of ``dest`` without hashing
+        it.
+        """
+        blob = self.path(hsum, hash_type)
+        if blob is None:
+            return False
+        try:
+            return os.path.samefile(blob, dest)
+        except OSError:
+            return False
+
+    def add(self, src, hsum, hash_type):
+        """
+        Add ``src`` to the store under the given hash. The caller is
+        responsible for having verified that ``src`` matches the hash. Returns
+        the blob location, or ``None`` if the file could not be stored.
+        """
+        blob = self.path(hsum, hash_type)
+        if blob is None:
+            return None
+        if os.path.isfile(blob):
+            self._touch(blob)
+            return blob
+        try:
+            self._makedirs(os.path.dirname(blob))
+            self._place(src, blob, link=True)
+        except OSError as exc:
+            log.debug("Unable to add %s to the blob store: %s", src, exc)
+            return None
+        if self.max_size:
+            self.gc()
+        return blob
+
+    def materialize(self, hsum, hash_type, dest, link=True):
+        """
+        Create ``dest`` from the blob for the given hash, either as a hardlink
+        or, if ``link`` is ``False`` or linking is not possible, as a copy.
+        Returns ``dest``, or ``None`` if no blob exists for the hash.
+        """
+        blob = self.path(hsum, hash_type)
+        if blob is None or not os.path.isfile(blob):
+            return None
+        if os.path.isdir(dest):
+            salt.utils.files.rm_rf(dest)
+        self._place(blob, dest, link=link)
+        self._touch(blob)
+        return dest
+
+    def blobs(self):
+        """
+        Yield ``(path, stat_result)`` for every blob in the store
+        """
+        if not os.path.isdir(self.root):
+            return
+        for root, _, files in salt.utils.path.os_walk(self.root):
+            for name in files:
+                if not HEX_RE.match(name):
+                    # Skip in-flight temporary files
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    yield path, os.stat(path)
+                except OSError:
+                    continue
+
+    def size(self):
+        """
+        Return the number of bytes used by the blobs in the store
+        """
+        return sum(st.st_size for _, st in self.blobs())
+
+    def gc(self, max_size=None):
+        """
+        Remove least recently used blobs until the store fits in ``max_size``
+        bytes. Only blobs that are no longer linked from the file cache are
+        removed, since removing a linked blob would not free any space.
+        Returns the list of removed blobs.
+        """
+        if max_size is None:
+            max_size = self.max_size
+        if not max_size:
+            return []
+        entries = list(self.blobs())
+        total = sum(st.st_size for _, st in entries)
+        removed = []
+        if total <= max_size:
+            return removed
+        candidates = sorted(
+            ((path, st) for path, st in entries if st.st_nlink <= 1),
+            key=lambda item: item[1].st_mtime,
+        )
+        for path, st in candidates:
+            if total <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError as exc:
+                if exc.errno != errno.ENOENT:
+                    log.debug("Unable to remove blob %s: %s", path, exc)
+                    continue
+            total -= st.st_size
+            removed.append(path)
+        if total > max_size:
+            log.debug(
+                "Blob store %s is %d bytes over its budget, remaining blobs are "
+                "still linked from the file cache",
+                self.root,
+                total - max_size,
+            )
+        return removed
+
+    @staticmethod
+    def _makedirs(path):
+        with salt.utils.files.set_umask(0o077):
+            try:
+                os.makedirs(path)
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:
+                    raise
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _place(src, dest, link=True):
+        """
+        Atomically put a hardlink to, or a copy of, ``src`` at ``dest``
+        """
+        tmp = "{}.{}.tmp".format(dest, os.getpid())
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        linked = False
+        if link:
+            try:
+                os.link(src, tmp)
+                linked = True
+            except (OSError, AttributeError, NotImplementedError):
+                pass
+        try:
+            if not linked:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,209 @@
+"""
+Remember the hash sums of files on disk, so that files which did not change
+since they were last hashed are not read again, see the
+``file_digest_cache`` minion option.
+
+A hash sum is reused while the device, inode, size, modification time and
+change time of the file are the same as when it was computed. The sums are
+kept in shard files under the ``file_digests`` directory of the
+``cachedir``, the shard of a file being chosen by the hash of its path.
+
+New sums are kept in memory and written to their shards in batches, see
+:py:meth:`DigestCache.flush`, and when the job or the process ends.
+
+.. versionadded:: 3007.0
+"""
+import atexit
+import hashlib
+import logging
+import os
+import stat
+import threading
+import time
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.stringutils
+
+log = logging.getLogger(__name__)
+
+# Files modified less than this number of seconds before they are hashed are
+# not cached, their timestamps may not change when they are modified again
+RACY_WINDOW = 2
+
+# The number of files remembered in each of the 256 shards
+MAX_SHARD_ENTRIES = 4096
+
+# New sums are written to disk once this many of them are waiting, or when
+# the oldest of them has waited this number of seconds
+FLUSH_ENTRIES = 10000
+FLUSH_INTERVAL = 30
+
+_CACHES = {}
+
+
+def get_cache(cachedir):
+    """
+    Return the :py:class:`DigestCache` of ``cachedir`` shared by the whole
+    process
+    """
+    if cachedir not in _CACHES:
+        _CACHES[cachedir] = DigestCache(os.path.join(cachedir, "file_digests"))
+    return _CACHES[cachedir]
+
+
+def get_hash(cachedir, path, form="sha256", chunk_size=65536):
+    """
+    Return the hash sum of a file like :py:func:`salt.utils.hashutils.get_hash`,
+    using the digest cache of ``cachedir``
+    """
+    return get_cache(cachedir).get_hash(path, form, chunk_size)
+
+
+def flush():
+    """
+    Write the sums waiting in memory of all the digest caches of the process
+    """
+    for cache in list(_CACHES.values()):
+        cache.flush()
+
+
+atexit.register(flush)
+
+
+def _stamp(st):
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns]
+
+
+class DigestCache:
+    """
+    The hash sums of the files already hashed, by path and hash type
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._shards = {}
+        # The paths stored since the last flush, by shard
+        self._dirty = {}
+        self._dirty_count = 0
+        self._dirty_since = None
+        self._lock = threading.RLock()
+
+    def _shard_path(self, name):
+        return os.path.join(self.path, "{}.p".format(name))
+
+    def _load_shard(self, name):
+        try:
+            with salt.utils.files.fopen(self._shard_path(name), "rb") as fh_:
+                shard = salt.payload.load(fh_)
+        except FileNotFoundError:
+            return {}
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug("Ignoring unreadable digest cache shard %s: %s", name, exc)
+            return {}
+        return shard if isinstance(shard, dict) else {}
+
+    def _shard(self, path):
+        name = hashlib.sha1(salt.utils.stringutils.to_bytes(path)).hexdigest()[:2]
+        if name not in self._shards:
+            self._shards[name] = self._load_shard(name)
+        return name, self._shards[name]
+
+    def lookup(self, path, form, st):
+        """
+        Return the cached hash sum of ``path``, or ``None`` if the file changed
+        since it was hashed
+        """
+        with self._lock:
+            _, shard = self._shard(path)
+            entry = shard.get(path)
+        if entry is None or entry["stamp"] != _stamp(st):
+            return None
+        return entry["digests"].get(form)
+
+    def store(self, path, form, st, digest):
+        """
+        Remember the hash sum of ``path``, whose stat was ``st`` when hashed
+        """
+        with self._lock:
+            name, shard = self._shard(path)
+            stamp = _stamp(st)
+            entry = shard.pop(path, None)
+            if entry is None or entry["stamp"] != stamp:
+                entry = {"stamp": stamp, "digests": {}}
+            entry["digests"][form] = digest
+            shard[path] = entry
+            self._dirty.setdefault(name, set()).add(path)
+            self._dirty_count += 1
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            if (
+                self._dirty_count >= FLUSH_ENTRIES
+                or time.monotonic() - self._dirty_since >= FLUSH_INTERVAL
+            ):
+                self.flush()
+
+    def flush(self):
+        """
+        Write the shards holding sums stored since the last flush, keeping
+        what other processes wrote to them in the meantime
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._dirty_count = 0
+            self._dirty_since = None
+            if not dirty:
+                return
+            try:
+                os.makedirs(self.path, exist_ok=True)
+            except OSError as exc:
+                log.debug("Unable to write the digest cache in %s: %s", self.path, exc)
+                return
+            for name, paths in dirty.items():
+                shard = self._load_shard(name)
+                for path in paths:
+                    entry = self._shards[name].get(path)
+                    if entry is not None:
+                        shard.pop(path, None)
+                        shard[path] = entry
+                while len(shard) > MAX_SHARD_ENTRIES:
+                    del shard[next(iter(shard))]
+                self._shards[name] = shard
+                try:
+                    with salt.utils.atomicfile.atomic_open(
+                        self._shard_path(name), "wb"
+                    ) as fh_:
+                        salt.payload.dump(shard, fh_)
+                except OSError as exc:
+                    log.debug(
+                        "Unable to write the digest cache in %s: %s", self.path, exc
+                    )
+
+    def get_hash(self, path, form="sha256", chunk_size=65536):
+        """
+        Return the hash sum of a file, only reading it if it changed since it
+        was last hashed
+        """
+        path = os.path.abspath(path)
+        try:
+            before = os.stat(path)
+        except OSError:
+            before = None
+        if before is None or not stat.S_ISREG(before.st_mode):
+            return salt.utils.hashutils.get_hash(path, form, chunk_size)
+        digest = self.lookup(path, form, before)
+        if digest is not None:
+            return digest
+        digest = salt.utils.hashutils.get_hash(path, form, chunk_size)
+        try:
+            after = os.stat(path)
+        except OSError:
+            return digest
+        if (
+            _stamp(after) == _stamp(before)
+            and time.time_ns() - after.st_mtime_ns > RACY_WINDOW * 1000000000
+        ):
+            self.store(path, form, after, digest)
+        return digest
@@ -0,0 +1,205 @@
+"""
+Block signature delta encoding, used to transfer only the changed parts of
+large files between the master's fileserver and the minion's fileclient
+
+The receiving side computes :func:`signatures` of the copy it already has, the
+sending side uses them to compute a :func:`delta` made of references to
+matching blocks and literal data, and the receiving side applies it with
+:func:`patch`. Blocks are matched with a rolling Adler-32 checksum confirmed by
+a strong hash, as described in the rsync algorithm.
+
+.. versionadded:: 3007.0
+"""
+import hashlib
+import logging
+import math
+import mmap
+import os
+import time
+import zlib
+
+import salt.utils.files
+import salt.utils.stringutils
+
+log = logging.getLogger(__name__)
+
+ADLER_MOD = 65521
+MIN_BLOCK_SIZE = 2048
+MAX_BLOCK_SIZE = 131072
+MAX_SIGNATURES = 1048576
+# Never send more than this much literal data in a single delta reply
+MAX_LITERAL = 64 * 1024 * 1024
+# Give up computing a delta after this many seconds
+MAX_DELTA_SECONDS = 10
+# The number of byte positions scanned between two checks of the time spent
+_TIME_CHECK_INTERVAL = 65536
+
+
+def block_size(size):
+    """
+    Return the block size to use for a file of ``size`` bytes
+    """
+    return int(min(max(math.sqrt(size), MIN_BLOCK_SIZE), MAX_BLOCK_SIZE)) // 8 * 8
+
+
+def _strong(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _roll(weak, out_byte, in_byte, window):
+    """
+    Slide the Adler-32 checksum of a window of ``window`` bytes forward by one
+    byte
+    """
+    low, high = weak & 0xFFFF, weak >> 16
+    low = (low - out_byte + in_byte) % ADLER_MOD
+    high = (high - window * out_byte + low - 1) % ADLER_MOD
+    return (high << 16) | low
+
+
+def signatures(path, bsize):
+    """
+    Return the ``[weak, strong]`` signature of each block of the file
+    """
+    ret = []
+    with salt.utils.files.fopen(path, "rb") as fp_:
+        for block in iter(lambda: fp_.read(bsize), b""):
+            ret.append([zlib.adler32(block), _strong(block)])
+    return ret
+
+
+def _validate(sigs, bsize):
+    if not isinstance(bsize, int) or not MIN_BLOCK_SIZE <= bsize <= MAX_BLOCK_SIZE:
+        raise ValueError("Invalid block size: {}".format(bsize))
+    if not isinstance(sigs, (list, tuple)) or len(sigs) > MAX_SIGNATURES:
+        raise ValueError("Invalid block signatures")
+    weak_map = {}
+    for idx, sig in enumerate(sigs):
+        try:
+            weak, strong = sig
+        except (TypeError, ValueError):
+            raise ValueError("Invalid block signature at index {}".format(idx))
+        strong = salt.utils.stringutils.to_str(strong)
+        weak_map.setdefault(weak, {}).setdefault(strong, idx)
+    return weak_map
+
+
+def delta(
+    path,
+    sigs,
+    bsize,
+    basis_size=None,
+    max_literal=None,
+    max_size=None,
+    timeout=MAX_DELTA_SECONDS,
+):
+    """
+    Compute the delta which turns a file with the given block signatures into
+    the file at ``path``. The delta is a list made of block indexes, meaning
+    "copy this block of the old file", and ``bytes`` of literal data. Passing
+    the size of the old file allows matching its last, shorter, block.
+
+    Returns ``None`` if the delta would carry more than ``max_literal`` bytes
+    of literal data, if the file is larger than ``max_size`` bytes or if
+    computing the delta takes more than ``timeout`` seconds, in which case a
+    full transfer is cheaper.
+    """
+    weak_map = _validate(sigs, bsize)
+    if not isinstance(basis_size, int):
+        basis_size = None
+    ops = []
+    literal = 0
+    deadline = time.monotonic() + timeout if timeout else None
+    with salt.utils.files.fopen(path, "rb") as fp_:
+        size = os.fstat(fp_.fileno()).st_size
+        if max_size and size > max_size:
+            log.debug("Not computing the delta of %s, larger than %d", path, max_size)
+            return None
+        if max_literal is None:
+            max_literal = min(size // 2, MAX_LITERAL)
+        if not size:
+            return ops
+        with mmap.mmap(fp_.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = lit_start = 0
+            weak = None
+            while pos + bsize <= size:
+                end = pos + bsize
+                if weak is None:
+                    weak = zlib.adler32(data[pos:end])
+                candidates = weak_map.get(weak)
+                if candidates:
+                    idx = candidates.get(_strong(data[pos:end]))
+                    if idx is not None:
+                        if lit_start < pos:
+                            ops.append(data[lit_start:pos])
+                            literal += pos - lit_start
+                        ops.append(idx)
+                        pos = lit_start = end
+                        weak = None
+                        continue
+                if end < size:
+                    weak = _roll(weak, data[pos], data[end], bsize)
+                pos += 1
+                if literal + pos - lit_start > max_literal:
+                    return None
+                if (
+                    deadline
+                    and not pos % _TIME_CHECK_INTERVAL
+                    and time.monotonic() > deadline
+                ):
+                    log.debug("Gave up computing the delta of %s", path)
+                    return None
+            # The old file may end with a short block, look for it in what is
+            # left of ours
+            tail_len = basis_size % bsize if basis_size and sigs else 0
+            if tail_len and size - pos >= tail_len:
+                tail_weak, tail_strong = sigs[-1]
+                tail_strong = salt.utils.stringutils.to_str(tail_strong)
+                weak = zlib.adler32(data[pos : pos + tail_len])
+                while True:
+                    end = pos + tail_len
+                    if weak == tail_weak and _strong(data[pos:end]) == tail_strong:
+                        if lit_start < pos:
+                            ops.append(data[lit_start:pos])
+                            literal += pos - lit_start
+                        ops.append(len(sigs) - 1)
+                        lit_start = end
+                        break
+                    if end >= size:
+                        break
+                    weak = _roll(weak, data[pos], data[end], tail_len)
+                    pos += 1
+            if lit_start < size:
+                if literal + size - lit_start > max_literal:
+                    return None
+                ops.append(data[lit_start:size])
+    return ops
+
+
+def literal_size(ops):
+    """
+    Return the number of bytes of literal data carried by a delta
+    """
+    return sum(len(op) for op in ops if not isinstance(op, int))
+
+
+def patch(basis, ops, bsize, fh_):
+    """
+    Apply a delta to the file at ``basis``, writing the result to the open
+    file ``fh_``. Returns the number of literal bytes which were applied.
+    """
+    literal = 0
+    with salt.utils.files.fopen(basis, "rb") as fp_:
+        for op in ops:
+            if isinstance(op, int):
+                fp_.seek(op * bsize)
+                block = fp_.read(bsize)
+                if not block:
+                    raise ValueError("Delta references missing block {}".format(op))
+                fh_.write(block)
+            else:
+                if isinstance(op, str):
+                    op = op.encode()
+                literal += len(op)
+                fh_.write(op)
+    return literal
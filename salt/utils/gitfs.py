@@ -4,6 +4,7 @@ Classes which provide the shared base for GitFS, git_pillar, and winrepo
 
 
 import base64
+import collections
 import contextlib
 import copy
 import errno
@@ -18,16 +19,20 @@ import shlex
 import shutil
 import stat
 import subprocess
+import threading
 import time
 import weakref
 from datetime import datetime
 
 import salt.ext.tornado.ioloop
 import salt.fileserver
+import salt.payload
 import salt.syspaths
+import salt.utils.atomicfile
 import salt.utils.cache
 import salt.utils.configparser
 import salt.utils.data
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -55,6 +60,11 @@ GLOBAL_ONLY = ()
 
 SYMLINK_RECURSE_DEPTH = 100
 
+# Version of the on-disk tree index format, bump when changing its layout
+TREE_INDEX_VERSION = 1
+# Number of tree indexes kept in memory by each remote
+TREE_INDEX_CACHE_SIZE = 32
+
 # Auth support (auth params can be global or per-remote, too)
 AUTH_PROVIDERS = ("pygit2",)
 AUTH_PARAMS = ("user", "password", "pubkey", "privkey", "passphrase", "insecure_auth")
@@ -486,6 +496,8 @@ class GitProvider:
         self._linkdir = salt.utils.path.join(
             cache_root, "links", self._cache_full_basename
         )
+        self._tree_index_dir = salt.utils.path.join(cache_root, "tree_index")
+        self._tree_indexes = OrderedDict()
         if not os.path.isdir(self._cachedir):
             os.makedirs(self._cachedir)
 
@@ -1086,9 +1098,17 @@ class GitProvider:
 
     def dir_list(self, tgt_env):
         """
-        This function must be overridden in a sub-class
+        Get list of directories for the target environment
         """
-        raise NotImplementedError()
+        ret = set()
+        index = self.tree_index(tgt_env)
+        if index is None:
+            return ret
+        for _, path in self._index_paths(index, index["dirs"], tgt_env):
+            ret.add(path)
+        if self.mountpoint(tgt_env):
+            ret.add(self.mountpoint(tgt_env))
+        return ret
 
     def env_is_exposed(self, tgt_env):
         """
@@ -1115,12 +1135,186 @@ class GitProvider:
         raise NotImplementedError()
 
     def file_list(self, tgt_env):
+        """
+        Get file list for the target environment
+        """
+        files = set()
+        symlinks = {}
+        index = self.tree_index(tgt_env)
+        if index is None:
+            # Not found, return empty objects
+            return files, symlinks
+        for repo_path, path in self._index_paths(index, index["files"], tgt_env):
+            files.add(path)
+            if repo_path in index["symlinks"]:
+                symlinks[path] = index["symlinks"][repo_path]
+        return files, symlinks
+
+    def find_blob(self, path, tgt_env):
+        """
+        Find the specified file in the specified environment, following
+        symlinks, and return the hex SHA and mode of its blob. No object is
+        read from the repository.
+        """
+        index = self.tree_index(tgt_env)
+        if index is None:
+            # Branch/tag/SHA not found in repo
+            return None, None
+        depth = 0
+        while depth < SYMLINK_RECURSE_DEPTH:
+            depth += 1
+            path = os.path.normpath(path).replace(os.sep, "/")
+            try:
+                blob_hexsha, mode, _ = index["files"][path]
+            except KeyError:
+                # File not found or path points to a directory
+                return None, None
+            if not stat.S_ISLNK(mode):
+                return blob_hexsha, mode
+            # Path is a symlink, follow it to the location it points to
+            path = salt.utils.path.join(
+                os.path.dirname(path), index["symlinks"][path], use_posixpath=True
+            )
+        return None, None
+
+    def find_file(self, path, tgt_env):
+        """
+        Find the specified file in the specified environment
+        """
+        blob_hexsha, mode = self.find_blob(path, tgt_env)
+        if blob_hexsha is None:
+            return None, None, None
+        return self.get_blob(blob_hexsha), blob_hexsha, mode
+
+    def get_blob(self, blob_hexsha):
         """
         This function must be overridden in a sub-class
         """
         raise NotImplementedError()
 
-    def find_file(self, path, tgt_env):
+    def get_tree_sha(self, tree):
+        """
+        This function must be overridden in a sub-class
+        """
+        raise NotImplementedError()
+
+    def read_blob(self, blob_hexsha):
+        """
+        This function must be overridden in a sub-class
+        """
+        raise NotImplementedError()
+
+    def tree_index(self, tgt_env):
+        """
+        Return the index of the tree for the specified environment, mapping
+        each path to the hex SHA, mode and size of its blob. Trees are
+        immutable, so the index is built only once for each tree SHA and kept
+        on disk, and a new one is only needed when the ref moves.
+        """
+        tree = self.get_tree(tgt_env)
+        if not tree:
+            return None
+        tree_sha = self.get_tree_sha(tree)
+        index = self._tree_indexes.get(tree_sha)
+        if index is not None:
+            self._tree_indexes.move_to_end(tree_sha)
+            return index
+        index_path = self._tree_index_path(tree_sha)
+        try:
+            with salt.utils.files.fopen(index_path, "rb") as fp_:
+                index = salt.payload.load(fp_)
+            if index.get("version") != TREE_INDEX_VERSION:
+                index = None
+        except (OSError, ValueError, TypeError, AttributeError, IndexError):
+            index = None
+        if index is None:
+            start = time.time()
+            index = self._build_tree_index(tree)
+            try:
+                self._write_tree_index(index_path, index)
+            except OSError as exc:
+                log.warning(
+                    "Unable to write tree index for %s remote '%s' to %s: %s",
+                    self.role,
+                    self.id,
+                    index_path,
+                    exc,
+                )
+            log.profile(
+                "%s tree index build repo=%s tree=%s files=%d duration=%s seconds",
+                self.role,
+                self.id,
+                tree_sha,
+                len(index["files"]),
+                time.time() - start,
+            )
+        index["dirs"] = set(index["dirs"])
+        self._tree_indexes[tree_sha] = index
+        while len(self._tree_indexes) > TREE_INDEX_CACHE_SIZE:
+            self._tree_indexes.popitem(last=False)
+        return index
+
+    def _build_tree_index(self, tree):
+        """
+        Walk the tree and return its index
+        """
+        index = {
+            "version": TREE_INDEX_VERSION,
+            "files": {},
+            "symlinks": {},
+            "dirs": [],
+        }
+        for path, mode, blob_hexsha, size in self.walk_tree(tree):
+            if mode is None:
+                index["dirs"].append(path)
+                continue
+            index["files"][path] = [blob_hexsha, mode, size]
+            if stat.S_ISLNK(mode):
+                index["symlinks"][path] = salt.utils.stringutils.to_str(
+                    self.read_blob(blob_hexsha)
+                )
+        return index
+
+    def _index_paths(self, index, paths, tgt_env):
+        """
+        Yield the repo path and the fileserver path, relative to the root and
+        prefixed with the mountpoint, of each of the paths which are within
+        the configured root
+        """
+        root = self.root(tgt_env)
+        mountpoint = self.mountpoint(tgt_env)
+        if root:
+            root = os.path.normpath(root).replace(os.sep, "/")
+            if root not in index["dirs"]:
+                return
+            prefix = root + "/"
+        for repo_path in paths:
+            if root:
+                if not repo_path.startswith(prefix):
+                    continue
+                path = repo_path[len(prefix) :]
+            else:
+                path = repo_path
+            yield repo_path, salt.utils.path.join(mountpoint, path, use_posixpath=True)
+
+    def _tree_index_path(self, tree_sha):
+        return salt.utils.path.join(
+            self._tree_index_dir, tree_sha[:2], "{}.p".format(tree_sha)
+        )
+
+    @staticmethod
+    def _write_tree_index(index_path, index):
+        index_dir = os.path.dirname(index_path)
+        if not os.path.isdir(index_dir):
+            try:
+                os.makedirs(index_dir)
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:
+                    raise
+        with salt.utils.atomicfile.atomic_open(index_path, "wb") as fp_:
+            salt.payload.dump(index, fp_)
+
+    def walk_tree(self, tree):
         """
         This function must be overridden in a sub-class
         """
@@ -1266,6 +1460,12 @@ class GitProvider:
         self.credentials = None
         return True
 
+    def write_blob(self, blob_hexsha, dest):
+        """
+        Write the blob matching the hex SHA to the destination path
+        """
+        self.write_file(self.get_blob(blob_hexsha), dest)
+
     def write_file(self, blob, dest):
         """
         This function must be overridden in a sub-class
@@ -1414,32 +1614,6 @@ class GitPython(GitProvider):
 
         return new
 
-    def dir_list(self, tgt_env):
-        """
-        Get list of directories for the target environment using GitPython
-        """
-        ret = set()
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            return ret
-        if self.root(tgt_env):
-            try:
-                tree = tree / self.root(tgt_env)
-            except KeyError:
-                return ret
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for blob in tree.traverse():
-            if isinstance(blob, git.Tree):
-                ret.add(add_mountpoint(relpath(blob.path)))
-        if self.mountpoint(tgt_env):
-            ret.add(self.mountpoint(tgt_env))
-        return ret
-
     def envs(self):
         """
         Check the refs and return a list of the ones which can be used as salt
@@ -1484,84 +1658,11 @@ class GitPython(GitProvider):
         cleaned = self.clean_stale_refs()
         return True if (new_objs or cleaned) else None
 
-    def file_list(self, tgt_env):
+    def get_blob(self, blob_hexsha):
         """
-        Get file list for the target environment using GitPython
+        Return the git.Blob object matching the hex SHA
         """
-        files = set()
-        symlinks = {}
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Not found, return empty objects
-            return files, symlinks
-        if self.root(tgt_env):
-            try:
-                tree = tree / self.root(tgt_env)
-            except KeyError:
-                return files, symlinks
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for file_blob in tree.traverse():
-            if not isinstance(file_blob, git.Blob):
-                continue
-            file_path = add_mountpoint(relpath(file_blob.path))
-            files.add(file_path)
-            if stat.S_ISLNK(file_blob.mode):
-                stream = io.BytesIO()
-                file_blob.stream_data(stream)
-                stream.seek(0)
-                link_tgt = salt.utils.stringutils.to_str(stream.read())
-                stream.close()
-                symlinks[file_path] = link_tgt
-        return files, symlinks
-
-    def find_file(self, path, tgt_env):
-        """
-        Find the specified file in the specified environment
-        """
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Branch/tag/SHA not found in repo
-            return None, None, None
-        blob = None
-        depth = 0
-        while True:
-            depth += 1
-            if depth > SYMLINK_RECURSE_DEPTH:
-                blob = None
-                break
-            try:
-                file_blob = tree / path
-                if stat.S_ISLNK(file_blob.mode):
-                    # Path is a symlink. The blob data corresponding to
-                    # this path's object ID will be the target of the
-                    # symlink. Follow the symlink and set path to the
-                    # location indicated in the blob data.
-                    stream = io.BytesIO()
-                    file_blob.stream_data(stream)
-                    stream.seek(0)
-                    link_tgt = salt.utils.stringutils.to_str(stream.read())
-                    stream.close()
-                    path = salt.utils.path.join(
-                        os.path.dirname(path), link_tgt, use_posixpath=True
-                    )
-                else:
-                    blob = file_blob
-                    if isinstance(blob, git.Tree):
-                        # Path is a directory, not a file.
-                        blob = None
-                    break
-            except KeyError:
-                # File not found or repo_path points to a directory
-                blob = None
-                break
-        if isinstance(blob, git.Blob):
-            return blob, blob.hexsha, blob.mode
-        return None, None, None
+        return git.Blob(self.repo, bytes.fromhex(blob_hexsha))
 
     def get_tree_from_branch(self, ref):
         """
@@ -1593,6 +1694,31 @@ class GitPython(GitProvider):
         except (gitdb.exc.ODBError, AttributeError):
             return None
 
+    def get_tree_sha(self, tree):
+        """
+        Return the hex SHA of a git.Tree object
+        """
+        return tree.hexsha
+
+    def read_blob(self, blob_hexsha):
+        """
+        Return the contents of the blob matching the hex SHA
+        """
+        stream = io.BytesIO()
+        self.get_blob(blob_hexsha).stream_data(stream)
+        return stream.getvalue()
+
+    def walk_tree(self, tree):
+        """
+        Yield the path, mode, hex SHA and size of each blob in the tree, and
+        the path of each subtree with the other values set to None
+        """
+        for obj in tree.traverse():
+            if isinstance(obj, git.Tree):
+                yield obj.path, None, None, None
+            elif isinstance(obj, git.Blob):
+                yield obj.path, obj.mode, obj.hexsha, obj.size
+
     def write_file(self, blob, dest):
         """
         Using the blob object, write the file to the destination path
@@ -1917,60 +2043,6 @@ class Pygit2(GitProvider):
 
         return new
 
-    def dir_list(self, tgt_env):
-        """
-        Get a list of directories for the target environment using pygit2
-        """
-
-        def _traverse(tree, blobs, prefix):
-            """
-            Traverse through a pygit2 Tree object recursively, accumulating all
-            the empty directories within it in the "blobs" list
-            """
-            for entry in iter(tree):
-                if entry.id not in self.repo:
-                    # Entry is a submodule, skip it
-                    continue
-                blob = self.repo[entry.id]
-                if not isinstance(blob, pygit2.Tree):
-                    continue
-                blobs.append(
-                    salt.utils.path.join(prefix, entry.name, use_posixpath=True)
-                )
-                if blob:
-                    _traverse(
-                        blob,
-                        blobs,
-                        salt.utils.path.join(prefix, entry.name, use_posixpath=True),
-                    )
-
-        ret = set()
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            return ret
-        if self.root(tgt_env):
-            try:
-                pygit2_id = tree[self.root(tgt_env)].id
-                tree = self.repo[pygit2_id]
-            except KeyError:
-                return ret
-            if not isinstance(tree, pygit2.Tree):
-                return ret
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        blobs = []
-        if tree:
-            _traverse(tree, blobs, self.root(tgt_env))
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for blob in blobs:
-            ret.add(add_mountpoint(relpath(blob)))
-        if self.mountpoint(tgt_env):
-            ret.add(self.mountpoint(tgt_env))
-        return ret
-
     def envs(self):
         """
         Check the refs and return a list of the ones which can be used as salt
@@ -2051,107 +2123,11 @@ class Pygit2(GitProvider):
         cleaned = self.clean_stale_refs(local_refs=refs_post)
         return True if (received_objects or refs_pre != refs_post or cleaned) else None
 
-    def file_list(self, tgt_env):
-        """
-        Get file list for the target environment using pygit2
-        """
-
-        def _traverse(tree, blobs, prefix):
-            """
-            Traverse through a pygit2 Tree object recursively, accumulating all
-            the file paths and symlink info in the "blobs" dict
-            """
-            for entry in iter(tree):
-                if entry.id not in self.repo:
-                    # Entry is a submodule, skip it
-                    continue
-                obj = self.repo[entry.id]
-                if isinstance(obj, pygit2.Blob):
-                    repo_path = salt.utils.path.join(
-                        prefix, entry.name, use_posixpath=True
-                    )
-                    blobs.setdefault("files", []).append(repo_path)
-                    if stat.S_ISLNK(tree[entry.name].filemode):
-                        link_tgt = self.repo[tree[entry.name].id].data
-                        blobs.setdefault("symlinks", {})[repo_path] = link_tgt
-                elif isinstance(obj, pygit2.Tree):
-                    _traverse(
-                        obj,
-                        blobs,
-                        salt.utils.path.join(prefix, entry.name, use_posixpath=True),
-                    )
-
-        files = set()
-        symlinks = {}
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Not found, return empty objects
-            return files, symlinks
-        if self.root(tgt_env):
-            try:
-                # This might need to be changed to account for a root that
-                # spans more than one directory
-                pygit2_id = tree[self.root(tgt_env)].id
-                tree = self.repo[pygit2_id]
-            except KeyError:
-                return files, symlinks
-            if not isinstance(tree, pygit2.Tree):
-                return files, symlinks
-            relpath = lambda path: os.path.relpath(path, self.root(tgt_env))
-        else:
-            relpath = lambda path: path
-        blobs = {}
-        if tree:
-            _traverse(tree, blobs, self.root(tgt_env))
-        add_mountpoint = lambda path: salt.utils.path.join(
-            self.mountpoint(tgt_env), path, use_posixpath=True
-        )
-        for repo_path in blobs.get("files", []):
-            files.add(add_mountpoint(relpath(repo_path)))
-        for repo_path, link_tgt in blobs.get("symlinks", {}).items():
-            symlinks[add_mountpoint(relpath(repo_path))] = link_tgt
-        return files, symlinks
-
-    def find_file(self, path, tgt_env):
+    def get_blob(self, blob_hexsha):
         """
-        Find the specified file in the specified environment
+        Return the pygit2.Blob object matching the hex SHA
         """
-        tree = self.get_tree(tgt_env)
-        if not tree:
-            # Branch/tag/SHA not found in repo
-            return None, None, None
-        blob = None
-        mode = None
-        depth = 0
-        while True:
-            depth += 1
-            if depth > SYMLINK_RECURSE_DEPTH:
-                blob = None
-                break
-            try:
-                entry = tree[path]
-                mode = entry.filemode
-                if stat.S_ISLNK(mode):
-                    # Path is a symlink. The blob data corresponding to this
-                    # path's object ID will be the target of the symlink. Follow
-                    # the symlink and set path to the location indicated
-                    # in the blob data.
-                    link_tgt = self.repo[entry.id].data
-                    path = salt.utils.path.join(
-                        os.path.dirname(path), link_tgt, use_posixpath=True
-                    )
-                else:
-                    blob = self.repo[entry.id]
-                    if isinstance(blob, pygit2.Tree):
-                        # Path is a directory, not a file.
-                        blob = None
-                    break
-            except KeyError:
-                blob = None
-                break
-        if isinstance(blob, pygit2.Blob):
-            return blob, str(blob.id), mode
-        return None, None, None
+        return self.repo[blob_hexsha]
 
     def get_tree_from_branch(self, ref):
         """
@@ -2185,6 +2161,35 @@ class Pygit2(GitProvider):
         except (KeyError, TypeError, ValueError, AttributeError):
             return None
 
+    def get_tree_sha(self, tree):
+        """
+        Return the hex SHA of a pygit2.Tree object
+        """
+        return str(tree.id)
+
+    def read_blob(self, blob_hexsha):
+        """
+        Return the contents of the blob matching the hex SHA
+        """
+        return self.repo[blob_hexsha].data
+
+    def walk_tree(self, tree, prefix=""):
+        """
+        Yield the path, mode, hex SHA and size of each blob in the tree, and
+        the path of each subtree with the other values set to None
+        """
+        for entry in iter(tree):
+            if entry.id not in self.repo:
+                # Entry is a submodule, skip it
+                continue
+            obj = self.repo[entry.id]
+            path = salt.utils.path.join(prefix, entry.name, use_posixpath=True)
+            if isinstance(obj, pygit2.Blob):
+                yield path, entry.filemode, str(obj.id), obj.size
+            elif isinstance(obj, pygit2.Tree):
+                yield path, None, None, None
+                yield from self.walk_tree(obj, path)
+
     def setup_callbacks(self):
         """
         Assign attributes for pygit2 callbacks
@@ -2423,6 +2428,7 @@ class GitBase:
             self.remote_root = salt.utils.path.join(self.cache_root, "remotes")
         self.env_cache = salt.utils.path.join(self.cache_root, "envs.p")
         self.hash_cachedir = salt.utils.path.join(self.cache_root, "hash")
+        self.tree_index_dir = salt.utils.path.join(self.cache_root, "tree_index")
         self.file_list_cachedir = salt.utils.path.join(
             self.opts["cachedir"], "file_lists", self.role
         )
@@ -2580,7 +2586,7 @@ class GitBase:
 
     def _iter_remote_hashes(self):
         for item in os.listdir(self.cache_root):
-            if item in ("hash", "refs", "links", "work"):
+            if item in ("hash", "refs", "links", "work", "tree_index"):
                 continue
             if os.path.isdir(salt.utils.path.join(self.cache_root, item)):
                 yield item
@@ -2653,49 +2659,180 @@ class GitBase:
             )
             remotes = []
 
-        changed = False
+        repos = []
         for repo in self.remotes:
             name = getattr(repo, "name", None)
             if not remotes or (repo.id, name) in remotes or name in remotes:
-                try:
-                    # Find and place fetch_request file for all the other branches for this repo
-                    repo_work_hash = os.path.split(repo.get_salt_working_dir())[0]
-                    for branch in os.listdir(repo_work_hash):
-                        # Don't place fetch request in current branch being updated
-                        if branch == repo.get_cache_basename():
-                            continue
-                        branch_salt_dir = salt.utils.path.join(repo_work_hash, branch)
-                        fetch_path = salt.utils.path.join(
-                            branch_salt_dir, "fetch_request"
+                repos.append(repo)
+        if not repos:
+            return False
+
+        workers = self.opts.get("{}_fetch_workers".format(self.role), 1) or 1
+        timeout = self.opts.get("{}_fetch_timeout".format(self.role), 0) or 0
+        if workers <= 1 and not timeout:
+            results = {repo: self._fetch_repo(repo) for repo in repos}
+        else:
+            results = self._fetch_repos_parallel(repos, workers, timeout)
+
+        errors = []
+        changed = False
+        for repo, result in results.items():
+            if result["error"] is not None:
+                errors.append("{} ({})".format(repo.id, result["error"]))
+            elif result["changed"]:
+                # We can't just use the return value from repo.fetch()
+                # because the data could still have changed if old
+                # remotes were cleared above. Additionally, we're
+                # running this in a loop and later remotes without
+                # changes would override this value and make it
+                # incorrect.
+                changed = True
+        if errors:
+            log.error(
+                "Failed to fetch %d of %d %s remotes: %s",
+                len(errors),
+                len(results),
+                self.role,
+                "; ".join(errors),
+            )
+        self._write_fetch_stats(results)
+        return changed
+
+    def _fetch_repo(self, repo):
+        """
+        Fetch a single remote and return the outcome and duration of the fetch
+        """
+        start = time.time()
+        result = {"changed": False, "error": None}
+        try:
+            # Find and place fetch_request file for all the other branches for this repo
+            repo_work_hash = os.path.split(repo.get_salt_working_dir())[0]
+            for branch in os.listdir(repo_work_hash):
+                # Don't place fetch request in current branch being updated
+                if branch == repo.get_cache_basename():
+                    continue
+                branch_salt_dir = salt.utils.path.join(repo_work_hash, branch)
+                fetch_path = salt.utils.path.join(branch_salt_dir, "fetch_request")
+                if os.path.isdir(branch_salt_dir):
+                    try:
+                        with salt.utils.files.fopen(fetch_path, "w"):
+                            pass
+                    except OSError as exc:  # pylint: disable=broad-except
+                        log.error(
+                            f"Failed to make fetch request: {fetch_path} {exc}",
+                            exc_info=True,
                         )
-                        if os.path.isdir(branch_salt_dir):
-                            try:
-                                with salt.utils.files.fopen(fetch_path, "w"):
-                                    pass
-                            except OSError as exc:  # pylint: disable=broad-except
-                                log.error(
-                                    f"Failed to make fetch request: {fetch_path} {exc}",
-                                    exc_info=True,
-                                )
-                        else:
-                            log.error(f"Failed to make fetch request: {fetch_path}")
-                    if repo.fetch():
-                        # We can't just use the return value from repo.fetch()
-                        # because the data could still have changed if old
-                        # remotes were cleared above. Additionally, we're
-                        # running this in a loop and later remotes without
-                        # changes would override this value and make it
-                        # incorrect.
-                        changed = True
-                except Exception as exc:  # pylint: disable=broad-except
-                    log.error(
-                        "Exception caught while fetching %s remote '%s': %s",
-                        self.role,
-                        repo.id,
-                        exc,
-                        exc_info=True,
+                else:
+                    log.error(f"Failed to make fetch request: {fetch_path}")
+            result["changed"] = bool(repo.fetch())
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error(
+                "Exception caught while fetching %s remote '%s': %s",
+                self.role,
+                repo.id,
+                exc,
+                exc_info=True,
+            )
+            result["error"] = str(exc)
+        result["duration"] = time.time() - start
+        return result
+
+    def _fetch_repos_parallel(self, repos, workers, timeout):
+        """
+        Fetch the remotes using up to ``workers`` threads. A remote which takes
+        longer than ``timeout`` seconds is reported as failed and its thread is
+        abandoned, so that it does not hold up the others. The remote's update
+        lock stays in place until that thread is done, so it will not be
+        fetched again in the meantime.
+        """
+        queue = collections.deque(repos)
+        running = {}
+        results = {}
+        cond = threading.Condition()
+
+        def _run(repo):
+            result = self._fetch_repo(repo)
+            with cond:
+                if repo in running:
+                    del running[repo]
+                    results[repo] = result
+                cond.notify()
+
+        with cond:
+            while queue or running:
+                while queue and len(running) < workers:
+                    repo = queue.popleft()
+                    running[repo] = time.time()
+                    thread = threading.Thread(
+                        target=_run,
+                        args=(repo,),
+                        name="{}-fetch-{}".format(self.role, len(results)),
                     )
-        return changed
+                    thread.daemon = True
+                    thread.start()
+                if not running:
+                    continue
+                wait = None
+                if timeout:
+                    wait = max(min(running.values()) + timeout - time.time(), 0)
+                cond.wait(wait)
+                if not timeout:
+                    continue
+                now = time.time()
+                for repo, started in list(running.items()):
+                    if now - started >= timeout:
+                        del running[repo]
+                        results[repo] = {
+                            "changed": False,
+                            "error": "timed out after {} seconds".format(timeout),
+                            "duration": now - started,
+                        }
+        # Keep the order in which the remotes are configured
+        return {repo: results[repo] for repo in repos}
+
+    @property
+    def fetch_stats_path(self):
+        return salt.utils.path.join(self.cache_root, "fetch_stats.p")
+
+    def _write_fetch_stats(self, results):
+        """
+        Record the outcome of the latest fetch of each remote, so that it can
+        be reported by other processes
+        """
+        stats = self.fetch_stats()
+        now = time.time()
+        for repo, result in results.items():
+            stats[repo.id] = {
+                "name": getattr(repo, "name", None),
+                "changed": result["changed"],
+                "duration": round(result["duration"], 3),
+                "error": result["error"],
+                "time": now,
+            }
+        try:
+            with salt.utils.atomicfile.atomic_open(self.fetch_stats_path, "wb") as fp_:
+                salt.payload.dump(stats, fp_)
+        except OSError as exc:
+            log.debug(
+                "Unable to write %s fetch stats to %s: %s",
+                self.role,
+                self.fetch_stats_path,
+                exc,
+            )
+
+    def fetch_stats(self):
+        """
+        Return the outcome and duration of the latest fetch of each remote
+        """
+        try:
+            with salt.utils.files.fopen(self.fetch_stats_path, "rb") as fp_:
+                stats = salt.payload.load(fp_)
+        except (OSError, ValueError, TypeError):
+            return {}
+        if not isinstance(stats, dict):
+            return {}
+        configured = {repo.id for repo in self.remotes}
+        return {key: val for key, val in stats.items() if key in configured}
 
     def lock(self, remote=None):
         """
@@ -2752,6 +2889,9 @@ class GitBase:
                 fp_.write(salt.payload.dumps(new_envs))
                 log.trace("Wrote env cache data to %s", self.env_cache)
 
+        if data["changed"] is True:
+            self.prune_tree_index()
+
         # if there is a change, fire an event
         if self.opts.get("fileserver_events", False):
             with salt.utils.event.get_event(
@@ -2769,6 +2909,60 @@ class GitBase:
             # Hash file won't exist if no files have yet been served up
             pass
 
+    def prune_tree_index(self):
+        """
+        Remove the tree indexes, and the hashes of the blobs they reference,
+        which no longer belong to the tip of any environment. Indexes for
+        trees which are requested again by SHA are simply rebuilt.
+        """
+        if not os.path.isdir(self.tree_index_dir):
+            return []
+        live_trees = set()
+        live_blobs = set()
+        for repo in self.remotes:
+            repo_envs = repo.envs()
+            for env_list in repo.saltenv_revmap.values():
+                repo_envs.update(env_list)
+            for tgt_env in repo_envs:
+                try:
+                    index = repo.tree_index(tgt_env)
+                    tree = repo.get_tree(tgt_env)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.debug(
+                        "Unable to index saltenv '%s' of %s remote '%s': %s",
+                        tgt_env,
+                        self.role,
+                        repo.id,
+                        exc,
+                    )
+                    # Err on the side of keeping everything
+                    return []
+                if index is None:
+                    continue
+                live_trees.add(repo.get_tree_sha(tree))
+                live_blobs.update(x[0] for x in index["files"].values())
+        removed = []
+        for root, _, files in salt.utils.path.os_walk(self.tree_index_dir):
+            in_digests = os.path.relpath(root, self.tree_index_dir).startswith(
+                "digests"
+            )
+            for name in files:
+                if in_digests:
+                    if name in live_blobs:
+                        continue
+                elif name.endswith(".p") and name[:-2] in live_trees:
+                    continue
+                path = salt.utils.path.join(root, name)
+                try:
+                    os.remove(path)
+                    removed.append(path)
+                except OSError as exc:
+                    if exc.errno != errno.ENOENT:
+                        log.debug("Unable to remove %s: %s", path, exc)
+        if removed:
+            log.debug("%s removed %d stale tree index files", self.role, len(removed))
+        return removed
+
     def update_intervals(self):
         """
         Returns a dictionary mapping remote IDs to their intervals, designed to
@@ -3121,8 +3315,8 @@ class GitFS(GitBase):
             if repo.root(tgt_env):
                 repo_path = salt.utils.path.join(repo.root(tgt_env), repo_path)
 
-            blob, blob_hexsha, blob_mode = repo.find_file(repo_path, tgt_env)
-            if blob is None:
+            blob_hexsha, blob_mode = repo.find_blob(repo_path, tgt_env)
+            if blob_hexsha is None:
                 continue
 
             def _add_file_stat(fnd, mode):
@@ -3160,7 +3354,7 @@ class GitFS(GitBase):
                 except Exception:  # pylint: disable=broad-except
                     pass
             # Write contents of file to their destination in the FS cache
-            repo.write_file(blob, dest)
+            repo.write_blob(blob_hexsha, dest)
             with salt.utils.files.fopen(blobshadest, "w+") as fp_:
                 fp_.write(blob_hexsha)
             try:
@@ -3207,6 +3401,46 @@ class GitFS(GitBase):
             ret["data"] = data
         return ret
 
+    def serve_file_delta(self, load, fnd):
+        """
+        Return the delta between the file and the block signatures of the
+        minion's copy
+        """
+        if "env" in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop("env")
+
+        ret = {}
+        required_load_keys = {"path", "saltenv", "block_size", "signatures"}
+        if not all(x in load for x in required_load_keys):
+            return ret
+        if not fnd["path"]:
+            return ret
+        fpath = os.path.normpath(fnd["path"])
+        try:
+            ops = salt.utils.filedelta.delta(
+                fpath,
+                load["signatures"],
+                load["block_size"],
+                basis_size=load.get("size"),
+                max_size=self.opts.get("file_delta_max_size"),
+            )
+        except (OSError, ValueError) as exc:
+            log.debug("Unable to compute delta for %s: %s", fpath, exc)
+            return ret
+        if ops is None:
+            return ret
+        literal = salt.utils.filedelta.literal_size(ops)
+        log.debug(
+            "Serving %s as a delta, %d bytes of literal data, %d bytes saved",
+            fpath,
+            literal,
+            max(os.path.getsize(fpath) - literal, 0),
+        )
+        ret["ops"] = ops
+        ret.update(self.file_hash(load, fnd))
+        return ret
+
     def file_hash(self, load, fnd):
         """
         Return a file hash, the hash type is set in the master config file
@@ -3239,7 +3473,35 @@ class GitFS(GitBase):
             if exc.errno != errno.EEXIST:
                 raise
 
-        ret["hsum"] = salt.utils.hashutils.get_hash(path, self.opts["hash_type"])
+        # The same blob is usually reachable from many saltenvs, so its hash is
+        # also kept under its SHA and only computed once
+        blobshadest = salt.utils.path.join(
+            self.hash_cachedir, load["saltenv"], "{}.hash.blob_sha1".format(relpath)
+        )
+        digestdest = None
+        try:
+            with salt.utils.files.fopen(blobshadest, "r") as fp_:
+                blob_hexsha = salt.utils.stringutils.to_unicode(fp_.read()).strip()
+            if salt.utils.stringutils.is_hex(blob_hexsha):
+                digestdest = salt.utils.path.join(
+                    self.tree_index_dir, "digests", self.opts["hash_type"], blob_hexsha
+                )
+                with salt.utils.files.fopen(digestdest, "r") as fp_:
+                    ret["hsum"] = salt.utils.stringutils.to_unicode(fp_.read())
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+
+        if not ret.get("hsum"):
+            ret["hsum"] = salt.utils.hashutils.get_hash(path, self.opts["hash_type"])
+            if digestdest is not None:
+                try:
+                    os.makedirs(os.path.dirname(digestdest))
+                except OSError as exc:
+                    if exc.errno != errno.EEXIST:
+                        raise
+                with salt.utils.atomicfile.atomic_open(digestdest, "w") as fp_:
+                    fp_.write(ret["hsum"])
         with salt.utils.files.fopen(hashdest, "w+") as fp_:
             fp_.write(ret["hsum"])
         return ret
@@ -198,10 +198,14 @@ class MasterPillarUtil:
             return mine_data
         if not minion_ids:
             minion_ids = self.cache.list("minions")
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch("minions/{}".format(minion_id), "mine")
+        minion_ids = [
+            minion_id
+            for minion_id in minion_ids
+            if salt.utils.verify.valid_id(self.opts, minion_id)
+        ]
+        for minion_id, mdata in salt.utils.minions.iter_minion_data(
+            self.cache, minion_ids, key="mine"
+        ):
             if isinstance(mdata, dict):
                 mine_data[minion_id] = mdata
         return mine_data
@@ -216,10 +220,14 @@ class MasterPillarUtil:
             return grains, pillars
         if not minion_ids:
             minion_ids = self.cache.list("minions")
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch("minions/{}".format(minion_id), "data")
+        minion_ids = [
+            minion_id
+            for minion_id in minion_ids
+            if salt.utils.verify.valid_id(self.opts, minion_id)
+        ]
+        for minion_id, mdata in salt.utils.minions.iter_minion_data(
+            self.cache, minion_ids
+        ):
             if not isinstance(mdata, dict):
                 log.warning(
                     "cache.fetch should always return a dict. ReturnedType: %s,"
@@ -32,6 +32,9 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# Number of minions whose cached data is fetched at once
+MINION_DATA_BATCH = 500
+
 TARGET_REX = re.compile(
     r"""(?x)
         (
@@ -119,6 +122,33 @@ def get_minion_data(minion, opts):
     return minion if minion else None, grains, pillar
 
 
+def iter_minion_data(cache, minion_ids, key="data", skip_errors=False):
+    """
+    Yield ``(minion_id, data)`` for the given minions, fetching their cached
+    ``key`` in batches. With ``skip_errors``, minions whose data cannot be read
+    are yielded with ``None``.
+    """
+    minion_ids = list(minion_ids)
+    for idx in range(0, len(minion_ids), MINION_DATA_BATCH):
+        batch = [
+            ("minions/{}".format(id_), key)
+            for id_ in minion_ids[idx : idx + MINION_DATA_BATCH]
+        ]
+        try:
+            data = cache.fetch_many(batch)
+        except SaltCacheError:
+            if not skip_errors:
+                raise
+            data = {}
+            for bank, key_ in batch:
+                try:
+                    data[(bank, key_)] = cache.fetch(bank, key_)
+                except SaltCacheError:
+                    pass
+        for id_, pair in zip(minion_ids[idx : idx + MINION_DATA_BATCH], batch):
+            yield id_, data.get(pair)
+
+
 def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
     """
     Recursively expand ``nodegroup`` from ``nodegroups``; ignore nodegroups in ``skip``
@@ -321,10 +351,9 @@ class CkMinions:
             if not cminions:
                 return {"minions": minions, "missing": []}
             minions = set(minions)
-            for id_ in cminions:
-                if greedy and id_ not in minions:
-                    continue
-                mdata = self.cache.fetch("minions/{}".format(id_), "data")
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            for id_, mdata in iter_minion_data(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -412,8 +441,7 @@ class CkMinions:
             proto = "ipv{}".format(tgt.version)
 
             minions = set(minions)
-            for id_ in cminions:
-                mdata = self.cache.fetch("minions/{}".format(id_), "data")
+            for id_, mdata in iter_minion_data(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -648,15 +676,11 @@ class CkMinions:
                 addrs.update(set(salt.utils.network.ip_addrs6(include_loopback=False)))
             if subset:
                 search = subset
-            for id_ in search:
-                try:
-                    mdata = self.cache.fetch("minions/{}".format(id_), "data")
-                except SaltCacheError:
-                    # If a SaltCacheError is explicitly raised during the fetch operation,
-                    # permission was denied to open the cached data.p file. Continue on as
-                    # in the releases <= 2016.3. (An explicit error raise was added in PR
-                    # #35388. See issue #36867 for more information.
-                    continue
+            # If a SaltCacheError is explicitly raised during the fetch operation,
+            # permission was denied to open the cached data.p file. Continue on as
+            # in the releases <= 2016.3. (An explicit error raise was added in PR
+            # #35388. See issue #36867 for more information.
+            for id_, mdata in iter_minion_data(self.cache, search, skip_errors=True):
                 if mdata is None:
                     continue
                 grains = mdata.get("grains", {})
@@ -0,0 +1,420 @@
+"""
+Store many small records in append-only segment files, used by the
+``localfs_packed`` cache driver
+
+Banks sharing their first two path components, e.g. ``minions/alpha`` and
+``minions/alpha/sub``, are kept in the same shard, and each top level bank is
+spread over :py:data:`SHARDS` shards:
+``<root>/<top level bank>/<shard>/<generation>.seg``. Every change is a record
+appended to the segment of the shard, and the position of the latest record
+of each key is kept in an in-memory index, rebuilt by scanning the records
+appended since the last operation. Reads are served from a memory map of the
+segment.
+
+Writers hold an exclusive lock on the ``lock`` file of the shard. A record
+which was only partially written when a writer died is ignored, and cut off
+by the next writer. Once most of a segment is made of overwritten or deleted
+records, it is compacted into a segment of the next generation, which
+replaces it atomically.
+
+.. versionadded:: 3007.0
+"""
+import errno
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+import salt.utils.files
+import salt.utils.stringutils
+
+log = logging.getLogger(__name__)
+
+SHARDS = 16
+# Compact a segment once it is larger than this and more than half of it is
+# made of stale records
+COMPACT_MIN_SIZE = 4 * 1024 * 1024
+MAX_NAME_SIZE = 4096
+
+OP_PUT = 1
+OP_DEL = 2
+OP_DEL_BANK = 3
+
+# magic, op, mtime, bank length, key length, data length, crc32
+HEADER = struct.Struct("<4sBdIIII")
+MAGIC = b"SPK1"
+SEGMENT_RE = re.compile(r"^(\d+)\.seg$")
+
+# {<root>: PackStore}
+_STORES = {}
+
+
+def get_store(root):
+    """
+    Return the :py:class:`PackStore` of ``root`` shared by the whole process
+    """
+    if root not in _STORES:
+        _STORES[root] = PackStore(root)
+    return _STORES[root]
+
+
+def _record(op, bank, key, data=b"", mtime=None):
+    bank = salt.utils.stringutils.to_bytes(bank)
+    key = salt.utils.stringutils.to_bytes(key)
+    body = bank + key + data
+    header = HEADER.pack(
+        MAGIC,
+        op,
+        time.time() if mtime is None else mtime,
+        len(bank),
+        len(key),
+        len(data),
+        zlib.crc32(body),
+    )
+    return header + body
+
+
+class _Shard:
+    """
+    The segment and index of a single shard
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = os.path.join(path, "lock")
+        self.gen = None
+        self.segment = None
+        # Offset up to which the records have been indexed
+        self.end = 0
+        # Size of the records which are still current
+        self.live = 0
+        # {<bank>: {<key>: (data offset, data length, mtime, record length)}}
+        self.index = {}
+        self._map = None
+        self._lock = threading.RLock()
+
+    def _reset(self, gen):
+        self.gen = gen
+        self.segment = (
+            None if gen is None else os.path.join(self.path, "{}.seg".format(gen))
+        )
+        self.end = 0
+        self.live = 0
+        self.index = {}
+        self._map = None
+
+    def _generations(self):
+        try:
+            names = os.listdir(self.path)
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+            return []
+        return sorted(
+            int(match.group(1))
+            for match in (SEGMENT_RE.match(name) for name in names)
+            if match
+        )
+
+    def _mapping(self, size):
+        if self._map is None or len(self._map) < size:
+            with salt.utils.files.fopen(self.segment, "rb") as fh_:
+                self._map = mmap.mmap(fh_.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def refresh(self):
+        """
+        Index the records appended since the last call, and return the size of
+        the segment
+        """
+        with self._lock:
+            for _ in range(5):
+                if self.segment is not None:
+                    try:
+                        size = os.stat(self.segment).st_size
+                        if size > self.end:
+                            self._scan(size)
+                        return size
+                    except FileNotFoundError:
+                        # Replaced by a compaction
+                        pass
+                gens = self._generations()
+                if not gens:
+                    self._reset(None)
+                    return 0
+                self._reset(gens[-1])
+            raise OSError(
+                errno.EAGAIN, "The segment of {} keeps changing".format(self.path)
+            )
+
+    def _scan(self, size):
+        data = self._mapping(size)
+        offset = self.end
+        while offset + HEADER.size <= size:
+            magic, op, mtime, bank_len, key_len, data_len, crc = HEADER.unpack_from(
+                data, offset
+            )
+            start = offset + HEADER.size
+            stop = start + bank_len + key_len + data_len
+            if (
+                magic != MAGIC
+                or bank_len > MAX_NAME_SIZE
+                or key_len > MAX_NAME_SIZE
+                or stop > size
+                or zlib.crc32(data[start:stop]) != crc
+            ):
+                # Torn write, the next writer will cut it off
+                break
+            bank = salt.utils.stringutils.to_str(data[start : start + bank_len])
+            key = salt.utils.stringutils.to_str(
+                data[start + bank_len : start + bank_len + key_len]
+            )
+            self._apply(
+                op,
+                bank,
+                key,
+                start + bank_len + key_len,
+                data_len,
+                mtime,
+                stop - offset,
+            )
+            offset = stop
+        self.end = offset
+
+    def _apply(self, op, bank, key, offset, length, mtime, rec_len):
+        if op == OP_PUT:
+            keys = self.index.setdefault(bank, {})
+            old = keys.get(key)
+            if old is not None:
+                self.live -= old[3]
+            keys[key] = (offset, length, mtime, rec_len)
+            self.live += rec_len
+        elif op == OP_DEL:
+            keys = self.index.get(bank)
+            if keys and key in keys:
+                self.live -= keys.pop(key)[3]
+                if not keys:
+                    del self.index[bank]
+        elif op == OP_DEL_BANK:
+            prefix = bank + "/"
+            for name in [
+                name for name in self.index if name == bank or name.startswith(prefix)
+            ]:
+                for entry in self.index.pop(name).values():
+                    self.live -= entry[3]
+
+    def read(self, bank, key):
+        """
+        Return the raw data of ``key`` in ``bank`` and its mtime, or ``None``
+        """
+        with self._lock:
+            self.refresh()
+            entry = self.index.get(bank, {}).get(key)
+            if entry is None:
+                return None
+            offset, length, mtime, _ = entry
+            return self._mapping(offset + length)[offset : offset + length], mtime
+
+    def append(self, records):
+        """
+        Append ``[(op, bank, key, data), ...]`` to the segment
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, salt.utils.files.flopen(self.lock_path, "a"):
+            gens = self._generations()
+            if gens and gens[-1] != self.gen:
+                self._reset(gens[-1])
+            size = self.refresh()
+            if self.segment is None:
+                self._reset(1)
+            with salt.utils.files.fopen(self.segment, "ab") as fh_:
+                if size > self.end:
+                    log.warning(
+                        "Discarding %d bytes of incomplete records in %s",
+                        size - self.end,
+                        self.segment,
+                    )
+                    fh_.truncate(self.end)
+                fh_.write(
+                    b"".join(
+                        _record(op, bank, key, data) for op, bank, key, data in records
+                    )
+                )
+            self.refresh()
+            self._remove_stale()
+            if self.end > COMPACT_MIN_SIZE and self.live * 2 < self.end:
+                self.compact()
+
+    def _remove_stale(self):
+        # Left behind by a compaction which did not complete
+        for gen in self._generations():
+            if gen < self.gen:
+                try:
+                    os.remove(os.path.join(self.path, "{}.seg".format(gen)))
+                except OSError:
+                    pass
+
+    def compact(self):
+        """
+        Rewrite the current records into a segment of the next generation.
+        Must be called with the shard lock held.
+        """
+        data = self._mapping(self.end)
+        new = os.path.join(self.path, "{}.seg".format(self.gen + 1))
+        tmp = "{}.tmp".format(new)
+        with salt.utils.files.fopen(tmp, "wb") as fh_:
+            for bank in sorted(self.index):
+                for key, (offset, length, mtime, _) in sorted(self.index[bank].items()):
+                    fh_.write(
+                        _record(
+                            OP_PUT, bank, key, data[offset : offset + length], mtime
+                        )
+                    )
+            fh_.flush()
+            os.fsync(fh_.fileno())
+        os.replace(tmp, new)
+        old = self.segment
+        self._reset(self.gen + 1)
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+        self.refresh()
+
+    def has(self, bank, key):
+        with self._lock:
+            self.refresh()
+            return key in self.index.get(bank, ())
+
+    def keys(self, bank):
+        with self._lock:
+            self.refresh()
+            return list(self.index.get(bank, ()))
+
+    def bank_names(self):
+        with self._lock:
+            self.refresh()
+            return list(self.index)
+
+
+class PackStore:
+    """
+    Access the shards under ``root``
+    """
+
+    def __init__(self, root, shards=SHARDS):
+        self.root = root
+        self.shards = shards
+        self._shards = {}
+
+    @staticmethod
+    def _parts(bank):
+        return [part for part in os.path.normpath(bank).split(os.sep) if part]
+
+    def _shard_path(self, parts):
+        shard = zlib.crc32(salt.utils.stringutils.to_bytes("/".join(parts[:2])))
+        return os.path.join(self.root, parts[0], "{:02x}".format(shard % self.shards))
+
+    def _get_shard(self, path):
+        if path not in self._shards:
+            self._shards[path] = _Shard(path)
+        return self._shards[path]
+
+    def shard(self, bank):
+        """
+        Return the normalized name of ``bank`` and the shard holding it
+        """
+        parts = self._parts(bank)
+        if not parts:
+            raise ValueError("Invalid bank name: {!r}".format(bank))
+        return "/".join(parts), self._get_shard(self._shard_path(parts))
+
+    def shards_of(self, bank):
+        """
+        Return the normalized name of ``bank`` and the shards holding it and
+        its sub-banks
+        """
+        parts = self._parts(bank)
+        if not parts:
+            raise ValueError("Invalid bank name: {!r}".format(bank))
+        if len(parts) > 1:
+            return "/".join(parts), [self._get_shard(self._shard_path(parts))]
+        top = os.path.join(self.root, parts[0])
+        try:
+            names = sorted(os.listdir(top))
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+            names = []
+        return parts[0], [self._get_shard(os.path.join(top, name)) for name in names]
+
+    def fetch(self, bank, key):
+        bank, shard = self.shard(bank)
+        return shard.read(bank, key)
+
+    def store_many(self, items):
+        """
+        Store ``{(bank, key): raw data}``
+        """
+        by_shard = {}
+        for (bank, key), data in items.items():
+            bank, shard = self.shard(bank)
+            by_shard.setdefault(shard, []).append((OP_PUT, bank, key, data))
+        for shard, records in by_shard.items():
+            shard.append(records)
+
+    def delete_many(self, keys):
+        """
+        Delete ``[(bank, key), ...]``, a ``None`` key deletes the bank and its
+        sub-banks. Returns whether anything was deleted.
+        """
+        by_shard = {}
+        for bank, key in keys:
+            if key is None:
+                bank, shards = self.shards_of(bank)
+                for shard in shards:
+                    if any(self._in_bank(name, bank) for name in shard.bank_names()):
+                        by_shard.setdefault(shard, []).append(
+                            (OP_DEL_BANK, bank, "", b"")
+                        )
+            else:
+                bank, shard = self.shard(bank)
+                if shard.has(bank, key):
+                    by_shard.setdefault(shard, []).append((OP_DEL, bank, key, b""))
+        for shard, records in by_shard.items():
+            shard.append(records)
+        return bool(by_shard)
+
+    @staticmethod
+    def _in_bank(name, bank):
+        return name == bank or name.startswith(bank + "/")
+
+    def list(self, bank):
+        """
+        Return the keys and the sub-banks of ``bank``
+        """
+        bank, shards = self.shards_of(bank)
+        prefix = bank + "/"
+        ret = set()
+        for shard in shards:
+            for name in shard.bank_names():
+                if name == bank:
+                    ret.update(shard.keys(bank))
+                elif name.startswith(prefix):
+                    ret.add(name[len(prefix) :].split("/", 1)[0])
+        return sorted(ret)
+
+    def contains(self, bank, key=None):
+        if key is None:
+            bank, shards = self.shards_of(bank)
+            return any(
+                self._in_bank(name, bank)
+                for shard in shards
+                for name in shard.bank_names()
+            )
+        bank, shard = self.shard(bank)
+        return shard.has(bank, key)
@@ -3283,6 +3283,27 @@ class SaltSSHOptionParser(
                 "faster communication should be. Default: %default."
             ),
         )
+        self.add_option(
+            "--engine",
+            dest="ssh_engine",
+            default="process",
+            choices=("process", "asyncio"),
+            help=(
+                "Run the targets with one process each (process) or from a "
+                "single asyncio event loop (asyncio). Default: %default."
+            ),
+        )
+        self.add_option(
+            "--max-conns",
+            dest="ssh_async_max_conns",
+            default=100,
+            type=int,
+            help=(
+                "Set the number of targets the asyncio engine runs at once, "
+                "and of the ssh and scp commands it runs at once. "
+                "Default: %default."
+            ),
+        )
         self.add_option(
             "--extra-filerefs",
             dest="extra_filerefs",
@@ -3392,6 +3413,16 @@ class SaltSSHOptionParser(
                 "Disable KeepAlive probes (ServerAliveInterval) for the SSH connection."
             ),
         )
+        ssh_group.add_option(
+            "--multiplex",
+            default=False,
+            action="store_true",
+            dest="ssh_multiplex",
+            help=(
+                "Share a single SSH connection per host between all the commands "
+                "run against it, using OpenSSH ControlMaster sockets."
+            ),
+        )
         ssh_group.add_option(
             "--keepalive-interval",
             dest="ssh_keepalive_interval",
@@ -3,17 +3,38 @@ Common functions for managing package refreshes during states
 """
 
 import errno
+import hashlib
 import logging
 import os
 import re
 import sys
 
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
+import salt.utils.stringutils
 import salt.utils.versions
 
 log = logging.getLogger(__name__)
 
+# Files and directories whose changes invalidate a package snapshot, relative
+# to the root of the system. Only the rpm database files themselves are
+# watched, read-only queries rewrite the Berkeley DB region files (__db.*) and
+# the sqlite shared memory file (rpmdb.sqlite-shm).
+RPMDB_PATHS = tuple(
+    os.path.join(path, name)
+    for path in ("var/lib/rpm", "usr/lib/sysimage/rpm")
+    for name in (
+        "Packages",
+        "Packages.db",
+        "Index.db",
+        "rpmdb.sqlite",
+        "rpmdb.sqlite-wal",
+    )
+)
+DPKG_PATHS = ("var/lib/dpkg/status",)
+
 
 def rtag(opts):
     """
@@ -65,6 +86,93 @@ def check_refresh(opts, refresh=None):
     )
 
 
+def snapshot_stamp(paths, root=None):
+    """
+    Return the modification time, size and inode of the package database
+    files in ``paths``, relative to ``root``. The files of a directory are
+    all included.
+
+    .. versionadded:: 3007.0
+    """
+    stamp = []
+    for path in paths:
+        path = os.path.join(root or os.sep, path)
+        try:
+            if os.path.isdir(path):
+                entries = sorted(
+                    (entry.path, entry.stat())
+                    for entry in os.scandir(path)
+                    if entry.is_file()
+                )
+            else:
+                entries = [(path, os.stat(path))]
+        except OSError:
+            continue
+        for name, stat in entries:
+            stamp.append((name, stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return stamp
+
+
+def _snapshot_path(opts, name, root):
+    root_id = hashlib.sha1(
+        salt.utils.stringutils.to_bytes(os.path.abspath(root or os.sep))
+    ).hexdigest()[:12]
+    return os.path.join(
+        opts["cachedir"], "pkg_snapshot", "{}-{}.p".format(name, root_id)
+    )
+
+
+def _use_snapshot(opts, stamp):
+    return bool(stamp and opts.get("cachedir") and opts.get("pkg_snapshot_cache", True))
+
+
+def load_snapshot(opts, name, stamp, root=None):
+    """
+    Return the package list saved with :py:func:`save_snapshot`, or ``None``
+    if there is none or if the package database changed since. ``stamp`` is
+    the current :py:func:`snapshot_stamp` of the database.
+
+    .. versionadded:: 3007.0
+    """
+    if not _use_snapshot(opts, stamp):
+        return None
+    path = _snapshot_path(opts, name, root)
+    try:
+        with salt.utils.files.fopen(path, "rb") as fh_:
+            snapshot = salt.payload.load(fh_)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("Ignoring unreadable package snapshot %s: %s", path, exc)
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("stamp") != [
+        list(item) for item in stamp
+    ]:
+        return None
+    log.trace("Using the package snapshot in %s", path)
+    return snapshot.get("data")
+
+
+def save_snapshot(opts, name, stamp, data, root=None):
+    """
+    Save a package list, ``stamp`` is the :py:func:`snapshot_stamp` of the
+    package database taken before listing the packages.
+
+    .. versionadded:: 3007.0
+    """
+    if not _use_snapshot(opts, stamp):
+        return
+    path = _snapshot_path(opts, name, root)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with salt.utils.atomicfile.atomic_open(path, "wb") as fh_:
+            salt.payload.dump(
+                {"stamp": [list(item) for item in stamp], "data": data}, fh_
+            )
+    except OSError as exc:
+        log.warning("Unable to write the package snapshot %s: %s", path, exc)
+
+
 def split_comparison(version):
     match = re.match(r"^(<=>|!=|>=|<=|>>|<<|<>|>|<|=)?\s?([^<>=]+)$", version)
     if match:
@@ -1,10 +1,15 @@
 """
 Functions which implement running reactor jobs
 """
+import collections
+import copy
 import fnmatch
 import glob
 import logging
 import os
+import re
+import threading
+import time
 
 import salt.client
 import salt.defaults.exitcodes
@@ -15,6 +20,7 @@ import salt.utils.cache
 import salt.utils.data
 import salt.utils.event
 import salt.utils.files
+import salt.utils.json
 import salt.utils.master
 import salt.utils.process
 import salt.utils.yaml
@@ -26,6 +32,72 @@ REACTOR_INTERNAL_KEYWORDS = frozenset(
     ["__id__", "__sls__", "name", "order", "fun", "key", "state"]
 )
 
+# Keywords controlling how a reaction is dispatched, they are not passed to the
+# function being called
+REACTOR_DISPATCH_KEYWORDS = frozenset(["coalesce", "rate_limit", "max_concurrency"])
+
+# Renderers which leave a file without any template markup untouched
+STATIC_RENDERERS = frozenset(["jinja", "yaml"])
+TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+
+class TagIndex:
+    """
+    Index of a reactor map, so that the reactors for a tag can be looked up
+    without matching the tag against every entry of the map.
+
+    Tags without glob characters are looked up in a dict, tags whose only glob
+    character is a trailing ``*`` are looked up by prefix, and the remaining
+    patterns are matched with precompiled regular expressions. Reactors are
+    returned in the order of the map, as with a linear scan.
+    """
+
+    def __init__(self, react_map):
+        self.exact = {}
+        self.prefixes = {}
+        self.globs = []
+        for pos, ropt in enumerate(react_map or []):
+            if not isinstance(ropt, dict):
+                continue
+            if len(ropt) != 1:
+                continue
+            key = next(iter(ropt.keys()))
+            val = ropt[key]
+            if isinstance(val, str):
+                val = [val]
+            elif not isinstance(val, list):
+                continue
+            if not isinstance(key, str):
+                continue
+            key = os.path.normcase(key)
+            entry = (pos, val)
+            if not glob.has_magic(key):
+                self.exact.setdefault(key, []).append(entry)
+            elif key.endswith("*") and not glob.has_magic(key[:-1]):
+                self.prefixes.setdefault(len(key) - 1, {}).setdefault(
+                    key[:-1], []
+                ).append(entry)
+            else:
+                self.globs.append((re.compile(fnmatch.translate(key)), entry))
+
+    def match(self, tag):
+        """
+        Return the list of reactors configured for ``tag``
+        """
+        tag = os.path.normcase(tag)
+        matches = list(self.exact.get(tag, ()))
+        for length, prefixes in self.prefixes.items():
+            matches.extend(prefixes.get(tag[:length], ()))
+        for regex, entry in self.globs:
+            if regex.match(tag):
+                matches.append(entry)
+        if len(matches) > 1:
+            matches.sort(key=lambda entry: entry[0])
+        reactors = []
+        for _, val in matches:
+            reactors.extend(val)
+        return reactors
+
 
 class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
     """
@@ -46,6 +118,118 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         salt.state.Compiler.__init__(self, opts, self.minion.rend)
         self.is_leader = True
+        self._react_index = None
+        self._react_map_key = None
+        self._reaction_cache = {}
+        self._glob_cache = {}
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {
+            "start": time.time(),
+            "events": 0,
+            "reactions": 0,
+            "queue_depth_max": 0,
+            "latency": {},
+        }
+
+    def _record_latency(self, name, elapsed):
+        latency = self.stats["latency"].setdefault(
+            name, {"count": 0, "total": 0.0, "max": 0.0}
+        )
+        latency["count"] += 1
+        latency["total"] += elapsed
+        latency["max"] = max(latency["max"], elapsed)
+
+    def get_stats(self):
+        """
+        Return the reactor metrics gathered since the last reset
+        """
+        queue_depth = self.wrap.pool.qsize() if hasattr(self, "wrap") else 0
+        return {
+            "interval": time.time() - self.stats["start"],
+            "events": self.stats["events"],
+            "reactions": self.stats["reactions"],
+            "queue_depth": queue_depth,
+            "queue_depth_max": max(self.stats["queue_depth_max"], queue_depth),
+            "dispatch": self.wrap.get_stats() if hasattr(self, "wrap") else {},
+            "latency": {
+                name: {
+                    "count": latency["count"],
+                    "avg": latency["total"] / latency["count"],
+                    "max": latency["max"],
+                }
+                for name, latency in self.stats["latency"].items()
+            },
+        }
+
+    def fire_stats(self, event):
+        """
+        Fire the reactor metrics on the event bus and start a new interval
+        """
+        stats = self.get_stats()
+        log.debug("Reactor stats: %s", stats)
+        stats["user"] = self.wrap.event_user
+        event.fire_event(stats, "salt/reactor/stats")
+        self._reset_stats()
+
+    @staticmethod
+    def _file_key(path):
+        """
+        Return a key which changes whenever the file at ``path`` is modified,
+        or ``None`` if it cannot be read
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _is_static(self, fn_):
+        """
+        Return ``True`` if rendering the reaction file does not depend on the
+        tag and data of the event, so that it only needs rendering once
+        """
+        renderers = {
+            part.strip()
+            for part in str(self.opts.get("renderer", "jinja|yaml")).split("|")
+        }
+        if not renderers or not renderers <= STATIC_RENDERERS:
+            return False
+        try:
+            with salt.utils.files.fopen(fn_, "r") as fp_:
+                content = fp_.read()
+        except (OSError, UnicodeDecodeError):
+            return False
+        if content.lstrip().startswith("#!"):
+            return False
+        return not any(marker in content for marker in TEMPLATE_MARKERS)
+
+    def _glob_reaction(self, glob_ref):
+        """
+        Expand a reaction file pattern. When only the file name holds glob
+        characters, the expansion is cached until the directory changes.
+        """
+        dirname, basename = os.path.split(glob_ref)
+        if not glob.has_magic(basename) or glob.has_magic(dirname):
+            return glob.glob(glob_ref)
+        key = self._file_key(dirname or os.curdir)
+        cached = self._glob_cache.get(glob_ref)
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            names = os.listdir(dirname or os.curdir)
+        except OSError:
+            names = []
+        if not basename.startswith("."):
+            names = [name for name in names if not name.startswith(".")]
+        ret = [
+            os.path.join(dirname, name)
+            for name in sorted(fnmatch.filter(names, basename))
+        ]
+        if key is not None:
+            self._glob_cache[glob_ref] = (key, ret)
+        return ret
 
     def render_reaction(self, glob_ref, tag, data):
         """
@@ -56,7 +240,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
 
         if glob_ref.startswith("salt://"):
             glob_ref = self.minion.functions["cp.cache_file"](glob_ref) or ""
-        globbed_ref = glob.glob(glob_ref)
+        globbed_ref = self._glob_reaction(glob_ref)
         if not globbed_ref:
             log.error(
                 "Can not render SLS %s for tag %s. File missing or not found.",
@@ -65,6 +249,16 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             )
         for fn_ in globbed_ref:
             try:
+                key = self._file_key(fn_)
+                cached = self._reaction_cache.get(fn_)
+                if key is not None and cached is not None and cached[0] == key:
+                    static = cached[1]
+                    if static:
+                        react.update(copy.deepcopy(cached[2]))
+                        continue
+                else:
+                    static = key is not None and self._is_static(fn_)
+
                 res = self.render_template(fn_, tag=tag, data=data)
 
                 # for #20841, inject the sls name here since verify_high()
@@ -72,43 +266,49 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 for name in res:
                     res[name]["__sls__"] = fn_
 
+                if key is not None:
+                    self._reaction_cache[fn_] = (
+                        key,
+                        static,
+                        copy.deepcopy(res) if static else None,
+                    )
                 react.update(res)
             except Exception:  # pylint: disable=broad-except
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
+    def _read_react_map(self):
+        try:
+            with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
+                return salt.utils.yaml.safe_load(fp_)
+        except OSError:
+            log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
+        except Exception:  # pylint: disable=broad-except
+            log.error('Failed to parse YAML in reactor map: "%s"', self.opts["reactor"])
+
+    def get_index(self):
+        """
+        Return the index of the reactor map, rebuilding it when the reactor
+        map file has changed
+        """
+        if isinstance(self.opts["reactor"], str):
+            key = (self.opts["reactor"], self._file_key(self.opts["reactor"]))
+            if key[1] is None or key != self._react_map_key:
+                log.debug("Loading reactor map from %s", self.opts["reactor"])
+                self._react_index = TagIndex(self._read_react_map())
+                self._react_map_key = key
+        elif self._react_index is None or self._react_map_key is not None:
+            self._react_index = TagIndex(self.opts["reactor"])
+            self._react_map_key = None
+        return self._react_index
+
     def list_reactors(self, tag):
         """
         Take in the tag from an event and return a list of the reactors to
         process
         """
         log.debug("Gathering reactors for tag %s", tag)
-        reactors = []
-        if isinstance(self.opts["reactor"], str):
-            try:
-                with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
-                    react_map = salt.utils.yaml.safe_load(fp_)
-            except OSError:
-                log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
-            except Exception:  # pylint: disable=broad-except
-                log.error(
-                    'Failed to parse YAML in reactor map: "%s"', self.opts["reactor"]
-                )
-        else:
-            react_map = self.opts["reactor"]
-        for ropt in react_map:
-            if not isinstance(ropt, dict):
-                continue
-            if len(ropt) != 1:
-                continue
-            key = next(iter(ropt.keys()))
-            val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, str):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
-        return reactors
+        return self.get_index().match(tag)
 
     def list_all(self):
         """
@@ -116,15 +316,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         """
         if isinstance(self.minion.opts["reactor"], str):
             log.debug("Reading reactors from yaml %s", self.opts["reactor"])
-            try:
-                with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
-                    react_map = salt.utils.yaml.safe_load(fp_)
-            except OSError:
-                log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
-            except Exception:  # pylint: disable=broad-except
-                log.error(
-                    'Failed to parse YAML in reactor map: "%s"', self.opts["reactor"]
-                )
+            react_map = self._read_react_map()
         else:
             log.debug("Not reading reactors from yaml")
             react_map = self.minion.opts["reactor"]
@@ -141,6 +333,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 return {"status": False, "comment": "Reactor already exists."}
 
         self.minion.opts["reactor"].append({tag: reaction})
+        self._react_index = None
         return {"status": True, "comment": "Reactor added."}
 
     def delete_reactor(self, tag):
@@ -152,6 +345,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             _tag = next(iter(reactor.keys()))
             if _tag == tag:
                 self.minion.opts["reactor"].remove(reactor)
+                self._react_index = None
                 return {"status": True, "comment": "Reactor deleted."}
 
         return {"status": False, "comment": "Reactor does not exists."}
@@ -175,7 +369,9 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         chunks = []
         try:
             for fn_ in reactors:
+                start = time.time()
                 high.update(self.render_reaction(fn_, tag, data))
+                self._record_latency(fn_, time.time() - start)
             if high:
                 errors = self.verify_high(high)
                 if errors:
@@ -217,8 +413,16 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             listen=True,
         ) as event:
             self.wrap = ReactWrap(self.opts)
+            self._reset_stats()
+            stats_interval = self.opts.get("reactor_stats_interval", 0)
 
             for data in event.iter_events(full=True):
+                if (
+                    stats_interval
+                    and time.time() - self.stats["start"] >= stats_interval
+                ):
+                    self.fire_stats(event)
+
                 # skip all events fired by ourselves
                 if data["data"].get("user") == self.wrap.event_user:
                     continue
@@ -258,6 +462,11 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                         {"reactors": self.list_all(), "result": res},
                         "salt/reactors/manage/delete-complete",
                     )
+                elif data["tag"].endswith("salt/reactors/manage/stats"):
+                    event.fire_event(
+                        {"stats": self.get_stats()},
+                        "salt/reactors/manage/stats-results",
+                    )
                 elif data["tag"].endswith("salt/reactors/manage/list"):
                     event.fire_event(
                         {"reactors": self.list_all()},
@@ -271,12 +480,19 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                         reactors = self.list_reactors(data["tag"])
                         if not reactors:
                             continue
+                        start = time.time()
+                        self.stats["events"] += 1
                         chunks = self.reactions(data["tag"], data["data"], reactors)
                         if chunks:
+                            self.stats["reactions"] += len(chunks)
                             try:
                                 self.call_reactions(chunks)
                             except SystemExit:
                                 log.warning("Exit ignored by reactor")
+                        self._record_latency("__event__", time.time() - start)
+                        self.stats["queue_depth_max"] = max(
+                            self.stats["queue_depth_max"], self.wrap.pool.qsize()
+                        )
 
 
 class ReactWrap:
@@ -306,6 +522,265 @@ class ReactWrap:
             self.opts["reactor_worker_threads"],  # number of workers for runner/wheel
             queue_size=self.opts["reactor_worker_hwm"],  # queue size for those workers
         )
+        # Reactions which are being coalesced, or held back by the rate and
+        # concurrency limits of their reactor, are dispatched by a separate
+        # thread. The condition serializes the use of the clients.
+        self._cond = threading.Condition()
+        self._flusher = None
+        self._coalescing = collections.OrderedDict()
+        self._backlog = collections.deque()
+        self._backlogged = collections.Counter()
+        self._buckets = {}
+        self._inflight = collections.Counter()
+        self._current = None
+        self.stats = {
+            "received": 0,
+            "dispatched": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "backlog_max": 0,
+        }
+
+    def _limits(self, low):
+        """
+        Pop the dispatch keywords from the low data and return the coalescing
+        window, rate limit and concurrency limit of the reaction
+        """
+        limits = {
+            "coalesce": self.opts["reactor_coalesce_window"],
+            "rate_limit": self.opts["reactor_rate_limit"],
+            "max_concurrency": self.opts["reactor_max_concurrency"],
+        }
+        for key in REACTOR_DISPATCH_KEYWORDS:
+            if key in low:
+                limits[key] = low.pop(key)
+        for key, value in limits.items():
+            try:
+                limits[key] = max(float(value or 0), 0)
+            except (TypeError, ValueError):
+                log.error(
+                    "Reactor '%s' has an invalid value for '%s': %s",
+                    low.get("__id__"),
+                    key,
+                    value,
+                )
+                limits[key] = 0
+        return limits
+
+    @staticmethod
+    def _coalesce_key(low):
+        """
+        Return the key under which identical reactions are coalesced, and
+        whether their targets can be merged into a list
+        """
+        mergeable = (
+            low.get("state") in ("local", "cmd")
+            and low.get("tgt_type", "glob") in ("glob", "list")
+            and (
+                isinstance(low.get("tgt"), list)
+                or (isinstance(low.get("tgt"), str) and not glob.has_magic(low["tgt"]))
+            )
+        )
+        skip = ("__run_num__", "tgt", "tgt_type") if mergeable else ("__run_num__",)
+        key = salt.utils.json.dumps(
+            {name: val for name, val in low.items() if name not in skip},
+            sort_keys=True,
+            default=repr,
+        )
+        return key, mergeable
+
+    def _coalesce(self, low, limits):
+        key, mergeable = self._coalesce_key(low)
+        entry = self._coalescing.get(key)
+        if entry is None:
+            self._coalescing[key] = {
+                "low": low,
+                "limits": limits,
+                "tgts": [],
+                "mergeable": mergeable,
+                "deadline": time.monotonic() + limits["coalesce"],
+            }
+            entry = self._coalescing[key]
+        else:
+            self.stats["coalesced"] += 1
+        if mergeable:
+            tgts = low["tgt"] if isinstance(low["tgt"], list) else [low["tgt"]]
+            for tgt in tgts:
+                if tgt not in entry["tgts"]:
+                    entry["tgts"].append(tgt)
+        self._start_flusher()
+
+    def _allowed(self, name, limits, now):
+        """
+        Return ``0`` if the reactor may dispatch a reaction now, otherwise
+        the number of seconds to wait, or ``None`` when waiting for a running
+        reaction to finish
+        """
+        if (
+            limits["max_concurrency"]
+            and self._inflight[name] >= limits["max_concurrency"]
+        ):
+            return None
+        rate = limits["rate_limit"]
+        if not rate:
+            return 0
+        burst = max(rate, 1.0)
+        tokens, last = self._buckets.get(name, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        if tokens < 1:
+            self._buckets[name] = (tokens, now)
+            return (1 - tokens) / rate
+        self._buckets[name] = (tokens - 1, now)
+        return 0
+
+    def _submit(self, low, limits):
+        """
+        Dispatch a reaction, or add it to the backlog if its reactor is over
+        its limits
+        """
+        name = low.get("__sls__")
+        if (
+            not self._backlogged[name]
+            and self._allowed(name, limits, time.monotonic()) == 0
+        ):
+            self._dispatch(low, limits)
+            return
+        if len(self._backlog) >= self.opts["reactor_backlog_size"]:
+            self.stats["dropped"] += 1
+            if self.opts["reactor_overflow_policy"] == "drop_oldest":
+                dropped = self._backlog.popleft()[0]
+                self._backlogged[dropped.get("__sls__")] -= 1
+            else:
+                dropped = low
+            log.warning(
+                "Reactor backlog is full, dropping reaction '%s'. Consider "
+                "tuning reactor_backlog_size, or the rate and concurrency "
+                "limits of reactor '%s'",
+                dropped.get("__id__"),
+                dropped.get("__sls__"),
+            )
+            if dropped is low:
+                return
+        self._backlog.append((low, limits))
+        self._backlogged[name] += 1
+        self.stats["backlog_max"] = max(self.stats["backlog_max"], len(self._backlog))
+        self._start_flusher()
+
+    def _dispatch(self, low, limits):
+        self.stats["dispatched"] += 1
+        if limits["max_concurrency"]:
+            self._current = low.get("__sls__")
+        try:
+            self.execute(low)
+        finally:
+            self._current = None
+
+    def _flush(self):
+        """
+        Dispatch the coalesced reactions whose window is over and the backlog
+        entries allowed by their limits. Returns the number of seconds until
+        something is due, or ``None`` if only running reactions can unblock
+        the backlog.
+        """
+        now = time.monotonic()
+        wait = []
+        for key, entry in list(self._coalescing.items()):
+            if entry["deadline"] > now:
+                wait.append(entry["deadline"] - now)
+                continue
+            del self._coalescing[key]
+            low = entry["low"]
+            if entry["mergeable"]:
+                if len(entry["tgts"]) > 1:
+                    low["tgt"] = entry["tgts"]
+                    low["tgt_type"] = "list"
+                else:
+                    low["tgt"] = entry["tgts"][0]
+            self._submit(low, entry["limits"])
+        blocked = set()
+        for _ in range(len(self._backlog)):
+            low, limits = self._backlog.popleft()
+            name = low.get("__sls__")
+            delay = None if name in blocked else self._allowed(name, limits, now)
+            if delay == 0:
+                self._backlogged[name] -= 1
+                self._dispatch(low, limits)
+                continue
+            # Keep the order of the reactions of a reactor
+            blocked.add(name)
+            if delay is not None:
+                wait.append(delay)
+            self._backlog.append((low, limits))
+        return min(wait) if wait else None
+
+    def _flush_loop(self):
+        with self._cond:
+            while True:
+                try:
+                    timeout = self._flush()
+                except Exception:  # pylint: disable=broad-except
+                    log.exception("Failed to dispatch delayed reactions")
+                    timeout = 1
+                if timeout is None and not self._backlog and not self._coalescing:
+                    timeout = 60
+                self._cond.wait(timeout)
+
+    def _start_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            self._cond.notify()
+            return
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="ReactorDispatcher"
+        )
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    def _tracked(self, func, name):
+        """
+        Wrap a function run in the thread pool to count the running reactions
+        of a reactor
+        """
+        self._inflight[name] += 1
+
+        def _run(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._cond:
+                    self._inflight[name] -= 1
+                    self._cond.notify()
+
+        return _run
+
+    def _fire_async(self, func, args):
+        name = self._current
+        if name is not None:
+            # Only reactors with a concurrency limit need their running
+            # reactions to be counted
+            func = self._tracked(func, name)
+        if self.pool.fire_async(func, args=args):
+            return True
+        if name is not None:
+            self._inflight[name] -= 1
+        self.stats["dropped"] += 1
+        return False
+
+    def get_stats(self):
+        """
+        Return the dispatch metrics of the reactor
+        """
+        with self._cond:
+            stats = dict(self.stats)
+            stats["backlog"] = len(self._backlog)
+            stats["coalescing"] = len(self._coalescing)
+            stats["queue_depth"] = self.pool.qsize()
+            stats["inflight"] = {
+                name: count for name, count in self._inflight.items() if count
+            }
+        stats["coalesce_ratio"] = (
+            stats["received"] / stats["dispatched"] if stats["dispatched"] else 1.0
+        )
+        return stats
 
     def populate_client_cache(self, low):
         """
@@ -335,6 +810,20 @@ class ReactWrap:
                 )
 
     def run(self, low):
+        """
+        Dispatch a reaction, coalescing it with identical reactions and
+        applying the rate and concurrency limits of its reactor
+        """
+        low = dict(low)
+        limits = self._limits(low)
+        with self._cond:
+            self.stats["received"] += 1
+            if limits["coalesce"]:
+                self._coalesce(low, limits)
+            else:
+                self._submit(low, limits)
+
+    def execute(self, low):
         """
         Execute a reaction by invoking the proper wrapper func
         """
@@ -461,13 +950,13 @@ class ReactWrap:
         """
         Wrap RunnerClient for executing :ref:`runner modules <all-salt.runners>`
         """
-        return self.pool.fire_async(self.client_cache["runner"].low, args=(fun, kwargs))
+        return self._fire_async(self.client_cache["runner"].low, args=(fun, kwargs))
 
     def wheel(self, fun, **kwargs):
         """
         Wrap Wheel to enable executing :ref:`wheel modules <all-salt.wheel>`
         """
-        return self.pool.fire_async(self.client_cache["wheel"].low, args=(fun, kwargs))
+        return self._fire_async(self.client_cache["wheel"].low, args=(fun, kwargs))
 
     def local(self, fun, tgt, **kwargs):
         """
@@ -14,6 +14,7 @@ Requires that python-dateutil is installed on the minion.
 import copy
 import datetime
 import errno
+import heapq
 import itertools
 import logging
 import os
@@ -185,6 +186,12 @@ class Schedule:
             self._subprocess_list = salt.utils.process.SubprocessList()
         else:
             self._subprocess_list = _subprocess_list
+        # Min-heap of (wakeup time, job name), so that eval() only has to
+        # evaluate the jobs which are due, see _jobs_to_eval()
+        self._wakeup_heap = []
+        self._job_wakeups = {}
+        self._eval_fingerprint = None
+        self._last_eval = None
 
     def __getnewargs__(self):
         return self.opts, self.functions, self.returners, self.intervals, None
@@ -335,6 +342,7 @@ class Schedule:
         # remove from self.intervals
         if name in self.intervals:
             del self.intervals[name]
+        self._reset_wakeup(name)
 
         if persist:
             self.persist()
@@ -348,6 +356,7 @@ class Schedule:
         self.enabled = True
         self.splay = None
         self.opts["schedule"] = {}
+        self._reset_wakeup()
 
     def delete_job_prefix(self, name, persist=True):
         """
@@ -372,6 +381,9 @@ class Schedule:
         for job in list(self.intervals.keys()):
             if job.startswith(name):
                 del self.intervals[job]
+        for job in list(self._job_wakeups):
+            if job.startswith(name):
+                self._reset_wakeup(job)
 
         if persist:
             self.persist()
@@ -397,6 +409,7 @@ class Schedule:
                 data[job]["enabled"] = True
 
         new_job = next(iter(data.keys()))
+        self._reset_wakeup(new_job)
 
         if new_job in self._get_schedule(include_opts=False):
             log.warning("Cannot update job %s, it's in the pillar!", new_job)
@@ -426,6 +439,7 @@ class Schedule:
         # ensure job exists, then enable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = True
+            self._reset_wakeup(name)
             log.info("Enabling job %s in scheduler", name)
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -447,6 +461,7 @@ class Schedule:
         # ensure job exists, then disable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = False
+            self._reset_wakeup(name)
             log.info("Disabling job %s in scheduler", name)
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -473,6 +488,7 @@ class Schedule:
             return
 
         self.opts["schedule"][name] = schedule
+        self._reset_wakeup(name)
 
         if persist:
             self.persist()
@@ -549,6 +565,7 @@ class Schedule:
         """
         # Remove all jobs from self.intervals
         self.intervals = {}
+        self._reset_wakeup()
 
         if "schedule" in schedule:
             schedule = schedule["schedule"]
@@ -604,6 +621,7 @@ class Schedule:
             self.opts["schedule"][name]["run_explicit"].append(
                 {"time": new_time, "time_fmt": time_fmt}
             )
+            self._reset_wakeup(name)
 
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -630,6 +648,7 @@ class Schedule:
             self.opts["schedule"][name]["skip_explicit"].append(
                 {"time": time, "time_fmt": time_fmt}
             )
+            self._reset_wakeup(name)
 
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -956,6 +975,9 @@ class Schedule:
         if not isinstance(loop_interval, datetime.timedelta):
             loop_interval = datetime.timedelta(seconds=loop_interval)
 
+        if not now:
+            now = datetime.datetime.now()
+
         def _splay(splaytime):
             """
             Calculate splaytime
@@ -1456,7 +1478,7 @@ class Schedule:
             self.splay = schedule["splay"]
 
         _hidden = ["enabled", "skip_function", "skip_during_range", "splay"]
-        for job, data in schedule.items():
+        for job, data in self._jobs_to_eval(schedule, _hidden, now, loop_interval):
 
             # Skip anything that is a global setting
             if job in _hidden:
@@ -1513,9 +1535,6 @@ class Schedule:
             ):
                 data["_run_on_start"] = True
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
@@ -1780,6 +1799,130 @@ class Schedule:
                         )
         return jids
 
+    def _reset_wakeup(self, name=None):
+        """
+        Make eval() evaluate the named job, or all jobs, on its next run
+        """
+        if name is None:
+            self._job_wakeups.clear()
+            self._wakeup_heap = []
+        else:
+            self._job_wakeups.pop(name, None)
+
+    def _jobs_to_eval(self, schedule, hidden, now, loop_interval):
+        """
+        Yield the schedule items which eval() needs to evaluate at ``now``.
+
+        Once a job has been evaluated, the earliest time at which evaluating
+        it again can change anything is computed from its ``_next_fire_time``
+        (see _set_wakeup()) and pushed on a min-heap. Until that time comes,
+        the job is skipped instead of going through the ``_handle_*`` helpers
+        again. Jobs are always evaluated if their data was replaced, if they
+        were changed through the Schedule API, or if the global settings of
+        the schedule changed.
+        """
+        whens = tuple(
+            repr(self.opts.get(key, {}).get("whens"))
+            if isinstance(self.opts.get(key), dict)
+            else None
+            for key in ("pillar", "grains")
+        )
+        fingerprint = (
+            self.enabled,
+            repr(self.skip_function),
+            repr(self.skip_during_range),
+            repr(self.splay),
+            loop_interval,
+            whens,
+        )
+        if (
+            fingerprint != self._eval_fingerprint
+            or self._last_eval is None
+            or now < self._last_eval
+        ):
+            self._reset_wakeup()
+            self._eval_fingerprint = fingerprint
+        self._last_eval = now
+
+        due = set()
+        while self._wakeup_heap and self._wakeup_heap[0][0] <= now:
+            wakeup, job = heapq.heappop(self._wakeup_heap)
+            if self._job_wakeups.get(job, (None,))[0] == wakeup:
+                due.add(job)
+
+        for job, data in schedule.items():
+            if job in hidden or not isinstance(data, dict):
+                yield job, data
+                continue
+            wakeup = self._job_wakeups.get(job)
+            if wakeup is not None and wakeup[1] is data and job not in due:
+                self._idle_job(data, now)
+                continue
+            yield job, data
+            self._set_wakeup(job, data, now, loop_interval)
+
+        if len(self._job_wakeups) > len(schedule):
+            for job in list(self._job_wakeups):
+                if job not in schedule:
+                    del self._job_wakeups[job]
+        if len(self._wakeup_heap) > 2 * len(self._job_wakeups) + 16:
+            self._wakeup_heap = [
+                (wakeup, job)
+                for job, (wakeup, _) in self._job_wakeups.items()
+                if wakeup is not None
+            ]
+            heapq.heapify(self._wakeup_heap)
+
+    def _idle_job(self, data, now):
+        """
+        Update a job which is not due in the same way evaluating it would
+        """
+        for item in ["_enabled", "_skipped", "_skip_reason", "_skipped_time"]:
+            if item in data:
+                del data[item]
+        if not self.enabled or not data.get("enabled", True):
+            data["_skip_reason"] = "disabled"
+            data["_skipped_time"] = now
+            data["_skipped"] = True
+
+    def _set_wakeup(self, job, data, now, loop_interval):
+        """
+        Record when a job which was just evaluated needs to be evaluated again.
+        ``None`` means not until the job is changed.
+        """
+        next_fire_time = data.get("_splay") or data.get("_next_fire_time")
+        if data.get("_error"):
+            # Evaluating the job again would fail the same way
+            wakeup = None
+        elif "run_explicit" in data or data.get("_run_on_start"):
+            wakeup = now
+        elif not any(
+            item in data
+            for item in ("seconds", "minutes", "hours", "days", "once", "when", "cron")
+        ):
+            # Nothing schedules this job
+            wakeup = None
+        elif data.get("splay") and not data.get("_splay"):
+            # The splay is computed on the next evaluation
+            wakeup = now
+        elif next_fire_time is None:
+            if "when" in data and data.get("_continue"):
+                # All of the "when" times have passed
+                wakeup = None
+            else:
+                wakeup = now
+        elif next_fire_time > now:
+            wakeup = next_fire_time - datetime.timedelta(
+                microseconds=next_fire_time.microsecond
+            )
+        elif "once" in data and next_fire_time < now - loop_interval:
+            wakeup = None
+        else:
+            wakeup = now
+        self._job_wakeups[job] = (wakeup, data)
+        if wakeup is not None:
+            heapq.heappush(self._wakeup_heap, (wakeup, job))
+
     def _run_job(self, func, data, jid=None):
         job_dry_run = data.get("dry_run", False)
         if job_dry_run:
@@ -0,0 +1,298 @@
+"""
+Run commands through a long running shell, instead of starting each of them
+from the Python process, see the ``cmd_worker_shell`` minion option.
+
+The shell reads the commands to run on its standard input. Each command runs
+in a subshell writing to the standard output and standard error of the shell,
+which are pipes read by the minion. The shell reports the pid and the exit
+status of the subshell on its standard output, and marks the end of its
+standard error, with lines holding a random marker.
+
+.. versionadded:: 3007.0
+"""
+import logging
+import os
+import select
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import types
+import uuid
+
+import salt.exceptions
+import salt.utils.stringutils
+
+log = logging.getLogger(__name__)
+
+# The number of seconds a new shell has to answer
+START_TIMEOUT = 10
+# How often the shell is checked for being alive while waiting for it
+POLL_INTERVAL = 1
+
+
+class ShellWorker:
+    """
+    A shell started with the given environment, user and group, running the
+    commands it is given one after the other
+    """
+
+    def __init__(self, shell, env=None, preexec_fn=None):
+        self.shell = shell
+        self.env = env
+        self.preexec_fn = preexec_fn
+        self.process = None
+        self.last_pid = None
+        self._marker = None
+        self._buffers = {}
+        # The jobs of a minion running with multiprocessing disabled share
+        # their __context__, and so their worker shells, between threads
+        self._lock = threading.RLock()
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Start the shell and wait for it to answer, which fails if it does not
+        understand the protocol
+        """
+        with self._lock:
+            self._marker = "<<<{}>>>".format(uuid.uuid4())
+            self.process = subprocess.Popen(
+                [self.shell],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=self.env,
+                preexec_fn=self.preexec_fn,
+                close_fds=True,
+                start_new_session=True,
+            )
+            self._buffers = {"out": b"", "err": b""}
+            try:
+                # Only a POSIX shell answers 2
+                self._send('echo "{} ready $((1 + 1))"\n'.format(self._marker))
+                ready = []
+
+                def done():
+                    found = self._take("out", "ready")
+                    if found is not None:
+                        ready.append(found[1])
+                    return bool(ready)
+
+                self._pump(done, time.time() + START_TIMEOUT)
+                if ready != ["2"]:
+                    raise OSError("unexpected answer {!r}".format(ready[0]))
+            except (OSError, salt.exceptions.TimedProcTimeoutError) as exc:
+                self.stop()
+                raise OSError(
+                    "The worker shell {} did not start: {}".format(self.shell, exc)
+                )
+            self._buffers = {}
+
+    def ensure_alive(self):
+        """
+        Start the shell if it is not running
+        """
+        with self._lock:
+            if not self.alive():
+                self.stop()
+                self.start()
+
+    def stop(self):
+        """
+        Kill the shell and everything it runs
+        """
+        with self._lock:
+            if self.process is None:
+                return
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            self.process.wait()
+            for stream in (
+                self.process.stdin,
+                self.process.stdout,
+                self.process.stderr,
+            ):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+            self.process = None
+
+    def _send(self, script):
+        self.process.stdin.write(salt.utils.stringutils.to_bytes(script))
+        self.process.stdin.flush()
+
+    def _take(self, name, field):
+        """
+        Remove the first ``field`` reported by the shell from the ``name``
+        stream. Returns the output written before it, the value of the field
+        and the output written after it, or ``None`` if it was not reported
+        yet.
+        """
+        prefix = salt.utils.stringutils.to_bytes("{} {}".format(self._marker, field))
+        buf = self._buffers[name]
+        start = buf.find(prefix)
+        if start == -1:
+            return None
+        end = buf.find(b"\n", start)
+        if end == -1:
+            return None
+        value = salt.utils.stringutils.to_str(buf[start + len(prefix) : end].strip())
+        return buf[:start], value, buf[end + 1 :]
+
+    def _pump(self, done, deadline):
+        """
+        Read the standard output and standard error of the shell until
+        ``done()`` is true. Both are read together so that a command writing
+        a lot to one of them does not block.
+        """
+        fds = {
+            self.process.stdout.fileno(): "out",
+            self.process.stderr.fileno(): "err",
+        }
+        while not done():
+            remaining = deadline - time.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                raise salt.exceptions.TimedProcTimeoutError("timeout")
+            ready, _, _ = select.select(
+                list(fds), [], [], min(remaining or POLL_INTERVAL, POLL_INTERVAL)
+            )
+            # The commands of the shell may keep its pipes open after it died
+            if not ready and self.process.poll() is not None:
+                raise OSError("The worker shell exited")
+            for fd in ready:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    raise OSError("The worker shell exited")
+                self._buffers[fds[fd]] += chunk
+
+    def run(
+        self, args, shell=False, cwd=None, umask=None, timeout=None, merge_stderr=False
+    ):
+        """
+        Run a command and return its pid, exit status, standard output and
+        standard error. ``args`` is a list of arguments, or a string run by
+        the shell if ``shell`` is ``True``. With ``merge_stderr``, the
+        standard error is written to the standard output and ``None`` is
+        returned for it.
+        """
+        with self._lock:
+            self.ensure_alive()
+            if shell:
+                command = "eval {}".format(shlex.quote(args))
+            else:
+                command = "exec {}".format(
+                    " ".join(shlex.quote(str(arg)) for arg in args)
+                )
+            setup = []
+            if umask is not None:
+                setup.append("umask {:04o}".format(umask))
+            if cwd:
+                setup.append("cd -- {} || exit 127".format(shlex.quote(cwd)))
+            setup.append(command)
+            self.last_pid = None
+            self._buffers = {"out": b"", "err": b""}
+            self._send(
+                "( {}\n) </dev/null {}&\n"
+                'echo "{marker} pid $!"\n'
+                'wait $!\necho "{marker} rc $?"\necho "{marker} end" >&2\n'.format(
+                    "\n".join(setup),
+                    "2>&1 " if merge_stderr else "",
+                    marker=self._marker,
+                )
+            )
+            result = {}
+
+            def done():
+                if self.last_pid is None:
+                    found = self._take("out", "pid")
+                    if found is None:
+                        return False
+                    before, value, after = found
+                    self._buffers["out"] = before + after
+                    self.last_pid = int(value)
+                for name, field in (("out", "rc"), ("err", "end")):
+                    if field not in result:
+                        found = self._take(name, field)
+                        if found is None:
+                            return False
+                        result[field] = found
+                return True
+
+            deadline = time.time() + timeout if timeout else None
+            try:
+                self._pump(done, deadline)
+                retcode = int(result["rc"][1])
+            except salt.exceptions.TimedProcTimeoutError:
+                self.stop()
+                raise salt.exceptions.TimedProcTimeoutError(
+                    "{} : Timed out after {} seconds".format(args, str(timeout))
+                )
+            except OSError:
+                self.stop()
+                raise
+            except ValueError as exc:
+                self.stop()
+                raise OSError("Invalid answer from the worker shell: {}".format(exc))
+            stdout = result["rc"][0]
+            stderr = None if merge_stderr else result["end"][0]
+            self._buffers = {}
+            return self.last_pid, retcode, stdout, stderr
+
+
+class WorkerProc:
+    """
+    Run a command through a :py:class:`ShellWorker`, with the interface of
+    :py:class:`salt.utils.timed_subprocess.TimedProc`
+    """
+
+    def __init__(
+        self,
+        worker,
+        args,
+        shell=False,
+        cwd=None,
+        umask=None,
+        timeout=None,
+        merge_stderr=False,
+    ):
+        if timeout and not isinstance(timeout, (int, float)):
+            raise salt.exceptions.TimedProcTimeoutError(
+                "Error: timeout {} must be a number".format(timeout)
+            )
+        worker.ensure_alive()
+        self.worker = worker
+        self.command = args
+        self.shell = shell
+        self.cwd = cwd
+        self.umask = umask
+        self.timeout = timeout
+        self.merge_stderr = merge_stderr
+        self.stdout = None
+        self.stderr = None
+        self.process = types.SimpleNamespace(pid=None, returncode=None)
+
+    def run(self):
+        try:
+            (
+                self.process.pid,
+                self.process.returncode,
+                self.stdout,
+                self.stderr,
+            ) = self.worker.run(
+                self.command,
+                shell=self.shell,
+                cwd=self.cwd,
+                umask=self.umask,
+                timeout=self.timeout,
+                merge_stderr=self.merge_stderr,
+            )
+        finally:
+            self.process.pid = self.worker.last_pid
+        return self.process.returncode
@@ -0,0 +1,167 @@
+"""
+Helpers used by the syndic to forward the returns and events of its minions to
+the masters of masters
+
+.. versionadded:: 3007.0
+"""
+import logging
+import os
+import time
+import zlib
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+from salt.utils.odict import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# Refuse to inflate compressed batches larger than this, the size of the
+# largest message salt.utils.msgpack unpacks from the transport
+MAX_DECOMPRESSED_SIZE = 100 * 1024 * 1024
+
+
+class JidCache:
+    """
+    A set of jids holding at most ``hwm`` of them, the oldest ones are
+    forgotten first
+    """
+
+    def __init__(self, hwm):
+        self.hwm = hwm
+        self._jids = OrderedDict()
+
+    def __contains__(self, jid):
+        return jid in self._jids
+
+    def __len__(self):
+        return len(self._jids)
+
+    def __iter__(self):
+        return iter(self._jids)
+
+    def add(self, jid):
+        self._jids[jid] = None
+        while len(self._jids) > max(self.hwm, 0):
+            self._jids.popitem(last=False)
+
+
+def count_returns(jdict):
+    """
+    Return the number of minion returns aggregated in a syndic job return
+    """
+    return sum(1 for key in jdict if not key.startswith("__"))
+
+
+def take_batch(jdicts, size):
+    """
+    Split a list of syndic job returns in a batch holding at most ``size``
+    minion returns and the rest. A job return which does not fit in the batch
+    is split, its job load is only kept in the batch.
+
+    Returns the ``(batch, rest)`` tuple, ``jdicts`` is not modified.
+    """
+    batch = []
+    room = max(size, 1)
+    for idx, jdict in enumerate(jdicts):
+        count = count_returns(jdict)
+        if count <= room:
+            batch.append(jdict)
+            room -= count
+            if room:
+                continue
+            return batch, list(jdicts[idx + 1 :])
+        head = {}
+        tail = {}
+        for key, value in jdict.items():
+            if key.startswith("__"):
+                head[key] = value
+                tail[key] = {} if key == "__load__" else value
+            elif room:
+                head[key] = value
+                room -= 1
+            else:
+                tail[key] = value
+        batch.append(head)
+        return batch, [tail] + list(jdicts[idx + 1 :])
+    return batch, []
+
+
+def compress(data, level=6):
+    """
+    Serialize and compress a batch of returns or events
+    """
+    return zlib.compress(salt.payload.dumps(data), level)
+
+
+def decompress(blob, max_size=None):
+    """
+    Inflate and deserialize a batch compressed with :py:func:`compress`, which
+    may not inflate to more than ``max_size`` bytes, ``MAX_DECOMPRESSED_SIZE``
+    by default
+    """
+    if max_size is None:
+        max_size = MAX_DECOMPRESSED_SIZE
+    inflater = zlib.decompressobj()
+    data = inflater.decompress(blob, max_size)
+    if inflater.unconsumed_tail:
+        raise ValueError(
+            "Compressed batch inflates to more than {} bytes".format(max_size)
+        )
+    return salt.payload.loads(data)
+
+
+class Spool:
+    """
+    Keep batches of job returns on disk while the masters of masters are too
+    slow to take them
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _files(self):
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return []
+        return sorted(name for name in names if name.endswith(".p"))
+
+    def __len__(self):
+        return len(self._files())
+
+    def put(self, values):
+        """
+        Write a list of job returns to the spool. Returns ``False`` if it could
+        not be written.
+        """
+        fn_ = os.path.join(self.path, "{:020d}.p".format(time.time_ns()))
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with salt.utils.atomicfile.atomic_open(fn_, "wb") as fh_:
+                salt.payload.dump(values, fh_)
+        except OSError as exc:
+            log.error("Unable to spool syndic returns to %s: %s", fn_, exc)
+            return False
+        return True
+
+    def pop(self):
+        """
+        Remove the oldest list of job returns from the spool and return it, or
+        ``None`` if the spool is empty
+        """
+        for name in self._files():
+            fn_ = os.path.join(self.path, name)
+            try:
+                with salt.utils.files.fopen(fn_, "rb") as fh_:
+                    values = salt.payload.load(fh_)
+            except (OSError, ValueError) as exc:
+                log.error("Discarding unreadable syndic spool file %s: %s", fn_, exc)
+                values = None
+            try:
+                os.remove(fn_)
+            except OSError:
+                pass
+            if values:
+                return values
+        return None
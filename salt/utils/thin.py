@@ -4,7 +4,9 @@ Generate the salt thin tarball from the installed python files
 
 import contextvars as py_contextvars
 import copy
+import gzip
 import importlib.util
+import io
 import logging
 import os
 import shutil
@@ -25,6 +27,7 @@ import yaml
 import salt
 import salt.exceptions
 import salt.ext.tornado as tornado
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.json
@@ -780,6 +783,207 @@ def thin_sum(cachedir, form="sha1"):
     return code_checksum, salt.utils.hashutils.get_hash(thintar, form)
 
 
+THIN_LAYERS = ("meta", "salt", "deps", "extra")
+
+
+def layers_dir(cachedir):
+    """
+    Return the directory holding the thin layers
+    """
+    return os.path.join(cachedir, "thin", "layers")
+
+
+def layer_path(cachedir, digest):
+    """
+    Return the path to the thin layer with the given digest
+    """
+    return os.path.join(layers_dir(cachedir), "{}.tgz".format(digest))
+
+
+def _walk_top(top, py_ver, absonly=True):
+    """
+    Yield the ``(path, arcname)`` of the files of a top, laid out as in the
+    thin tarball, and the temporary directory to remove once they are packed
+    """
+    if absonly and not os.path.isabs(top):
+        return
+    base = os.path.basename(top)
+    top_dirname = os.path.dirname(top)
+    site_pkg_dir = _is_shareable(base) and "pyall" or "py{}".format(py_ver)
+    if not os.path.isdir(top_dirname):
+        # This is likely a compressed python .egg
+        tempdir = tempfile.mkdtemp()
+        with zipfile.ZipFile(top_dirname) as egg:
+            egg.extractall(tempdir)
+        top_dirname = tempdir
+        top = os.path.join(tempdir, base)
+        yield None, tempdir
+    if not os.path.isdir(top):
+        # top is a single file module
+        if os.path.exists(top):
+            yield top, os.path.join(site_pkg_dir, base)
+        return
+    for root, dirs, files in salt.utils.path.os_walk(top, followlinks=True):
+        for name in files:
+            if not name.endswith((".pyc", ".pyo")):
+                path = os.path.join(root, name)
+                yield path, os.path.join(
+                    site_pkg_dir, os.path.relpath(path, top_dirname)
+                )
+
+
+def _write_layer(cachedir, members):
+    """
+    Write a reproducible layer from ``(path or bytes, arcname)`` members and
+    return its digest. Members are sorted and stripped of their ownership and
+    times, so that the same content always gives the same layer.
+    """
+    tmp_layer = _get_thintar_prefix(os.path.join(layers_dir(cachedir), "layer.tgz"))
+    seen = set()
+    with salt.utils.files.fopen(tmp_layer, "wb") as raw:
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gzf:
+            with tarfile.open(fileobj=gzf, mode="w", format=tarfile.GNU_FORMAT) as tfp:
+                for src, arcname in sorted(members, key=lambda item: item[1]):
+                    if arcname in seen:
+                        continue
+                    seen.add(arcname)
+                    info = tarfile.TarInfo(arcname)
+                    info.mtime = 0
+                    if src is None:
+                        info.type = tarfile.DIRTYPE
+                        info.mode = 0o755
+                        tfp.addfile(info)
+                        continue
+                    if isinstance(src, bytes):
+                        data = src
+                        info.mode = 0o644
+                    else:
+                        with salt.utils.files.fopen(src, "rb") as fp_:
+                            data = fp_.read()
+                        info.mode = 0o755 if os.access(src, os.X_OK) else 0o644
+                    info.size = len(data)
+                    tfp.addfile(info, io.BytesIO(data))
+    digest = salt.utils.hashutils.get_hash(tmp_layer, "sha256")
+    os.replace(tmp_layer, layer_path(cachedir, digest))
+    return digest
+
+
+def gen_thin_layers(cachedir, extra_mods="", so_mods="", overwrite=False):
+    """
+    Generate the salt thin as content-addressed layers, so that only the
+    layers which changed have to be sent to the targets. Returns a dictionary
+    mapping the name of each layer to its digest:
+
+    meta
+        The ``salt-call`` script and the version files
+    salt
+        The Salt package
+    deps
+        The dependencies of Salt
+    extra
+        The ``extra_mods`` and ``so_mods``, if any
+
+    The layers are cached and only regenerated when Salt, the Python version
+    or the extra modules change.
+
+    .. versionadded:: 3007.0
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run thin.generate_layers
+        salt-run thin.generate_layers mako
+    """
+    ldir = layers_dir(cachedir)
+    if not os.path.isdir(ldir):
+        os.makedirs(ldir)
+    manifest = os.path.join(ldir, "manifest.json")
+    key = {
+        "version": salt.version.__version__,
+        "python": list(sys.version_info[:2]),
+        "extra_mods": extra_mods or "",
+        "so_mods": so_mods or "",
+    }
+    if not overwrite and os.path.isfile(manifest):
+        try:
+            with salt.utils.files.fopen(manifest, "r") as fp_:
+                cached = salt.utils.json.load(fp_)
+        except (OSError, ValueError):
+            cached = {}
+        layers = cached.get("layers") or {}
+        if (
+            cached.get("key") == key
+            and layers
+            and all(os.path.isfile(layer_path(cachedir, d)) for d in layers.values())
+        ):
+            return layers
+
+    py_ver = sys.version_info.major
+    base_tops = get_tops()
+    tops = {
+        "salt": [top for top in base_tops if os.path.basename(top) == "salt"],
+        "deps": [top for top in base_tops if os.path.basename(top) != "salt"],
+        "extra": [
+            top
+            for top in get_tops(extra_mods=extra_mods or "", so_mods=so_mods or "")
+            if top not in base_tops
+        ],
+    }
+    dirs = []
+    for name in ("salt", "deps", "extra"):
+        dirs.extend(
+            "layers/{}/{}".format(name, site_pkg_dir)
+            for site_pkg_dir in ("pyall", "py{}".format(py_ver))
+        )
+    members = {
+        "meta": [
+            (_get_salt_call(*dirs), "salt-call"),
+            (_get_supported_py_config({py_ver: []}, None), "supported-versions"),
+            (salt.utils.stringutils.to_bytes(salt.version.__version__), "version"),
+            (salt.utils.stringutils.to_bytes(str(py_ver)), ".thin-gen-py-version"),
+            (None, "py{}".format(py_ver)),
+        ]
+    }
+    layers = {}
+    tempdirs = []
+    try:
+        for name, layer_tops in tops.items():
+            members[name] = []
+            for top in layer_tops:
+                for path, arcname in _walk_top(top, py_ver):
+                    if path is None:
+                        tempdirs.append(arcname)
+                    else:
+                        members[name].append((path, arcname))
+        for name in THIN_LAYERS:
+            if members[name]:
+                layers[name] = _write_layer(cachedir, members[name])
+                log.debug("Generated thin layer %s: %s", name, layers[name])
+    finally:
+        for tempdir in tempdirs:
+            shutil.rmtree(tempdir, ignore_errors=True)
+
+    with salt.utils.atomicfile.atomic_open(manifest, "w") as fp_:
+        salt.utils.json.dump({"key": key, "layers": layers}, fp_)
+    # Remove the layers which are no longer used
+    for fname in os.listdir(ldir):
+        if fname.endswith(".tgz") and fname[:-4] not in layers.values():
+            try:
+                os.remove(os.path.join(ldir, fname))
+            except OSError:
+                pass
+    return layers
+
+
+def layer_sums(cachedir, extra_mods="", so_mods=""):
+    """
+    Return the digests of the current thin layers built with the given extra
+    modules, which are only generated if they are not cached yet
+    """
+    return gen_thin_layers(cachedir, extra_mods=extra_mods, so_mods=so_mods)
+
+
 def gen_min(
     cachedir,
     extra_mods="",
@@ -0,0 +1,65 @@
+"""
+Test the virt module against the libvirt test driver
+"""
+import pytest
+
+pytestmark = [
+    pytest.mark.slow_test,
+]
+
+libvirt = pytest.importorskip("libvirt")
+
+CONNECTION = "test:///default"
+
+
+@pytest.fixture(scope="module")
+def virt(modules):
+    return modules.virt
+
+
+@pytest.fixture
+def domain():
+    conn = libvirt.open(CONNECTION)
+    try:
+        yield conn.lookupByName("test")
+    finally:
+        conn.close()
+
+
+def test_vm_stats(virt, domain):
+    """
+    The stats collected in bulk match the ones of the domain
+    """
+    raw = domain.info()
+    assert virt.vm_state(connection=CONNECTION) == {"test": "running"}
+    assert virt.vm_state("test", connection=CONNECTION) == {"test": "running"}
+
+    info = virt.vm_info(connection=CONNECTION)["test"]
+    assert info["state"] == "running"
+    assert info["cpu"] == raw[3]
+    assert info["maxMem"] == raw[1]
+    assert info["mem"] == raw[2]
+    assert info["uuid"] == domain.UUIDString()
+
+    cputime = virt.vm_cputime(connection=CONNECTION)["test"]
+    assert cputime["cputime"] >= 0
+    assert set(virt.vm_netstats(connection=CONNECTION)["test"]) == {
+        "rx_bytes",
+        "rx_packets",
+        "rx_errs",
+        "rx_drop",
+        "tx_bytes",
+        "tx_packets",
+        "tx_errs",
+        "tx_drop",
+    }
+    assert set(virt.vm_diskstats(connection=CONNECTION)["test"]) == {
+        "rd_req",
+        "rd_bytes",
+        "wr_req",
+        "wr_bytes",
+        "errs",
+    }
+
+    full = virt.full_info(connection=CONNECTION)
+    assert full["vm_info"]["test"]["uuid"] == domain.UUIDString()
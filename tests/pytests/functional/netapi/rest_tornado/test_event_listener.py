@@ -164,3 +164,35 @@ async def test_clean_by_request(sock_dir, io_loop):
 
             assert 0 == len(event_listener.tag_map)
             assert 0 == len(event_listener.request_map)
+
+
+async def test_filtered_events(sock_dir):
+    """
+    Test subscribing to several tag prefixes and to some fields of the data
+    """
+    with eventpublisher_process(sock_dir):
+        with salt.utils.event.MasterEvent(sock_dir) as me:
+            request = Request()
+            event_listener = saltnado.EventListener(
+                {},  # we don't use mod_opts, don't save?
+                {"sock_dir": sock_dir, "transport": "zeromq"},
+            )
+            event_future = event_listener.get_event(
+                request,
+                tag=("salt/job/", "salt/run/"),
+                matcher=saltnado.EventListener.any_prefix_matcher,
+                fields=["fun", "id"],
+            )
+            me.fire_event({"fun": "test.ping"}, "salt/auth")
+            me.fire_event(
+                {"fun": "test.ping", "id": "minion", "return": True},
+                "salt/job/20140112010149808995/ret/minion",
+            )
+
+            await event_future
+
+            assert event_future.result() == {
+                "tag": "salt/job/20140112010149808995/ret/minion",
+                "data": {"fun": "test.ping", "id": "minion"},
+            }
+            assert not event_listener.fields_map
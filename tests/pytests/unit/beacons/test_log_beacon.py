@@ -6,7 +6,11 @@
 """
 import pytest
 
+import salt.beacons
 import salt.beacons.log_beacon as log_beacon
+import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
+import salt.utils.files
 from tests.support.mock import mock_open, patch
 
 
@@ -56,3 +60,33 @@ def test_log_match(stub_log_entry):
         ]
         ret = log_beacon.beacon(config)
         assert ret == _expected_return
+
+
+def test_log_watch(tmp_path, stub_log_entry):
+    """
+    Test that the log beacon fires events when the file changes
+    """
+    log_file = tmp_path / "auth.log"
+    log_file.write_text("start\n")
+    config = [{"file": str(log_file)}, {"tags": {"sshd": {"regex": ".*sshd.*"}}}]
+    events = []
+    io_loop = salt.ext.tornado.ioloop.IOLoop()
+    watcher = salt.beacons.BeaconWatcher(
+        "log", io_loop, events.extend, {"calls": 0, "cpu": 0.0}
+    )
+    try:
+        with patch.dict(log_beacon.__context__, {"log.loc": 0}), patch.object(
+            salt.beacons, "HAS_PYINOTIFY", False
+        ):
+            log_beacon.watch(config, watcher)
+            io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.3))
+            assert events == []
+            with salt.utils.files.fopen(str(log_file), "a") as fp_:
+                fp_.write(stub_log_entry)
+            io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(1.5))
+    finally:
+        watcher.close()
+        io_loop.close()
+    assert events == [
+        {"error": "", "match": "yes", "raw": stub_log_entry.rstrip("\n"), "tag": "sshd"}
+    ]
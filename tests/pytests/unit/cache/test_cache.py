@@ -5,8 +5,9 @@ Validate the cache package functions.
 import pytest
 
 import salt.cache
+import salt.config
 import salt.payload
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 
 @pytest.fixture
@@ -29,3 +30,58 @@ def test_factory_memcache(opts):
     with patch.dict(opts, {"memcache_expire_seconds": 10}):
         ret = salt.cache.factory(opts)
         assert isinstance(ret, salt.cache.MemCache)
+
+
+def test_batch_fallback(opts, tmp_path):
+    """
+    Test the batch API falls back to per-key operations for drivers without
+    bulk functions
+    """
+    opts = dict(salt.config.DEFAULT_MASTER_OPTS.copy(), **opts)
+    opts["cachedir"] = str(tmp_path)
+    cache = salt.cache.factory(opts)
+    cache.store_many(
+        {
+            ("minions/alpha", "data"): {"grains": {"id": "alpha"}},
+            ("minions/beta", "data"): {"grains": {"id": "beta"}},
+            ("minions/beta", "mine"): {"test.ping": True},
+        }
+    )
+    assert cache.fetch("minions/alpha", "data") == {"grains": {"id": "alpha"}}
+    assert cache.fetch_many([("minions/alpha", "data"), ("minions/gamma", "data")]) == {
+        ("minions/alpha", "data"): {"grains": {"id": "alpha"}},
+        ("minions/gamma", "data"): {},
+    }
+    assert cache.list_with_data("minions", "data") == {
+        "alpha": {"grains": {"id": "alpha"}},
+        "beta": {"grains": {"id": "beta"}},
+    }
+    assert cache.list_with_data("minions/beta") == {
+        "data": {"grains": {"id": "beta"}},
+        "mine": {"test.ping": True},
+    }
+
+    cache.flush_many([("minions/beta", "mine"), ("minions/alpha", None)])
+    assert sorted(cache.list("minions")) == ["beta"]
+    assert cache.list("minions/beta") == ["data"]
+
+
+def test_batch_driver(opts):
+    """
+    Test the batch API uses the bulk functions of the driver
+    """
+    fetch_many = MagicMock(return_value={("bank", "key"): "data"})
+    flush = MagicMock()
+    flush_many = MagicMock()
+    modules = {
+        "localfs.fetch_many": fetch_many,
+        "localfs.flush": flush,
+        "localfs.flush_many": flush_many,
+    }
+    with patch("salt.loader.cache", return_value=modules):
+        cache = salt.cache.factory(opts)
+        assert cache.fetch_many([("bank", "key")]) == {("bank", "key"): "data"}
+        fetch_many.assert_called_once_with([("bank", "key")])
+        cache.flush_many([("bank", "key"), ("other", None)])
+        flush_many.assert_called_once_with([("bank", "key")])
+        flush.assert_called_once_with("other", key=None)
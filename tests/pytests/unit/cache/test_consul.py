@@ -0,0 +1,55 @@
+"""
+unit tests for the consul cache
+"""
+
+import base64
+
+import pytest
+
+import salt.cache.consul as consul_cache
+import salt.payload
+from tests.support.mock import MagicMock, patch
+
+
+@pytest.fixture
+def configure_loader_modules():
+    return {consul_cache: {}}
+
+
+def _kv(key, value):
+    return {"KV": {"Key": key, "Value": base64.b64encode(value).decode()}}
+
+
+def test_fetch_many_reads_only_the_requested_keys():
+    """
+    fetch_many reads the requested keys in transactions of at most _TXN_OPS
+    operations rather than the whole bank holding them
+    """
+    keys = [("minions/m{}".format(idx), "data") for idx in range(70)]
+
+    def txn_put(operations):
+        results = []
+        for operation in operations:
+            key = operation["KV"]["Key"]
+            assert operation["KV"]["Verb"] == "get-tree"
+            if key == "minions/m1/data":
+                # Missing key
+                continue
+            results.append(_kv(key, salt.payload.dumps({"id": key})))
+            results.append(
+                _kv(key + consul_cache._tstamp_suffix, salt.payload.dumps(1))
+            )
+        return {"Results": results, "Errors": None}
+
+    api = MagicMock()
+    api.txn.put.side_effect = txn_put
+    with patch.object(consul_cache, "api", api):
+        ret = consul_cache.fetch_many(keys)
+
+    assert api.txn.put.call_count == 2
+    assert len(api.txn.put.call_args_list[0][0][0]) == consul_cache._TXN_OPS
+    api.kv.get.assert_not_called()
+    assert ret[("minions/m1", "data")] == {}
+    assert ret[("minions/m0", "data")] == {"id": "minions/m0/data"}
+    assert ret[("minions/m69", "data")] == {"id": "minions/m69/data"}
+    assert len(ret) == 70
@@ -0,0 +1,118 @@
+"""
+Validate the functions in the localfs_packed cache
+"""
+import os
+
+import pytest
+
+import salt.cache.localfs_packed as localfs_packed
+import salt.payload
+import salt.utils.files
+import salt.utils.packstore
+from tests.support.mock import patch
+
+
+@pytest.fixture
+def configure_loader_modules():
+    return {localfs_packed: {}}
+
+
+@pytest.fixture
+def cachedir(tmp_path):
+    yield str(tmp_path)
+    salt.utils.packstore._STORES.clear()
+
+
+def _other_process(cachedir):
+    """
+    Return a store with its own index, as another process would have
+    """
+    return salt.utils.packstore.PackStore(os.path.join(cachedir, "packed"))
+
+
+def test_store_fetch(cachedir):
+    localfs_packed.store("minions/alpha", "data", {"grains": {"id": "alpha"}}, cachedir)
+    localfs_packed.store("minions/alpha", "mine", {"test.ping": True}, cachedir)
+    assert localfs_packed.fetch("minions/alpha", "data", cachedir) == {
+        "grains": {"id": "alpha"}
+    }
+    assert localfs_packed.fetch("minions/alpha", "missing", cachedir) == {}
+    assert localfs_packed.fetch("minions/beta", "data", cachedir) == {}
+    assert isinstance(localfs_packed.updated("minions/alpha", "data", cachedir), int)
+    assert localfs_packed.updated("minions/beta", "data", cachedir) is None
+
+    # Overwrite
+    localfs_packed.store("minions/alpha", "data", {"grains": {}}, cachedir)
+    assert localfs_packed.fetch("minions/alpha", "data", cachedir) == {"grains": {}}
+
+
+def test_list_contains_flush(cachedir):
+    localfs_packed.store_many(
+        {
+            ("minions/alpha", "data"): 1,
+            ("minions/alpha", "mine"): 2,
+            ("minions/beta", "data"): 3,
+            ("minions/beta/sub", "key"): 4,
+        },
+        cachedir,
+    )
+    assert localfs_packed.list_("minions", cachedir) == ["alpha", "beta"]
+    assert localfs_packed.list_("minions/beta", cachedir) == ["data", "sub"]
+    assert localfs_packed.list_("nothing", cachedir) == []
+    assert localfs_packed.contains("minions", None, cachedir)
+    assert localfs_packed.contains("minions/alpha", "mine", cachedir)
+    assert not localfs_packed.contains("minions/gamma", None, cachedir)
+
+    assert localfs_packed.flush("minions/alpha", "mine", cachedir)
+    assert not localfs_packed.flush("minions/alpha", "mine", cachedir)
+    assert localfs_packed.list_("minions/alpha", cachedir) == ["data"]
+    assert localfs_packed.flush("minions/beta", cachedir=cachedir)
+    assert localfs_packed.list_("minions", cachedir) == ["alpha"]
+    assert localfs_packed.flush("minions", cachedir=cachedir)
+    assert not localfs_packed.contains("minions", None, cachedir)
+
+
+def test_shared_between_processes(cachedir):
+    other = _other_process(cachedir)
+    localfs_packed.store("minions/alpha", "data", "first", cachedir)
+    assert other.list("minions") == ["alpha"]
+
+    # Changes made elsewhere are picked up
+    other.store_many({("minions/alpha", "data"): salt.payload.dumps("second")})
+    assert localfs_packed.fetch("minions/alpha", "data", cachedir) == "second"
+    other.delete_many([("minions/alpha", "data")])
+    assert localfs_packed.fetch("minions/alpha", "data", cachedir) == {}
+
+
+def test_torn_write(cachedir):
+    localfs_packed.store("minions/alpha", "data", "payload", cachedir)
+    _, shard = localfs_packed._store(cachedir).shard("minions/alpha")
+    with salt.utils.files.fopen(shard.segment, "ab") as fh_:
+        fh_.write(salt.utils.packstore._record(1, "minions/alpha", "data", b"x")[:-3])
+
+    # The incomplete record is ignored by readers and cut off by writers
+    other = _other_process(cachedir)
+    assert other.list("minions/alpha") == ["data"]
+    localfs_packed.store("minions/alpha", "mine", "more", cachedir)
+    assert localfs_packed.fetch("minions/alpha", "data", cachedir) == "payload"
+    assert salt.payload.loads(other.fetch("minions/alpha", "mine")[0]) == "more"
+
+
+def test_compact(cachedir):
+    other = _other_process(cachedir)
+    with patch("salt.utils.packstore.COMPACT_MIN_SIZE", 1024):
+        for idx in range(100):
+            localfs_packed.store(
+                "minions/alpha", "data", "x" * 100 + str(idx), cachedir
+            )
+            if idx == 10:
+                assert other.list("minions/alpha") == ["data"]
+    _, shard = localfs_packed._store(cachedir).shard("minions/alpha")
+    assert shard.gen > 1
+    assert sorted(os.listdir(shard.path)) == ["{}.seg".format(shard.gen), "lock"]
+    assert os.path.getsize(shard.segment) < 1024
+    assert localfs_packed.fetch("minions/alpha", "data", cachedir) == "x" * 100 + "99"
+    # Other processes follow the compaction
+    assert salt.payload.loads(other.fetch("minions/alpha", "data")[0]) == (
+        "x" * 100 + "99"
+    )
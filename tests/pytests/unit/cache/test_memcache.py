@@ -5,7 +5,7 @@ import pytest
 
 import salt.cache
 import salt.payload
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 
 @pytest.fixture
@@ -22,6 +22,9 @@ def opts():
 @pytest.fixture
 def cache(opts):
     salt.cache.MemCache.data = {}
+    salt.cache.MemCache.sizes = {}
+    salt.cache.MemCache.used = {}
+    salt.cache.MemCache.stats = {}
     return salt.cache.factory(opts)
 
 
@@ -163,6 +166,69 @@ def test_full_cleanup(cache):
             }
 
 
+def test_max_bytes(cache):
+    size = len(salt.payload.dumps("fake_data11"))
+    cache.max = 0
+    cache.max_bytes = size * 2
+    with patch("salt.cache.Cache.store"):
+        with patch("salt.loader.cache", return_value={}):
+            with patch("time.time", return_value=0):
+                cache.store("bank1", "key1", "fake_data11")
+            with patch("time.time", return_value=1):
+                cache.store("bank1", "key2", "fake_data12")
+            assert salt.cache.MemCache.used == {"fake_driver": size * 2}
+            # Put one more and check the least recently used was removed
+            with patch("time.time", return_value=2):
+                cache.store("bank2", "key1", "fake_data21")
+            assert salt.cache.MemCache.data["fake_driver"] == {
+                ("bank1", "key2"): [1, "fake_data12"],
+                ("bank2", "key1"): [2, "fake_data21"],
+            }
+            assert salt.cache.MemCache.used == {"fake_driver": size * 2}
+            # Values larger than the budget are not kept
+            cache.store("bank2", "key2", "x" * size * 2)
+            assert ("bank2", "key2") not in salt.cache.MemCache.data["fake_driver"]
+            assert salt.cache.MemCache.stats["fake_driver"]["bank1"]["evict"] == 1
+
+
+def test_stats(cache, tmp_path):
+    with patch("salt.cache.Cache.fetch", return_value="fake_data"):
+        with patch("salt.loader.cache", return_value={}):
+            with patch("time.time", return_value=0):
+                cache.fetch("minions/alpha", "data")
+                cache.fetch("minions/alpha", "data")
+                cache.fetch("minions/beta", "data")
+                cache.fetch("pillar", "key")
+            assert salt.cache.MemCache.stats == {
+                "fake_driver": {
+                    "minions": {"hit": 1, "miss": 2, "evict": 0},
+                    "pillar": {"hit": 0, "miss": 1, "evict": 0},
+                }
+            }
+
+    salt.cache.write_memcache_stats(str(tmp_path))
+    assert salt.cache.memcache_stats(str(tmp_path)) == {
+        "fake_driver": {
+            "minions": {
+                "hit": 1,
+                "miss": 2,
+                "evict": 0,
+                "items": 2,
+                "bytes": 0,
+                "hit_rate": 1 / 3,
+            },
+            "pillar": {
+                "hit": 0,
+                "miss": 1,
+                "evict": 0,
+                "items": 1,
+                "bytes": 0,
+                "hit_rate": 0.0,
+            },
+        }
+    }
+
+
 def test_fetch_debug(cache, opts):
     with patch("salt.cache.Cache.fetch", return_value="fake_data"):
         with patch("salt.loader.cache", return_value={}):
@@ -189,3 +255,28 @@ def test_fetch_debug(cache, opts):
             # Check debug data
             assert cache.call == 6
             assert cache.hit == 3
+
+
+def test_fetch_many(cache):
+    with patch(
+        "salt.cache.Cache.fetch_many",
+        side_effect=lambda keys: {pair: "data" for pair in keys},
+    ) as fetch_many_mock:
+        modules = {"fake_driver.fetch_many": MagicMock()}
+        with patch("salt.loader.cache", return_value=modules):
+            with patch("time.time", return_value=0):
+                cache.fetch_many([("bank", "key1")])
+            fetch_many_mock.assert_called_once_with([("bank", "key1")])
+            fetch_many_mock.reset_mock()
+
+            # Only the keys which are not kept in memory are fetched
+            with patch("time.time", return_value=1):
+                ret = cache.fetch_many([("bank", "key1"), ("bank", "key2")])
+            assert ret == {("bank", "key1"): "data", ("bank", "key2"): "data"}
+            fetch_many_mock.assert_called_once_with([("bank", "key2")])
+            assert salt.cache.MemCache.data == {
+                "fake_driver": {
+                    ("bank", "key1"): [1, "data"],
+                    ("bank", "key2"): [1, "data"],
+                }
+            }
@@ -1,4 +1,9 @@
+import os
+import pathlib
+import socket
+import stat
 import subprocess
+import tempfile
 import types
 
 import pytest
@@ -52,3 +57,81 @@ def test_ssh_shell_exec_cmd(caplog):
         ret = _shell.exec_cmd("ls {}".format(passwd))
         assert not any([x for x in ret if passwd in str(x)])
         assert passwd not in caplog.text
+
+
+@pytest.fixture
+def short_tmp_path():
+    """
+    A temporary directory short enough to hold unix sockets
+    """
+    with tempfile.TemporaryDirectory(dir="/tmp") as path:
+        yield pathlib.Path(path)
+
+
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_ssh_shell_control_path(short_tmp_path):
+    """
+    Test that ssh connections to the same host, user and port share a
+    ControlMaster socket in a private directory
+    """
+    tmp_path = short_tmp_path
+    opts = {"cachedir": str(tmp_path), "ssh_multiplex": True}
+    path = shell.control_path(opts, "web1", "root", "22")
+    assert os.path.dirname(path) == str(tmp_path / "ssh_control")
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+    assert shell.control_path(opts, "[web1]", "root", "22") == path
+    assert shell.control_path(opts, "web1", "root", "2222") != path
+    assert shell.control_path(opts, "web1", "admin", "22") != path
+    assert shell.control_path({"cachedir": str(tmp_path)}, "web1") is None
+
+    # Sockets of dead masters are removed
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.close()
+    assert os.path.exists(path)
+    assert shell.control_path(opts, "web1", "root", "22") == path
+    assert not os.path.exists(path)
+
+    os.chmod(os.path.dirname(path), 0o777)
+    assert shell.control_path(opts, "web1", "root", "22") is None
+
+
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_ssh_shell_control_dir_length(short_tmp_path):
+    """
+    Test that the control directory moves to the temporary directory when the
+    sockets and the temporary names ssh gives them would not fit in sun_path
+    """
+    # The socket name and the temporary suffix of ssh leave 60 characters
+    longest = str(short_tmp_path / ("d" * (60 - len(str(short_tmp_path)) - 1)))
+    assert len(longest) == 60
+    assert shell.control_dir({"ssh_control_path": longest}) == longest
+    too_long = longest + "d"
+    assert shell.control_dir({"ssh_control_path": too_long}) == os.path.join(
+        tempfile.gettempdir(), "salt-ssh-{}".format(os.getuid())
+    )
+
+
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_ssh_shell_cmd_str_multiplex(tmp_path):
+    """
+    Test that ssh and scp commands use the ControlMaster socket of the host
+    """
+    opts = {
+        "_ssh_version": (8, 0),
+        "cachedir": str(tmp_path),
+        "ssh_multiplex": True,
+        "ssh_control_persist": 30,
+    }
+    _shell = shell.Shell(opts=opts, host="web1", user="root", port="22", priv="key")
+    control_opts = (
+        "-o ControlMaster=auto -o ControlPath={} -o ControlPersist=30".format(
+            _shell.control_path
+        )
+    )
+    assert _shell._cmd_str("date").endswith(control_opts + " date")
+    assert _shell._cmd_str("a web1:b", ssh="scp").endswith(control_opts + " a web1:b")
+
+    opts["ssh_multiplex"] = False
+    _shell = shell.Shell(opts=opts, host="web1", user="root", port="22", priv="key")
+    assert "ControlPath" not in _shell._cmd_str("date")
@@ -1,3 +1,5 @@
+import time
+
 import pytest
 
 import salt.client.ssh.client
@@ -72,6 +74,8 @@ def roster():
         ("ssh_remote_port_forwards", "test", True),
         ("ssh_options", ["test1", "test2"], True),
         ("ssh_max_procs", 2, True),
+        ("ssh_engine", "asyncio", True),
+        ("ssh_async_max_conns", 2, True),
         ("ssh_askpass", True, True),
         ("ssh_key_deploy", True, True),
         ("ssh_update_roster", True, True),
@@ -81,6 +85,7 @@ def roster():
         ("ssh_keepalive", True, True),
         ("ssh_keepalive_interval", 30, True),
         ("ssh_keepalive_count_max", 3, True),
+        ("ssh_multiplex", True, True),
         ("ssh_log_file", "/tmp/test", True),
         ("raw_shell", True, True),
         ("refresh_cache", True, True),
@@ -452,3 +457,136 @@ def test_key_deploy_no_permission_denied(tmp_path, opts):
     ret = client.key_deploy(host, ssh_ret)
     assert ret == ssh_ret
     assert mock_key_run.call_count == 0
+
+
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_handle_ssh_asyncio(opts):
+    """
+    test the asyncio engine runs the commands of every target from the event
+    loop, at most ssh_async_max_conns at once, one routine at a time outside
+    of them, and yields the returns as they come in
+    """
+    opts["tgt"] = "*"
+    opts["ssh_engine"] = "asyncio"
+    opts["ssh_max_procs"] = 1
+    opts["ssh_async_max_conns"] = 3
+    roster = {
+        "host{}".format(idx): {"host": "10.0.0.{}".format(idx)} for idx in range(6)
+    }
+    in_routine = set()
+    routine_concurrency = []
+    running = set()
+    concurrency = []
+    run_cmd_async = salt.client.ssh.shell.Shell._run_cmd_async
+
+    async def _run_cmd_async(self, cmd):
+        running.add(self.host)
+        concurrency.append(len(running))
+        try:
+            return await run_cmd_async(self, cmd)
+        finally:
+            running.discard(self.host)
+
+    def _run_routine(_opts, host, target, mine=False):
+        in_routine.add(host)
+        routine_concurrency.append(len(in_routine))
+        shell = salt.client.ssh.shell.Shell(_opts, host=target["host"])
+        in_routine.discard(host)
+        stdout, _, retcode = shell.exec_cmd("")
+        in_routine.add(host)
+        routine_concurrency.append(len(in_routine))
+        in_routine.discard(host)
+        if host == "host3":
+            raise Exception("boom")
+        return {"id": host, "ret": {"return": stdout.strip(), "retcode": retcode}}
+
+    def _cmd_str(self, cmd, ssh="ssh"):
+        return "sh -c 'sleep 0.2; echo {}'".format(self.host)
+
+    with patch("salt.roster.get_roster_file", MagicMock(return_value="")), patch(
+        "salt.roster.Roster.targets", MagicMock(return_value=roster)
+    ):
+        client = ssh.SSH(opts)
+    with patch.object(client, "_run_routine", side_effect=_run_routine), patch(
+        "salt.client.ssh.shell.Shell._run_cmd_async", _run_cmd_async
+    ), patch("salt.client.ssh.shell.Shell._cmd_str", _cmd_str), patch(
+        "salt.client.ssh.shell.Shell._run_cmd_term", side_effect=AssertionError
+    ):
+        rets = {}
+        for ret in client.handle_ssh():
+            rets.update(ret)
+
+    assert set(rets) == set(roster)
+    assert rets["host0"] == {"return": "10.0.0.0", "retcode": 0}
+    assert "did not return any data" in rets["host3"]
+    # More hosts than ssh_max_procs, but not more than ssh_async_max_conns
+    assert max(concurrency) == 3
+    assert max(routine_concurrency) == 1
+    # Every session is released
+    for host in roster:
+        session = client.cache.fetch("salt-ssh/session", host)
+        assert session["running"] is False
+        assert session["pid"] == 0
+
+
+def test_handle_ssh_asyncio_terminal(opts):
+    """
+    test the asyncio engine runs the commands of targets needing a password
+    through a terminal
+    """
+    opts["tgt"] = "*"
+    opts["ssh_engine"] = "asyncio"
+    roster = {"host0": {"host": "10.0.0.1", "passwd": "secret"}}
+
+    def _run_routine(_opts, host, target, mine=False):
+        shell = salt.client.ssh.shell.Shell(
+            _opts, host=target["host"], passwd=target["passwd"]
+        )
+        return {"id": host, "ret": shell.exec_cmd("true")}
+
+    with patch("salt.roster.get_roster_file", MagicMock(return_value="")), patch(
+        "salt.roster.Roster.targets", MagicMock(return_value=roster)
+    ):
+        client = ssh.SSH(opts)
+    with patch.object(client, "_run_routine", side_effect=_run_routine), patch(
+        "salt.client.ssh.shell.Shell._run_cmd_term",
+        return_value=("out", "", 0),
+    ) as run_cmd_term, patch(
+        "salt.client.ssh.shell.Shell._run_cmd_async", side_effect=AssertionError
+    ):
+        rets = {}
+        for ret in client.handle_ssh():
+            rets.update(ret)
+    assert rets == {"host0": ("out", "", 0)}
+    run_cmd_term.assert_called_once()
+
+
+def test_handle_ssh_asyncio_busy_session(opts):
+    """
+    test the asyncio engine waits for hosts run by another salt-ssh session
+    """
+    opts["tgt"] = "*"
+    opts["ssh_engine"] = "asyncio"
+    roster = {"host0": {"host": "10.0.0.1"}, "host1": {"host": "10.0.0.2"}}
+
+    with patch("salt.roster.get_roster_file", MagicMock(return_value="")), patch(
+        "salt.roster.Roster.targets", MagicMock(return_value=roster)
+    ):
+        client = ssh.SSH(opts)
+    client.cache.store(
+        "salt-ssh/session",
+        "host1",
+        {"pid": 0, "master_id": client.master_id, "ts": time.time(), "running": False},
+    )
+    client.ssh_session_grace_time = 0.5
+    order = []
+
+    def _run_routine(_opts, host, target, mine=False):
+        return {"id": host, "ret": host}
+
+    with patch.object(client, "_run_routine", side_effect=_run_routine):
+        start = time.time()
+        for ret in client.handle_ssh():
+            order.extend(ret)
+    assert order == ["host0", "host1"]
+    assert time.time() - start >= 0.3
@@ -0,0 +1,81 @@
+import hashlib
+import io
+import tarfile
+
+import pytest
+
+import salt.client.ssh.ssh_py_shim as shim
+from tests.support.mock import patch
+
+pytestmark = [
+    pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh"),
+]
+
+
+def _layer(path, files):
+    with tarfile.open(str(path), "w:gz") as tfp:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tfp.addfile(info, io.BytesIO(data))
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@pytest.fixture
+def saltdir(tmp_path):
+    saltdir = tmp_path / "salt"
+    saltdir.mkdir(mode=0o700)
+    options = shim.OptionsContainer()
+    options.saltdir = str(saltdir)
+    options.delimiter = (
+        "_edbc7885e4f9aac9b83b35999b68d015148caf467b78fa39c05f669c0ff89878"
+    )
+    with patch.object(shim, "OPTIONS", options):
+        yield saltdir
+
+
+def test_check_layers(saltdir, capsys):
+    """
+    Test the shim asks for the missing thin layers only and unpacks the ones
+    which were sent
+    """
+    meta = _layer(saltdir.parent / "meta.tgz", {"salt-call": b"call"})
+    core = _layer(saltdir.parent / "salt.tgz", {"pyall/salt/__init__.py": b"#"})
+    shim.OPTIONS.layers = {"meta": meta, "salt": core}
+
+    with pytest.raises(SystemExit) as exc:
+        shim.check_layers()
+    assert exc.value.code == shim.EX_THIN_DEPLOY
+    out = capsys.readouterr().out.split()
+    assert out[1] == "layers"
+    assert sorted(out[2:]) == sorted([meta, core])
+
+    # Only the meta layer was sent
+    (saltdir.parent / "meta.tgz").rename(saltdir / "{}.tgz".format(meta))
+    with pytest.raises(SystemExit):
+        shim.check_layers()
+    assert capsys.readouterr().out.split()[2:] == [core]
+    assert (saltdir / "salt-call").read_bytes() == b"call"
+    assert not (saltdir / "{}.tgz".format(meta)).exists()
+
+    (saltdir.parent / "salt.tgz").rename(saltdir / "{}.tgz".format(core))
+    shim.check_layers()
+    assert (saltdir / "layers" / "salt" / "pyall" / "salt" / "__init__.py").exists()
+    assert (saltdir / "layers" / "salt.digest").read_text() == core
+
+    # Everything is in place
+    shim.check_layers()
+    assert capsys.readouterr().out == ""
+
+
+def test_check_layers_corrupted(saltdir, capsys):
+    """
+    Test a layer which does not match its digest is asked for again
+    """
+    core = _layer(saltdir.parent / "salt.tgz", {"pyall/salt/__init__.py": b"#"})
+    shim.OPTIONS.layers = {"salt": core}
+    (saltdir / "{}.tgz".format(core)).write_bytes(b"corrupted")
+    with pytest.raises(SystemExit):
+        shim.check_layers()
+    assert capsys.readouterr().out.split()[2:] == [core]
+    assert not (saltdir / "{}.tgz".format(core)).exists()
@@ -29,6 +29,7 @@ import salt.ext.tornado.ioloop
 import salt.fileserver.gitfs as gitfs
 import salt.utils.files
 import salt.utils.gitfs
+import salt.utils.hashutils
 import salt.utils.platform
 import salt.utils.win_functions
 import salt.utils.yaml
@@ -318,6 +319,56 @@ def test_find_and_serve_file_fallback(repo_dir):
         assert ret == {"data": data, "dest": "testfile"}
 
 
+@pytest.mark.slow_test
+def test_tree_index(unicode_filename, unicode_dirname):
+    """
+    Test that file lists and lookups are answered from the persisted tree
+    index without walking the tree again
+    """
+    gitfs.update()
+    ret = gitfs.file_list({"saltenv": "base"})
+    assert "testfile" in ret
+    index_dir = os.path.join(gitfs.__opts__["cachedir"], "gitfs", "tree_index")
+    assert any(fn.endswith(".p") for _, _, files in os.walk(index_dir) for fn in files)
+
+    # A new instance must be able to use the index written to disk
+    del salt.utils.gitfs.GitFS.instance_map[salt.ext.tornado.ioloop.IOLoop.current()]
+    repo = gitfs._gitfs().remotes[0]
+    with patch.object(
+        type(repo), "walk_tree", side_effect=Exception("tree walked")
+    ), patch.object(type(repo), "read_blob", side_effect=Exception("blob read")):
+        files, symlinks = repo.file_list("base")
+        assert "testfile" in files
+        assert "/".join((unicode_dirname, "foo.txt")) in files
+        assert symlinks == {}
+        dirs = repo.dir_list("base")
+        assert {"grail", unicode_dirname} <= dirs
+        blob_hexsha, mode = repo.find_blob("testfile", "base")
+        assert blob_hexsha is not None
+        assert mode is not None
+        assert repo.find_blob("grail", "base") == (None, None)
+        assert repo.find_blob("nonexistent", "base") == (None, None)
+
+
+@pytest.mark.slow_test
+def test_file_hash_shared_between_envs(tag_name):
+    """
+    Test that a blob reachable from several saltenvs is only hashed once
+    """
+    gitfs.update()
+    hashes = []
+    with patch.dict(gitfs.__opts__, {"hash_type": "sha256"}), patch(
+        "salt.utils.hashutils.get_hash",
+        side_effect=salt.utils.hashutils.get_hash,
+    ) as get_hash:
+        for saltenv in ("base", tag_name):
+            fnd = gitfs.find_file("testfile", tgt_env=saltenv)
+            load = {"saltenv": saltenv, "path": "testfile"}
+            hashes.append(gitfs.file_hash(load, fnd)["hsum"])
+    assert hashes[0] == hashes[1]
+    assert get_hash.call_count == 1
+
+
 @pytest.mark.slow_test
 def test_envs(unicode_dirname, tag_name):
     gitfs.update()
@@ -3,6 +3,7 @@
 """
 
 import copy
+import io
 import pathlib
 import shutil
 import sys
@@ -12,6 +13,7 @@ import pytest
 
 import salt.fileclient
 import salt.fileserver.roots as roots
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.platform
@@ -96,6 +98,36 @@ def test_serve_file(testfilepath):
         assert ret == {"data": data, "dest": "testfile"}
 
 
+def test_serve_file_delta(tmp_state_tree, tmp_path):
+    old = bytes(range(256)) * 64
+    new = old[:5000] + b"changed" + old[5000:]
+    (tmp_state_tree / "bigfile").write_bytes(new)
+    basis = tmp_path / "basis"
+    basis.write_bytes(old)
+    sigs = salt.utils.filedelta.signatures(str(basis), 2048)
+    load = {
+        "saltenv": "base",
+        "path": "bigfile",
+        "block_size": 2048,
+        "signatures": sigs,
+    }
+    fnd = {"path": str(tmp_state_tree / "bigfile"), "rel": "bigfile"}
+    ret = roots.serve_file_delta(load, fnd)
+    assert ret["hsum"] == salt.utils.hashutils.sha256_digest(new)
+    out = io.BytesIO()
+    received = salt.utils.filedelta.patch(str(basis), ret["ops"], 2048, out)
+    assert out.getvalue() == new
+    assert received < len(new) // 2
+
+
+def test_serve_file_delta_outside_root(tmp_path):
+    outside = tmp_path / "outside"
+    outside.write_bytes(b"secret")
+    load = {"saltenv": "base", "path": "outside", "block_size": 2048, "signatures": []}
+    fnd = {"path": str(outside), "rel": "outside"}
+    assert roots.serve_file_delta(load, fnd) == {}
+
+
 def test_envs(unicode_dirname):
     opts = {"file_roots": copy.copy(roots.__opts__["file_roots"])}
     opts["file_roots"][unicode_dirname] = opts["file_roots"]["base"]
@@ -75,3 +75,67 @@ def test_return_named_context_from_loaded_func(tmp_path):
     with pytest.helpers.temp_file("mymod.py", contents, directory=tmp_path):
         loader = salt.loader.LazyLoader([tmp_path], opts, pack={"__test__": "meh"})
         assert loader["mymod.foobar"]() == "meh"
+
+
+def test_grains_module_cache(minion_opts, tmp_path):
+    """
+    Grain modules listed in grains_module_cache only run when their cached
+    result is invalidated
+    """
+    counter = tmp_path / "counter"
+    watched = tmp_path / "watched"
+    watched.write_text("1")
+    grains_dir = tmp_path / "grains"
+    grains_dir.mkdir()
+    (grains_dir / "counted.py").write_text(
+        textwrap.dedent(
+            """
+            def counted():
+                path = {!r}
+                try:
+                    with open(path) as fp_:
+                        count = int(fp_.read())
+                except OSError:
+                    count = 0
+                with open(path, "w") as fp_:
+                    fp_.write(str(count + 1))
+                return {{"counted": count + 1}}
+
+            def depends(grains):
+                return {{"counted_twice": grains["counted"] * 2}}
+            """.format(
+                str(counter)
+            )
+        )
+    )
+    minion_opts["grains_dirs"] = [str(grains_dir)]
+    minion_opts["grains_module_cache"] = {
+        "counted.counted": {"ttl": 0, "watch": [str(watched)]}
+    }
+    minion_opts["grains_parallel"] = 4
+
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert grains["counted"] == 1
+    assert grains["counted_twice"] == 2
+    assert "saltversion" in grains
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert grains["counted"] == 1
+
+    # Without modules, as on every grains.setval, the cached results are kept
+    salt.loader.invalidate_grains_cache(minion_opts)
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert grains["counted"] == 1
+
+    salt.loader.invalidate_grains_cache(minion_opts, ["counted"])
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert grains["counted"] == 2
+    assert grains["counted_twice"] == 4
+
+    salt.loader.invalidate_grains_cache(minion_opts, ["*"])
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert grains["counted"] == 3
+
+    # Changes to a watched path invalidate the cached result
+    os.utime(str(watched), (0, 0))
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert grains["counted"] == 4
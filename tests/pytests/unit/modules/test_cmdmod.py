@@ -1112,3 +1112,83 @@ def test_prep_powershell_cmd():
             ret
             == '"powershell" -NonInteractive -NoProfile -ExecutionPolicy Bypass -Command $PSVersionTable'
         )
+
+
+@pytest.mark.skip_on_windows
+@pytest.mark.parametrize(
+    "name,python_shell,expected",
+    [
+        ("bash", True, "bash"),
+        ("dash", True, "dash"),
+        ("rbash", True, None),
+        ("csh", True, None),
+        ("fish", True, None),
+        ("rbash", False, "/bin/sh"),
+        ("csh", False, "/bin/sh"),
+    ],
+)
+def test_worker_shell_path(tmp_path, name, python_shell, expected):
+    """
+    Test that only POSIX shells which are not restricted run commands through
+    a worker shell, and that commands which are not run by a shell use /bin/sh
+    """
+    shell = tmp_path / name
+    shell.write_text("")
+    shell.chmod(0o755)
+    if expected and not os.path.isabs(expected):
+        expected = str(shell)
+    assert cmdmod._worker_shell_path(str(shell), python_shell) == expected
+    # Relative names are not resolved
+    assert cmdmod._worker_shell_path(name, True) is None
+
+
+@pytest.mark.skip_on_windows
+def test_run_all_worker_shell_fallback(tmp_path):
+    """
+    Test that commands for a shell the worker cannot use run on their own
+    """
+    shell = tmp_path / "csh"
+    shell.symlink_to("/bin/sh")
+    context = {}
+    with patch.dict(cmdmod.__opts__, {"cmd_worker_shell": True}), patch.object(
+        cmdmod, "__context__", context, create=True
+    ), patch("salt.modules.cmdmod._is_valid_shell", MagicMock(return_value=True)):
+        ret = cmdmod.run_all("echo hi", python_shell=True, shell=str(shell))
+        assert ret["stdout"] == "hi"
+        assert ret["retcode"] == 0
+        assert "cmd.worker_shells" not in context
+
+
+@pytest.mark.skip_on_windows
+def test_run_all_worker_shell(tmp_path):
+    """
+    Test that commands run through the worker shell of the job when
+    cmd_worker_shell is enabled
+    """
+    context = {}
+    with patch.dict(cmdmod.__opts__, {"cmd_worker_shell": True}), patch.object(
+        cmdmod, "__context__", context, create=True
+    ), patch(
+        "salt.utils.timed_subprocess.TimedProc", MagicMock(side_effect=AssertionError)
+    ):
+        try:
+            ret = cmdmod.run_all("echo out; echo err >&2; exit 2", python_shell=True)
+            assert ret["stdout"] == "out"
+            assert ret["stderr"] == "err"
+            assert ret["retcode"] == 2
+            assert cmdmod.run_stdout(["pwd"], cwd=str(tmp_path)) == str(tmp_path)
+            # Commands which are not run by a shell go through /bin/sh
+            shells = {cmdmod.DEFAULT_SHELL, "/bin/sh"}
+            assert {key[0] for key in context["cmd.worker_shells"]} == shells
+
+            # cmd.run and cmd.retcode merge stderr into stdout
+            assert cmdmod.run("echo out; echo err >&2", python_shell=True) == "out\nerr"
+            assert cmdmod.retcode("echo err >&2; exit 3", python_shell=True) == 3
+            assert len(context["cmd.worker_shells"]) == len(shells)
+
+            ret = cmdmod.run_all("sleep 10", python_shell=True, timeout=1)
+            assert "Timed out after 1 seconds" in ret["stdout"]
+            assert ret["retcode"] == 1
+        finally:
+            for worker in context.get("cmd.worker_shells", {}).values():
+                worker.stop()
@@ -7,6 +7,7 @@ import salt.modules.cmdmod as cmdmod
 import salt.modules.pkg_resource as pkg_resource
 import salt.modules.rpm_lowpkg as rpm
 import salt.modules.yumpkg as yumpkg
+import salt.utils.pkg
 import salt.utils.platform
 from salt.exceptions import CommandExecutionError, SaltInvocationError
 from tests.support.mock import MagicMock, Mock, call, mock_open, patch
@@ -196,6 +197,102 @@ def test_list_pkgs_no_context():
         list_pkgs_context_mock.reset_mock()
 
 
+def test_list_pkgs_snapshot(tmp_path):
+    """
+    Test that the package list is kept on disk until the rpm database changes
+    """
+
+    def _add_data(data, key, value):
+        data.setdefault(key, []).append(value)
+
+    rpmdb = tmp_path / "rpmdb.sqlite"
+    rpmdb.write_text("db")
+    cmd_mock = MagicMock(
+        return_value="yum_|-(none)_|-3.4.3_|-150.el7.centos_|-noarch_|-(none)_|-1487838479"
+    )
+    with patch.dict(yumpkg.__grains__, {"osarch": "x86_64"}), patch.dict(
+        yumpkg.__opts__, {"cachedir": str(tmp_path / "cache")}
+    ), patch.dict(
+        yumpkg.__salt__,
+        {
+            "cmd.run": cmd_mock,
+            "pkg_resource.add_pkg": _add_data,
+            "pkg_resource.format_pkg_list": pkg_resource.format_pkg_list,
+            "pkg_resource.stringify": MagicMock(),
+        },
+    ), patch.dict(
+        pkg_resource.__salt__, {"pkg.parse_arch": yumpkg.parse_arch}
+    ), patch(
+        "salt.utils.pkg.RPMDB_PATHS", (str(rpmdb),)
+    ):
+        expected = {"yum": ["3.4.3-150.el7.centos"]}
+        assert yumpkg.list_pkgs(versions_as_list=True, use_context=False) == expected
+        assert yumpkg.list_pkgs(versions_as_list=True, use_context=False) == expected
+        assert cmd_mock.call_count == 1
+
+        rpmdb.write_text("db changed")
+        assert yumpkg.list_pkgs(versions_as_list=True, use_context=False) == expected
+        assert cmd_mock.call_count == 2
+
+        with patch.dict(yumpkg.__opts__, {"pkg_snapshot_cache": False}):
+            yumpkg.list_pkgs(versions_as_list=True, use_context=False)
+        assert cmd_mock.call_count == 3
+
+
+def test_list_pkgs_snapshot_rpmdb_readers(tmp_path):
+    """
+    Test that the files rpm rewrites when only reading the database do not
+    invalidate the package list
+    """
+
+    def _add_data(data, key, value):
+        data.setdefault(key, []).append(value)
+
+    paths = tuple(
+        os.path.join(str(tmp_path), path) for path in salt.utils.pkg.RPMDB_PATHS
+    )
+    for dirname in ("var/lib/rpm", "usr/lib/sysimage/rpm"):
+        (tmp_path / dirname).mkdir(parents=True)
+    (tmp_path / "var/lib/rpm/Packages").write_text("bdb")
+    (tmp_path / "usr/lib/sysimage/rpm/rpmdb.sqlite").write_text("db")
+    readers = [
+        tmp_path / "var/lib/rpm/__db.001",
+        tmp_path / "var/lib/rpm/.rpm.lock",
+        tmp_path / "usr/lib/sysimage/rpm/rpmdb.sqlite-shm",
+        tmp_path / "usr/lib/sysimage/rpm/.rpm.lock",
+    ]
+    for path in readers:
+        path.write_text("")
+    cmd_mock = MagicMock(
+        return_value="yum_|-(none)_|-3.4.3_|-150.el7.centos_|-noarch_|-(none)_|-1487838479"
+    )
+    with patch.dict(yumpkg.__grains__, {"osarch": "x86_64"}), patch.dict(
+        yumpkg.__opts__, {"cachedir": str(tmp_path / "cache")}
+    ), patch.dict(
+        yumpkg.__salt__,
+        {
+            "cmd.run": cmd_mock,
+            "pkg_resource.add_pkg": _add_data,
+            "pkg_resource.format_pkg_list": pkg_resource.format_pkg_list,
+            "pkg_resource.stringify": MagicMock(),
+        },
+    ), patch.dict(
+        pkg_resource.__salt__, {"pkg.parse_arch": yumpkg.parse_arch}
+    ), patch(
+        "salt.utils.pkg.RPMDB_PATHS", paths
+    ):
+        yumpkg.list_pkgs(use_context=False)
+        # rpm -qa touched the region, shared memory and lock files
+        for path in readers:
+            path.write_text("rewritten by a reader")
+        yumpkg.list_pkgs(use_context=False)
+        assert cmd_mock.call_count == 1
+
+        (tmp_path / "usr/lib/sysimage/rpm/rpmdb.sqlite-wal").write_text("txn")
+        yumpkg.list_pkgs(use_context=False)
+        assert cmd_mock.call_count == 2
+
+
 def test_list_pkgs_with_attr():
     """
     Test packages listing with the attr parameter
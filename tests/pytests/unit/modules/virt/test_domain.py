@@ -2352,3 +2352,75 @@ def test_gen_xml_spice():
     assert "listen" not in root.find("devices/graphics").attrib
     assert root.find("devices/graphics/listen").attrib["type"] == "none"
     assert "address" not in root.find("devices/graphics/listen").attrib
+
+
+def test_vm_stats_bulk(make_mock_vm):
+    """
+    Test that the vm_* functions use the statistics collected in bulk
+    """
+    vm_def = """<domain type='kvm' id='7'>
+      <name>my_vm</name>
+      <uuid>28deee33-4859-4f23-891c-ee239cffec94</uuid>
+      <on_reboot>restart</on_reboot>
+    </domain>
+    """
+    domain_mock = make_mock_vm(vm_def, running=True)
+    stats = {
+        "state.state": 1,
+        "balloon.maximum": 2048 * 1024,
+        "balloon.current": 1024 * 1024,
+        "vcpu.current": 2,
+        "cpu.time": 4000000000,
+        "net.count": 2,
+        "net.0.rx.bytes": 100,
+        "net.0.tx.bytes": 10,
+        "net.1.rx.bytes": 50,
+        "net.1.rx.pkts": 3,
+        "block.count": 1,
+        "block.0.rd.reqs": 4,
+        "block.0.wr.bytes": 512,
+    }
+    mocked_conn = virt.libvirt.openAuth.return_value
+    mocked_conn.getAllDomainStats.return_value = [(domain_mock, stats)]
+    mocked_conn.domainListGetStats.return_value = [(domain_mock, stats)]
+    mocked_conn.getInfo.return_value = ["x86_64", 4096, 4, 2712, 1, 2, 4, 2]
+
+    assert virt.vm_state() == {"my_vm": "running"}
+    assert virt.vm_state("my_vm") == {"my_vm": "running"}
+    mocked_conn.domainListGetStats.assert_called_once()
+    assert virt.vm_cputime() == {
+        "my_vm": {"cputime": 4000000000, "cputime_percent": 50}
+    }
+    assert virt.vm_netstats()["my_vm"] == {
+        "rx_bytes": 150,
+        "rx_packets": 3,
+        "rx_errs": 0,
+        "rx_drop": 0,
+        "tx_bytes": 10,
+        "tx_packets": 0,
+        "tx_errs": 0,
+        "tx_drop": 0,
+    }
+    assert virt.vm_diskstats()["my_vm"] == {
+        "rd_req": 4,
+        "rd_bytes": 0,
+        "wr_req": 0,
+        "wr_bytes": 512,
+        "errs": -1,
+    }
+    info = virt.vm_info()["my_vm"]
+    assert info["state"] == "running"
+    assert info["cpu"] == 2
+    assert info["mem"] == 1024 * 1024
+    assert info["on_reboot"] == "restart"
+    assert info["uuid"] == "28deee33-4859-4f23-891c-ee239cffec94"
+    domain_mock.info.assert_not_called()
+    domain_mock.interfaceStats.assert_not_called()
+    domain_mock.blockStats.assert_not_called()
+
+    # Fall back to the per domain calls if the driver can't collect the stats
+    mocked_conn.getAllDomainStats.side_effect = virt.libvirt.libvirtError(
+        "not supported"
+    )
+    assert virt.vm_state() == {"my_vm": "running"}
+    domain_mock.info.assert_called_once()
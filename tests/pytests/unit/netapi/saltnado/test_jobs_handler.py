@@ -0,0 +1,110 @@
+import pytest
+
+import salt.ext.tornado.gen
+import salt.netapi.rest_tornado.saltnado as saltnado_app
+import salt.utils.json
+from tests.support.mock import MagicMock, patch
+
+
+@pytest.fixture
+def arg_mock():
+    mock = MagicMock()
+    mock.opts = {
+        "syndic_wait": 0.1,
+        "cachedir": "/tmp/testing/cachedir",
+        "sock_dir": "/tmp/testing/sock_drawer",
+        "transport": "zeromq",
+        "extension_modules": "/tmp/testing/moduuuuules",
+        "order_masters": False,
+        "gather_job_timeout": 10.001,
+    }
+    return mock
+
+
+async def _get(arg_mock, ret, query, jid=None, content_type="application/json"):
+    """
+    Run a GET on the jobs handler whose runner returns ``ret``, return the
+    lowstate and the chunks of the response flushed to the client
+    """
+    handler = saltnado_app.JobsSaltAPIHandler(arg_mock, arg_mock)
+    handler.content_type = content_type
+    handler.dumper = dict(handler.ct_out_map)[content_type]
+    chunks = [""]
+
+    def write(chunk):
+        chunks[-1] += chunk
+
+    def flush():
+        chunks.append("")
+        future = salt.ext.tornado.gen.Future()
+        future.set_result(None)
+        return future
+
+    def disbatch_lowstate():
+        future = salt.ext.tornado.gen.Future()
+        future.set_result(ret)
+        return future
+
+    with patch.object(handler, "_verify_auth", return_value=True), patch.object(
+        handler, "get_query_argument", lambda name, default: query.get(name, default)
+    ), patch.object(handler, "write", write), patch.object(
+        handler, "flush", flush
+    ), patch.object(
+        handler, "finish"
+    ), patch.object(
+        handler, "_disbatch_lowstate", disbatch_lowstate
+    ), patch.object(
+        saltnado_app, "JOB_STREAM_CHUNK_SIZE", 2
+    ):
+        await handler.get(jid)
+    return handler.lowstate, chunks
+
+
+async def test_list_jobs_paginated(arg_mock):
+    jobs = {"20160524035600000000": {}, "20160524035524895387": {}}
+    lowstate, chunks = await _get(arg_mock, [jobs], {"limit": "2", "cursor": "2017"})
+    assert lowstate == [
+        {"fun": "jobs.list_jobs", "client": "runner", "limit": 2, "cursor": "2017"}
+    ]
+    assert salt.utils.json.loads("".join(chunks)) == {
+        "return": [jobs],
+        "next_cursor": "20160524035524895387",
+    }
+
+    # The last page
+    _, chunks = await _get(arg_mock, [jobs], {"limit": "3"})
+    assert salt.utils.json.loads("".join(chunks))["next_cursor"] is None
+
+
+async def test_list_job_streamed(arg_mock):
+    job = {
+        "jid": "20160524035600000000",
+        "Function": "test.ping",
+        "Result": {"minion{}".format(idx): {"return": True} for idx in range(5)},
+    }
+    lowstate, chunks = await _get(arg_mock, [dict(job)], {}, jid="20160524035600000000")
+    assert lowstate == [
+        {"fun": "jobs.list_job", "jid": "20160524035600000000", "client": "runner"}
+    ]
+    # The results of the minions were flushed two by two
+    assert len(chunks) == 3
+    assert salt.utils.json.loads("".join(chunks)) == {"return": [job]}
+
+    _, chunks = await _get(
+        arg_mock, [dict(job)], {"limit": "5"}, jid="20160524035600000000"
+    )
+    assert salt.utils.json.loads("".join(chunks)) == {
+        "return": [job],
+        "next_cursor": "minion4",
+    }
+
+    # Only JSON is streamed
+    _, chunks = await _get(
+        arg_mock,
+        [dict(job)],
+        {},
+        jid="20160524035600000000",
+        content_type="application/x-yaml",
+    )
+    assert len(chunks) == 1
+    assert salt.utils.yaml.safe_load(chunks[0]) == {"return": [job]}
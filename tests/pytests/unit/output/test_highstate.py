@@ -917,3 +917,37 @@ def test_nested_output():
     assert "              Succeeded: 2 (changed=1)" in ret
     assert "              Failed:    0" in ret
     assert "              Total states run:     2" in ret
+
+
+def test_checks_memoized_summary_output():
+    data = {
+        "local": {
+            "cmd_|-first_|-true_|-run": {
+                "name": "true",
+                "changes": {},
+                "result": True,
+                "comment": "onlyif condition is false",
+                "__sls__": "test",
+                "__run_num__": 0,
+                "__id__": "first",
+            },
+            "cmd_|-second_|-true_|-run": {
+                "name": "true",
+                "changes": {},
+                "result": True,
+                "comment": "onlyif condition is false",
+                "__sls__": "test",
+                "__run_num__": 1,
+                "__id__": "second",
+                "__checks_memoized__": 2,
+            },
+        }
+    }
+
+    actual_output = highstate.output(data)
+    assert "Checks memoized: 2" in actual_output
+    assert "Total states run:           2" in actual_output
+
+    del data["local"]["cmd_|-second_|-true_|-run"]["__checks_memoized__"]
+    actual_output = highstate.output(data)
+    assert "Checks memoized" not in actual_output
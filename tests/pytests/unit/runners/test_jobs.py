@@ -69,3 +69,58 @@ def test_list_jobs_with_search_target():
         assert jobs.list_jobs(search_target="node-1-2.com") == returns["node-1-2.com"]
 
         assert jobs.list_jobs(search_target="non-existant") == returns["non-existant"]
+
+
+def test_list_jobs_paginated():
+    """
+    test jobs.list_jobs runner with the limit and cursor args
+    """
+    mock_jobs_cache = {
+        "20160524035503086853": {"Function": "test.ping"},
+        "20160524035524895387": {"Function": "test.ping"},
+        "20160524035600000000": {"Function": "test.ping"},
+    }
+
+    class MockMasterMinion:
+
+        returners = {"local_cache.get_jids": lambda: mock_jobs_cache}
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    with patch.object(salt.minion, "MasterMinion", MockMasterMinion):
+        assert list(jobs.list_jobs(limit=2)) == [
+            "20160524035600000000",
+            "20160524035524895387",
+        ]
+        assert list(jobs.list_jobs(limit=2, cursor="20160524035524895387")) == [
+            "20160524035503086853"
+        ]
+        assert jobs.list_jobs(cursor="20160524035503086853") == {}
+
+
+def test_list_job_paginated():
+    """
+    test jobs.list_job runner with the limit and cursor args
+    """
+
+    class MockMasterMinion:
+
+        returners = {
+            "local_cache.get_load": lambda jid: {"fun": "test.ping"},
+            "local_cache.get_jid": lambda jid: {
+                "minion3": {"return": True},
+                "minion1": {"return": True},
+                "minion2": {"return": True},
+            },
+        }
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    with patch.object(salt.minion, "MasterMinion", MockMasterMinion):
+        ret = jobs.list_job("20160524035503086853", limit=2)
+        assert list(ret["Result"]) == ["minion1", "minion2"]
+        assert ret["Function"] == "test.ping"
+        ret = jobs.list_job("20160524035503086853", limit=2, cursor="minion2")
+        assert list(ret["Result"]) == ["minion3"]
@@ -301,3 +301,33 @@ def test_set_leader():
                 get_master_key.retun_value = MagicMock(retun_value="master_key")
                 ret = reactor.set_leader()
                 assert ret
+
+
+def test_stats():
+    """
+    test reactor.stats runner
+    """
+    with pytest.raises(CommandExecutionError) as excinfo:
+        ret = reactor.stats()
+    assert excinfo.value.error == "Reactor system is not running."
+
+    mock_opts = {}
+    mock_opts["engines"] = [
+        {
+            "reactor": {
+                "refresh_interval": 60,
+                "worker_threads": 10,
+                "worker_hwm": 10000,
+            }
+        }
+    ]
+
+    stats = {"events": 2, "reactions": 2, "dispatch": {"dropped": 0}}
+    event_returns = {"stats": stats, "_stamp": "2020-09-04T18:32:10.004490"}
+
+    with patch.dict(reactor.__opts__, mock_opts):
+        with patch.object(SaltEvent, "get_event", return_value=event_returns):
+            with patch("salt.utils.master.get_master_key") as get_master_key:
+                get_master_key.retun_value = MagicMock(retun_value="master_key")
+                ret = reactor.stats()
+                assert ret == stats
@@ -1045,6 +1045,89 @@ def test_mod_aggregate(minion_opts):
             assert low_ret["pkgs"] == ["figlet", "sl"]
 
 
+def test_mod_plan(minion_opts):
+    """
+    Test that the planned states run in a single transaction and get their
+    part of its changes
+    """
+
+    def _chunk(name, order, **kwargs):
+        chunk = {
+            "state": "plan",
+            "name": name,
+            "__sls__": "plan",
+            "__env__": "base",
+            "__id__": name,
+            "order": order,
+            "fun": "installed",
+        }
+        chunk.update(kwargs)
+        return chunk
+
+    chunks = [
+        _chunk("vim", 10000),
+        {
+            "state": "other",
+            "name": "foo",
+            "__sls__": "plan",
+            "__env__": "base",
+            "__id__": "foo",
+            "order": 10001,
+            "fun": "configured",
+        },
+        _chunk("tmux", 10002),
+        _chunk("figlet", 10003, require=[{"other": "foo"}]),
+    ]
+    calls = []
+
+    def installed(name, pkgs=None, **kwargs):
+        calls.append(pkgs or [name])
+        return {
+            "name": name,
+            "result": True,
+            "changes": {pkg: {"old": "", "new": "1.0"} for pkg in pkgs or [name]},
+            "comment": "",
+        }
+
+    def mod_plan(low, chunks, ready):
+        members = {salt.state._gen_tag(low): [low["name"]]}
+        for chunk in chunks:
+            if salt.state._gen_tag(chunk) in ready:
+                members[salt.state._gen_tag(chunk)] = [chunk["name"]]
+        return dict(low, pkgs=[names[0] for names in members.values()]), members
+
+    def configured(name, **kwargs):
+        return {"name": name, "result": True, "changes": {}, "comment": ""}
+
+    minion_opts["state_plan"] = True
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        with patch.dict(
+            state_obj.states,
+            {
+                "plan.installed": installed,
+                "plan.mod_plan": mod_plan,
+                "other.configured": configured,
+            },
+        ):
+            ret = state_obj.call_chunks(chunks)
+
+    # figlet waits for its requisite
+    assert calls == [["vim", "tmux"], ["figlet"]]
+    assert ret["plan_|-vim_|-vim_|-installed"]["changes"] == {
+        "vim": {"old": "", "new": "1.0"}
+    }
+    assert ret["plan_|-tmux_|-tmux_|-installed"]["changes"] == {
+        "tmux": {"old": "", "new": "1.0"}
+    }
+    assert ret["plan_|-tmux_|-tmux_|-installed"]["result"] is True
+    assert ret["plan_|-figlet_|-figlet_|-installed"]["changes"] == {
+        "figlet": {"old": "", "new": "1.0"}
+    }
+    run_nums = [ret[tag]["__run_num__"] for tag in ret]
+    assert len(set(run_nums)) == len(run_nums)
+
+
 def test_verify_onlyif_cmd_opts_exclude(minion_opts):
     """
     Verify cmd.run state arguments are properly excluded from cmd.retcode
@@ -1090,3 +1173,61 @@ def test_verify_onlyif_cmd_opts_exclude(minion_opts):
                 timeout=5,
                 success_retcodes=1,
             )
+
+
+def test_state_check_memo(minion_opts):
+    """
+    Test that identical onlyif and unless checks run once until a state
+    reports changes
+    """
+
+    def _chunk(name, order, **kwargs):
+        chunk = {
+            "state": "memo",
+            "name": name,
+            "__sls__": "memo",
+            "__env__": "base",
+            "__id__": name,
+            "order": order,
+            "fun": "configured",
+            "onlyif": "test -e /etc/motd",
+            "cwd": "/tmp",
+        }
+        chunk.update(kwargs)
+        return chunk
+
+    chunks = [
+        _chunk("first", 10000),
+        _chunk("second", 10001),
+        _chunk("third", 10002, cwd="/"),
+        _chunk("changed", 10003, onlyif=[{"fun": "test.true"}]),
+        _chunk("fourth", 10004, onlyif=[{"fun": "test.true"}]),
+        _chunk("fifth", 10005),
+    ]
+
+    def configured(name, **kwargs):
+        changes = {"changed": True} if name == "changed" else {}
+        return {"name": name, "result": True, "changes": changes, "comment": ""}
+
+    minion_opts["state_check_memo"] = True
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        retcode = MagicMock(return_value=0)
+        true = MagicMock(return_value=True)
+        with patch.dict(
+            state_obj.functions, {"cmd.retcode": retcode, "test.true": true}
+        ), patch.dict(state_obj.states, {"memo.configured": configured}):
+            ret = state_obj.call_chunks(chunks)
+
+    # first, third and fifth run the command, fifth after the changes
+    assert retcode.call_count == 3
+    assert [call.kwargs["cwd"] for call in retcode.call_args_list] == [
+        "/tmp",
+        "/",
+        "/tmp",
+    ]
+    # The function check is not reused across the changes of its own state
+    assert true.call_count == 2
+    assert ret["memo_|-second_|-second_|-configured"]["__checks_memoized__"] == 1
+    assert "__checks_memoized__" not in ret["memo_|-fifth_|-fifth_|-configured"]
+    assert all(state_ret["result"] is True for state_ret in ret.values())
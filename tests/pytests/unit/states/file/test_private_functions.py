@@ -6,10 +6,12 @@ import pytest
 import salt.modules.file as filemod
 import salt.states.file as filestate
 import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.json
 import salt.utils.platform
 import salt.utils.win_functions
 import salt.utils.yaml
+from tests.support.mock import MagicMock, patch
 
 log = logging.getLogger(__name__)
 
@@ -95,3 +97,73 @@ def test__check_directory(tmp_path):
         recurse=["mode"],
     )
     assert changed_files == set(ret[-1].keys())
+
+
+def test__report_transfer_stats():
+    stats = {
+        "size": 1000,
+        "bytes_received": 100,
+        "bytes_saved": 900,
+        "duration": 0.5,
+    }
+    context = {"cp.transfer_stats": {"/cache/files/base/big": stats}}
+    ret = {"name": "/big", "changes": {}, "result": True, "comment": "updated"}
+    with patch.dict(filestate.__context__, context):
+        filestate._report_transfer_stats(ret, "/cache/files/base/big", None)
+        assert ret["transfer"] == stats
+        assert ret["comment"].startswith("updated\n")
+        assert "900 bytes saved" in ret["comment"]
+        # The stats are only reported once
+        assert not filestate.__context__["cp.transfer_stats"]
+
+
+@pytest.mark.skip_on_windows(reason="Symlinks need privileges on windows")
+def test__depth_limited_walk(tmp_path):
+    for path in ("a/b/c", "d"):
+        (tmp_path / path).mkdir(parents=True)
+    (tmp_path / "file").write_text("")
+    (tmp_path / "a" / "b" / "file").write_text("")
+    (tmp_path / "link").symlink_to(tmp_path / "a")
+
+    walk = {
+        root: (sorted(dirs), files)
+        for root, dirs, files in filestate._depth_limited_walk(str(tmp_path))
+    }
+    # Like os.walk, symlinks to directories are not followed
+    assert walk == {
+        str(tmp_path): (["a", "d", "link"], ["file"]),
+        str(tmp_path / "a"): (["b"], []),
+        str(tmp_path / "a" / "b"): (["c"], ["file"]),
+        str(tmp_path / "a" / "b" / "c"): ([], []),
+        str(tmp_path / "d"): ([], []),
+    }
+    walk = list(filestate._depth_limited_walk(str(tmp_path), max_depth=1))
+    assert sorted(root for root, _, _ in walk) == [
+        str(tmp_path),
+        str(tmp_path / "a"),
+        str(tmp_path / "d"),
+    ]
+    assert [dirs for root, dirs, _ in walk if root == str(tmp_path / "a")] == [[]]
+
+
+def test__changed_recurse_sources(tmp_path):
+    (tmp_path / "same").write_text("same")
+    (tmp_path / "changed").write_text("old")
+    mng_files = [
+        (str(tmp_path / name), "salt://dir/{}".format(name))
+        for name in ("same", "changed", "new", "missing")
+    ]
+    sums = [
+        {"hsum": salt.utils.hashutils.sha256_digest(data), "hash_type": "sha256"}
+        for data in ("same", "new", "new")
+    ] + [{}]
+    hash_files = MagicMock(return_value=sums)
+    with patch.dict(
+        filestate.__salt__,
+        {"cp.hash_files": hash_files, "file.get_hash": filemod.get_hash},
+    ):
+        assert filestate._changed_recurse_sources(mng_files, "base", 4) == [
+            "salt://dir/changed",
+            "salt://dir/new",
+        ]
+    hash_files.assert_called_once_with([src for _, src in mng_files], "base", workers=4)
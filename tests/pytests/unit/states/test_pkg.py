@@ -551,6 +551,53 @@ def test_mod_aggregate():
     assert res == expected
 
 
+def test_mod_plan():
+    """
+    Test to mod_plan function
+    """
+
+    def _chunk(name, fun="installed", state="pkg", **kwargs):
+        chunk = {
+            "state": state,
+            "name": name,
+            "__sls__": "plan",
+            "__env__": "base",
+            "__id__": name,
+            "fun": fun,
+        }
+        chunk.update(kwargs)
+        return chunk
+
+    low = _chunk("vim")
+    chunks = [
+        _chunk("tmux", version="3.2"),
+        _chunk("other_pkgs", pkgs=["byobu", {"bc": "1.07"}]),
+        _chunk("held", hold=True),
+        _chunk("fromrepo", fromrepo="epel"),
+        _chunk("removed", fun="removed"),
+        _chunk("not-ready"),
+        _chunk("again", pkgs=["vim"]),
+        _chunk("repo", state="pkgrepo", fun="managed"),
+        _chunk("after-repo"),
+    ]
+    ready = {
+        state_utils.gen_tag(chunk) for chunk in chunks if chunk["name"] != "not-ready"
+    }
+
+    merged, members = pkg.mod_plan(low, chunks, ready)
+    assert merged["name"] == "vim"
+    assert merged["pkgs"] == ["vim", {"tmux": "3.2"}, "byobu", {"bc": "1.07"}]
+    assert members == {
+        "pkg_|-vim_|-vim_|-installed": ["vim"],
+        "pkg_|-tmux_|-tmux_|-installed": ["tmux"],
+        "pkg_|-other_pkgs_|-other_pkgs_|-installed": ["byobu", "bc"],
+    }
+
+    # Nothing to merge with
+    assert pkg.mod_plan(_chunk("held", hold=True), chunks, ready) is None
+    assert pkg.mod_plan(_chunk("removed", fun="removed"), chunks, ready) is None
+
+
 def test_installed_with_changes_test_true(list_pkgs):
     """
     Test pkg.installed with simulated changes
@@ -3,8 +3,11 @@ unit tests for the beacon_module parameter
 """
 
 import logging
+import os
 
 import salt.beacons
+import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
 from tests.support.mock import MagicMock, call, patch
 
 log = logging.getLogger(__name__)
@@ -104,3 +107,101 @@ def test_beacon_module(minion_opts):
         }
     ]
     assert ret == _expected
+
+
+def test_beacon_event_driven(minion_opts):
+    """
+    Test that beacons implementing watch are registered on the IOLoop once
+    and fire their events as they happen
+    """
+    minion_opts["id"] = "minion"
+    minion_opts["__role"] = "minion"
+    minion_opts["beacons"] = {"watch_pipe": [{"beacon_module": "fake"}]}
+    rfd, wfd = os.pipe()
+    io_loop = salt.ext.tornado.ioloop.IOLoop()
+    fire = MagicMock()
+    closed = []
+
+    def _watch(config, watcher):
+        def _read():
+            data = os.read(rfd, 1024).decode()
+            watcher.emit([{"tag": "read", "data": data}])
+
+        watcher.add_fd(rfd, _read)
+        watcher.add_closer(lambda: closed.append(config))
+
+    try:
+        beacon = salt.beacons.Beacon(minion_opts, [], io_loop=io_loop, fire=fire)
+        watch_mock = MagicMock(side_effect=_watch)
+        beacon.beacons["fake.watch"] = watch_mock
+        beacon.beacons["fake.beacon"] = MagicMock()
+        for _ in range(3):
+            assert beacon.process(minion_opts["beacons"], minion_opts["grains"]) == []
+        assert watch_mock.call_count == 1
+        assert beacon.beacons["fake.beacon"].call_count == 0
+
+        os.write(wfd, b"hello")
+        io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.2))
+        fire.assert_called_once_with(
+            [
+                {
+                    "tag": "salt/beacon/minion/watch_pipe/read",
+                    "data": {"data": "hello", "id": "minion"},
+                    "beacon_name": "fake",
+                }
+            ]
+        )
+        assert beacon.stats["watch_pipe"]["events"] == 1
+        assert beacon.stats["watch_pipe"]["calls"] == 2
+
+        # Changing the configuration restarts the watch
+        minion_opts["beacons"]["watch_pipe"].append({"foo": "bar"})
+        beacon.process(minion_opts["beacons"], minion_opts["grains"])
+        assert watch_mock.call_count == 2
+        assert len(closed) == 1
+
+        # Removing the beacon stops the watch
+        beacon.process({}, minion_opts["grains"])
+        assert not beacon.watchers
+        assert len(closed) == 2
+        os.write(wfd, b"ignored")
+        io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.2))
+        assert fire.call_count == 1
+    finally:
+        io_loop.close()
+        os.close(rfd)
+        os.close(wfd)
+
+
+def test_beacon_event_driven_disabled(minion_opts):
+    """
+    Test that beacons are polled when there is no IOLoop or event-driven
+    beacons are disabled
+    """
+    minion_opts["id"] = "minion"
+    minion_opts["__role"] = "minion"
+    minion_opts["beacons"] = {"watch_pipe": [{"beacon_module": "fake"}]}
+    io_loop = salt.ext.tornado.ioloop.IOLoop()
+    try:
+        for kwargs, event_driven in (
+            ({}, True),
+            ({"io_loop": io_loop, "fire": MagicMock()}, False),
+        ):
+            minion_opts["beacons_event_driven"] = event_driven
+            beacon = salt.beacons.Beacon(minion_opts, [], **kwargs)
+            beacon.beacons["fake.watch"] = MagicMock()
+            beacon_mock = MagicMock(return_value=[{"tag": "polled"}])
+            beacon_mock.__globals__ = {}
+            beacon.beacons["fake.beacon"] = beacon_mock
+            ret = beacon.process(minion_opts["beacons"], minion_opts["grains"])
+            assert ret == [
+                {
+                    "tag": "salt/beacon/minion/watch_pipe/polled",
+                    "data": {"id": "minion"},
+                    "beacon_name": "fake",
+                }
+            ]
+            assert beacon.beacons["fake.watch"].call_count == 0
+            assert beacon.stats["watch_pipe"]["calls"] == 1
+    finally:
+        io_loop.close()
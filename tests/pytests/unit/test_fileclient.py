@@ -1,4 +1,13 @@
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+import salt.ext.tornado.gen
 import salt.fileclient
+import salt.utils.filedelta
+import salt.utils.files
 from tests.support.mock import patch
 
 
@@ -46,3 +55,220 @@ def test_fileclient_context_manager_closes(temp_salt_minion, temp_salt_master):
 
         assert client._closing
         assert client.channel.close.called
+
+
+class FakeFileChannel:
+    """
+    Serve files from a dict, counting the chunks sent
+    """
+
+    def __init__(self, files, buffer_size=4):
+        self.files = files
+        self.buffer_size = buffer_size
+        self.served = 0
+        self.delta_requests = 0
+
+    def close(self):
+        return True
+
+    def send(self, load, raw=False):
+        data = self.files.get(load.get("saltenv"), {}).get(load.get("path"))
+        if load["cmd"] == "_file_hash":
+            if data is None:
+                return ""
+            return {"hsum": hashlib.sha256(data).hexdigest(), "hash_type": "sha256"}
+        if load["cmd"] == "_file_find":
+            if data is None:
+                return {"path": "", "rel": ""}
+            stat = [0o100644, 0, 0, 1, 0, 0, len(data), 0, 0, 0]
+            return {"path": load["path"], "rel": load["path"], "stat": stat}
+        if load["cmd"] == "_serve_file_delta":
+            self.delta_requests += 1
+            with tempfile.NamedTemporaryFile() as fp_:
+                fp_.write(data)
+                fp_.flush()
+                ops = salt.utils.filedelta.delta(
+                    fp_.name,
+                    load["signatures"],
+                    load["block_size"],
+                    basis_size=load["size"],
+                )
+            return {"ops": ops} if ops is not None else {}
+        if load["cmd"] == "_serve_file":
+            self.served += 1
+            if data is None:
+                return {"data": "", "dest": ""}
+            chunk = data[load["loc"] : load["loc"] + self.buffer_size]
+            return {"data": chunk, "dest": load["path"]}
+        raise ValueError(load["cmd"])
+
+
+@pytest.fixture
+def blob_client(tmp_path):
+    opts = {
+        "cachedir": str(tmp_path / "cache"),
+        "extension_modules": "",
+        "hash_type": "sha256",
+        "file_cache_blobstore": True,
+    }
+    channel = FakeFileChannel(
+        {
+            "base": {"big.tar": b"0123456789" * 3},
+            "dev": {"other/big.tar": b"0123456789" * 3},
+        }
+    )
+    with patch("salt.channel.client.ReqChannel.factory", return_value=channel):
+        client = salt.fileclient.RemoteClient(opts)
+    return client
+
+
+def test_get_file_blobstore_dedups_across_saltenvs(blob_client):
+    base = blob_client.get_file("salt://big.tar", saltenv="base")
+    served = blob_client.channel.served
+    assert served > 0
+    dev = blob_client.get_file("salt://other/big.tar", saltenv="dev")
+    assert blob_client.channel.served == served
+    assert os.path.samefile(base, dev)
+
+
+def test_get_file_blobstore_skips_local_hash(blob_client):
+    cached = blob_client.get_file("salt://big.tar", saltenv="base")
+    with patch("salt.utils.hashutils.get_hash") as get_hash:
+        assert blob_client.get_file("salt://big.tar", saltenv="base") == cached
+    get_hash.assert_not_called()
+
+
+def test_get_file_blobstore_empty_file_keeps_blob(blob_client):
+    base = blob_client.get_file("salt://big.tar", saltenv="base")
+    dev = blob_client.get_file("salt://other/big.tar", saltenv="dev")
+    assert os.path.samefile(base, dev)
+
+    # The file becomes empty on the master, the shared blob is not truncated
+    blob_client.channel.files["base"]["big.tar"] = b""
+    assert blob_client.get_file("salt://big.tar", saltenv="base") == base
+    assert os.path.getsize(base) == 0
+    with salt.utils.files.fopen(dev, "rb") as fp_:
+        assert fp_.read() == b"0123456789" * 3
+
+
+def test_get_file_blobstore_copies_to_explicit_dest(blob_client, tmp_path):
+    cached = blob_client.get_file("salt://big.tar", saltenv="base")
+    served = blob_client.channel.served
+    dest = str(tmp_path / "out.tar")
+    assert blob_client.get_file("salt://big.tar", dest=dest) == dest
+    assert blob_client.channel.served == served
+    assert not os.path.samefile(cached, dest)
+    with salt.utils.files.fopen(dest, "rb") as fp_:
+        assert fp_.read() == b"0123456789" * 3
+
+
+class FakeAsyncFileChannel:
+    """
+    Answer requests from a FakeFileChannel, replying to later chunks first
+    """
+
+    def __init__(self, channel, corrupt_loc=None):
+        self.channel = channel
+        self.corrupt_loc = corrupt_loc
+        self.closed = False
+
+    @salt.ext.tornado.gen.coroutine
+    def send(self, load, raw=False):
+        yield salt.ext.tornado.gen.sleep(0.001 * (100 - load["loc"]))
+        ret = self.channel.send(load, raw=raw)
+        if load["loc"] == self.corrupt_loc:
+            ret["data"] = b"X" * len(ret["data"])
+        raise salt.ext.tornado.gen.Return(ret)
+
+    def close(self):
+        self.closed = True
+
+
+def test_get_file_pipelined(blob_client, tmp_path):
+    blob_client.opts["file_transfer_window"] = 3
+    async_channels = []
+
+    def _factory(opts, **kwargs):
+        async_channels.append(FakeAsyncFileChannel(blob_client.channel))
+        return async_channels[-1]
+
+    dest = str(tmp_path / "out.tar")
+    with patch("salt.channel.client.AsyncReqChannel.factory", _factory):
+        assert blob_client.get_file("salt://big.tar", dest=dest) == dest
+    with salt.utils.files.fopen(dest, "rb") as fp_:
+        assert fp_.read() == b"0123456789" * 3
+    assert blob_client.channel.served == 8
+    assert len(async_channels) == 3
+    assert all(channel.closed for channel in async_channels)
+
+
+def test_get_file_pipelined_falls_back_on_bad_hash(blob_client, tmp_path):
+    blob_client.opts["file_transfer_window"] = 3
+
+    def _factory(opts, **kwargs):
+        return FakeAsyncFileChannel(blob_client.channel, corrupt_loc=8)
+
+    dest = str(tmp_path / "out.tar")
+    with patch("salt.channel.client.AsyncReqChannel.factory", _factory):
+        assert blob_client.get_file("salt://big.tar", dest=dest) == dest
+    with salt.utils.files.fopen(dest, "rb") as fp_:
+        assert fp_.read() == b"0123456789" * 3
+
+
+def test_get_file_delta(tmp_path):
+    old = bytes(range(256)) * 64
+    new = old[:5000] + b"changed" + old[5000:]
+    opts = {
+        "cachedir": str(tmp_path / "cache"),
+        "extension_modules": "",
+        "hash_type": "sha256",
+        "file_delta_threshold": 4096,
+    }
+    channel = FakeFileChannel({"base": {"bigfile": old}}, buffer_size=4096)
+    with patch("salt.channel.client.ReqChannel.factory", return_value=channel):
+        client = salt.fileclient.RemoteClient(opts)
+    cached = client.get_file("salt://bigfile")
+    assert channel.delta_requests == 0
+    served = channel.served
+
+    channel.files["base"]["bigfile"] = new
+    assert client.get_file("salt://bigfile") == cached
+    assert channel.delta_requests == 1
+    assert channel.served == served
+    with salt.utils.files.fopen(cached, "rb") as fp_:
+        assert fp_.read() == new
+    stats = client.transfer_stats[cached]
+    assert stats["size"] == len(new)
+    assert stats["bytes_saved"] == len(new) - stats["bytes_received"]
+    assert stats["bytes_received"] < len(new) // 2
+
+
+def test_cache_files_workers(tmp_path):
+    opts = {
+        "cachedir": str(tmp_path / "cache"),
+        "extension_modules": "",
+        "hash_type": "sha256",
+    }
+    files = {"dir/{}".format(idx): str(idx).encode() * 10 for idx in range(8)}
+    channel = FakeFileChannel({"base": files})
+    paths = ["salt://{}".format(path) for path in sorted(files)]
+    with patch("salt.channel.client.ReqChannel.factory", return_value=channel):
+        client = salt.fileclient.RemoteClient(opts)
+        ret = client.cache_files(paths, "base", workers=3)
+        assert len(ret) == len(paths)
+        for path, cached in zip(sorted(files), ret):
+            with salt.utils.files.fopen(cached, "rb") as fp_:
+                assert fp_.read() == files[path]
+
+        # Unchanged files are not transferred again
+        served = channel.served
+        assert client.cache_files(paths, "base", workers=3) == ret
+        assert channel.served == served
+
+        sums = client.hash_files(paths + ["salt://missing"], "base", workers=3)
+        assert sums[:-1] == [
+            {"hsum": hashlib.sha256(files[path]).hexdigest(), "hash_type": "sha256"}
+            for path in sorted(files)
+        ]
+        assert not sums[-1]
+        assert channel.served == served
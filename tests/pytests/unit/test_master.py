@@ -5,6 +5,7 @@ import pytest
 
 import salt.master
 import salt.utils.platform
+import salt.utils.syndic
 from tests.support.mock import MagicMock, patch
 
 
@@ -163,6 +164,60 @@ def test_when_syndic_return_processes_load_then_correct_values_should_be_returne
         fake_return.assert_called_with(expected_return)
 
 
+def test_syndic_return_compressed(encrypted_requests):
+    """
+    Test returns forwarded by a syndic as a compressed batch are processed
+    """
+    loads = [
+        {
+            "id": "syndic",
+            "jid": "20221107162714826470",
+            "fun": "test.ping",
+            "return": {"minion": {"return": True}},
+        }
+    ]
+
+    def payload(id_="syndic", blob=None):
+        return {
+            "cmd": "_syndic_return",
+            "id": id_,
+            "tok": b"tok",
+            "load_zlib": blob or salt.utils.syndic.compress(loads),
+        }
+
+    encrypted_requests.opts["syndic_compressed_ids"] = ["syndic"]
+    with patch.object(
+        encrypted_requests, "_return", autospec=True
+    ) as fake_return, patch.object(
+        encrypted_requests, "_AESFuncs__verify_minion", return_value=True
+    ) as verify_minion:
+        encrypted_requests._syndic_return(payload())
+        fake_return.assert_called_once_with(
+            {
+                "jid": "20221107162714826470",
+                "id": "minion",
+                "return": True,
+                "fun": "test.ping",
+            }
+        )
+        fake_return.reset_mock()
+        # Garbage is ignored
+        encrypted_requests._syndic_return(payload(blob=b"x"))
+        fake_return.assert_not_called()
+        # Compressed batches are only accepted from the listed syndics
+        encrypted_requests._syndic_return(payload(id_="minion"))
+        fake_return.assert_not_called()
+        # and only when the sender is who it says it is
+        verify_minion.return_value = False
+        encrypted_requests._syndic_return(payload())
+        fake_return.assert_not_called()
+        verify_minion.return_value = True
+        # A batch inflating past the limit is refused
+        with patch("salt.utils.syndic.MAX_DECOMPRESSED_SIZE", 10):
+            encrypted_requests._syndic_return(payload())
+        fake_return.assert_not_called()
+
+
 def test_mworker_pass_context():
     """
     Test of passing the __context__ to pillar ext module loader
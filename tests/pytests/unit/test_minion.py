@@ -4,7 +4,9 @@ import os
 
 import pytest
 
+import salt.config
 import salt.ext.tornado
+import salt.ext.tornado.concurrent
 import salt.ext.tornado.gen
 import salt.ext.tornado.testing
 import salt.minion
@@ -89,6 +91,7 @@ def test_send_req_tries(req_channel, minion_opts):
 
             assert rtn == 30
 
+
 def test_mine_send_tries(minion_opts):
     channel_enter = MagicMock()
     channel_enter.send.side_effect = lambda load, timeout, tries: tries
@@ -1045,3 +1048,109 @@ async def test_master_type_disable(minion_opts):
         assert minion.connected is False
     finally:
         minion.destroy()
+
+
+def test_syndic_forward_batches(minion_opts, tmp_path):
+    """
+    Tests the syndic forwards the returns of its minions in bounded batches,
+    and spools them when its master does not keep up
+    """
+    for key, value in salt.config.DEFAULT_MASTER_OPTS.items():
+        if key.startswith("syndic_"):
+            minion_opts.setdefault(key, value)
+    minion_opts.update(
+        {
+            "master": "master1",
+            "master_job_cache": "local_cache",
+            "syndic_forward_batch_size": 3,
+            "syndic_forward_queue_hwm": 8,
+            "syndic_forward_compress": True,
+            "syndic_jid_forward_cache_hwm": 2,
+        }
+    )
+    syndic = MagicMock()
+    syndic_future = salt.ext.tornado.concurrent.Future()
+    syndic_future.set_result(syndic)
+    with patch("salt.minion.MasterMinion"):
+        manager = salt.minion.SyndicManager(minion_opts, io_loop=MagicMock())
+    manager._syndics = {"master1": syndic_future}
+    manager.local = MagicMock()
+    manager.mminion.returners = {"local_cache.get_load": lambda jid: {"jid": jid}}
+
+    def _return(jid, minion):
+        data = {"jid": jid, "id": minion, "return": True, "fun": "test.ping"}
+        manager.local.event.unpack.return_value = (
+            "salt/job/{}/ret/{}".format(jid, minion),
+            data,
+        )
+        manager._process_event(b"")
+
+    futures = []
+
+    def _return_pub_multi(*args, **kwargs):
+        futures.append(salt.ext.tornado.concurrent.Future())
+        return futures[-1]
+
+    syndic._return_pub_multi.side_effect = _return_pub_multi
+    syndic.reconnect.return_value = syndic_future
+
+    jid = "20230101000000000000"
+    for minion in ("a", "b", "c", "d"):
+        _return(jid, minion)
+    # A full batch is forwarded without waiting for the next interval
+    manager.io_loop.add_callback.assert_called_once_with(manager._forward_events)
+    assert manager.pending_returns == 4
+    manager._forward_events()
+    args, kwargs = syndic._return_pub_multi.call_args
+    assert kwargs["compress"] is True
+    batch = [
+        {
+            "__fun__": "test.ping",
+            "__jid__": jid,
+            "__load__": {"jid": jid} if minion == "a" else {},
+            minion: {"return": True},
+        }
+        for minion in ("a", "b", "c")
+    ]
+    assert args[0] == batch
+    assert manager.pending_returns == 1
+    # The returns are only counted as forwarded once the master took them
+    assert manager.get_forward_stats()["returns_forwarded"] == 0
+
+    # The master fails to take them, they are queued again without being
+    # counted as forwarded
+    futures[0].set_exception(Exception("master down"))
+    manager._forward_events()
+    stats = manager.get_forward_stats()
+    assert stats["returns_forwarded"] == 0
+    assert stats["batches"] == 0
+    assert manager.pending_returns == 4
+
+    # They are sent again
+    manager._forward_events()
+    assert syndic._return_pub_multi.call_count == 2
+    assert syndic._return_pub_multi.call_args[0][0] == batch
+    assert manager.pending_returns == 1
+
+    # The master is still busy with the batch, past the high water mark the
+    # returns are spooled
+    manager._forward_events()
+    assert syndic._return_pub_multi.call_count == 2
+    for idx in range(8):
+        _return(jid, "minion{}".format(idx))
+    stats = manager.get_forward_stats()
+    assert stats["pending_returns"] == 0
+    assert stats["returns_spooled"] == 9
+    assert stats["spooled_batches"] == 1
+
+    # The master took the batch, the returns are counted once
+    futures[1].set_result(True)
+    stats = manager.get_forward_stats()
+    assert stats["returns_forwarded"] == 3
+    assert stats["batches"] == 1
+
+    # The spooled returns are forwarded once the master is available
+    manager._forward_events()
+    assert syndic._return_pub_multi.call_count == 3
+    assert manager.get_forward_stats()["pending_returns"] == 6
+    assert manager.spooled == 0
@@ -0,0 +1,114 @@
+"""
+Tests for the min-heap which lets Schedule.eval skip the jobs which are not
+due
+"""
+
+import datetime
+import logging
+import time
+
+import pytest
+
+from tests.support.mock import patch
+
+log = logging.getLogger(__name__)
+
+
+def _interval_job(seconds=3600):
+    return {"function": "test.ping", "seconds": seconds, "dry_run": True}
+
+
+def test_eval_skips_jobs_not_due(schedule):
+    """
+    A job is only evaluated again once its next fire time has come
+    """
+    schedule.opts.update({"schedule": {"job1": _interval_job()}, "pillar": {}})
+    start = datetime.datetime(2023, 1, 1, 12, 0, 0)
+    schedule.eval(now=start)
+    assert schedule.job_status("job1")["_next_fire_time"] == start + (
+        datetime.timedelta(seconds=3600)
+    )
+
+    with patch.object(
+        schedule, "_set_wakeup", wraps=schedule._set_wakeup
+    ) as set_wakeup:
+        schedule.eval(now=start + datetime.timedelta(seconds=60))
+        set_wakeup.assert_not_called()
+
+        run_time = start + datetime.timedelta(seconds=3600)
+        schedule.eval(now=run_time)
+        assert set_wakeup.call_count == 1
+    status = schedule.job_status("job1")
+    assert status["_last_run"] == run_time
+    assert status["_next_fire_time"] == run_time + datetime.timedelta(seconds=3600)
+
+
+def test_eval_reevaluates_changed_jobs(schedule):
+    """
+    Jobs changed through the Schedule API or replaced in the opts are
+    evaluated on the next run, as well as all jobs when time goes backwards
+    """
+    schedule.opts.update(
+        {"schedule": {"job1": _interval_job(), "job2": _interval_job()}, "pillar": {}}
+    )
+    start = datetime.datetime(2023, 1, 1, 12, 0, 0)
+    schedule.eval(now=start)
+
+    with patch.object(
+        schedule, "_set_wakeup", wraps=schedule._set_wakeup
+    ) as set_wakeup:
+        schedule.modify_job("job1", _interval_job(60), persist=False)
+        schedule.eval(now=start + datetime.timedelta(seconds=1))
+        assert [x.args[0] for x in set_wakeup.call_args_list] == ["job1"]
+
+        set_wakeup.reset_mock()
+        schedule.opts["schedule"]["job2"] = _interval_job(30)
+        schedule.eval(now=start + datetime.timedelta(seconds=2))
+        assert [x.args[0] for x in set_wakeup.call_args_list] == ["job2"]
+
+        set_wakeup.reset_mock()
+        schedule.eval(now=start)
+        assert set_wakeup.call_count == 2
+
+
+def test_eval_disabled_job_not_due(schedule):
+    """
+    A disabled job which is not due is still reported as skipped
+    """
+    job = _interval_job()
+    job["enabled"] = False
+    schedule.opts.update({"schedule": {"job1": job}, "pillar": {}})
+    start = datetime.datetime(2023, 1, 1, 12, 0, 0)
+    schedule.eval(now=start)
+    later = start + datetime.timedelta(seconds=60)
+    schedule.eval(now=later)
+    status = schedule.job_status("job1")
+    assert status["_skipped"] is True
+    assert status["_skip_reason"] == "disabled"
+    assert status["_skipped_time"] == later
+
+
+@pytest.mark.slow_test
+def test_eval_benchmark_10k_jobs(schedule):
+    """
+    Evaluating a schedule of 10k jobs none of which is due must be much
+    cheaper than evaluating all of them
+    """
+    jobs = {
+        "job{}".format(idx): _interval_job(3600 + idx % 600) for idx in range(10000)
+    }
+    schedule.opts.update({"schedule": jobs, "pillar": {}})
+    start = datetime.datetime(2023, 1, 1, 12, 0, 0)
+
+    begin = time.perf_counter()
+    schedule.eval(now=start)
+    full = time.perf_counter() - begin
+
+    idle = []
+    for offset in range(1, 11):
+        begin = time.perf_counter()
+        schedule.eval(now=start + datetime.timedelta(seconds=offset))
+        idle.append(time.perf_counter() - begin)
+    idle = min(idle)
+    log.info("Schedule eval of 10k jobs: first %.4fs, not due %.4fs", full, idle)
+    assert idle * 2 < full
@@ -0,0 +1,90 @@
+"""
+Unit tests for salt.utils.blobstore
+"""
+import hashlib
+import os
+import time
+
+import pytest
+
+import salt.utils.blobstore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return salt.utils.blobstore.BlobStore(str(tmp_path / "blobs"))
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path), hashlib.sha256(data).hexdigest()
+
+
+def test_path_rejects_invalid_keys(store):
+    assert store.path("../../etc/passwd", "sha256") is None
+    assert store.path("abc", "sha256") is None
+    assert store.path("0123456789abcdef", "sha/256") is None
+    assert store.path(None, "sha256") is None
+    assert store.path("0123456789ABCDEF", "SHA256").endswith(
+        os.path.join("sha256", "01", "0123456789abcdef")
+    )
+
+
+def test_add_and_materialize_links(store, tmp_path):
+    src, hsum = _write(tmp_path / "files" / "base" / "foo", b"content")
+    blob = store.add(src, hsum, "sha256")
+    assert os.path.samefile(blob, src)
+    assert store.contains(hsum, "sha256")
+    assert store.is_linked(src, hsum, "sha256")
+
+    dest = str(tmp_path / "files" / "dev" / "foo")
+    os.makedirs(os.path.dirname(dest))
+    assert store.materialize(hsum, "sha256", dest) == dest
+    assert store.is_linked(dest, hsum, "sha256")
+
+
+def test_materialize_copy(store, tmp_path):
+    src, hsum = _write(tmp_path / "src", b"content")
+    store.add(src, hsum, "sha256")
+    dest = str(tmp_path / "dest")
+    store.materialize(hsum, "sha256", dest, link=False)
+    assert not store.is_linked(dest, hsum, "sha256")
+    with open(dest, "rb") as fp_:
+        assert fp_.read() == b"content"
+
+
+def test_materialize_missing_blob(store, tmp_path):
+    assert store.materialize("0123456789abcdef", "sha256", str(tmp_path / "x")) is None
+    assert not (tmp_path / "x").exists()
+
+
+def test_gc_removes_only_unlinked_blobs(store, tmp_path):
+    old, old_hsum = _write(tmp_path / "old", b"a" * 100)
+    new, new_hsum = _write(tmp_path / "new", b"b" * 100)
+    linked, linked_hsum = _write(tmp_path / "linked", b"c" * 100)
+    for src, hsum in ((old, old_hsum), (new, new_hsum), (linked, linked_hsum)):
+        store.add(src, hsum, "sha256")
+    os.remove(old)
+    os.remove(new)
+    past = time.time() - 3600
+    os.utime(store.path(old_hsum, "sha256"), (past, past))
+
+    removed = store.gc(200)
+    assert removed == [store.path(old_hsum, "sha256")]
+    assert store.contains(new_hsum, "sha256")
+    assert store.contains(linked_hsum, "sha256")
+    assert store.size() == 200
+
+    # The remaining linked blob is kept even when over budget
+    store.gc(50)
+    assert not store.contains(new_hsum, "sha256")
+    assert store.contains(linked_hsum, "sha256")
+
+
+def test_gc_unlimited(store, tmp_path):
+    src, hsum = _write(tmp_path / "src", b"content")
+    store.add(src, hsum, "sha256")
+    os.remove(src)
+    assert store.gc() == []
+    assert store.contains(hsum, "sha256")
@@ -0,0 +1,107 @@
+"""
+Tests for salt.utils.digestcache
+"""
+import os
+import time
+
+import pytest
+
+import salt.payload
+import salt.utils.digestcache
+import salt.utils.files
+import salt.utils.hashutils
+from tests.support.mock import patch
+
+
+@pytest.fixture
+def cachedir(tmp_path):
+    yield str(tmp_path / "cache")
+    salt.utils.digestcache._CACHES.clear()
+
+
+@pytest.fixture
+def old_file(tmp_path):
+    path = str(tmp_path / "file")
+    with salt.utils.files.fopen(path, "w") as fh_:
+        fh_.write("first")
+    # Out of the racy window
+    past = time.time() - 60
+    os.utime(path, (past, past))
+    return path
+
+
+def test_get_hash(cachedir, old_file):
+    expected = salt.utils.hashutils.get_hash(old_file)
+    assert salt.utils.digestcache.get_hash(cachedir, old_file) == expected
+    # The sums are written in batches
+    assert not os.path.exists(os.path.join(cachedir, "file_digests"))
+    salt.utils.digestcache.flush()
+    assert os.listdir(os.path.join(cachedir, "file_digests"))
+
+    # Unchanged files are not read again, even by another process
+    salt.utils.digestcache._CACHES.clear()
+    with patch(
+        "salt.utils.hashutils.get_hash", wraps=salt.utils.hashutils.get_hash
+    ) as get_hash:
+        assert salt.utils.digestcache.get_hash(cachedir, old_file) == expected
+        get_hash.assert_not_called()
+        # Other hash types are computed
+        salt.utils.digestcache.get_hash(cachedir, old_file, "md5")
+        get_hash.assert_called_once()
+
+    # The stat of modified files changes
+    with salt.utils.files.fopen(old_file, "w") as fh_:
+        fh_.write("second")
+    assert salt.utils.digestcache.get_hash(
+        cachedir, old_file
+    ) == salt.utils.hashutils.get_hash(old_file)
+
+
+def test_get_hash_racy(cachedir, tmp_path):
+    path = str(tmp_path / "new")
+    with salt.utils.files.fopen(path, "w") as fh_:
+        fh_.write("new")
+    salt.utils.digestcache.get_hash(cachedir, path)
+    # Just written files are not remembered
+    assert not os.path.exists(os.path.join(cachedir, "file_digests"))
+    with pytest.raises(FileNotFoundError):
+        salt.utils.digestcache.get_hash(cachedir, str(tmp_path / "missing"))
+
+
+def test_flush(cachedir, tmp_path):
+    paths = []
+    for idx in range(5):
+        path = str(tmp_path / "file{}".format(idx))
+        with salt.utils.files.fopen(path, "w") as fh_:
+            fh_.write(str(idx))
+        past = time.time() - 60
+        os.utime(path, (past, past))
+        paths.append(path)
+    other = salt.utils.digestcache.DigestCache(os.path.join(cachedir, "file_digests"))
+    cache = salt.utils.digestcache.get_cache(cachedir)
+    with patch("salt.utils.digestcache.FLUSH_ENTRIES", 3), patch(
+        "salt.payload.dump", wraps=salt.payload.dump
+    ) as dump:
+        # Another process stores a sum in the meantime
+        other.get_hash(paths[4])
+        other.flush()
+        dump.reset_mock()
+        for path in paths[:2]:
+            cache.get_hash(path)
+        dump.assert_not_called()
+        cache.get_hash(paths[2])
+        # All the waiting sums are written at once
+        assert dump.call_count == len({cache._shard(path)[0] for path in paths[:3]})
+        dump.reset_mock()
+        cache.get_hash(paths[3])
+        dump.assert_not_called()
+        salt.utils.digestcache.flush()
+        dump.assert_called_once()
+
+    salt.utils.digestcache._CACHES.clear()
+    with patch("salt.utils.hashutils.get_hash") as get_hash:
+        for path in paths:
+            assert salt.utils.digestcache.get_hash(
+                cachedir, path
+            ) == salt.utils.hashutils.sha256_digest(str(paths.index(path)))
+        get_hash.assert_not_called()
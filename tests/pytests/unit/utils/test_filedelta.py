@@ -0,0 +1,91 @@
+"""
+Unit tests for salt.utils.filedelta
+"""
+import io
+import random
+
+import pytest
+
+import salt.utils.filedelta
+from tests.support.mock import patch
+
+
+@pytest.fixture
+def old_data():
+    rand = random.Random(42)
+    return bytes(rand.getrandbits(8) for _ in range(100000))
+
+
+def _roundtrip(tmp_path, old, new, bsize=2048):
+    basis = tmp_path / "basis"
+    basis.write_bytes(old)
+    target = tmp_path / "target"
+    target.write_bytes(new)
+    sigs = salt.utils.filedelta.signatures(str(basis), bsize)
+    ops = salt.utils.filedelta.delta(str(target), sigs, bsize, basis_size=len(old))
+    assert ops is not None
+    out = io.BytesIO()
+    received = salt.utils.filedelta.patch(str(basis), ops, bsize, out)
+    assert out.getvalue() == new
+    return received
+
+
+def test_block_size():
+    assert salt.utils.filedelta.block_size(0) == 2048
+    assert salt.utils.filedelta.block_size(100 * 1024 * 1024) == 10240
+    assert salt.utils.filedelta.block_size(1 << 40) == 131072
+
+
+def test_delta_identical(tmp_path, old_data):
+    assert _roundtrip(tmp_path, old_data, old_data) == 0
+
+
+def test_delta_insert_and_delete(tmp_path, old_data):
+    new = old_data[:1000] + b"inserted" + old_data[1000:50000] + old_data[50100:]
+    received = _roundtrip(tmp_path, old_data, new)
+    assert received < 2 * 2048 + 8
+
+
+def test_delta_append(tmp_path, old_data):
+    assert _roundtrip(tmp_path, old_data, old_data + b"appended") == 8
+
+
+def test_delta_empty_target(tmp_path, old_data):
+    assert _roundtrip(tmp_path, old_data, b"") == 0
+
+
+def test_delta_too_much_literal(tmp_path, old_data):
+    basis = tmp_path / "basis"
+    basis.write_bytes(old_data)
+    target = tmp_path / "target"
+    target.write_bytes(bytes(reversed(old_data)))
+    sigs = salt.utils.filedelta.signatures(str(basis), 2048)
+    assert salt.utils.filedelta.delta(str(target), sigs, 2048) is None
+
+
+def test_delta_invalid_block_size(tmp_path):
+    target = tmp_path / "target"
+    target.write_bytes(b"data")
+    with pytest.raises(ValueError):
+        salt.utils.filedelta.delta(str(target), [], 1)
+
+
+def test_delta_limits(tmp_path, old_data):
+    basis = tmp_path / "basis"
+    basis.write_bytes(old_data)
+    target = tmp_path / "target"
+    target.write_bytes(b"x" * 1000 + old_data)
+    sigs = salt.utils.filedelta.signatures(str(basis), 2048)
+    ops = salt.utils.filedelta.delta(
+        str(target), sigs, 2048, basis_size=len(old_data), max_size=200000
+    )
+    assert salt.utils.filedelta.literal_size(ops) == 1000
+
+    # Too large for the master
+    assert salt.utils.filedelta.delta(str(target), sigs, 2048, max_size=1000) is None
+
+    # Too slow
+    with patch("salt.utils.filedelta._TIME_CHECK_INTERVAL", 1), patch(
+        "time.monotonic", side_effect=[0, 0, 20]
+    ):
+        assert salt.utils.filedelta.delta(str(target), sigs, 2048) is None
@@ -1,4 +1,5 @@
 import os
+import threading
 import time
 
 import pytest
@@ -260,3 +261,80 @@ def test_checkout_pygit2_with_home_env_unset(_prepare_provider):
 )
 def test_get_cachedir_basename_pygit2(_prepare_provider):
     assert "_" == _prepare_provider.get_cache_basename()
+
+
+def _fake_remote(tmp_path, id_, fetch):
+    work_dir = tmp_path / "work" / id_ / "_"
+    work_dir.mkdir(parents=True)
+    repo = MagicMock()
+    repo.id = id_
+    repo.name = None
+    repo.get_salt_working_dir.return_value = str(work_dir)
+    repo.get_cache_basename.return_value = "_"
+    repo.fetch.side_effect = fetch
+    return repo
+
+
+@pytest.fixture
+def gitfs_nofetch(tmp_path, minion_opts):
+    with patch.object(
+        salt.utils.gitfs.GitFS, "verify_provider", MagicMock(return_value=None)
+    ):
+        gitfs = salt.utils.gitfs.GitFS(minion_opts, [], init_remotes=False)
+    gitfs.role = "gitfs"
+    os.makedirs(gitfs.cache_root, exist_ok=True)
+    yield gitfs
+    salt.utils.gitfs.GitFS.instance_map.clear()
+
+
+def test_fetch_remotes_parallel(tmp_path, gitfs_nofetch):
+    """
+    Remotes are fetched concurrently, and the outcome of each fetch is
+    recorded
+    """
+    barrier = threading.Barrier(2, timeout=10)
+
+    def _fetch():
+        barrier.wait()
+        return True
+
+    def _fail():
+        raise Exception("unreachable")
+
+    gitfs_nofetch.remotes = [
+        _fake_remote(tmp_path, "one", _fetch),
+        _fake_remote(tmp_path, "two", _fetch),
+        _fake_remote(tmp_path, "three", _fail),
+    ]
+    with patch.dict(gitfs_nofetch.opts, {"gitfs_fetch_workers": 2}):
+        assert gitfs_nofetch.fetch_remotes() is True
+    stats = gitfs_nofetch.fetch_stats()
+    assert set(stats) == {"one", "two", "three"}
+    assert stats["one"]["changed"] is True
+    assert stats["one"]["error"] is None
+    assert stats["three"]["changed"] is False
+    assert stats["three"]["error"] == "unreachable"
+
+
+def test_fetch_remotes_timeout(tmp_path, gitfs_nofetch):
+    """
+    A remote which takes too long to fetch does not hold up the others
+    """
+    release = threading.Event()
+
+    gitfs_nofetch.remotes = [
+        _fake_remote(tmp_path, "slow", lambda: release.wait(10)),
+        _fake_remote(tmp_path, "fast", lambda: None),
+    ]
+    opts = {"gitfs_fetch_workers": 1, "gitfs_fetch_timeout": 1}
+    try:
+        start = time.time()
+        with patch.dict(gitfs_nofetch.opts, opts):
+            assert gitfs_nofetch.fetch_remotes() is False
+        assert time.time() - start < 5
+    finally:
+        release.set()
+    stats = gitfs_nofetch.fetch_stats()
+    assert stats["slow"]["error"] == "timed out after 1 seconds"
+    assert stats["fast"]["error"] is None
+    gitfs_nofetch.remotes[1].fetch.assert_called_once_with()
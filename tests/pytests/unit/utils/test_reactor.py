@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 
 import salt.utils.data
@@ -55,3 +58,268 @@ def test_run_master_reactor(master_opts, master_reactor):
                 master_reactor.run()
                 calls = [call(9)]
                 os_nice_mock.assert_has_calls(calls)
+
+
+def test_tag_index_matches_fnmatch():
+    """
+    Ensure that the tag index returns the same reactors, in the same order,
+    as matching each entry of the reactor map with fnmatch
+    """
+    react_map = [
+        {"salt/job/*/ret/*": ["/srv/reactor/ret.sls"]},
+        {"salt/minion/*": "/srv/reactor/minion.sls"},
+        {"salt/minion/web1/start": ["/srv/reactor/start.sls"]},
+        {"salt/minion/*/start": ["/srv/reactor/any_start.sls"]},
+        {"salt/minion/[a-z]*": ["/srv/reactor/alpha.sls"]},
+        {"*": ["/srv/reactor/all.sls"]},
+        {"salt/minion/web1/start": "/srv/reactor/start2.sls"},
+        {"invalid": 1},
+        "not a dict",
+    ]
+    index = reactor.TagIndex(react_map)
+    assert index.match("salt/minion/web1/start") == [
+        "/srv/reactor/minion.sls",
+        "/srv/reactor/start.sls",
+        "/srv/reactor/any_start.sls",
+        "/srv/reactor/alpha.sls",
+        "/srv/reactor/all.sls",
+        "/srv/reactor/start2.sls",
+    ]
+    assert index.match("salt/job/123/ret/web1") == [
+        "/srv/reactor/ret.sls",
+        "/srv/reactor/all.sls",
+    ]
+    assert index.match("salt/minion/1/stop") == [
+        "/srv/reactor/minion.sls",
+        "/srv/reactor/all.sls",
+    ]
+    assert reactor.TagIndex([]).match("salt/minion/web1/start") == []
+
+
+def test_list_reactors_reloads_map(master_opts, tmp_path):
+    """
+    Ensure that the reactor map file is only read again when it changes
+    """
+    react_map = tmp_path / "reactor.conf"
+    react_map.write_text("- salt/test:\n  - /srv/reactor/one.sls\n")
+    master_opts["reactor"] = str(react_map)
+    reactor_ = reactor.Reactor(master_opts)
+    with patch.object(
+        reactor_, "_read_react_map", wraps=reactor_._read_react_map
+    ) as read_mock:
+        assert reactor_.list_reactors("salt/test") == ["/srv/reactor/one.sls"]
+        assert reactor_.list_reactors("salt/test") == ["/srv/reactor/one.sls"]
+        assert read_mock.call_count == 1
+        react_map.write_text("- salt/test:\n  - /srv/reactor/two_files.sls\n")
+        assert reactor_.list_reactors("salt/test") == ["/srv/reactor/two_files.sls"]
+        assert read_mock.call_count == 2
+
+
+def test_add_reactor_updates_index(master_opts):
+    """
+    Ensure that reactors added at runtime are matched
+    """
+    master_opts["reactor"] = [{"salt/one": ["/srv/reactor/one.sls"]}]
+    reactor_ = reactor.Reactor(master_opts)
+    assert reactor_.list_reactors("salt/two") == []
+    reactor_.add_reactor("salt/two", ["/srv/reactor/two.sls"])
+    assert reactor_.list_reactors("salt/two") == ["/srv/reactor/two.sls"]
+    reactor_.delete_reactor("salt/two")
+    assert reactor_.list_reactors("salt/two") == []
+
+
+def test_render_reaction_cache(master_reactor, tmp_path):
+    """
+    Ensure that reaction files without template markup are only rendered once
+    per version of the file, while templated ones are rendered for each event
+    """
+    static = tmp_path / "static.sls"
+    static.write_text("refresh:\n  local.saltutil.refresh_pillar:\n    - tgt: '*'\n")
+    templated = tmp_path / "templated.sls"
+    templated.write_text(
+        "refresh:\n  local.saltutil.refresh_pillar:\n    - tgt: {{ data['id'] }}\n"
+    )
+    with patch.object(
+        master_reactor, "render_template", wraps=master_reactor.render_template
+    ) as render_mock:
+        for _ in range(3):
+            res = master_reactor.render_reaction(str(static), "salt/test", {})
+            assert res["refresh"]["__sls__"] == str(static)
+            res["refresh"]["mutated"] = True
+        assert render_mock.call_count == 1
+        assert (
+            "mutated"
+            not in master_reactor.render_reaction(str(static), "salt/test", {})[
+                "refresh"
+            ]
+        )
+
+        for minion in ("web1", "web2"):
+            res = master_reactor.render_reaction(
+                str(templated), "salt/test", {"id": minion}
+            )
+            assert res["refresh"]["local"][0] == {"tgt": minion}
+        assert render_mock.call_count == 3
+
+        static.write_text(
+            "refresh:\n  local.saltutil.refresh_pillar:\n    - tgt: web*\n"
+        )
+        res = master_reactor.render_reaction(str(static), "salt/test", {})
+        assert res["refresh"]["local"][0] == {"tgt": "web*"}
+        assert render_mock.call_count == 4
+
+
+def test_render_reaction_glob(master_reactor, tmp_path):
+    """
+    Ensure that globbed reaction files are expanded again when a file is added
+    """
+    (tmp_path / "one.sls").write_text("one:\n  local.test.ping:\n    - tgt: '*'\n")
+    ref = str(tmp_path / "*.sls")
+    assert list(master_reactor.render_reaction(ref, "salt/test", {})) == ["one"]
+    (tmp_path / "two.sls").write_text("two:\n  local.test.ping:\n    - tgt: '*'\n")
+    (tmp_path / ".hidden.sls").write_text("hidden:\n  local.test.ping: []\n")
+    assert sorted(master_reactor.render_reaction(ref, "salt/test", {})) == [
+        "one",
+        "two",
+    ]
+
+
+def _low(sls="/srv/reactor/start.sls", tgt="web1", **kwargs):
+    low = {
+        "state": "local",
+        "fun": "state.apply",
+        "__id__": "highstate",
+        "name": "highstate",
+        "__sls__": sls,
+        "__env__": "base",
+        "order": 10000,
+        "tgt": tgt,
+    }
+    low.update(kwargs)
+    return low
+
+
+def _wait_for(func, timeout=10):
+    start = time.time()
+    while not func():
+        if time.time() - start > timeout:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.fixture
+def react_wrap(master_opts):
+    wrap = reactor.ReactWrap(master_opts)
+    with patch.object(wrap, "execute") as execute:
+        wrap.execute_mock = execute
+        yield wrap
+
+
+def test_react_wrap_dispatches_immediately(react_wrap):
+    """
+    Ensure that without any limits reactions are executed right away
+    """
+    react_wrap.run(_low())
+    react_wrap.execute_mock.assert_called_once_with(_low())
+    assert react_wrap.get_stats()["dispatched"] == 1
+
+
+def test_react_wrap_coalesce(react_wrap):
+    """
+    Ensure that identical reactions are coalesced into a single one targeting
+    all the minions
+    """
+    for minion in ("web1", "web2", "web1", "web3"):
+        react_wrap.run(_low(tgt=minion, coalesce=0.2))
+    react_wrap.run(_low(tgt="db*", coalesce=0.2))
+    react_wrap.run(_low(tgt="db*", coalesce=0.2))
+    assert react_wrap.execute_mock.call_count == 0
+    assert _wait_for(lambda: react_wrap.execute_mock.call_count == 2)
+    lows = [call_.args[0] for call_ in react_wrap.execute_mock.call_args_list]
+    assert lows == [
+        _low(tgt=["web1", "web2", "web3"], tgt_type="list"),
+        _low(tgt="db*"),
+    ]
+    stats = react_wrap.get_stats()
+    assert stats["received"] == 6
+    assert stats["dispatched"] == 2
+    assert stats["coalesced"] == 4
+    assert stats["coalesce_ratio"] == 3
+
+
+def test_react_wrap_rate_limit(react_wrap):
+    """
+    Ensure that reactions over the rate limit of their reactor are delayed,
+    without holding back the other reactors
+    """
+    for minion in range(4):
+        react_wrap.run(_low(tgt=str(minion), rate_limit=2))
+    react_wrap.run(_low(sls="/srv/reactor/other.sls"))
+    assert react_wrap.execute_mock.call_count == 3
+    assert react_wrap.get_stats()["backlog"] == 2
+    assert _wait_for(lambda: react_wrap.execute_mock.call_count == 5)
+    tgts = [
+        call_.args[0]["tgt"]
+        for call_ in react_wrap.execute_mock.call_args_list
+        if call_.args[0]["__sls__"] == "/srv/reactor/start.sls"
+    ]
+    assert tgts == ["0", "1", "2", "3"]
+    assert react_wrap.get_stats()["backlog"] == 0
+
+
+@pytest.mark.parametrize(
+    "policy,expected", [("drop_new", ["0", "1", "2"]), ("drop_oldest", ["0", "2", "3"])]
+)
+def test_react_wrap_overflow(react_wrap, policy, expected):
+    """
+    Ensure that the overflow policy decides which reaction is dropped when the
+    backlog is full
+    """
+    opts = {"reactor_backlog_size": 2, "reactor_overflow_policy": policy}
+    with patch.dict(react_wrap.opts, opts):
+        for minion in range(4):
+            react_wrap.run(_low(tgt=str(minion), rate_limit=1))
+        assert react_wrap.get_stats()["dropped"] == 1
+        assert _wait_for(lambda: react_wrap.execute_mock.call_count == 3)
+    tgts = [call_.args[0]["tgt"] for call_ in react_wrap.execute_mock.call_args_list]
+    assert tgts == expected
+
+
+def test_react_wrap_max_concurrency(master_opts):
+    """
+    Ensure that no more runner reactions of a reactor than its concurrency
+    limit run at once
+    """
+    wrap = reactor.ReactWrap(master_opts)
+    release = threading.Event()
+    running = []
+
+    def _runner(fun, kwargs):
+        running.append(fun)
+        release.wait(10)
+
+    client_cache = {"runner": MagicMock()}
+    client_cache["runner"].low = _runner
+    low = {
+        "state": "runner",
+        "fun": "test.arg",
+        "__id__": "orchestrate",
+        "name": "orchestrate",
+        "__sls__": "/srv/reactor/orch.sls",
+        "order": 10000,
+        "args": [{"foo": "bar"}],
+        "max_concurrency": 2,
+    }
+    with patch.object(wrap, "client_cache", client_cache):
+        for _ in range(4):
+            wrap.run(low)
+        assert _wait_for(lambda: len(running) == 2)
+        time.sleep(0.2)
+        assert len(running) == 2
+        stats = wrap.get_stats()
+        assert stats["backlog"] == 2
+        assert stats["inflight"] == {"/srv/reactor/orch.sls": 2}
+        release.set()
+        assert _wait_for(lambda: len(running) == 4)
+        assert _wait_for(lambda: not wrap.get_stats()["inflight"])
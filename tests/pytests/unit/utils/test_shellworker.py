@@ -0,0 +1,131 @@
+"""
+Tests for salt.utils.shellworker
+"""
+import os
+import threading
+
+import pytest
+
+import salt.utils.shellworker
+from salt.exceptions import TimedProcTimeoutError
+from tests.support.mock import patch
+
+pytestmark = [
+    pytest.mark.skip_on_windows,
+    pytest.mark.skip_if_binaries_missing("sh"),
+]
+
+
+@pytest.fixture
+def worker():
+    worker = salt.utils.shellworker.ShellWorker(
+        "sh", env=dict(os.environ, SALT_TEST="value")
+    )
+    yield worker
+    worker.stop()
+
+
+def test_run(worker, tmp_path):
+    pid, retcode, out, err = worker.run(["echo", "a b"], cwd=str(tmp_path))
+    assert retcode == 0
+    assert out == b"a b\n"
+    assert err == b""
+    assert isinstance(pid, int)
+
+    # Shell commands, the environment, cwd and stderr
+    _, retcode, out, err = worker.run(
+        "echo $SALT_TEST; pwd; echo oops >&2; exit 3", shell=True, cwd=str(tmp_path)
+    )
+    assert retcode == 3
+    assert out == "value\n{}\n".format(tmp_path).encode()
+    assert err == b"oops\n"
+
+    # Nothing leaks from one command to the next
+    worker.run("cd /; export SALT_TEST=changed", shell=True)
+    _, _, out, _ = worker.run("echo $SALT_TEST", shell=True, umask=0o077)
+    assert out == b"value\n"
+    worker.run(["touch", str(tmp_path / "file")], umask=0o077)
+    assert os.stat(str(tmp_path / "file")).st_mode & 0o777 == 0o600
+
+
+def test_run_merge_stderr(worker):
+    pid, retcode, out, err = worker.run(
+        "echo out; echo err >&2; echo out", shell=True, merge_stderr=True
+    )
+    assert retcode == 0
+    assert out == b"out\nerr\nout\n"
+    assert err is None
+
+
+def test_run_large_output(worker):
+    """
+    Both streams are read while the command runs, so it does not block on a
+    full pipe
+    """
+    _, retcode, out, err = worker.run(
+        "head -c 1000000 /dev/zero; head -c 1000000 /dev/zero >&2; printf end",
+        shell=True,
+        timeout=30,
+    )
+    assert retcode == 0
+    assert out == b"\0" * 1000000 + b"end"
+    assert err == b"\0" * 1000000
+
+
+def test_run_threads(worker):
+    """
+    Commands run from several threads are run one after the other
+    """
+    results = {}
+
+    def run(idx):
+        results[idx] = worker.run("echo {}; echo {} >&2".format(idx, idx), shell=True)
+
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for idx in range(8):
+        assert results[idx][1:] == (
+            0,
+            "{}\n".format(idx).encode(),
+            "{}\n".format(idx).encode(),
+        )
+
+
+def test_timeout(worker):
+    proc = salt.utils.shellworker.WorkerProc(worker, "sleep 10", shell=True, timeout=1)
+    first = worker.process.pid
+    with pytest.raises(TimedProcTimeoutError):
+        proc.run()
+    assert proc.process.pid is not None
+    assert not worker.alive()
+
+    # The next command starts a new shell
+    proc = salt.utils.shellworker.WorkerProc(worker, ["echo", "ok"])
+    assert proc.run() == 0
+    assert proc.stdout == b"ok\n"
+    assert worker.process.pid != first
+
+
+def test_start_not_posix():
+    """
+    A shell which does not follow the protocol fails to start instead of
+    hanging
+    """
+    worker = salt.utils.shellworker.ShellWorker("cat")
+    with patch("salt.utils.shellworker.START_TIMEOUT", 5):
+        with pytest.raises(OSError, match="did not start"):
+            worker.run(["echo", "hi"])
+    assert worker.process is None
+
+
+def test_run_shell_exited(worker):
+    """
+    A shell dying while its commands keep its pipes open is noticed without
+    a timeout
+    """
+    with pytest.raises(OSError, match="exited"):
+        worker.run("sleep 30 & kill -9 $$", shell=True)
+    assert worker.process is None
@@ -0,0 +1,60 @@
+"""
+Tests for salt.utils.syndic
+"""
+import pytest
+
+import salt.utils.syndic
+
+
+def test_jid_cache():
+    cache = salt.utils.syndic.JidCache(3)
+    for jid in ("1", "2", "3", "4"):
+        cache.add(jid)
+    assert list(cache) == ["2", "3", "4"]
+    assert "1" not in cache
+    assert "4" in cache
+    assert len(cache) == 3
+
+
+def test_take_batch():
+    jdicts = [
+        {"__jid__": "1", "__load__": {"fun": "test.ping"}, "a": 1, "b": 2},
+        {"__jid__": "2", "__load__": {"fun": "test.echo"}, "a": 1, "b": 2, "c": 3},
+        {"__jid__": "3", "__load__": {}, "a": 1},
+    ]
+    batch, rest = salt.utils.syndic.take_batch(jdicts, 2)
+    assert batch == [jdicts[0]]
+    assert rest == jdicts[1:]
+
+    # A job return is split, its load only goes with the first part
+    batch, rest = salt.utils.syndic.take_batch(jdicts, 4)
+    assert batch == [
+        jdicts[0],
+        {"__jid__": "2", "__load__": {"fun": "test.echo"}, "a": 1, "b": 2},
+    ]
+    assert rest == [{"__jid__": "2", "__load__": {}, "c": 3}, jdicts[2]]
+    assert salt.utils.syndic.count_returns(jdicts[1]) == 3
+
+    batch, rest = salt.utils.syndic.take_batch(jdicts, 10)
+    assert batch == jdicts
+    assert rest == []
+
+
+def test_compress():
+    data = [{"__jid__": "1", "minion": {"return": "x" * 1000}}]
+    blob = salt.utils.syndic.compress(data)
+    assert len(blob) < 1000
+    assert salt.utils.syndic.decompress(blob) == data
+    with pytest.raises(ValueError):
+        salt.utils.syndic.decompress(blob, max_size=100)
+
+
+def test_spool(tmp_path):
+    spool = salt.utils.syndic.Spool(str(tmp_path / "spool"))
+    assert spool.pop() is None
+    assert spool.put([{"__jid__": "1"}])
+    assert spool.put([{"__jid__": "2"}])
+    assert len(spool) == 2
+    assert spool.pop() == [{"__jid__": "1"}]
+    assert spool.pop() == [{"__jid__": "2"}]
+    assert spool.pop() is None
@@ -1,3 +1,6 @@
+import os
+import tarfile
+
 import pytest
 
 import salt.exceptions
@@ -77,3 +80,59 @@ def test_get_ext_tops(version):
     else:
         assert not [x for x in ret["namespace"]["dependencies"] if "distro" in x]
         assert [x for x in ret["namespace"]["dependencies"] if "msgpack" in x]
+
+
+def test_gen_thin_layers(tmp_path):
+    """
+    Test the thin layers are reproducible, cached and only change with
+    their content
+    """
+    site = tmp_path / "site"
+    for pkg in ("salt", "yaml", "mako"):
+        (site / pkg).mkdir(parents=True)
+        (site / pkg / "__init__.py").write_text("# {}\n".format(pkg))
+    (site / "salt" / "__init__.pyc").write_bytes(b"compiled")
+    cachedir = tmp_path / "cache"
+
+    def _get_tops(extra_mods="", so_mods=""):
+        tops = [str(site / "salt"), str(site / "yaml")]
+        if extra_mods:
+            tops.append(str(site / extra_mods))
+        return tops
+
+    with patch("salt.utils.thin.get_tops", _get_tops):
+        layers = salt.utils.thin.gen_thin_layers(str(cachedir))
+        assert sorted(layers) == ["deps", "meta", "salt"]
+        assert salt.utils.thin.layer_sums(str(cachedir)) == layers
+        with tarfile.open(
+            salt.utils.thin.layer_path(str(cachedir), layers["salt"])
+        ) as tfp:
+            assert tfp.getnames() == ["pyall/salt/__init__.py"]
+
+        # Regenerating the same content gives the same layers
+        assert salt.utils.thin.gen_thin_layers(str(cachedir), overwrite=True) == layers
+
+        with_extra = salt.utils.thin.gen_thin_layers(str(cachedir), extra_mods="mako")
+        assert with_extra["salt"] == layers["salt"]
+        assert with_extra["deps"] == layers["deps"]
+        assert "extra" in with_extra
+
+        (site / "salt" / "__init__.py").write_text("# changed\n")
+        changed = salt.utils.thin.gen_thin_layers(
+            str(cachedir), extra_mods="mako", overwrite=True
+        )
+        assert changed["salt"] != with_extra["salt"]
+        assert changed["deps"] == with_extra["deps"]
+        # Layers which are no longer used are removed
+        assert not os.path.exists(
+            salt.utils.thin.layer_path(str(cachedir), with_extra["salt"])
+        )
+
+        # Reading the sums with the same extra modules keeps the extra layer,
+        # even when the manifest is missing
+        os.remove(
+            os.path.join(salt.utils.thin.layers_dir(str(cachedir)), "manifest.json")
+        )
+        sums = salt.utils.thin.layer_sums(str(cachedir), extra_mods="mako")
+        assert sums == changed
+        assert os.path.exists(salt.utils.thin.layer_path(str(cachedir), sums["extra"]))